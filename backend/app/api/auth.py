@@ -1,11 +1,13 @@
 ﻿from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, List, Optional
 
-from fastapi import APIRouter, HTTPException, status
-from jose import JWTError, jwt
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel, Field, validator
 
 from ..config import settings
+from ..security import get_jwks_cache, get_nonce_store, require_internal_endpoints, verify_oidc_token
+from ..services.zklogin import ProofJob, VerifierSaturatedError, get_proof_verifier
 
 
 router = APIRouter()
@@ -78,9 +80,20 @@ class ZkLoginRequest(BaseModel):
 
 
 @router.post("/zk-login")
-def zk_login(payload: ZkLoginRequest):
+async def zk_login(payload: ZkLoginRequest):
+    from jose import ExpiredSignatureError, JWTError, jwt
+
     try:
-        claims = jwt.get_unverified_claims(payload.jwt)
+        if get_jwks_cache() is not None:
+            # A JWKS refresh may fetch over the network.
+            claims = await run_in_threadpool(verify_oidc_token, payload.jwt)
+        else:
+            claims = jwt.get_unverified_claims(payload.jwt)
+    except ExpiredSignatureError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="OIDC token has expired",
+        ) from exc
     except JWTError as exc:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -113,6 +126,39 @@ def zk_login(payload: ZkLoginRequest):
             detail="Nonce mismatch between proof and OIDC token",
         )
 
+    # Replays of a spent nonce are refused before they reach the verifier.
+    if get_nonce_store().is_used(payload.nonce):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Nonce has already been used",
+        )
+
+    job = ProofJob(
+        address=payload.address,
+        max_epoch=payload.proof.max_epoch,
+        proof=payload.proof.proof,
+        public_inputs=tuple(payload.proof.public_inputs) if payload.proof.public_inputs else None,
+    )
+    try:
+        proof_valid = await get_proof_verifier().verify(job)
+    except VerifierSaturatedError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many logins are being verified; retry shortly",
+            headers={"Retry-After": "1"},
+        ) from exc
+    if not proof_valid:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid zkLogin proof",
+        )
+
+    if not get_nonce_store().use(payload.nonce, exp_dt.timestamp()):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Nonce has already been used",
+        )
+
     session_expiration = now + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     session_payload = {
         "sub": claims.get("sub"),
@@ -147,3 +193,9 @@ def zk_login(payload: ZkLoginRequest):
         },
         "proof": proof_summary,
     }
+
+
+@router.get("/metrics", dependencies=[Depends(require_internal_endpoints)], include_in_schema=False)
+def auth_metrics():
+    """zkLogin proof verification queue and latency (operational, see ``app.main``)."""
+    return {"proof_verifier": get_proof_verifier().stats()}
@@ -0,0 +1,84 @@
+import asyncio
+import json
+from typing import List
+
+from fastapi import APIRouter, HTTPException, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+
+from ..config import settings
+from ..services.live import SubscriptionClosed, get_live_hub
+
+router = APIRouter()
+
+# WebSocket close codes for a dropped subscriber; anything else closes normally.
+_CLOSE_CODES = {"slow consumer": 1013, "shutdown": 1001}
+
+@router.websocket("/ws")
+async def live_socket(websocket: WebSocket, topic: List[str] = Query([])):
+    # Frames of metric/proposal deltas for ?topic=feed|tag:<tag>|message:<id>|proposals|proposal:<id>.
+    # Clients change topics with {"subscribe": [...], "unsubscribe": [...]}.
+    await websocket.accept()
+    hub = get_live_hub()
+    try:
+        subscriber = hub.subscribe(topic)
+    except ValueError as exc:
+        await websocket.close(code=1008, reason=str(exc))
+        return
+
+    async def receive() -> None:
+        try:
+            while True:
+                try:
+                    request = json.loads(await websocket.receive_text())
+                    hub.update(
+                        subscriber, add=request.get("subscribe", ()), remove=request.get("unsubscribe", ())
+                    )
+                except (ValueError, AttributeError, TypeError) as exc:
+                    await websocket.send_text(json.dumps({"error": str(exc)}))
+        except WebSocketDisconnect:
+            hub.unsubscribe(subscriber, "disconnected")
+
+    reader = asyncio.ensure_future(receive())
+    try:
+        while True:
+            await websocket.send_text(await subscriber.next_frame())
+    except SubscriptionClosed as exc:
+        if exc.reason != "disconnected":
+            await websocket.close(code=_CLOSE_CODES.get(exc.reason, 1000), reason=exc.reason)
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    finally:
+        reader.cancel()
+        hub.unsubscribe(subscriber, "disconnected")
+
+@router.get("/sse")
+async def live_events(topic: List[str] = Query([])):
+    # The same frames as /live/ws as server-sent events, with keepalive comments.
+    hub = get_live_hub()
+    try:
+        subscriber = hub.subscribe(topic)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    async def stream():
+        try:
+            yield "retry: 1000\n\n"
+            while True:
+                try:
+                    frame = await subscriber.next_frame(timeout=settings.LIVE_SSE_KEEPALIVE_SECONDS)
+                except SubscriptionClosed as exc:
+                    yield f"event: closed\ndata: {json.dumps({'reason': exc.reason})}\n\n"
+                    return
+                yield ": keepalive\n\n" if frame is None else f"data: {frame}\n\n"
+        finally:
+            hub.unsubscribe(subscriber, "disconnected")
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.get("/stats")
+def live_stats():
+    return get_live_hub().stats()
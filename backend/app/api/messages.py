@@ -1,15 +1,30 @@
-from typing import List, Optional
+from typing import Iterator, List, Optional
 
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 
 from ..schemas import MessageFeedEntry
-from ..services.messages import list_messages
+from ..services.messages import InvalidCursorError, MessagePage, page_messages_async
 
 router = APIRouter()
 
+MAX_PAGE_SIZE = 200
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def _ndjson_lines(encoded: Iterator[bytes]) -> Iterator[bytes]:
+    for entry in encoded:
+        yield entry + b"\n"
+
+
+def _json_array(page: MessagePage) -> bytes:
+    return b"[" + b",".join(page.encoded()) + b"]"
+
 
 @router.get("/", response_model=List[MessageFeedEntry])
-def get_messages(
+async def get_messages(
     search: Optional[str] = Query(
         default=None,
         description="Case-insensitive search across title, content, creator handle, and tags.",
@@ -26,14 +41,46 @@ def get_messages(
         default="latest",
         description="Sort mode: 'latest', 'likes', 'alerts', or 'under_review'.",
     ),
-) -> List[MessageFeedEntry]:
-    messages = list_messages(
-        search=search,
-        tags=tags,
-        tag_mode=tag_mode,
-        sort=sort,
-    )
-    return messages
+    limit: Optional[int] = Query(
+        default=None,
+        ge=1,
+        le=MAX_PAGE_SIZE,
+        description="Page size. When set, the next page cursor is returned in the X-Next-Cursor header.",
+    ),
+    cursor: Optional[str] = Query(
+        default=None,
+        description="Opaque cursor from a previous page's X-Next-Cursor header.",
+    ),
+    response_format: str = Query(
+        default="json",
+        alias="format",
+        pattern="^(json|ndjson)$",
+        description="'json' (default) for a JSON array, 'ndjson' to stream one entry per line.",
+    ),
+) -> Response:
+    try:
+        page = await page_messages_async(
+            search=search,
+            tags=tags,
+            tag_mode=tag_mode,
+            sort=sort,
+            cursor=cursor,
+            limit=limit,
+        )
+    except InvalidCursorError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+
+    # Entries are spliced from cached, pre-encoded segments; returning a Response
+    # skips re-validating them through response_model.  Rendering entries that
+    # miss the cache is CPU work, so it runs on the threadpool (StreamingResponse
+    # iterates a sync generator there already).
+    headers = {NEXT_CURSOR_HEADER: page.next_cursor} if page.next_cursor else {}
+    if response_format == "ndjson":
+        return StreamingResponse(
+            _ndjson_lines(page.encoded()), media_type=NDJSON_MEDIA_TYPE, headers=headers
+        )
+    body = await run_in_threadpool(_json_array, page)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 @router.post("/")
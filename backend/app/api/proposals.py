@@ -1,14 +1,57 @@
-from fastapi import APIRouter
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from ..schemas import ProposalSummary, ProposalType, ProposalVote
+from ..security import get_current_user
+from ..services.proposals import (
+    AlreadyVotedError,
+    NotAManagerError,
+    ProposalClosedError,
+    UnknownProposalError,
+    cast_vote,
+    list_open_proposals,
+    pending_proposals,
+)
 
 router = APIRouter()
 
-@router.get("/")
-def get_proposals():
-    # TODO: Get active hype/scam proposals for managers
-    return []
+@router.get("/", response_model=List[ProposalSummary])
+def get_proposals(
+    proposal_type: Optional[ProposalType] = Query(None, alias="type"),
+    message_id: Optional[str] = Query(None),
+    newest_first: bool = Query(False),
+    limit: Optional[int] = Query(None, ge=1, le=500),
+):
+    # Open hype/scam proposals, opened automatically when a message crosses
+    # the like/alert threshold (see app.services.proposals).
+    return list_open_proposals(proposal_type, message_id, newest_first=newest_first, limit=limit)
+
+@router.get("/pending", response_model=List[ProposalSummary])
+def get_pending_proposals(
+    proposal_type: Optional[ProposalType] = Query(None, alias="type"),
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    current_user: dict = Depends(get_current_user),
+):
+    # Open proposals the calling manager has not voted on yet, for dashboards
+    # that poll every second.
+    try:
+        return pending_proposals(current_user["id"], proposal_type, limit=limit)
+    except NotAManagerError:
+        raise HTTPException(status_code=403, detail="Only managers have pending proposals")
 
-@router.post("/{proposal_id}/vote")
-def vote_on_proposal(proposal_id: int):
-    # TODO: Allow managers to vote (2/3 majority)
-    # On success, resolve hype/scam via chain.py
-    return {"status": "voted"}
+@router.post("/{proposal_id}/vote", response_model=ProposalSummary)
+def vote_on_proposal(proposal_id: str, vote: ProposalVote, current_user: dict = Depends(get_current_user)):
+    # One vote per manager; QUORUM votes on either side resolve the proposal.
+    # The outcome moves the message to HYPED/SPAM, or back to NORMAL (see
+    # app.services.proposals.apply_outcome).
+    try:
+        return cast_vote(proposal_id, current_user["id"], vote.approve)
+    except UnknownProposalError:
+        raise HTTPException(status_code=404, detail="Proposal not found")
+    except NotAManagerError:
+        raise HTTPException(status_code=403, detail="Only managers can vote")
+    except ProposalClosedError:
+        raise HTTPException(status_code=409, detail="Proposal is no longer open")
+    except AlreadyVotedError:
+        raise HTTPException(status_code=409, detail="Already voted on this proposal")
@@ -1,15 +1,24 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException
+
+from ..services.counters import UnknownMessageError, get_reaction_buffer
 
 router = APIRouter()
 
 @router.post("/{message_id}/like")
-def like_message(message_id: int):
-    # TODO: Increment off-chain like count
-    # If > 20, trigger manager vote for hype
-    return {"status": "ok"}
+def like_message(message_id: str):
+    # Buffered write-behind; crossing LIKES_THRESHOLD is reported by the buffer
+    # so a manager vote for hype can be opened.
+    try:
+        totals = get_reaction_buffer().increment(message_id, likes=1)
+    except UnknownMessageError:
+        raise HTTPException(status_code=404, detail="Message not found")
+    return {"status": "ok", "likes": totals.likes, "alerts": totals.alerts}
 
 @router.post("/{message_id}/alert")
-def alert_message(message_id: int):
-    # TODO: Increment off-chain alert count
-    # If > 20, trigger manager vote for scam
-    return {"status": "ok"}
+def alert_message(message_id: str):
+    # Crossing ALERTS_THRESHOLD is reported the same way for a scam vote.
+    try:
+        totals = get_reaction_buffer().increment(message_id, alerts=1)
+    except UnknownMessageError:
+        raise HTTPException(status_code=404, detail="Message not found")
+    return {"status": "ok", "likes": totals.likes, "alerts": totals.alerts}
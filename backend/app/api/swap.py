@@ -1,11 +1,13 @@
 from fastapi import APIRouter
 
+from app.services.amm import get_swap_pool
+
 router = APIRouter()
 
 @router.get("/pool")
 def get_swap_pool_status():
-    # TODO: Return SUI <-> SWT pool details
-    return {}
+    # Local SUI <-> SWT pool model; reserves follow the chain via sync/apply_event.
+    return get_swap_pool().status()
 
 @router.post("/swap")
 def execute_swap():
@@ -1,24 +1,85 @@
 """Wallet API endpoints for balance summaries, swap quotes, and address lookups."""
 from __future__ import annotations
 
-from datetime import datetime, timedelta
+import asyncio
+import logging
+import threading
+import time
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from datetime import datetime, timedelta, timezone
 from decimal import Decimal, InvalidOperation
-from typing import Dict, List, Literal, Optional, Tuple
+from typing import Annotated, AsyncIterator, Dict, List, Literal, Mapping, Optional, Tuple
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel, Field
 
 from app import chain as chain_module
+from app.chain import SWT_COIN_SUFFIX
+from app.chain_client import SUI_COIN_TYPE
+from app.config import settings
 from app.security import get_current_user
+from app.services.amm import ConstantProductPool, PoolError, get_swap_pool
+from app.services.idempotency import IdempotencyInProgressError, get_idempotency_store
+from app.services.prices import get_price_oracle
+from app.services.quote_tokens import QuoteTokenError, QuoteTokenExpiredError, get_quote_signer
+from app.services.wallet_cache import WalletCache
+
+
+@asynccontextmanager
+async def _lifespan(_app: object) -> AsyncIterator[None]:
+    # Merged into the lifespan of whichever app includes the router.
+    use_chain_pool(ThreadPoolExecutor(max_workers=WALLET_CHAIN_WORKERS, thread_name_prefix="wallet-chain"))
+    stop = asyncio.Event()
+    followers = []
+    if settings.WALLET_FOLLOW_EVENTS:
+        from app.indexer import WALLET_MODULES, balance_changes, rpc_indexers
+
+        followers = rpc_indexers(
+            None,
+            WALLET_MODULES,
+            on_page=lambda events: _WALLET_CACHE.apply_balance_changes(balance_changes(events)),
+            project=False,
+        )
+    tasks = [asyncio.create_task(follower.run(stop=stop)) for follower in followers]
+    try:
+        yield
+    finally:
+        stop.set()
+        for follower, result in zip(followers, await asyncio.gather(*tasks, return_exceptions=True)):
+            if isinstance(result, Exception):
+                logger.warning("wallet event follower %s failed: %s", follower.name, result)
+            await follower.source.aclose()
+        use_chain_pool(None)
+
+
+logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/api/wallet", tags=["wallet"])
+router = APIRouter(lifespan=_lifespan)
 
 FEE_BPS = 1  # 0.01%
-IDEMPOTENCY_TTL = timedelta(minutes=5)
 QUOTE_TTL_SECONDS = 30
+MAX_BATCH_QUOTES = 500
+MAX_LADDER_STEPS = 100
 ASSET_SYMBOLS: Tuple[str, ...] = ("SWT", "SUI", "BTC", "ETH")
 SWAPPABLE_SYMBOLS: Tuple[str, ...] = ("SWT", "SUI")
 _OPTIONAL_CHAIN_SYMBOLS = {"BTC", "ETH"}
+# Chain each asset lives on; the summary reads the balances of one chain in a
+# single batched call, and the chains concurrently.
+ASSET_CHAINS: Mapping[str, str] = {"SWT": "sui", "SUI": "sui", "BTC": "bitcoin", "ETH": "ethereum"}
+# A required chain's address lookups and balance call must finish this long
+# after the summary starts; the balance call is cancelled at that point.
+CHAIN_CALL_TIMEOUT_SECONDS = 2.0
+# Optional chains never hold up a summary past this point; late ones read as 0.
+OPTIONAL_CHAIN_TIMEOUT_SECONDS = 0.5
+# How long past a chain's deadline the summary waits for its lookups to stop
+# on their own before cancelling them (see ``_get_asset_balances``).
+CHAIN_DEADLINE_GRACE_SECONDS = 0.05
+WALLET_CHAIN_WORKERS = 16
+# Addresses never change; balances are cached briefly and dropped on swaps and coin events.
+BALANCE_CACHE_TTL_SECONDS = 5.0
+WALLET_CACHE_MAX_ENTRIES = 50_000
 
 
 def _decimal_encoder(value: Decimal) -> str:
@@ -60,10 +121,45 @@ class SwapQuoteResp(WalletBaseModel):
     fee_amount: Decimal
     price: Decimal
     expires_at: datetime
+    # Signed copy of this quote; pass it to /swap/execute to execute at this price.
+    quote_token: Optional[str] = None
+
+
+class SwapQuoteBatchReq(WalletBaseModel):
+    quotes: List[SwapQuoteReq] = Field(..., min_length=1, max_length=MAX_BATCH_QUOTES)
+
+
+class SwapQuoteBatchResp(WalletBaseModel):
+    quotes: List[SwapQuoteResp]
+
+
+class SwapLadderReq(WalletBaseModel):
+    pay_symbol: Literal["SWT", "SUI"]
+    receive_symbol: Literal["SWT", "SUI"]
+    pay_amounts: List[Annotated[Decimal, Field(gt=Decimal("0"))]] = Field(
+        ..., min_length=1, max_length=MAX_LADDER_STEPS
+    )
+
+
+class SwapLadderStep(WalletBaseModel):
+    pay_amount: Decimal
+    receive_amount: Decimal
+    fee_amount: Decimal
+
+
+class SwapLadderResp(WalletBaseModel):
+    pay_symbol: str
+    receive_symbol: str
+    fee_rate_bps: int
+    # Spot price of the snapshot every step was quoted from.
+    price: Decimal
+    expires_at: datetime
+    steps: List[SwapLadderStep]
 
 
 class SwapExecReq(SwapQuoteReq):
     idempotency_key: Optional[str] = None
+    quote_token: Optional[str] = None
 
 
 class SwapExecResp(WalletBaseModel):
@@ -82,9 +178,50 @@ class AddressResp(WalletBaseModel):
     chain: str
 
 
-_PRICE_CACHE: Optional[Tuple[datetime, Dict[str, Decimal]]] = None
-_PRICE_CACHE_TTL = timedelta(minutes=5)
-_IDEMPOTENCY_CACHE: Dict[str, Tuple[datetime, SwapExecResp]] = {}
+_WALLET_CACHE = WalletCache(
+    max_entries=WALLET_CACHE_MAX_ENTRIES,
+    balance_ttl=BALANCE_CACHE_TTL_SECONDS,
+    coin_symbols={SUI_COIN_TYPE: "SUI", "0x" + "0" * 63 + "2::sui::SUI": "SUI"},
+)
+if settings.SUI_PACKAGE_ID:
+    _WALLET_CACHE.coin_symbols[settings.SUI_PACKAGE_ID + SWT_COIN_SUFFIX] = "SWT"
+
+
+def get_wallet_cache() -> WalletCache:
+    return _WALLET_CACHE
+
+
+_CHAIN_POOL: Optional[ThreadPoolExecutor] = None
+_CHAIN_POOL_LOCK = threading.Lock()
+
+
+def get_chain_pool() -> ThreadPoolExecutor:
+    """Bounded pool for the summary's concurrent chain calls; owned by the router lifespan."""
+    global _CHAIN_POOL
+    with _CHAIN_POOL_LOCK:
+        if _CHAIN_POOL is None:
+            _CHAIN_POOL = ThreadPoolExecutor(max_workers=WALLET_CHAIN_WORKERS, thread_name_prefix="wallet-chain")
+        return _CHAIN_POOL
+
+
+# Summary chain lookups that ran past their deadline: ``timeouts`` counts them,
+# ``abandoned`` those still holding a pool thread when the summary gave up.
+_CHAIN_LOOKUPS = {"timeouts": 0, "abandoned": 0}
+_CHAIN_LOOKUPS_LOCK = threading.Lock()
+
+
+def _count_chain_lookup(outcome: str) -> None:
+    with _CHAIN_LOOKUPS_LOCK:
+        _CHAIN_LOOKUPS[outcome] += 1
+
+
+def use_chain_pool(pool: Optional[ThreadPoolExecutor]) -> None:
+    """Swap the chain pool; the previous one is shut down, and ``None`` rebuilds it on next use."""
+    global _CHAIN_POOL
+    with _CHAIN_POOL_LOCK:
+        previous, _CHAIN_POOL = _CHAIN_POOL, pool
+    if previous is not None and previous is not pool:
+        previous.shutdown(wait=False, cancel_futures=True)
 
 
 def _wallet_error(status_code: int, code: str, detail: str) -> HTTPException:
@@ -105,21 +242,9 @@ def _get_user_identifier(user: object) -> str:
     return str(user)
 
 
-def _get_prices_usd() -> Dict[str, Decimal]:
-    # TODO(pricing): Replace with external oracle integration.
-    global _PRICE_CACHE
-    now = datetime.utcnow()
-    if _PRICE_CACHE and (now - _PRICE_CACHE[0]) < _PRICE_CACHE_TTL:
-        return _PRICE_CACHE[1]
-
-    prices = {
-        "SWT": Decimal("0.001"),
-        "SUI": Decimal("3.66"),
-        "BTC": Decimal("155500"),
-        "ETH": Decimal("4500"),
-    }
-    _PRICE_CACHE = (now, prices)
-    return prices
+def _get_prices_usd() -> Mapping[str, Decimal]:
+    # Served from the oracle's snapshot; a stale snapshot is refreshed in the background.
+    return get_price_oracle().prices()
 
 
 def _get_chain_callable(name: str):
@@ -141,7 +266,7 @@ def _get_user_address(user_identifier: str, symbol: str, *, optional: bool = Fal
             return None
         raise
     try:
-        address = func(user_identifier, symbol)
+        address = _WALLET_CACHE.address(user_identifier, symbol, lambda: func(user_identifier, symbol))
     except Exception as exc:  # noqa: BLE001 - bubble up as wallet error
         if optional:
             return None
@@ -150,6 +275,8 @@ def _get_user_address(user_identifier: str, symbol: str, *, optional: bool = Fal
             "WALLET_CHAIN_UNAVAILABLE",
             f"Unable to fetch {symbol} address: {exc}",
         ) from exc
+    if not address:
+        _WALLET_CACHE.addresses.invalidate((user_identifier, symbol))
     return address
 
 
@@ -186,10 +313,10 @@ def _get_asset_balance(
     try:
         if symbol == "SUI":
             func = _get_chain_callable("get_sui_balance")
-            raw_balance = func(address)
+            raw_balance = _WALLET_CACHE.balance(address, symbol, lambda: func(address))
         else:
             func = _get_chain_callable("get_token_balance")
-            raw_balance = func(address, symbol)
+            raw_balance = _WALLET_CACHE.balance(address, symbol, lambda: func(address, symbol))
     except HTTPException:
         if optional:
             return Decimal("0")
@@ -206,7 +333,131 @@ def _get_asset_balance(
     return _to_decimal(raw_balance)
 
 
-def _compute_quote(pay_symbol: str, receive_symbol: str, pay_amount: Decimal) -> Tuple[Decimal, Decimal, Decimal]:
+def _get_chain_balances(
+    user_identifier: str,
+    symbols: Tuple[str, ...],
+    *,
+    optional: bool,
+    deadline: float,
+) -> Dict[str, Decimal]:
+    """Balances of ``symbols`` on one chain; uncached ones are read in one ``get_balances`` call."""
+    label = ", ".join(symbols)
+    zeros = {symbol: Decimal("0") for symbol in symbols}
+    try:
+        addresses: Dict[str, str] = {}
+        for symbol in symbols:
+            address = _get_user_address(user_identifier, symbol, optional=optional)
+            if address:
+                addresses[symbol] = address
+            elif not optional:
+                raise _wallet_error(
+                    status.HTTP_503_SERVICE_UNAVAILABLE,
+                    "WALLET_CHAIN_UNAVAILABLE",
+                    f"Address for {symbol} unavailable.",
+                )
+
+        def read(queries: List[Tuple[str, str]]) -> Dict[Tuple[str, str], object]:
+            func = _get_chain_callable("get_balances")
+            return dict(zip(queries, func(queries, timeout=max(0.0, deadline - time.monotonic()))))
+
+        missing = [
+            (address, symbol)
+            for symbol, address in addresses.items()
+            if _WALLET_CACHE.cached_balance(address, symbol) is None
+        ]
+        fetched = read(missing) if missing else {}
+        balances = dict(zeros)
+        for symbol, address in addresses.items():
+            key = (address, symbol)
+            # An entry that expired since the check above is read on its own.
+            raw = _WALLET_CACHE.balance(
+                address, symbol, lambda key=key: fetched[key] if key in fetched else read([key])[key]
+            )
+            balances[symbol] = _to_decimal(raw)
+        return balances
+    except HTTPException:
+        if optional:
+            return zeros
+        raise
+    except FutureTimeoutError as exc:
+        _count_chain_lookup("timeouts")
+        if optional:
+            return zeros
+        raise _wallet_error(
+            status.HTTP_503_SERVICE_UNAVAILABLE,
+            "WALLET_CHAIN_UNAVAILABLE",
+            f"Timed out fetching {label} balance.",
+        ) from exc
+    except Exception as exc:  # noqa: BLE001 - rewrap
+        if optional:
+            return zeros
+        raise _wallet_error(
+            status.HTTP_503_SERVICE_UNAVAILABLE,
+            "WALLET_CHAIN_UNAVAILABLE",
+            f"Unable to fetch {label} balance: {exc}",
+        ) from exc
+
+
+def _get_asset_balances(
+    current_user: object,
+    user_identifier: str,
+    symbols: Tuple[str, ...],
+) -> Dict[str, Decimal]:
+    """Fetch asset balances one batched call per chain, the chains concurrently on the chain pool.
+
+    Each chain's balance call is cancelled at its deadline.  A chain whose
+    lookups are still running shortly after that is given up on: its pool
+    task is cancelled if it has not started, or counted as abandoned.
+    """
+    started = time.monotonic()
+    pool = get_chain_pool()
+    chains: Dict[str, List[str]] = {}
+    for symbol in symbols:
+        chains.setdefault(ASSET_CHAINS[symbol], []).append(symbol)
+    lookups = []
+    for members in chains.values():
+        optional = all(symbol in _OPTIONAL_CHAIN_SYMBOLS for symbol in members)
+        deadline = started + (OPTIONAL_CHAIN_TIMEOUT_SECONDS if optional else CHAIN_CALL_TIMEOUT_SECONDS)
+        future = pool.submit(
+            _get_chain_balances, user_identifier, tuple(members), optional=optional, deadline=deadline
+        )
+        lookups.append((optional, deadline, members, future))
+
+    balances: Dict[str, Decimal] = {}
+    # Required chains first: optional ones only get whatever time is left.
+    for optional, deadline, members, future in sorted(lookups, key=lambda lookup: lookup[0]):
+        try:
+            balances.update(
+                future.result(timeout=max(0.0, deadline + CHAIN_DEADLINE_GRACE_SECONDS - time.monotonic()))
+            )
+        except FutureTimeoutError as exc:
+            _count_chain_lookup("timeouts")
+            if not future.cancel():
+                _count_chain_lookup("abandoned")
+            if optional:
+                balances.update((symbol, Decimal("0")) for symbol in members)
+                continue
+            raise _wallet_error(
+                status.HTTP_503_SERVICE_UNAVAILABLE,
+                "WALLET_CHAIN_UNAVAILABLE",
+                f"Timed out fetching {', '.join(members)} balance.",
+            ) from exc
+    return balances
+
+
+def _compute_quote(
+    pay_symbol: str,
+    receive_symbol: str,
+    pay_amount: Decimal,
+    prices: Optional[Mapping[str, Decimal]] = None,
+    pool: Optional[ConstantProductPool] = None,
+) -> Tuple[Decimal, Decimal, Decimal]:
+    """Return ``(receive_amount, fee_amount, price)``; batch callers pass one ``prices`` and ``pool`` snapshot.
+
+    Pairs the SUI/SWT pool model covers are priced from its reserves once it
+    has liquidity; everything else from USD prices.  ``price`` is the spot
+    price, before fee and price impact.
+    """
     if pay_symbol == receive_symbol:
         raise _wallet_error(
             status.HTTP_400_BAD_REQUEST,
@@ -214,7 +465,21 @@ def _compute_quote(pay_symbol: str, receive_symbol: str, pay_amount: Decimal) ->
             "Cannot swap the same asset.",
         )
 
-    prices = _get_prices_usd()
+    if pool is None:
+        pool = get_swap_pool()
+    if pool.ready and {pay_symbol, receive_symbol} == set(pool.symbols):
+        # Priced off the pool's reserves, so the quote includes price impact.
+        try:
+            return pool.quote_amount(pay_symbol, pay_amount)
+        except PoolError as exc:
+            raise _wallet_error(
+                status.HTTP_400_BAD_REQUEST,
+                "WALLET_INVALID_QUOTE",
+                f"Pool cannot quote this swap: {exc}",
+            ) from exc
+
+    if prices is None:
+        prices = _get_prices_usd()
     try:
         price_pay = prices[pay_symbol]
         price_receive = prices[receive_symbol]
@@ -255,11 +520,26 @@ def _ensure_balance_available(
         )
 
 
-def _clean_idempotency_cache() -> None:
-    now = datetime.utcnow()
-    expired_keys = [key for key, (ts, _) in _IDEMPOTENCY_CACHE.items() if now - ts > IDEMPOTENCY_TTL]
-    for key in expired_keys:
-        _IDEMPOTENCY_CACHE.pop(key, None)
+def _min_receive_amount(expected_receive_amount: Decimal, slippage_bps: int) -> Decimal:
+    if slippage_bps > 10_000:
+        raise _wallet_error(
+            status.HTTP_400_BAD_REQUEST,
+            "WALLET_INVALID_SLIPPAGE",
+            "slippage_bps must not exceed 10000.",
+        )
+    return expected_receive_amount * (Decimal(10_000) - slippage_bps) / Decimal(10_000)
+
+
+def _verify_quote_token(exec_req: SwapExecReq, user_identifier: str) -> Decimal:
+    """Check the quote token against the request and return its quoted receive amount."""
+    try:
+        return get_quote_signer().verify(
+            exec_req.quote_token, user_identifier, exec_req.pay_symbol, exec_req.receive_symbol, exec_req.pay_amount
+        )
+    except QuoteTokenExpiredError as exc:
+        raise _wallet_error(status.HTTP_400_BAD_REQUEST, "WALLET_QUOTE_EXPIRED", "Quote has expired.") from exc
+    except QuoteTokenError as exc:
+        raise _wallet_error(status.HTTP_400_BAD_REQUEST, "WALLET_QUOTE_INVALID", str(exc)) from exc
 
 
 @router.get("/summary", response_model=WalletSummaryResp)
@@ -268,10 +548,10 @@ def get_wallet_summary(current_user: object = Depends(get_current_user)) -> Wall
     prices = _get_prices_usd()
     updated_at = datetime.utcnow()
 
+    balances = _get_asset_balances(current_user, user_identifier, ASSET_SYMBOLS)
     assets: List[AssetBalance] = []
     for symbol in ASSET_SYMBOLS:
-        optional = symbol in _OPTIONAL_CHAIN_SYMBOLS
-        balance = _get_asset_balance(current_user, user_identifier, symbol, optional=optional)
+        balance = balances[symbol]
         usd_value = balance * prices[symbol]
         assets.append(
             AssetBalance(
@@ -285,11 +565,19 @@ def get_wallet_summary(current_user: object = Depends(get_current_user)) -> Wall
 @router.post("/swap/quote", response_model=SwapQuoteResp)
 def get_swap_quote(
     quote_req: SwapQuoteReq, current_user: object = Depends(get_current_user)
-) -> SwapQuoteResp:  # noqa: ARG001 - current_user reserved for auth checks
+) -> SwapQuoteResp:
     receive_amount, fee_amount, price = _compute_quote(
         quote_req.pay_symbol, quote_req.receive_symbol, quote_req.pay_amount
     )
     expires_at = datetime.utcnow() + timedelta(seconds=QUOTE_TTL_SECONDS)
+    quote_token = get_quote_signer().sign(
+        _get_user_identifier(current_user),
+        quote_req.pay_symbol,
+        quote_req.receive_symbol,
+        quote_req.pay_amount,
+        receive_amount,
+        int(expires_at.replace(tzinfo=timezone.utc).timestamp()),
+    )
     return SwapQuoteResp(
         pay_symbol=quote_req.pay_symbol,
         receive_symbol=quote_req.receive_symbol,
@@ -299,6 +587,67 @@ def get_swap_quote(
         fee_amount=fee_amount,
         price=price,
         expires_at=expires_at,
+        quote_token=quote_token,
+    )
+
+
+@router.post("/swap/quote/batch", response_model=SwapQuoteBatchResp)
+def get_swap_quotes(
+    batch_req: SwapQuoteBatchReq, current_user: object = Depends(get_current_user)
+) -> SwapQuoteBatchResp:  # noqa: ARG001 - current_user reserved for auth checks
+    """Quote many pairs and amounts against one price and pool snapshot and one expiry."""
+    prices = _get_prices_usd()
+    pool = get_swap_pool().snapshot()
+    expires_at = datetime.utcnow() + timedelta(seconds=QUOTE_TTL_SECONDS)
+    quotes: List[SwapQuoteResp] = []
+    for index, quote_req in enumerate(batch_req.quotes):
+        try:
+            receive_amount, fee_amount, price = _compute_quote(
+                quote_req.pay_symbol, quote_req.receive_symbol, quote_req.pay_amount, prices, pool
+            )
+        except HTTPException as exc:
+            detail = exc.detail
+            raise _wallet_error(exc.status_code, detail["code"], f"quotes[{index}]: {detail['detail']}") from exc
+        quotes.append(
+            SwapQuoteResp(
+                pay_symbol=quote_req.pay_symbol,
+                receive_symbol=quote_req.receive_symbol,
+                pay_amount=quote_req.pay_amount,
+                receive_amount=receive_amount,
+                fee_rate_bps=FEE_BPS,
+                fee_amount=fee_amount,
+                price=price,
+                expires_at=expires_at,
+            )
+        )
+    return SwapQuoteBatchResp(quotes=quotes)
+
+
+@router.post("/swap/quote/ladder", response_model=SwapLadderResp)
+def get_swap_quote_ladder(
+    ladder_req: SwapLadderReq, current_user: object = Depends(get_current_user)
+) -> SwapLadderResp:  # noqa: ARG001 - current_user reserved for auth checks
+    """Quote one pair at several pay amounts, e.g. to draw a receive-amount curve.
+
+    Every step is priced against one snapshot of prices and pool reserves,
+    so ``price`` is the spot price all of them were quoted from.
+    """
+    prices = _get_prices_usd()
+    pool = get_swap_pool().snapshot()
+    steps: List[SwapLadderStep] = []
+    price = Decimal("0")
+    for pay_amount in ladder_req.pay_amounts:
+        receive_amount, fee_amount, price = _compute_quote(
+            ladder_req.pay_symbol, ladder_req.receive_symbol, pay_amount, prices, pool
+        )
+        steps.append(SwapLadderStep(pay_amount=pay_amount, receive_amount=receive_amount, fee_amount=fee_amount))
+    return SwapLadderResp(
+        pay_symbol=ladder_req.pay_symbol,
+        receive_symbol=ladder_req.receive_symbol,
+        fee_rate_bps=FEE_BPS,
+        price=price,
+        expires_at=datetime.utcnow() + timedelta(seconds=QUOTE_TTL_SECONDS),
+        steps=steps,
     )
 
 
@@ -326,73 +675,94 @@ def execute_swap(
             "Only SUI and SWT swaps are supported.",
         )
 
-    _ensure_balance_available(current_user, user_identifier, pay_symbol, pay_amount)
-
-    idempotency_key = exec_req.idempotency_key
-    if idempotency_key:
-        _clean_idempotency_cache()
-        cached = _IDEMPOTENCY_CACHE.get(idempotency_key)
-        if cached:
-            _, cached_resp = cached
-            return cached_resp
+    def _execute() -> SwapExecResp:
+        _ensure_balance_available(current_user, user_identifier, pay_symbol, pay_amount)
 
-    try:
-        expected_receive_amount, _, _ = _compute_quote(pay_symbol, receive_symbol, pay_amount)
-    except HTTPException:
-        raise
-    if expected_receive_amount <= Decimal("0"):
-        raise _wallet_error(
-            status.HTTP_400_BAD_REQUEST,
-            "WALLET_INVALID_QUOTE",
-            "Calculated quote output is non-positive.",
-        )
-
-    try:
-        if pay_symbol == "SUI" and receive_symbol == "SWT":
-            func = _get_chain_callable("swap_sui_to_swt")
-            tx_digest, receive_amount_actual = func(current_user, pay_amount, exec_req.slippage_bps or 0)
-        elif pay_symbol == "SWT" and receive_symbol == "SUI":
-            func = _get_chain_callable("swap_swt_to_sui")
-            tx_digest, receive_amount_actual = func(current_user, pay_amount, exec_req.slippage_bps or 0)
+        if exec_req.quote_token:
+            expected_receive_amount = _verify_quote_token(exec_req, user_identifier)
         else:
+            expected_receive_amount, _, _ = _compute_quote(pay_symbol, receive_symbol, pay_amount)
+        if expected_receive_amount <= Decimal("0"):
             raise _wallet_error(
                 status.HTTP_400_BAD_REQUEST,
-                "WALLET_ASSET_UNSUPPORTED",
-                "Unsupported swap direction.",
+                "WALLET_INVALID_QUOTE",
+                "Calculated quote output is non-positive.",
             )
-    except HTTPException:
-        raise
-    except Exception as exc:  # noqa: BLE001
-        raise _wallet_error(
-            status.HTTP_502_BAD_GATEWAY,
-            "WALLET_SWAP_FAILED",
-            f"Swap execution failed: {exc}",
-        ) from exc
+        slippage_bps = exec_req.slippage_bps or 0
+        # The chain helper must not fill below this; it is re-checked on the result.
+        min_receive_amount = _min_receive_amount(expected_receive_amount, slippage_bps)
+
+        try:
+            if pay_symbol == "SUI" and receive_symbol == "SWT":
+                func = _get_chain_callable("swap_sui_to_swt")
+                tx_digest, receive_amount_actual = func(
+                    current_user, pay_amount, slippage_bps, min_receive_amount=min_receive_amount
+                )
+            elif pay_symbol == "SWT" and receive_symbol == "SUI":
+                func = _get_chain_callable("swap_swt_to_sui")
+                tx_digest, receive_amount_actual = func(
+                    current_user, pay_amount, slippage_bps, min_receive_amount=min_receive_amount
+                )
+            else:
+                raise _wallet_error(
+                    status.HTTP_400_BAD_REQUEST,
+                    "WALLET_ASSET_UNSUPPORTED",
+                    "Unsupported swap direction.",
+                )
+        except HTTPException:
+            raise
+        except Exception as exc:  # noqa: BLE001
+            raise _wallet_error(
+                status.HTTP_502_BAD_GATEWAY,
+                "WALLET_SWAP_FAILED",
+                f"Swap execution failed: {exc}",
+            ) from exc
 
-    receive_amount_actual = _to_decimal(receive_amount_actual)
-    if receive_amount_actual <= Decimal("0"):
-        raise _wallet_error(
-            status.HTTP_502_BAD_GATEWAY,
-            "WALLET_SWAP_FAILED",
-            "Swap execution returned zero output.",
-        )
+        receive_amount_actual = _to_decimal(receive_amount_actual)
+        if receive_amount_actual <= Decimal("0"):
+            raise _wallet_error(
+                status.HTTP_502_BAD_GATEWAY,
+                "WALLET_SWAP_FAILED",
+                "Swap execution returned zero output.",
+            )
 
-    # TODO(chain): Validate slippage when chain helpers expose minimum output controls.
-    executed_at = datetime.utcnow()
-    response = SwapExecResp(
-        tx_digest=str(tx_digest),
-        chain="sui",
-        executed_at=executed_at,
-        pay_symbol=pay_symbol,
-        receive_symbol=receive_symbol,
-        pay_amount=pay_amount,
-        receive_amount=receive_amount_actual,
-    )
+        if receive_amount_actual < min_receive_amount:
+            raise _wallet_error(
+                status.HTTP_502_BAD_GATEWAY,
+                "WALLET_SLIPPAGE_EXCEEDED",
+                f"Swap returned {receive_amount_actual} {receive_symbol}, below the minimum {min_receive_amount}.",
+            )
 
-    if idempotency_key:
-        _IDEMPOTENCY_CACHE[idempotency_key] = (executed_at, response)
+        executed_at = datetime.utcnow()
+        response = SwapExecResp(
+            tx_digest=str(tx_digest),
+            chain="sui",
+            executed_at=executed_at,
+            pay_symbol=pay_symbol,
+            receive_symbol=receive_symbol,
+            pay_amount=pay_amount,
+            receive_amount=receive_amount_actual,
+        )
 
-    return response
+        _WALLET_CACHE.invalidate_user_balances(user_identifier, (pay_symbol, receive_symbol))
+        return response
+
+    if not exec_req.idempotency_key:
+        return _execute()
+    # Keys are scoped per user so one user's key can never replay another's swap.
+    try:
+        return get_idempotency_store().run(
+            f"swap:{user_identifier}:{exec_req.idempotency_key}",
+            _execute,
+            encode=SwapExecResp.model_dump_json,
+            decode=SwapExecResp.model_validate_json,
+        )
+    except IdempotencyInProgressError as exc:
+        raise _wallet_error(
+            status.HTTP_409_CONFLICT,
+            "WALLET_SWAP_IN_PROGRESS",
+            "A swap with this idempotency key is still in progress.",
+        ) from exc
 
 
 @router.get("/address/{symbol}", response_model=AddressResp)
@@ -415,10 +785,15 @@ def get_address(symbol: str, current_user: object = Depends(get_current_user)) -
             f"Address for {symbol} unavailable.",
         )
 
-    chain_name = "sui"
-    if symbol == "BTC":
-        chain_name = "bitcoin"
-    elif symbol == "ETH":
-        chain_name = "ethereum"
+    return AddressResp(symbol=symbol, address=address, chain=ASSET_CHAINS[symbol])
+
 
-    return AddressResp(symbol=symbol, address=address, chain=chain_name)
+@router.get("/metrics")
+def get_wallet_metrics(current_user: object = Depends(get_current_user)) -> Dict[str, object]:  # noqa: ARG001
+    """Counters of the wallet caches, chain lookups and idempotency store, and the current prices with their age."""
+    return {
+        "cache": _WALLET_CACHE.stats(),
+        "chain_lookups": dict(_CHAIN_LOOKUPS),
+        "idempotency": get_idempotency_store().stats(),
+        "prices": get_price_oracle().stats(),
+    }
@@ -1,11 +1,189 @@
-# TODO: Implement functions to interact with Sui blockchain
-# - Call Move modules (rewards, slashing, etc.)
-# - Use a service account to sign transactions
+# Synchronous chain adapter used by the API routers (see api/wallet.py).
+# Calls run on one background event loop that owns the pooled async client
+# from app.chain_client, so blocking callers still share connections and
+# batches.  A service account signs resolution transactions.
+from __future__ import annotations
 
-def resolve_hype_proposal(message_id: int, creator_id: str):
-    # TODO: Call rewards.move to reward creator and managers
-    pass
+import asyncio
+import re
+import threading
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from decimal import Decimal
+from typing import Any, Coroutine, Dict, List, Optional, Sequence, Tuple, TypeVar
 
-def resolve_scam_proposal(message_id: int, creator_id: str):
-    # TODO: Call slashing.move to slash creator
-    pass
+from .chain_client import SUI_COIN_TYPE, Ed25519Signer, ProgrammableTransactionBuilder, SuiRpcClient
+from .config import settings
+
+T = TypeVar("T")
+
+SUI_DECIMALS = 9
+SWT_DECIMALS = 6
+# SWT is the one-time-witness coin ``token::TOKEN`` (move/sources/token.move),
+# published under settings.SUI_PACKAGE_ID.
+SWT_COIN_SUFFIX = "::token::TOKEN"
+_SUI_ADDRESS = re.compile(r"^0x[0-9a-f]{1,64}$")
+
+
+class ChainConfigurationError(RuntimeError):
+    """A chain call needs settings (package or object ids, signer key) that are not configured."""
+
+
+class _LoopThread:
+    def __init__(self) -> None:
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name="chain-client-loop", daemon=True)
+        self._thread.start()
+
+    def submit(self, coro: Coroutine[Any, Any, T]) -> "Future[T]":
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+
+_LOCK = threading.Lock()
+_LOOP: Optional[_LoopThread] = None
+_CLIENT: Optional[SuiRpcClient] = None
+_SIGNER: Optional[Ed25519Signer] = None
+
+
+def _loop() -> _LoopThread:
+    global _LOOP
+    with _LOCK:
+        if _LOOP is None:
+            _LOOP = _LoopThread()
+        return _LOOP
+
+
+def get_client() -> SuiRpcClient:
+    global _CLIENT
+    with _LOCK:
+        if _CLIENT is None:
+            _CLIENT = SuiRpcClient(
+                settings.SUI_RPC_URL,
+                max_connections=settings.SUI_RPC_MAX_CONNECTIONS,
+                timeout=settings.SUI_RPC_TIMEOUT_SECONDS,
+                max_batch=settings.SUI_RPC_MAX_BATCH,
+            )
+        return _CLIENT
+
+
+def use_client(client: Optional[SuiRpcClient], signer: Optional[Ed25519Signer] = None) -> None:
+    """Swap the client (and optionally the signer); ``None`` rebuilds them from settings."""
+    global _CLIENT, _SIGNER
+    with _LOCK:
+        _CLIENT, _SIGNER = client, signer
+
+
+def run(coro: Coroutine[Any, Any, T], timeout: Optional[float] = None) -> T:
+    """Run a chain coroutine on the adapter loop and wait for its result.
+
+    A call that runs out of time is cancelled on the loop before
+    ``TimeoutError`` is raised, so it does not keep running unobserved.
+    """
+    future = _loop().submit(coro)
+    try:
+        return future.result(timeout if timeout is not None else settings.SUI_RPC_TIMEOUT_SECONDS * 2)
+    except FutureTimeoutError:
+        future.cancel()
+        raise
+
+
+def _signer() -> Ed25519Signer:
+    global _SIGNER
+    with _LOCK:
+        if _SIGNER is None:
+            if not settings.SUI_SIGNER_KEY:
+                raise ChainConfigurationError("SUI_SIGNER_KEY is not configured")
+            _SIGNER = Ed25519Signer.from_base64(settings.SUI_SIGNER_KEY)
+        return _SIGNER
+
+
+def _required(name: str) -> str:
+    value = getattr(settings, name)
+    if not value:
+        raise ChainConfigurationError(f"{name} is not configured")
+    return value
+
+
+def _coin_type(symbol: str) -> Tuple[str, int]:
+    if symbol == "SUI":
+        return SUI_COIN_TYPE, SUI_DECIMALS
+    if symbol == "SWT":
+        return _required("SUI_PACKAGE_ID") + SWT_COIN_SUFFIX, SWT_DECIMALS
+    raise LookupError(f"{symbol} is not a Sui coin")
+
+
+def _to_units(raw: int, decimals: int) -> Decimal:
+    return Decimal(raw).scaleb(-decimals)
+
+
+# Wallet reads -------------------------------------------------------------------------
+
+
+def get_user_address(user_identifier: str, symbol: str) -> str:
+    """SUI and SWT live at the user's zkLogin Sui address; BTC/ETH are not bridged yet."""
+    if symbol not in ("SUI", "SWT"):
+        raise LookupError(f"No {symbol} address for user")
+    address = user_identifier.strip().lower()
+    if not _SUI_ADDRESS.match(address):
+        raise LookupError("User has no Sui address")
+    return address
+
+
+def get_balances(queries: Sequence[Tuple[str, str]], timeout: Optional[float] = None) -> List[Decimal]:
+    """Balances for ``(address, symbol)`` pairs, read in one JSON-RPC batch within ``timeout`` seconds."""
+    coin_types = [_coin_type(symbol) for _, symbol in queries]
+    raw = run(
+        get_client().get_balances([(address, coin) for (address, _), (coin, _) in zip(queries, coin_types)]),
+        timeout,
+    )
+    return [_to_units(value, decimals) for value, (_, decimals) in zip(raw, coin_types)]
+
+
+def get_sui_balance(address: str) -> Decimal:
+    return get_balances([(address, "SUI")])[0]
+
+
+def get_token_balance(address: str, symbol: str) -> Decimal:
+    return get_balances([(address, symbol)])[0]
+
+
+# Proposal resolution ------------------------------------------------------------------
+
+
+def _resolution_builder(resolutions: Sequence[Dict[str, str]]) -> ProgrammableTransactionBuilder:
+    builder = ProgrammableTransactionBuilder(_required("SUI_PACKAGE_ID"))
+    treasury = _required("SUI_TREASURY_ID")
+    for resolution in resolutions:
+        if resolution["type"] == "HYPE":
+            builder.resolve_hype(resolution["proposal_id"], resolution["message_id"], treasury)
+        elif resolution["type"] == "SCAM":
+            builder.resolve_scam(
+                resolution["proposal_id"],
+                resolution["message_id"],
+                treasury,
+                _required("SUI_LOCKUP_VAULT_ID"),
+                _required("SUI_MANAGER_REGISTRY_ID"),
+            )
+        else:
+            raise ValueError(f"Unknown proposal type: {resolution['type']}")
+    return builder
+
+
+def resolve_proposals(resolutions: Sequence[Dict[str, str]]) -> str:
+    """Execute several hype/scam resolutions in one programmable transaction.
+
+    Each resolution is ``{"type": "HYPE" | "SCAM", "proposal_id": ..., "message_id": ...}``
+    with on-chain object ids; returns the transaction digest.
+    """
+    builder = _resolution_builder(resolutions)
+    return run(get_client().execute(builder, _signer(), gas_budget=settings.SUI_GAS_BUDGET))
+
+
+def resolve_hype_proposal(proposal_id: str, message_id: str) -> str:
+    # vote::execute_proposal rewards the creator and voting managers.
+    return resolve_proposals([{"type": "HYPE", "proposal_id": proposal_id, "message_id": message_id}])
+
+
+def resolve_scam_proposal(proposal_id: str, message_id: str) -> str:
+    # vote::execute_proposal then message::slash_message on the creator's stake.
+    return resolve_proposals([{"type": "SCAM", "proposal_id": proposal_id, "message_id": message_id}])
@@ -0,0 +1,274 @@
+"""Async Sui JSON-RPC client used by ``app.chain``.
+
+* One pooled ``httpx.AsyncClient`` per client keeps connections to the
+  full node alive between calls.
+* ``batch`` sends many JSON-RPC calls as one HTTP request (a JSON array),
+  split into ``max_batch`` sized chunks that are posted concurrently.
+* ``ProgrammableTransactionBuilder`` collects Move calls for several
+  proposal resolutions so they execute as a single programmable transaction
+  built with ``unsafe_batchTransaction`` and signed by the service account.
+
+``app.chain_mock`` serves the subset of the RPC used here for offline tests.
+"""
+from __future__ import annotations
+
+import asyncio
+import base64
+import hashlib
+import itertools
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+from cryptography.hazmat.primitives.serialization import Encoding, PublicFormat
+
+if TYPE_CHECKING:  # pragma: no cover - httpx is imported when the first client is built
+    import httpx
+
+SUI_COIN_TYPE = "0x2::sui::SUI"
+ED25519_FLAG = 0x00
+# IntentScope::TransactionData, IntentVersion::V0, AppId::Sui
+TRANSACTION_INTENT = bytes([0, 0, 0])
+
+
+class ChainRpcError(RuntimeError):
+    """A JSON-RPC error object returned by the node."""
+
+    def __init__(self, code: int, message: str, data: Any = None) -> None:
+        super().__init__(f"RPC error {code}: {message}")
+        self.code = code
+        self.message = message
+        self.data = data
+
+
+class ChainTransactionError(RuntimeError):
+    """A transaction was executed but did not succeed."""
+
+
+@dataclass(frozen=True)
+class RpcCall:
+    method: str
+    params: Sequence[Any] = ()
+
+
+def _blake2b256(data: bytes) -> bytes:
+    return hashlib.blake2b(data, digest_size=32).digest()
+
+
+class Ed25519Signer:
+    """Service-account key; signs transaction bytes the way Sui wallets do."""
+
+    def __init__(self, private_key: Ed25519PrivateKey) -> None:
+        self._private_key = private_key
+        self.public_key = private_key.public_key().public_bytes(Encoding.Raw, PublicFormat.Raw)
+        self.address = "0x" + _blake2b256(bytes([ED25519_FLAG]) + self.public_key).hex()
+
+    @classmethod
+    def from_base64(cls, value: str) -> "Ed25519Signer":
+        """Accept a raw 32-byte seed or a keystore entry (flag byte + seed), base64 encoded."""
+        raw = base64.b64decode(value)
+        if len(raw) == 33 and raw[0] == ED25519_FLAG:
+            raw = raw[1:]
+        if len(raw) != 32:
+            raise ValueError("Expected a 32-byte Ed25519 seed")
+        return cls(Ed25519PrivateKey.from_private_bytes(raw))
+
+    @classmethod
+    def generate(cls) -> "Ed25519Signer":
+        return cls(Ed25519PrivateKey.generate())
+
+    def sign_transaction(self, tx_bytes: bytes) -> str:
+        signature = self._private_key.sign(_blake2b256(TRANSACTION_INTENT + tx_bytes))
+        return base64.b64encode(bytes([ED25519_FLAG]) + signature + self.public_key).decode()
+
+
+@dataclass(frozen=True)
+class MoveCall:
+    package: str
+    module: str
+    function: str
+    arguments: Tuple[Any, ...] = ()
+    type_arguments: Tuple[str, ...] = ()
+
+    def request_params(self) -> Dict[str, Any]:
+        return {
+            "moveCallRequestParams": {
+                "packageObjectId": self.package,
+                "module": self.module,
+                "function": self.function,
+                "typeArguments": list(self.type_arguments),
+                "arguments": list(self.arguments),
+            }
+        }
+
+
+@dataclass
+class ProgrammableTransactionBuilder:
+    """Groups Move calls (e.g. several proposal resolutions) into one transaction."""
+
+    package_id: str
+    calls: List[MoveCall] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.calls)
+
+    def move_call(
+        self,
+        module: str,
+        function: str,
+        arguments: Sequence[Any] = (),
+        type_arguments: Sequence[str] = (),
+    ) -> "ProgrammableTransactionBuilder":
+        self.calls.append(MoveCall(self.package_id, module, function, tuple(arguments), tuple(type_arguments)))
+        return self
+
+    def resolve_hype(self, proposal_id: str, message_id: str, treasury_id: str) -> "ProgrammableTransactionBuilder":
+        # vote::execute_proposal marks the message HYPED and pays creator and voters.
+        return self.move_call("vote", "execute_proposal", [proposal_id, message_id, treasury_id])
+
+    def resolve_scam(
+        self,
+        proposal_id: str,
+        message_id: str,
+        treasury_id: str,
+        vault_id: str,
+        registry_id: str,
+    ) -> "ProgrammableTransactionBuilder":
+        # execute_proposal marks the message SPAM; slash_message takes the creator's locked stake.
+        self.move_call("vote", "execute_proposal", [proposal_id, message_id, treasury_id])
+        return self.move_call("message", "slash_message", [message_id, vault_id, registry_id, treasury_id, message_id])
+
+    def batch_params(self, signer: str, gas_budget: int, gas: Optional[str] = None) -> List[Any]:
+        return [signer, [call.request_params() for call in self.calls], gas, str(gas_budget)]
+
+
+RpcResult = Union[Any, ChainRpcError]
+
+
+class SuiRpcClient:
+    """Pooled, batching JSON-RPC client for a Sui full node."""
+
+    def __init__(
+        self,
+        url: str,
+        *,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        timeout: float = 10.0,
+        max_batch: int = 50,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ) -> None:
+        import httpx
+
+        self._url = url
+        self._max_batch = max(max_batch, 1)
+        self._ids = itertools.count(1)
+        self._http = httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+            ),
+            transport=transport,
+        )
+
+    async def aclose(self) -> None:
+        await self._http.aclose()
+
+    async def __aenter__(self) -> "SuiRpcClient":
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.aclose()
+
+    # JSON-RPC ------------------------------------------------------------------------
+
+    async def call(self, method: str, params: Sequence[Any] = ()) -> Any:
+        payload = {"jsonrpc": "2.0", "id": next(self._ids), "method": method, "params": list(params)}
+        response = await self._http.post(self._url, json=payload)
+        response.raise_for_status()
+        return _unwrap(response.json())
+
+    async def batch(self, calls: Sequence[RpcCall], *, raise_errors: bool = True) -> List[RpcResult]:
+        """Run ``calls`` as JSON-RPC batches; results come back in call order.
+
+        With ``raise_errors=False`` a failed call yields its ``ChainRpcError``
+        in place of a result instead of failing the whole batch.
+        """
+        if not calls:
+            return []
+        chunks = [calls[start : start + self._max_batch] for start in range(0, len(calls), self._max_batch)]
+        results = await asyncio.gather(*(self._post_batch(chunk) for chunk in chunks))
+        flat = [item for chunk in results for item in chunk]
+        if raise_errors:
+            for item in flat:
+                if isinstance(item, ChainRpcError):
+                    raise item
+        return flat
+
+    async def _post_batch(self, calls: Sequence[RpcCall]) -> List[RpcResult]:
+        ids = [next(self._ids) for _ in calls]
+        payload = [
+            {"jsonrpc": "2.0", "id": request_id, "method": call.method, "params": list(call.params)}
+            for request_id, call in zip(ids, calls)
+        ]
+        response = await self._http.post(self._url, json=payload)
+        response.raise_for_status()
+        body = response.json()
+        if isinstance(body, dict):
+            # A batch-level failure (e.g. parse error) comes back as one error object.
+            error = _error(body)
+            return [error] * len(calls)
+        by_id = {item.get("id"): item for item in body}
+        missing = {"error": {"code": -32603, "message": "No response for request"}}
+        results: List[RpcResult] = []
+        for request_id in ids:
+            item = by_id.get(request_id, missing)
+            results.append(_error(item) if "error" in item else item.get("result"))
+        return results
+
+    # Reads ---------------------------------------------------------------------------
+
+    async def get_balances(self, queries: Sequence[Tuple[str, str]]) -> List[int]:
+        """Total balances (in base units) for ``(owner, coin_type)`` pairs, in one batch."""
+        results = await self.batch([RpcCall("suix_getBalance", [owner, coin_type]) for owner, coin_type in queries])
+        return [int(result["totalBalance"]) for result in results]
+
+    async def get_balance(self, owner: str, coin_type: str = SUI_COIN_TYPE) -> int:
+        return (await self.get_balances([(owner, coin_type)]))[0]
+
+    # Writes --------------------------------------------------------------------------
+
+    async def execute(
+        self,
+        builder: ProgrammableTransactionBuilder,
+        signer: Ed25519Signer,
+        *,
+        gas_budget: int,
+        gas: Optional[str] = None,
+    ) -> str:
+        """Build, sign and execute all calls in ``builder`` as one transaction; returns its digest."""
+        if not builder.calls:
+            raise ValueError("Transaction has no Move calls")
+        built = await self.call("unsafe_batchTransaction", builder.batch_params(signer.address, gas_budget, gas))
+        tx_bytes = built["txBytes"]
+        signature = signer.sign_transaction(base64.b64decode(tx_bytes))
+        result = await self.call(
+            "sui_executeTransactionBlock",
+            [tx_bytes, [signature], {"showEffects": True}, "WaitForLocalExecution"],
+        )
+        status = ((result.get("effects") or {}).get("status") or {})
+        if status.get("status") != "success":
+            raise ChainTransactionError(status.get("error") or f"Transaction {result.get('digest')} failed")
+        return result["digest"]
+
+
+def _error(item: Dict[str, Any]) -> ChainRpcError:
+    error = item.get("error") or {}
+    return ChainRpcError(int(error.get("code", -32603)), str(error.get("message", "Unknown error")), error.get("data"))
+
+
+def _unwrap(body: Dict[str, Any]) -> Any:
+    if "error" in body:
+        raise _error(body)
+    return body.get("result")
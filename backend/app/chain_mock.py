@@ -0,0 +1,162 @@
+"""Local mock of the Sui JSON-RPC subset used by ``app.chain_client``.
+
+Serves single and batched requests for ``suix_getBalance``,
+``unsafe_batchTransaction`` and ``sui_executeTransactionBlock``.  Built
+transactions are opaque JSON bytes; execution checks the Ed25519 signature
+against them and records the Move calls, so tests can assert what one
+transaction contained.  ``delay`` injects latency per HTTP request.
+
+Run standalone with ``python -m app.chain_mock --port 9100`` and point
+``SUI_RPC_URL`` at it for offline development.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Tuple
+
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PublicKey
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from .chain_client import ED25519_FLAG, TRANSACTION_INTENT
+
+_BASE58 = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+
+
+def _base58(data: bytes) -> str:
+    number = int.from_bytes(data, "big")
+    encoded = ""
+    while number:
+        number, remainder = divmod(number, 58)
+        encoded = _BASE58[remainder] + encoded
+    return "1" * (len(data) - len(data.lstrip(b"\0"))) + encoded
+
+
+@dataclass
+class MockChainState:
+    balances: Dict[Tuple[str, str], int] = field(default_factory=dict)
+    # Move calls of each executed transaction, in execution order.
+    transactions: List[List[Dict[str, Any]]] = field(default_factory=list)
+    http_requests: int = 0
+    rpc_calls: int = 0
+    delay: float = 0.0
+    fail_moves: bool = False
+
+    def set_balance(self, owner: str, coin_type: str, amount: int) -> None:
+        self.balances[(owner, coin_type)] = amount
+
+
+class _RpcFailure(Exception):
+    def __init__(self, code: int, message: str) -> None:
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+def _get_balance(state: MockChainState, owner: str, coin_type: str = "0x2::sui::SUI") -> Dict[str, Any]:
+    return {
+        "coinType": coin_type,
+        "coinObjectCount": 1,
+        "totalBalance": str(state.balances.get((owner, coin_type), 0)),
+        "lockedBalance": {},
+    }
+
+
+def _batch_transaction(
+    state: MockChainState, signer: str, calls: List[Dict[str, Any]], gas: Any, gas_budget: str, *_: Any
+) -> Dict[str, Any]:
+    if not calls:
+        raise _RpcFailure(-32602, "No transactions in batch")
+    tx = {"sender": signer, "gasBudget": gas_budget, "calls": [call["moveCallRequestParams"] for call in calls]}
+    tx_bytes = json.dumps(tx, sort_keys=True).encode()
+    return {"txBytes": base64.b64encode(tx_bytes).decode(), "gas": [], "inputObjects": []}
+
+
+def _execute(state: MockChainState, tx_bytes_b64: str, signatures: List[str], *_: Any) -> Dict[str, Any]:
+    tx_bytes = base64.b64decode(tx_bytes_b64)
+    tx = json.loads(tx_bytes)
+    raw = base64.b64decode(signatures[0])
+    if len(raw) != 97 or raw[0] != ED25519_FLAG:
+        raise _RpcFailure(-32602, "Unsupported signature scheme")
+    signature, public_key = raw[1:65], raw[65:]
+    address = "0x" + hashlib.blake2b(bytes([ED25519_FLAG]) + public_key, digest_size=32).hexdigest()
+    if address != tx["sender"]:
+        raise _RpcFailure(-32602, "Signer does not match transaction sender")
+    try:
+        Ed25519PublicKey.from_public_bytes(public_key).verify(
+            signature, hashlib.blake2b(TRANSACTION_INTENT + tx_bytes, digest_size=32).digest()
+        )
+    except InvalidSignature as exc:
+        raise _RpcFailure(-32602, "Invalid signature") from exc
+
+    digest = _base58(hashlib.blake2b(tx_bytes, digest_size=32).digest())
+    if state.fail_moves:
+        status = {"status": "failure", "error": "MoveAbort in execute_proposal"}
+    else:
+        status = {"status": "success"}
+        state.transactions.append(tx["calls"])
+    return {"digest": digest, "effects": {"status": status, "transactionDigest": digest}}
+
+
+_METHODS = {
+    "suix_getBalance": _get_balance,
+    "unsafe_batchTransaction": _batch_transaction,
+    "sui_executeTransactionBlock": _execute,
+}
+
+
+def _dispatch(state: MockChainState, request: Dict[str, Any]) -> Dict[str, Any]:
+    state.rpc_calls += 1
+    request_id = request.get("id")
+    handler = _METHODS.get(request.get("method"))
+    if handler is None:
+        return {"jsonrpc": "2.0", "id": request_id, "error": {"code": -32601, "message": "Method not found"}}
+    try:
+        result = handler(state, *request.get("params", []))
+    except _RpcFailure as exc:
+        return {"jsonrpc": "2.0", "id": request_id, "error": {"code": exc.code, "message": exc.message}}
+    except (TypeError, ValueError, KeyError) as exc:
+        return {"jsonrpc": "2.0", "id": request_id, "error": {"code": -32602, "message": f"Invalid params: {exc}"}}
+    return {"jsonrpc": "2.0", "id": request_id, "result": result}
+
+
+def create_mock_rpc_app(state: MockChainState | None = None) -> FastAPI:
+    state = state or MockChainState()
+    app = FastAPI(title="Mock Sui RPC")
+    app.state.chain = state
+
+    @app.post("/")
+    async def rpc(request: Request) -> JSONResponse:
+        state.http_requests += 1
+        if state.delay:
+            await asyncio.sleep(state.delay)
+        try:
+            body = await request.json()
+        except ValueError:
+            return JSONResponse({"jsonrpc": "2.0", "id": None, "error": {"code": -32700, "message": "Parse error"}})
+        if isinstance(body, list):
+            return JSONResponse([_dispatch(state, item) for item in body])
+        return JSONResponse(_dispatch(state, body))
+
+    return app
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--delay", type=float, default=0.0, help="seconds of latency per HTTP request")
+    args = parser.parse_args()
+    uvicorn.run(create_mock_rpc_app(MockChainState(delay=args.delay)), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -5,6 +7,107 @@ class Settings(BaseSettings):
     SUPABASE_ANON_KEY: str
     SUPABASE_SERVICE_ROLE_KEY: str
     DATABASE_URL: str
+    # "full" applies pending schema migrations on startup; "lite" skips DDL
+    # and expects `python -m app.migrations` to have run (see app.main).
+    STARTUP_MODE: str = "full"
+    # Comma-separated app.api routers this worker mounts (app.main.ROUTERS);
+    # unset mounts them all.  Unlisted routers are never imported.
+    API_ROUTERS: Optional[str] = None
+    # Serve /db/pool, /blobs, /indexer and /startup; they are unauthenticated,
+    # so only enable this where the port is not public.
+    INTERNAL_ENDPOINTS: bool = False
+    # Connection pools (app.db).  DATABASE_ASYNC serves the feed through the
+    # async engine; its URL defaults to DATABASE_URL with asyncpg/aiosqlite.
+    DATABASE_ASYNC: bool = False
+    DATABASE_ASYNC_URL: Optional[str] = None
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    # Session JWTs issued by app.api.auth.
+    SECRET_KEY: Optional[str] = None
+    ALGORITHM: str = "HS256"
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
+    SESSION_CACHE_MAX_ENTRIES: int = 100_000
+    # OIDC ID token verification for zk-login (app.security).  Without a JWKS
+    # file or URL the token's claims are read unverified.
+    OIDC_JWKS_FILE: Optional[str] = None
+    OIDC_JWKS_URL: Optional[str] = None
+    OIDC_AUDIENCE: Optional[str] = None
+    JWKS_CACHE_TTL_SECONDS: float = 3600.0
+    # zkLogin proof verification (app.services.zklogin): "module:function", or
+    # "structure"/"none" for tests and development, run on a process pool of
+    # ZKLOGIN_VERIFIER_WORKERS.  Required: startup fails without it.
+    ZKLOGIN_PROOF_VERIFIER: Optional[str] = None
+    ZKLOGIN_VERIFIER_WORKERS: int = 2
+    ZKLOGIN_VERIFIER_MAX_PENDING: int = 64
+    # Off-chain body hashing at ingest (app.services.content_hash): thread pool
+    # size and pairs per pool task.
+    CONTENT_HASH_WORKERS: int = 4
+    CONTENT_HASH_BATCH_SIZE: int = 256
+    # Content-addressed body store (app.services.blobs) for the database
+    # backend; unset keeps bodies inline in messages.content.
+    BLOB_STORE_DIR: Optional[str] = None
+    BLOB_SEGMENT_BYTES: int = 64 * 1024 * 1024
+    BLOB_LARGE_BYTES: int = 1024 * 1024
+    # How often the owning worker compacts away bodies of deleted messages; 0 disables.
+    BLOB_COMPACT_INTERVAL_SECONDS: float = 3600.0
+    # HMAC key for swap quote tokens (app.services.quote_tokens); falls back to SECRET_KEY.
+    QUOTE_SIGNING_KEY: Optional[str] = None
+    # "memory" serves the feed from the in-process store, "database" from app.repositories.
+    MESSAGE_BACKEND: str = "memory"
+    # Write-behind like/alert counters (app.services.counters). Without a log
+    # directory, buffered increments do not survive a crash.
+    REACTION_LOG_DIR: Optional[str] = None
+    REACTION_SHARDS: int = 16
+    REACTION_FLUSH_INTERVAL_SECONDS: float = 1.0
+    REACTION_FLUSH_THRESHOLD: int = 1000
+    # Comma-separated Sui addresses allowed to vote through /proposals (app.services.proposals);
+    # voters seen in indexed VoteCast events are added as well.
+    PROPOSAL_MANAGERS: str = ""
+    # Server-push deltas (app.services.live): frame cadence, per-client queue
+    # of frames before a slow client is evicted, topics per client, SSE keepalive.
+    LIVE_FRAME_INTERVAL_SECONDS: float = 0.1
+    LIVE_CLIENT_MAX_FRAMES: int = 64
+    LIVE_CLIENT_MAX_TOPICS: int = 64
+    LIVE_SSE_KEEPALIVE_SECONDS: float = 15.0
+    # Sui full node and on-chain objects used by app.chain.
+    SUI_RPC_URL: str = "https://fullnode.testnet.sui.io:443"
+    SUI_RPC_MAX_CONNECTIONS: int = 20
+    SUI_RPC_MAX_BATCH: int = 50
+    SUI_RPC_TIMEOUT_SECONDS: float = 10.0
+    SUI_PACKAGE_ID: Optional[str] = None
+    SUI_TREASURY_ID: Optional[str] = None
+    SUI_LOCKUP_VAULT_ID: Optional[str] = None
+    SUI_MANAGER_REGISTRY_ID: Optional[str] = None
+    # Base64 Ed25519 seed (or keystore entry) of the service account.
+    SUI_SIGNER_KEY: Optional[str] = None
+    SUI_GAS_BUDGET: int = 50_000_000
+    # Event indexer (app.indexer): events per page and idle poll interval.
+    INDEXER_PAGE_SIZE: int = 1000
+    INDEXER_POLL_INTERVAL_SECONDS: float = 1.0
+    # Wallet routes follow the token and rewards modules' events and drop the
+    # cached balances they move (needs SUI_PACKAGE_ID).
+    WALLET_FOLLOW_EVENTS: bool = False
+    # Keep the proposal book current from the vote module's events, starting at
+    # the `python -m app.indexer` checkpoint (needs SUI_PACKAGE_ID).
+    PROPOSAL_FOLLOW_EVENTS: bool = False
+    # Swap idempotency keys (app.services.idempotency): "memory" dedupes within
+    # one process, "sqlite" across workers sharing IDEMPOTENCY_DB_PATH.
+    IDEMPOTENCY_BACKEND: str = "memory"
+    IDEMPOTENCY_DB_PATH: str = "idempotency.sqlite3"
+    IDEMPOTENCY_TTL_SECONDS: float = 300.0
+    # USD prices (app.services.prices): a CoinGecko-style API and/or a JSON
+    # file such as {"SUI": "3.66"}, backed by built-in placeholder prices.
+    PRICE_API_URL: Optional[str] = None
+    PRICE_FILE: Optional[str] = None
+    PRICE_REFRESH_INTERVAL_SECONDS: float = 30.0
+    PRICE_STALE_AFTER_SECONDS: float = 300.0
+    # SUI/SWT pool model (app.services.amm), in base units.  Quotes use it once
+    # both reserves are non-zero, from these seeds or from chain sync.
+    SWAP_POOL_RESERVE_SUI: int = 0
+    SWAP_POOL_RESERVE_SWT: int = 0
+    SWAP_POOL_FEE_BPS: int = 1
 
     class Config:
         env_file = ".env"
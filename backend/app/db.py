@@ -1,11 +1,67 @@
+"""Database engines and sessions.
+
+``engine``/``SessionLocal`` are the synchronous stack used by repositories and
+``get_db``.  The async stack (``get_async_engine``/``get_async_db``) is built on
+first use from ``DATABASE_ASYNC_URL``, or from ``DATABASE_URL`` with the async
+driver swapped in (asyncpg for PostgreSQL, aiosqlite for SQLite), so the
+driver is only imported when the async stack is enabled.
+
+Both engines take their pool size, overflow, timeout and recycle from
+settings; ``pool_stats`` reports how busy a pool is.
+"""
+from typing import Any, AsyncIterator, Dict
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker
+
 from .config import settings
 
+_ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+
+
+def pool_options(url: str) -> Dict[str, Any]:
+    """Pool keyword arguments for ``url`` (in-memory SQLite has a single-connection pool)."""
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        return {}
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+    }
+
+
+def async_url(url: str) -> str:
+    """``url`` with its driver replaced by the async driver for its backend."""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in _ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {backend!r} databases")
+    return parsed.set(drivername=f"{backend}+{_ASYNC_DRIVERS[backend]}").render_as_string(hide_password=False)
+
+
+def pool_stats(engine: Any) -> Dict[str, Any]:
+    """Size, checked-out connections and overflow of an engine's (sync or async) pool."""
+    pool = getattr(engine, "sync_engine", engine).pool
+    stats: Dict[str, Any] = {"pool": type(pool).__name__}
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        method = getattr(pool, name, None)
+        if method is not None:
+            stats[name] = method()
+    timeout = getattr(pool, "timeout", None)
+    if callable(timeout):
+        stats["timeout"] = timeout()
+    stats["status"] = pool.status()
+    return stats
+
+
 engine = create_engine(
     settings.DATABASE_URL,
     future=True,
     pool_pre_ping=True,
+    **pool_options(settings.DATABASE_URL),
 )
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
 
@@ -15,3 +71,44 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+_async_engine = None
+_async_sessionmaker = None
+
+
+def get_async_engine():
+    """The shared ``AsyncEngine``, created on first use."""
+    global _async_engine, _async_sessionmaker
+    if _async_engine is None:
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+        url = settings.DATABASE_ASYNC_URL or async_url(settings.DATABASE_URL)
+        _async_engine = create_async_engine(url, pool_pre_ping=True, **pool_options(url))
+        _async_sessionmaker = async_sessionmaker(bind=_async_engine, autoflush=False, expire_on_commit=False)
+    return _async_engine
+
+
+def get_async_sessionmaker():
+    get_async_engine()
+    return _async_sessionmaker
+
+
+async def get_async_db() -> AsyncIterator[Any]:
+    async with get_async_sessionmaker()() as session:
+        yield session
+
+
+async def dispose_async_engine() -> None:
+    global _async_engine, _async_sessionmaker
+    if _async_engine is not None:
+        await _async_engine.dispose()
+    _async_engine = _async_sessionmaker = None
+
+
+def engine_stats() -> Dict[str, Any]:
+    """Pool statistics for the sync engine and, once created, the async one."""
+    return {
+        "sync": pool_stats(engine),
+        "async": pool_stats(_async_engine) if _async_engine is not None else None,
+    }
@@ -0,0 +1,755 @@
+"""Checkpointed indexer that projects the Move modules' events into the database.
+
+An ``EventIndexer`` pulls pages of events from an ``EventSource`` starting at
+its stored cursor, folds each page into one ``Projection`` (so a message
+created and liked fifty times in a page becomes one insert), and applies it
+with bulk statements in a single transaction that also advances the
+checkpoint row.  A crash therefore never applies a page twice or skips one;
+the next run resumes from the last committed cursor.  The next page is
+fetched while the current one is being written.
+
+Sources:
+
+* ``RpcEventSource`` pages ``suix_queryEvents`` for one Move module.
+* ``JsonlEventSource`` replays a file with one event (as the RPC returns it)
+  per line, for fixtures, tests and benchmarks.
+
+Run one stream per module against ``DATABASE_URL``::
+
+    python -m app.indexer                       # message and vote modules over RPC
+    python -m app.indexer --jsonl events.jsonl  # replay a file
+    python -m app.indexer status                # cursor and lag per stream
+
+Like and alert events carry the on-chain totals, so counters are set rather
+than incremented.  Lag (``stats``/``indexer_status``) is wall-clock time
+minus the chain timestamp of the last applied event.  ``on_page`` is called
+with each page once it is committed, e.g. ``ProposalBook.apply_events`` to
+keep an in-process proposal index current.
+
+With ``project=False`` an indexer only follows a stream for its ``on_page``
+hook: nothing is written, and it starts from the stream's stored checkpoint
+or, without one, from the newest event.  The wallet routes follow the token
+and rewards modules this way and drop the cached balances their events
+change (``balance_changes``); with ``PROPOSAL_FOLLOW_EVENTS`` the app follows
+the vote module into ``ProposalBook.apply_events``.
+"""
+from __future__ import annotations
+
+import abc
+import argparse
+import asyncio
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from sqlalchemy import bindparam, insert, select, tuple_, update
+from sqlalchemy.orm import Session
+
+from .models import Comment, Creator, IndexerCheckpoint, Message, Proposal, Vote
+from .repositories.messages import SEARCH_SEPARATOR
+from .repositories.sql import chunks, messages_fts, review_flag, review_flag_expression
+from .schemas import MessageStatus, ProposalStatus, ProposalType
+
+logger = logging.getLogger(__name__)
+
+Event = Mapping[str, Any]
+Cursor = Dict[str, str]
+
+# Status and type codes from move/sources/message.move and vote.move.
+MESSAGE_STATUSES = {
+    0: MessageStatus.NORMAL,
+    1: MessageStatus.UNDER_REVIEW,
+    2: MessageStatus.HYPED,
+    3: MessageStatus.SPAM,
+    4: MessageStatus.DELETED,
+}
+PROPOSAL_TYPES = {0: ProposalType.HYPE, 1: ProposalType.SCAM}
+PROPOSAL_STATUSES = {
+    0: ProposalStatus.OPEN,
+    1: ProposalStatus.PASSED,
+    2: ProposalStatus.REJECTED,
+    3: ProposalStatus.EXECUTED,
+}
+MODULES = ("message", "vote")
+# Modules whose events move SWT balances, and the address field of each event.
+WALLET_MODULES = ("token", "rewards")
+BALANCE_EVENTS = {
+    "TokenMinted": "recipient",
+    "TokenBurned": "from",
+    "TokenLocked": "from",
+    "TokenUnlocked": "recipient",
+    "RewardDistributed": "recipient",
+}
+
+_messages = Message.__table__
+_creators = Creator.__table__
+_comments = Comment.__table__
+_proposals = Proposal.__table__
+_votes = Vote.__table__
+_checkpoints = IndexerCheckpoint.__table__
+
+
+def event_name(event: Event) -> str:
+    """``MessageLiked`` for ``0xpkg::message::MessageLiked`` (type arguments dropped)."""
+    return event["type"].split("<", 1)[0].rsplit("::", 1)[-1]
+
+
+def _timestamp(event: Event) -> datetime:
+    millis = event.get("timestampMs")
+    if millis is None:
+        return datetime.now(timezone.utc)
+    return datetime.fromtimestamp(int(millis) / 1000, tz=timezone.utc)
+
+
+# Sources ---------------------------------------------------------------------------
+
+
+@dataclass
+class EventPage:
+    events: List[Event]
+    next_cursor: Optional[Cursor]
+    has_next_page: bool
+
+
+class EventSource(abc.ABC):
+    """A paged stream of one module's events; subclasses implement ``fetch``."""
+
+    @abc.abstractmethod
+    async def fetch(self, cursor: Optional[Cursor], limit: int) -> EventPage:
+        """Up to ``limit`` events after ``cursor`` (from the first event when ``None``)."""
+
+    async def latest_cursor(self) -> Optional[Cursor]:
+        """Cursor of the newest event; ``None`` (start from the first event) if unknown."""
+        return None
+
+    async def aclose(self) -> None:
+        pass
+
+
+class JsonlEventSource(EventSource):
+    """Events replayed from a JSON-lines file, paged by their ``id`` cursor."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._events: Optional[List[Event]] = None
+        self._positions: Dict[Tuple[str, str], int] = {}
+
+    def _load(self) -> List[Event]:
+        if self._events is None:
+            with open(self.path, "rb") as handle:
+                self._events = [json.loads(line) for line in handle if line.strip()]
+            self._positions = {
+                (event["id"]["txDigest"], str(event["id"]["eventSeq"])): index
+                for index, event in enumerate(self._events)
+            }
+        return self._events
+
+    async def fetch(self, cursor: Optional[Cursor], limit: int) -> EventPage:
+        events = self._load()
+        start = 0
+        if cursor is not None:
+            start = self._positions[(cursor["txDigest"], str(cursor["eventSeq"]))] + 1
+        page = events[start : start + limit]
+        next_cursor = dict(page[-1]["id"]) if page else cursor
+        return EventPage(page, next_cursor, start + limit < len(events))
+
+
+class RpcEventSource(EventSource):
+    """``suix_queryEvents`` for one module of the SuiWorld package, oldest first."""
+
+    def __init__(self, client: Any, package_id: str, module: str) -> None:
+        self._client = client
+        self._filter = {"MoveEventModule": {"package": package_id, "module": module}}
+
+    async def fetch(self, cursor: Optional[Cursor], limit: int) -> EventPage:
+        result = await self._client.call("suix_queryEvents", [self._filter, cursor, limit, False])
+        return EventPage(result.get("data", []), result.get("nextCursor") or cursor, bool(result.get("hasNextPage")))
+
+    async def latest_cursor(self) -> Optional[Cursor]:
+        result = await self._client.call("suix_queryEvents", [self._filter, None, 1, True])
+        data = result.get("data", [])
+        return dict(data[0]["id"]) if data else None
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+# Projection ------------------------------------------------------------------------
+
+
+def balance_changes(events: Iterable[Event]) -> List[Dict[str, Any]]:
+    """SWT balances moved by token and rewards events, as Sui ``balanceChanges`` entries."""
+    from .chain import SWT_COIN_SUFFIX
+
+    changes: List[Dict[str, Any]] = []
+    for event in events:
+        field_name = BALANCE_EVENTS.get(event_name(event))
+        if field_name is None:
+            continue
+        changes.append(
+            {
+                "owner": {"AddressOwner": event["parsedJson"][field_name]},
+                "coinType": event["packageId"] + SWT_COIN_SUFFIX,
+            }
+        )
+    return changes
+
+
+def _short_address(address: str) -> str:
+    return address[:10]
+
+
+@dataclass
+class Projection:
+    """The net effect of a page of events on each table."""
+
+    creators: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    messages: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    message_changes: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    comments: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    proposals: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    proposal_changes: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    tallies: Dict[str, List[int]] = field(default_factory=dict)
+    votes: Dict[Tuple[str, str], Dict[str, Any]] = field(default_factory=dict)
+    skipped: int = 0
+
+    @classmethod
+    def of(cls, events: Iterable[Event]) -> "Projection":
+        projection = cls()
+        handlers = _HANDLERS
+        for event in events:
+            handler = handlers.get(event_name(event))
+            if handler is None:
+                projection.skipped += 1
+            else:
+                handler(projection, event["parsedJson"], event)
+        return projection
+
+    def _message(self, message_id: str, **values: Any) -> None:
+        row = self.messages.get(message_id)
+        if row is not None:
+            row.update(values)
+        else:
+            self.message_changes.setdefault(message_id, {}).update(values)
+
+    def _proposal(self, proposal_id: str, **values: Any) -> None:
+        row = self.proposals.get(proposal_id)
+        if row is not None:
+            row.update(values)
+        else:
+            self.proposal_changes.setdefault(proposal_id, {}).update(values)
+
+    # Handlers, one per event type ------------------------------------------------
+
+    def message_created(self, fields: Mapping[str, Any], event: Event) -> None:
+        author = fields["author"]
+        when = _timestamp(event)
+        handle = _short_address(author)
+        self.creators.setdefault(
+            author, {"id": author, "handle": handle, "display_name": author, "avatar_url": ""}
+        )
+        self.messages[fields["message_id"]] = {
+            "id": fields["message_id"],
+            "title": "",
+            "content": "",
+            "creator_id": author,
+            "status": MessageStatus.NORMAL.value,
+            "like_count": 0,
+            "alert_count": 0,
+            "search_text": SEARCH_SEPARATOR.join(("", "", handle.lower(), author.lower())),
+            "created_at": when,
+            "updated_at": when,
+        }
+
+    def message_updated(self, fields: Mapping[str, Any], event: Event) -> None:
+        status = MESSAGE_STATUSES[int(fields["status"])]
+        self._message(fields["message_id"], status=status.value, updated_at=_timestamp(event))
+
+    def message_deleted(self, fields: Mapping[str, Any], event: Event) -> None:
+        self._message(fields["message_id"], status=MessageStatus.DELETED.value, updated_at=_timestamp(event))
+
+    def message_liked(self, fields: Mapping[str, Any], event: Event) -> None:
+        self._message(fields["message_id"], like_count=int(fields["total_likes"]))
+
+    def message_alerted(self, fields: Mapping[str, Any], event: Event) -> None:
+        self._message(fields["message_id"], alert_count=int(fields["total_alerts"]))
+
+    def comment_created(self, fields: Mapping[str, Any], event: Event) -> None:
+        self.comments[fields["comment_id"]] = {
+            "id": fields["comment_id"],
+            "message_id": fields["message_id"],
+            "author": fields["author"],
+            "created_at": _timestamp(event),
+        }
+
+    def proposal_created(self, fields: Mapping[str, Any], event: Event) -> None:
+        when = _timestamp(event)
+        self.proposals[fields["proposal_id"]] = {
+            "id": fields["proposal_id"],
+            "message_id": fields["message_id"],
+            "proposal_type": PROPOSAL_TYPES[int(fields["proposal_type"])].value,
+            "proposer": fields["proposer"],
+            "status": ProposalStatus.OPEN.value,
+            "approve_votes": 0,
+            "reject_votes": 0,
+            "created_at": when,
+            "updated_at": when,
+        }
+
+    def vote_cast(self, fields: Mapping[str, Any], event: Event) -> None:
+        proposal_id, voter = fields["proposal_id"], fields["voter"]
+        if (proposal_id, voter) in self.votes:
+            return
+        approve = bool(fields["vote"])
+        self.votes[(proposal_id, voter)] = {
+            "proposal_id": proposal_id,
+            "voter": voter,
+            "approve": approve,
+            "cast_at": _timestamp(event),
+        }
+        row = self.proposals.get(proposal_id)
+        column = "approve_votes" if approve else "reject_votes"
+        if row is not None:
+            row[column] += 1
+        else:
+            tally = self.tallies.setdefault(proposal_id, [0, 0])
+            tally[0 if approve else 1] += 1
+
+    def proposal_resolved(self, fields: Mapping[str, Any], event: Event) -> None:
+        proposal_id = fields["proposal_id"]
+        # The resolution carries final totals, which supersede any counted votes.
+        self.tallies.pop(proposal_id, None)
+        self._proposal(
+            proposal_id,
+            status=PROPOSAL_STATUSES[int(fields["status"])].value,
+            approve_votes=int(fields["approve_votes"]),
+            reject_votes=int(fields["reject_votes"]),
+            updated_at=_timestamp(event),
+        )
+
+
+_HANDLERS: Dict[str, Callable[[Projection, Mapping[str, Any], Event], None]] = {
+    "MessageCreated": Projection.message_created,
+    "MessageUpdated": Projection.message_updated,
+    "MessageDeleted": Projection.message_deleted,
+    "MessageLiked": Projection.message_liked,
+    "MessageAlerted": Projection.message_alerted,
+    "CommentCreated": Projection.comment_created,
+    "ProposalCreated": Projection.proposal_created,
+    "VoteCast": Projection.vote_cast,
+    "ProposalResolved": Projection.proposal_resolved,
+}
+
+
+# Writes ----------------------------------------------------------------------------
+
+
+def _existing(session: Session, column: Any, ids: Sequence[Any]) -> set:
+    found: set = set()
+    for chunk in chunks(list(ids)):
+        found.update(session.scalars(select(column).where(column.in_(chunk))))
+    return found
+
+
+def _update_by_id(session: Session, table: Any, changes: Mapping[str, Dict[str, Any]]) -> None:
+    """One executemany per distinct set of changed columns."""
+    groups: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+    for row_id, values in changes.items():
+        columns = tuple(sorted(values))
+        groups.setdefault(columns, []).append({"row_id": row_id, **{f"new_{key}": values[key] for key in columns}})
+    for columns, rows in groups.items():
+        stmt = (
+            update(table)
+            .where(table.c.id == bindparam("row_id"))
+            .values({key: bindparam(f"new_{key}") for key in columns})
+        )
+        for chunk in chunks(rows):
+            session.execute(stmt, chunk)
+
+
+def apply_projection(session: Session, projection: Projection) -> None:
+    """Write ``projection``; replaying a page that was already applied changes nothing."""
+    sqlite = session.get_bind().dialect.name == "sqlite"
+
+    if projection.creators:
+        known = _existing(session, _creators.c.id, list(projection.creators))
+        fresh = [row for creator_id, row in projection.creators.items() if creator_id not in known]
+        for chunk in chunks(fresh):
+            session.execute(insert(_creators), chunk)
+
+    message_changes = dict(projection.message_changes)
+    if projection.messages:
+        known = _existing(session, _messages.c.id, list(projection.messages))
+        rows = []
+        for message_id, row in projection.messages.items():
+            if message_id in known:
+                message_changes[message_id] = {
+                    key: value for key, value in row.items() if key not in ("id", "created_at", "search_text")
+                }
+                continue
+            status = MessageStatus(row["status"])
+            rows.append({**row, "review_flag": review_flag(status, row["like_count"], row["alert_count"])})
+        for chunk in chunks(rows):
+            session.execute(insert(_messages), chunk)
+            if sqlite:
+                session.execute(
+                    insert(messages_fts),
+                    [{"message_id": row["id"], "search_text": row["search_text"]} for row in chunk],
+                )
+    if message_changes:
+        _update_by_id(session, _messages, message_changes)
+        for chunk in chunks(list(message_changes)):
+            session.execute(
+                update(_messages).where(_messages.c.id.in_(chunk)).values(review_flag=review_flag_expression())
+            )
+
+    if projection.comments:
+        known = _existing(session, _comments.c.id, list(projection.comments))
+        fresh = [row for comment_id, row in projection.comments.items() if comment_id not in known]
+        for chunk in chunks(fresh):
+            session.execute(insert(_comments), chunk)
+
+    proposal_changes = dict(projection.proposal_changes)
+    if projection.proposals:
+        known = _existing(session, _proposals.c.id, list(projection.proposals))
+        fresh = []
+        for proposal_id, row in projection.proposals.items():
+            if proposal_id in known:
+                proposal_changes[proposal_id] = {
+                    key: row[key] for key in ("status", "approve_votes", "reject_votes", "updated_at")
+                }
+            else:
+                fresh.append(row)
+        for chunk in chunks(fresh):
+            session.execute(insert(_proposals), chunk)
+
+    tallies = projection.tallies
+    if projection.votes:
+        pairs = list(projection.votes)
+        known_votes: set = set()
+        for chunk in chunks(pairs):
+            known_votes.update(
+                tuple(row)
+                for row in session.execute(
+                    select(_votes.c.proposal_id, _votes.c.voter).where(
+                        tuple_(_votes.c.proposal_id, _votes.c.voter).in_(chunk)
+                    )
+                )
+            )
+        fresh = [row for pair, row in projection.votes.items() if pair not in known_votes]
+        if known_votes:
+            # Votes already stored were counted when they were first applied.
+            tallies = {proposal_id: list(counts) for proposal_id, counts in tallies.items()}
+            for proposal_id, voter in known_votes:
+                counts = tallies.get(proposal_id)
+                if counts is not None:
+                    counts[0 if projection.votes[(proposal_id, voter)]["approve"] else 1] -= 1
+        for chunk in chunks(fresh):
+            session.execute(insert(_votes), chunk)
+    if proposal_changes:
+        _update_by_id(session, _proposals, proposal_changes)
+    tally_rows = [
+        {"row_id": proposal_id, "delta_approve": approve, "delta_reject": reject}
+        for proposal_id, (approve, reject) in tallies.items()
+        if approve or reject
+    ]
+    for chunk in chunks(tally_rows):
+        session.execute(
+            update(_proposals)
+            .where(_proposals.c.id == bindparam("row_id"))
+            .values(
+                approve_votes=_proposals.c.approve_votes + bindparam("delta_approve"),
+                reject_votes=_proposals.c.reject_votes + bindparam("delta_reject"),
+            ),
+            chunk,
+        )
+
+
+def load_checkpoint(session: Session, name: str) -> Optional[Dict[str, Any]]:
+    row = session.execute(select(_checkpoints).where(_checkpoints.c.name == name)).mappings().first()
+    return dict(row) if row is not None else None
+
+
+def save_checkpoint(
+    session: Session, name: str, cursor: Optional[Cursor], timestamp_ms: Optional[int], events: int
+) -> None:
+    values = {
+        "tx_digest": cursor["txDigest"] if cursor else None,
+        "event_seq": str(cursor["eventSeq"]) if cursor else None,
+        "timestamp_ms": timestamp_ms,
+        "updated_at": datetime.now(timezone.utc),
+    }
+    result = session.execute(
+        update(_checkpoints)
+        .where(_checkpoints.c.name == name)
+        .values(events=_checkpoints.c.events + events, **values)
+    )
+    if result.rowcount == 0:
+        session.execute(insert(_checkpoints).values(name=name, events=events, **values))
+
+
+def _cursor(row: Optional[Mapping[str, Any]]) -> Optional[Cursor]:
+    if row is None or row["tx_digest"] is None:
+        return None
+    return {"txDigest": row["tx_digest"], "eventSeq": row["event_seq"]}
+
+
+def _lag_seconds(timestamp_ms: Optional[int], now: float) -> Optional[float]:
+    return None if timestamp_ms is None else max(0.0, now - timestamp_ms / 1000)
+
+
+def indexer_status(
+    session_factory: Callable[[], Session], clock: Callable[[], float] = time.time
+) -> List[Dict[str, Any]]:
+    """Cursor, event count and lag of every indexer stream, from the checkpoint table."""
+    with session_factory() as session:
+        rows = session.execute(select(_checkpoints).order_by(_checkpoints.c.name)).mappings().all()
+    now = clock()
+    return [
+        {
+            "name": row["name"],
+            "cursor": _cursor(row),
+            "events": row["events"],
+            "last_event_at": row["timestamp_ms"],
+            "lag_seconds": _lag_seconds(row["timestamp_ms"], now),
+            "updated_at": row["updated_at"].isoformat() if row["updated_at"] else None,
+        }
+        for row in rows
+    ]
+
+
+# Indexer ---------------------------------------------------------------------------
+
+
+class EventIndexer:
+    """Pages one event stream into the database, resuming from its checkpoint."""
+
+    def __init__(
+        self,
+        source: EventSource,
+        session_factory: Optional[Callable[[], Session]],
+        *,
+        name: str = "default",
+        page_size: int = 1000,
+        poll_interval: float = 1.0,
+        clock: Callable[[], float] = time.time,
+        on_page: Optional[Callable[[Sequence[Event]], Any]] = None,
+        project: bool = True,
+    ) -> None:
+        if project and session_factory is None:
+            raise ValueError("a projecting indexer needs a session factory")
+        self.source = source
+        self.name = name
+        self.project = project
+        self.page_size = page_size
+        self.poll_interval = poll_interval
+        self._session_factory = session_factory
+        self._clock = clock
+        self._on_page = on_page
+        self._cursor: Optional[Cursor] = None
+        self._loaded = False
+        self._timestamp_ms: Optional[int] = None
+        self.events = 0
+        self.skipped = 0
+        self.batches = 0
+        self.caught_up = False
+        self.last_batch_seconds = 0.0
+        self.busy_seconds = 0.0
+
+    @property
+    def cursor(self) -> Optional[Cursor]:
+        return self._cursor
+
+    async def load(self) -> None:
+        """Read the stored checkpoint (following: else the newest cursor); ``run`` does this on first use."""
+        row = None
+        if self._session_factory is not None:
+            with self._session_factory() as session:
+                row = load_checkpoint(session, self.name)
+        self._cursor = _cursor(row)
+        self._timestamp_ms = row["timestamp_ms"] if row else None
+        if self._cursor is None and not self.project:
+            self._cursor = await self.source.latest_cursor()
+        self._loaded = True
+
+    def _apply(self, page: EventPage) -> Projection:
+        if not self.project:
+            return Projection()
+        projection = Projection.of(page.events)
+        millis = page.events[-1].get("timestampMs") if page.events else None
+        with self._session_factory() as session, session.begin():
+            apply_projection(session, projection)
+            save_checkpoint(
+                session,
+                self.name,
+                page.next_cursor,
+                int(millis) if millis is not None else self._timestamp_ms,
+                len(page.events),
+            )
+        return projection
+
+    async def _commit(self, page: EventPage) -> None:
+        started = time.perf_counter()
+        projection = await asyncio.to_thread(self._apply, page)
+        elapsed = time.perf_counter() - started
+        millis = page.events[-1].get("timestampMs")
+        if millis is not None:
+            self._timestamp_ms = int(millis)
+        self._cursor = page.next_cursor
+        self.events += len(page.events)
+        self.skipped += projection.skipped
+        self.batches += 1
+        self.last_batch_seconds = elapsed
+        self.busy_seconds += elapsed
+        if self._on_page is not None:
+            self._on_page(page.events)
+
+    async def run_once(self) -> int:
+        """Apply one page; returns how many events it held."""
+        if not self._loaded:
+            await self.load()
+        page = await self.source.fetch(self._cursor, self.page_size)
+        self.caught_up = not page.has_next_page
+        if page.events:
+            await self._commit(page)
+        return len(page.events)
+
+    async def run(self, *, stop: Optional[asyncio.Event] = None, until_caught_up: bool = False) -> None:
+        """Index until ``stop`` is set (or, with ``until_caught_up``, the stream is drained)."""
+        if not self._loaded:
+            await self.load()
+        next_page = asyncio.ensure_future(self.source.fetch(self._cursor, self.page_size))
+        try:
+            while stop is None or not stop.is_set():
+                page = await next_page
+                self.caught_up = not page.has_next_page
+                if page.has_next_page:
+                    # Fetch ahead while this page is written.
+                    next_page = asyncio.ensure_future(self.source.fetch(page.next_cursor, self.page_size))
+                if page.events:
+                    await self._commit(page)
+                if not page.has_next_page:
+                    if until_caught_up:
+                        return
+                    if stop is not None:
+                        try:
+                            await asyncio.wait_for(stop.wait(), self.poll_interval)
+                        except asyncio.TimeoutError:
+                            pass
+                    else:
+                        await asyncio.sleep(self.poll_interval)
+                    next_page = asyncio.ensure_future(self.source.fetch(self._cursor, self.page_size))
+        finally:
+            if not next_page.done():
+                next_page.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "cursor": self._cursor,
+            "events": self.events,
+            "skipped": self.skipped,
+            "batches": self.batches,
+            "caught_up": self.caught_up,
+            "lag_seconds": _lag_seconds(self._timestamp_ms, self._clock()),
+            "last_batch_ms": self.last_batch_seconds * 1e3,
+            "events_per_second": self.events / self.busy_seconds if self.busy_seconds else None,
+        }
+
+
+def rpc_indexers(
+    session_factory: Optional[Callable[[], Session]],
+    modules: Sequence[str],
+    *,
+    on_page: Optional[Callable[[Sequence[Event]], Any]] = None,
+    project: bool = True,
+    page_size: Optional[int] = None,
+) -> List[EventIndexer]:
+    """One RPC-backed indexer per module of ``settings.SUI_PACKAGE_ID``, checkpointed under the module name."""
+    from .chain_client import SuiRpcClient
+    from .config import settings
+
+    if not settings.SUI_PACKAGE_ID:
+        raise RuntimeError("SUI_PACKAGE_ID is not configured")
+    return [
+        EventIndexer(
+            RpcEventSource(
+                SuiRpcClient(settings.SUI_RPC_URL, timeout=settings.SUI_RPC_TIMEOUT_SECONDS),
+                settings.SUI_PACKAGE_ID,
+                module,
+            ),
+            session_factory,
+            name=module,
+            page_size=page_size or settings.INDEXER_PAGE_SIZE,
+            poll_interval=settings.INDEXER_POLL_INTERVAL_SECONDS,
+            on_page=on_page,
+            project=project,
+        )
+        for module in modules
+    ]
+
+
+# CLI -------------------------------------------------------------------------------
+
+
+async def _run(args: argparse.Namespace, session_factory: Callable[[], Session]) -> None:
+    if args.jsonl:
+        source = JsonlEventSource(args.jsonl)
+        indexers = [EventIndexer(source, session_factory, name=args.name or "replay", page_size=args.page_size)]
+    else:
+        try:
+            indexers = rpc_indexers(session_factory, MODULES, page_size=args.page_size)
+        except RuntimeError as exc:
+            raise SystemExit(str(exc)) from exc
+
+    async def report() -> None:
+        while True:
+            await asyncio.sleep(args.report_interval)
+            for indexer in indexers:
+                logger.info("indexer %s", json.dumps(indexer.stats(), default=str))
+
+    reporter = asyncio.ensure_future(report())
+    try:
+        await asyncio.gather(*(indexer.run(until_caught_up=args.once) for indexer in indexers))
+    finally:
+        reporter.cancel()
+        for indexer in indexers:
+            await indexer.source.aclose()
+            print(json.dumps(indexer.stats(), default=str))
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.indexer", description="Index SuiWorld Move events.")
+    parser.add_argument("command", nargs="?", default="run", choices=("run", "status"))
+    parser.add_argument("--jsonl", default=None, help="replay events from a JSON-lines file instead of RPC")
+    parser.add_argument("--name", default=None, help="checkpoint name for --jsonl (default: replay)")
+    parser.add_argument("--url", default=None, help="database URL (default: DATABASE_URL)")
+    parser.add_argument("--page-size", type=int, default=None)
+    parser.add_argument("--once", action="store_true", help="stop once caught up")
+    parser.add_argument("--report-interval", type=float, default=10.0)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    from .config import settings
+
+    engine = create_engine(args.url or settings.DATABASE_URL, future=True)
+    session_factory = sessionmaker(bind=engine, future=True)
+    try:
+        if args.command == "status":
+            print(json.dumps(indexer_status(session_factory), indent=2))
+            return 0
+        args.page_size = args.page_size or settings.INDEXER_PAGE_SIZE
+        asyncio.run(_run(args, session_factory))
+        return 0
+    finally:
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
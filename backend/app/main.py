@@ -1,40 +1,237 @@
-from contextlib import asynccontextmanager
+"""FastAPI application.
 
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
+Startup is kept light for autoscaled workers: SQLAlchemy, jose and httpx are
+imported on first use, and with ``STARTUP_MODE=lite`` no DDL runs at boot
+(apply migrations with ``python -m app.migrations`` at deploy time instead).
+Routers are imported in the "routers" phase, and only those named in
+``API_ROUTERS`` (all by default), so a worker serving part of the API never
+loads the rest.  The background services (and numpy and sortedcontainers
+behind the message store and proposal book) are imported by the lifespan, or
+by the routers that use them.  Settings are read from the environment in
+their own phase, since router selection needs them.  Phase timings are
+logged and served at ``GET /startup``; that and the other operational
+endpoints answer only with ``INTERNAL_ENDPOINTS`` set.
+"""
+from .startup import STARTUP
 
-from .api import auth, galleries, messages, proposals, reactions, swap
-from .config import settings
-from .db import engine
-from .models import Base
+with STARTUP.phase("settings"):
+    from .config import settings
+
+with STARTUP.phase("imports"):
+    import asyncio
+    import importlib
+    import logging
+    from contextlib import asynccontextmanager
+    from typing import Optional
+
+    from fastapi import APIRouter, Depends, FastAPI
+    from fastapi.middleware.cors import CORSMiddleware
+
+    from .security import require_internal_endpoints
+
+
+logger = logging.getLogger(__name__)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Initialize database state on startup."""
-    Base.metadata.create_all(bind=engine)
+    """Apply migrations (full mode) and start background services."""
+    with STARTUP.phase("services"):
+        from .services.content_hash import ContentVerifier, VerifiedHashCache, use_content_verifier
+        from .services.counters import ReactionCounterBuffer, use_reaction_buffer
+        from .services.live import LiveHub, use_live_hub
+        from .services.messages import MESSAGE_SEEDS, use_async_repository, use_repository
+        from .services.prices import get_price_oracle
+        from .services.proposals import ProposalPipeline, get_proposal_book, use_proposal_store
+        from .services.zklogin import get_proof_verifier, use_proof_verifier
+
+    database = settings.MESSAGE_BACKEND == "database"
+    blobs = compactor = proposal_store = None
+    if settings.STARTUP_MODE != "lite":
+        with STARTUP.phase("migrations"):
+            from .db import engine
+            from .migrations import upgrade
+
+            upgrade(engine)
+    if database:
+        with STARTUP.phase("repository"):
+            from .db import SessionLocal, get_async_sessionmaker
+            from .repositories.content_hashes import SqlVerificationStore
+            from .repositories.messages import AsyncSqlMessageRepository, SqlMessageRepository
+            from .repositories.proposals import SqlProposalStore
+            from .services.blobs import compact_periodically, open_blob_store
+
+            use_content_verifier(
+                ContentVerifier(
+                    VerifiedHashCache(SqlVerificationStore(SessionLocal)),
+                    workers=settings.CONTENT_HASH_WORKERS,
+                    batch_size=settings.CONTENT_HASH_BATCH_SIZE,
+                )
+            )
+            blobs = open_blob_store()
+            repository = SqlMessageRepository(SessionLocal, blobs)
+            if repository.count() == 0:
+                repository.upsert_many(MESSAGE_SEEDS)
+            use_repository(repository)
+            proposal_store = SqlProposalStore(SessionLocal)
+            use_proposal_store(proposal_store)
+            if blobs is not None and settings.BLOB_COMPACT_INTERVAL_SECONDS > 0:
+                compactor = asyncio.create_task(
+                    compact_periodically(repository.compact_blobs, settings.BLOB_COMPACT_INTERVAL_SECONDS)
+                )
+            if settings.DATABASE_ASYNC:
+                use_async_repository(AsyncSqlMessageRepository(get_async_sessionmaker(), blobs))
+    with STARTUP.phase("background"):
+        # Fails fast when ZKLOGIN_PROOF_VERIFIER is not configured.
+        get_proof_verifier()
+        live_hub = LiveHub(
+            frame_interval=settings.LIVE_FRAME_INTERVAL_SECONDS,
+            max_frames=settings.LIVE_CLIENT_MAX_FRAMES,
+            max_topics=settings.LIVE_CLIENT_MAX_TOPICS,
+        )
+        use_live_hub(live_hub)
+        await live_hub.start()
+        proposal_book = get_proposal_book()
+        managers = (address.strip() for address in settings.PROPOSAL_MANAGERS.split(","))
+        proposal_book.add_managers(address for address in managers if address)
+        proposal_followers = []
+        if settings.PROPOSAL_FOLLOW_EVENTS:
+            from .indexer import rpc_indexers
+
+            proposal_followers = rpc_indexers(
+                SessionLocal if database else None,
+                ("vote",),
+                on_page=proposal_book.apply_events,
+                project=False,
+            )
+            for follower in proposal_followers:
+                await follower.load()
+        if proposal_store is not None:
+            # After the followers read their checkpoint, so no vote committed in between is missed.
+            proposal_book.load(*proposal_store.load())
+        stop_followers = asyncio.Event()
+        follower_tasks = [asyncio.create_task(follower.run(stop=stop_followers)) for follower in proposal_followers]
+        proposal_pipeline = ProposalPipeline(proposal_book, store=proposal_store)
+        reactions_buffer = ReactionCounterBuffer(
+            on_crossing=proposal_pipeline.publish,
+            auto_ack=False,
+            log_dir=settings.REACTION_LOG_DIR,
+            shards=settings.REACTION_SHARDS,
+            flush_interval=settings.REACTION_FLUSH_INTERVAL_SECONDS,
+            flush_threshold=settings.REACTION_FLUSH_THRESHOLD,
+        )
+        proposal_pipeline.start(acknowledge=reactions_buffer.acknowledge)
+        reactions_buffer.start()
+        use_reaction_buffer(reactions_buffer)
+        price_oracle = get_price_oracle()
+        price_oracle.start()
+    STARTUP.log(settings.STARTUP_MODE)
     yield
+    if compactor is not None:
+        compactor.cancel()
+    stop_followers.set()
+    for follower, result in zip(proposal_followers, await asyncio.gather(*follower_tasks, return_exceptions=True)):
+        if isinstance(result, Exception):
+            logger.warning("proposal event follower %s failed: %s", follower.name, result)
+        await follower.source.aclose()
+    await live_hub.stop()
+    await price_oracle.stop()
+    reactions_buffer.stop()
+    await proposal_pipeline.stop()
+    use_proof_verifier(None)
+    use_content_verifier(None)
+    use_reaction_buffer(None)
+    use_proposal_store(None)
+    use_live_hub(None)
+    use_repository(None)
+    use_async_repository(None)
+    if database:
+        from .db import dispose_async_engine
 
+        await dispose_async_engine()
+    if blobs is not None:
+        blobs.close()
 
-app = FastAPI(title="SuiWorld Backend", lifespan=lifespan)
 
-allowed_origins = getattr(settings, "ALLOWED_ORIGINS", ["http://localhost:3000"])
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=allowed_origins,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+# Module under app.api and mount prefix of each router, in mount order.
+ROUTERS = (
+    ("auth", "/auth"),
+    ("galleries", "/galleries"),
+    ("messages", "/messages"),
+    ("reactions", "/reactions"),
+    ("proposals", "/proposals"),
+    ("live", "/live"),
+    ("swap", "/swap"),
+    ("wallet", "/api/wallet"),
 )
 
-app.include_router(auth.router, prefix="/auth", tags=["auth"])
-app.include_router(galleries.router, prefix="/galleries", tags=["galleries"])
-app.include_router(messages.router, prefix="/messages", tags=["messages"])
-app.include_router(reactions.router, prefix="/reactions", tags=["reactions"])
-app.include_router(proposals.router, prefix="/proposals", tags=["proposals"])
-app.include_router(swap.router, prefix="/swap", tags=["swap"])
+
+def enabled_routers(names: Optional[str] = None):
+    """The ``ROUTERS`` entries named in ``names`` (comma-separated), or all."""
+    if names is None:
+        return ROUTERS
+    wanted = {name.strip() for name in names.split(",") if name.strip()}
+    unknown = wanted - {name for name, _ in ROUTERS}
+    if unknown:
+        raise ValueError(f"API_ROUTERS names unknown routers: {', '.join(sorted(unknown))}")
+    return tuple(entry for entry in ROUTERS if entry[0] in wanted)
+
+
+with STARTUP.phase("app"):
+    app = FastAPI(title="SuiWorld Backend", lifespan=lifespan)
+
+    allowed_origins = getattr(settings, "ALLOWED_ORIGINS", ["http://localhost:3000"])
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=allowed_origins,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+with STARTUP.phase("routers"):
+    for name, prefix in enabled_routers(settings.API_ROUTERS):
+        module = importlib.import_module(f".api.{name}", __package__)
+        app.include_router(module.router, prefix=prefix, tags=[name])
 
 
 @app.get("/")
 def read_root():
     return {"status": "ok"}
+
+
+internal = APIRouter(dependencies=[Depends(require_internal_endpoints)], include_in_schema=False)
+
+
+@internal.get("/db/pool")
+def database_pool():
+    """Connection pool usage of the sync and (when enabled) async engines."""
+    from .db import engine_stats
+
+    return engine_stats()
+
+
+@internal.get("/blobs")
+def blob_store_stats():
+    """Size and dedup counters of the message body blob store, when enabled."""
+    from .services.messages import body_store_stats
+
+    return body_store_stats()
+
+
+@internal.get("/indexer")
+def indexer_progress():
+    """Cursor, event count and lag of each event indexer stream."""
+    from .db import SessionLocal
+    from .indexer import indexer_status
+
+    return {"streams": indexer_status(SessionLocal)}
+
+
+@internal.get("/startup")
+def startup_timings():
+    """How long each startup phase took in this worker."""
+    return {"mode": settings.STARTUP_MODE, **STARTUP.report()}
+
+
+app.include_router(internal)
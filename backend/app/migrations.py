@@ -0,0 +1,325 @@
+"""Versioned schema migrations.
+
+Each migration has a version number and runs once, in its own transaction;
+applied versions are recorded in ``schema_migrations``.  Deployments run
+
+    python -m app.migrations upgrade [--to VERSION] [--url URL]
+
+before starting workers in ``STARTUP_MODE=lite``, which skips DDL at boot.
+``python -m app.migrations status`` lists applied and pending versions.
+In the default ``full`` mode the app applies pending migrations itself on
+startup, as ``create_all`` used to.
+
+Every migration carries its own frozen DDL - a snapshot ``MetaData`` or
+plain statements - rather than reading ``app.models``, so later model
+changes never alter what an old migration creates.  Migration 1 is the
+schema as versioning started; it creates tables only where missing.  A
+database from before versioning (whose ``messages.id`` was an Integer, with
+no creators table) cannot be upgraded in place: migration 1 refuses it, and
+it has to be rebuilt or converted by hand.  Append new migrations to
+``MIGRATIONS`` with the next version number; never edit one that has shipped.
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, List, Optional, Sequence
+
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    create_engine,
+    insert,
+    inspect,
+    select,
+    text,
+)
+from sqlalchemy.engine import Connection, Engine
+
+_metadata = MetaData()
+schema_migrations = Table(
+    "schema_migrations",
+    _metadata,
+    Column("version", Integer, primary_key=True),
+    Column("name", String(128), nullable=False),
+    Column("applied_at", DateTime(timezone=True), nullable=False),
+)
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    apply: Callable[[Connection], None]
+
+
+def _create_tables(metadata: MetaData) -> Callable[[Connection], None]:
+    def apply(connection: Connection) -> None:
+        metadata.create_all(bind=connection, checkfirst=True)
+
+    return apply
+
+
+def _execute(*statements: str, dialect: Optional[str] = None) -> Callable[[Connection], None]:
+    """Run ``statements`` (only on ``dialect`` when given)."""
+
+    def apply(connection: Connection) -> None:
+        if dialect is not None and connection.dialect.name != dialect:
+            return
+        for statement in statements:
+            connection.execute(text(statement))
+
+    return apply
+
+
+def _add_columns(table: str, *columns: Column) -> Callable[[Connection], None]:
+    """Add nullable columns to an existing table.
+
+    Skipped where the column exists: migration 1 used to build its tables from
+    the live models, so databases it created early may already have them.
+    """
+
+    def apply(connection: Connection) -> None:
+        existing = {column["name"] for column in inspect(connection).get_columns(table)}
+        for column in columns:
+            if column.name in existing:
+                continue
+            column_type = column.type.compile(dialect=connection.dialect)
+            connection.execute(text(f"ALTER TABLE {table} ADD COLUMN {column.name} {column_type}"))
+
+    return apply
+
+
+def _steps(*steps: Callable[[Connection], None]) -> Callable[[Connection], None]:
+    def apply(connection: Connection) -> None:
+        for step in steps:
+            step(connection)
+
+    return apply
+
+
+def _refuse_legacy_messages(connection: Connection) -> None:
+    tables = inspect(connection)
+    if tables.has_table("messages") and "creator_id" not in {
+        column["name"] for column in tables.get_columns("messages")
+    }:
+        raise RuntimeError(
+            "messages predates versioned migrations (Integer ids, no creators); "
+            "rebuild or convert it before running migration 1"
+        )
+
+
+# Frozen schemas, one MetaData per migration.  Do not edit: add a migration.
+
+_V1 = MetaData()
+Table(
+    "creators",
+    _V1,
+    Column("id", String(128), primary_key=True),
+    Column("handle", String(64), nullable=False),
+    Column("display_name", String(128), nullable=False),
+    Column("avatar_url", String, nullable=False),
+)
+Table(
+    "messages",
+    _V1,
+    Column("id", String(128), primary_key=True),
+    Column("title", String, nullable=False),
+    Column("content", String, nullable=False),
+    Column("creator_id", String(128), ForeignKey("creators.id"), nullable=False, index=True),
+    Column("status", String(16), nullable=False),
+    Column("like_count", Integer, nullable=False),
+    Column("alert_count", Integer, nullable=False),
+    Column("review_flag", Integer, nullable=False),
+    Column("search_text", String, nullable=False),
+    Column("created_at", DateTime(timezone=True), nullable=False),
+    Column("updated_at", DateTime(timezone=True), nullable=False),
+    Index("ix_messages_latest", "created_at", "id"),
+    Index("ix_messages_likes", "like_count", "created_at", "id"),
+    Index("ix_messages_alerts", "alert_count", "created_at", "id"),
+    Index("ix_messages_under_review", "review_flag", "like_count", "created_at", "id"),
+    Index(
+        "ix_messages_search_trgm",
+        "search_text",
+        postgresql_using="gin",
+        postgresql_ops={"search_text": "gin_trgm_ops"},
+    ).ddl_if(dialect="postgresql"),
+)
+Table(
+    "message_tags",
+    _V1,
+    Column("message_id", String(128), ForeignKey("messages.id", ondelete="CASCADE"), primary_key=True),
+    Column("position", Integer, primary_key=True),
+    Column("tag", String(64), nullable=False),
+    Column("tag_lower", String(64), nullable=False),
+    Index("ix_message_tags_lower", "tag_lower", "message_id"),
+)
+
+_V2 = MetaData()
+Table(
+    "comments",
+    _V2,
+    Column("id", String(128), primary_key=True),
+    Column("message_id", String(128), nullable=False, index=True),
+    Column("author", String(128), nullable=False),
+    Column("created_at", DateTime(timezone=True), nullable=False),
+)
+Table(
+    "proposals",
+    _V2,
+    Column("id", String(128), primary_key=True),
+    Column("message_id", String(128), nullable=False, index=True),
+    Column("proposal_type", String(16), nullable=False),
+    Column("proposer", String(128), nullable=False),
+    Column("status", String(16), nullable=False),
+    Column("approve_votes", Integer, nullable=False),
+    Column("reject_votes", Integer, nullable=False),
+    Column("created_at", DateTime(timezone=True), nullable=False),
+    Column("updated_at", DateTime(timezone=True), nullable=False),
+    Index("ix_proposals_status", "status", "created_at"),
+)
+Table(
+    "votes",
+    _V2,
+    Column("proposal_id", String(128), ForeignKey("proposals.id", ondelete="CASCADE"), primary_key=True),
+    Column("voter", String(128), primary_key=True),
+    Column("approve", Boolean, nullable=False),
+    Column("cast_at", DateTime(timezone=True), nullable=False),
+)
+Table(
+    "indexer_checkpoints",
+    _V2,
+    Column("name", String(64), primary_key=True),
+    Column("tx_digest", String(128), nullable=True),
+    Column("event_seq", String(32), nullable=True),
+    Column("timestamp_ms", BigInteger, nullable=True),
+    Column("events", BigInteger, nullable=False),
+    Column("updated_at", DateTime(timezone=True), nullable=False),
+)
+
+_V3 = MetaData()
+Table(
+    "content_hashes",
+    _V3,
+    Column("message_id", String(128), primary_key=True),
+    Column("title_hash", String(66), nullable=False),
+    Column("content_hash", String(66), nullable=False),
+    Column("verified", Boolean, nullable=False),
+    Column("checked_at", DateTime(timezone=True), nullable=False),
+)
+
+_V5 = MetaData()
+Table(
+    "reaction_log_checkpoints",
+    _V5,
+    Column("log", String(512), primary_key=True),
+    Column("segment", BigInteger, nullable=False),
+    Column("updated_at", DateTime(timezone=True), nullable=False),
+)
+
+
+MIGRATIONS: Sequence[Migration] = (
+    Migration(
+        1,
+        "initial schema",
+        _steps(
+            _refuse_legacy_messages,
+            _execute("CREATE EXTENSION IF NOT EXISTS pg_trgm", dialect="postgresql"),
+            _create_tables(_V1),
+            # SQLite has no trigram GIN index; an FTS5 trigram table stands in.
+            _execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts "
+                "USING fts5(message_id UNINDEXED, search_text, tokenize='trigram')",
+                dialect="sqlite",
+            ),
+        ),
+    ),
+    Migration(2, "indexer tables", _create_tables(_V2)),
+    Migration(3, "content hash verifications", _create_tables(_V3)),
+    Migration(4, "message body blob keys", _add_columns("messages", Column("content_hash", String(66)))),
+    Migration(5, "reaction log checkpoints", _create_tables(_V5)),
+    Migration(6, "proposal trigger counts", _add_columns("proposals", Column("trigger_count", Integer))),
+    Migration(
+        7,
+        "review flag covers UNDER_REVIEW",
+        _execute("UPDATE messages SET review_flag = 1 WHERE status = 'UNDER_REVIEW'"),
+    ),
+    Migration(8, "dismissed reviews", _add_columns("messages", Column("review_dismissed", Boolean))),
+)
+
+
+def applied_versions(engine: Engine) -> List[int]:
+    _metadata.create_all(bind=engine)
+    with engine.connect() as connection:
+        return list(connection.scalars(select(schema_migrations.c.version).order_by(schema_migrations.c.version)))
+
+
+def pending(engine: Engine, migrations: Sequence[Migration] = MIGRATIONS) -> List[Migration]:
+    applied = set(applied_versions(engine))
+    return [migration for migration in migrations if migration.version not in applied]
+
+
+def upgrade(
+    engine: Engine,
+    target: Optional[int] = None,
+    migrations: Sequence[Migration] = MIGRATIONS,
+) -> List[Migration]:
+    """Apply pending migrations up to ``target`` (default: all); returns those applied."""
+    applied: List[Migration] = []
+    for migration in sorted(pending(engine, migrations), key=lambda item: item.version):
+        if target is not None and migration.version > target:
+            break
+        with engine.begin() as connection:
+            migration.apply(connection)
+            connection.execute(
+                insert(schema_migrations).values(
+                    version=migration.version,
+                    name=migration.name,
+                    applied_at=datetime.now(timezone.utc),
+                )
+            )
+        applied.append(migration)
+    return applied
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.migrations", description="Apply schema migrations.")
+    parser.add_argument("command", nargs="?", default="upgrade", choices=("upgrade", "status"))
+    parser.add_argument("--to", type=int, default=None, help="stop after this version")
+    parser.add_argument("--url", default=None, help="database URL (default: DATABASE_URL)")
+    args = parser.parse_args(argv)
+
+    if args.url is None:
+        from .config import settings
+
+        args.url = settings.DATABASE_URL
+    engine = create_engine(args.url, future=True)
+    try:
+        if args.command == "status":
+            applied = set(applied_versions(engine))
+            for migration in MIGRATIONS:
+                state = "applied" if migration.version in applied else "pending"
+                print(f"{migration.version:>4}  {state:<8} {migration.name}")
+            return 0
+        done = upgrade(engine, args.to)
+        for migration in done:
+            print(f"applied {migration.version}: {migration.name}")
+        if not done:
+            print("schema is up to date")
+        return 0
+    finally:
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,14 +1,153 @@
-# TODO: Define SQLAlchemy or other ORM models
-# These will represent off-chain data stored in PostgreSQL.
-from sqlalchemy import Column, Integer, String, ForeignKey
+# SQLAlchemy models for off-chain data stored in PostgreSQL.
+from sqlalchemy import DDL, BigInteger, Boolean, Column, DateTime, ForeignKey, Index, Integer, String, event
 from sqlalchemy.ext.declarative import declarative_base
 
 Base = declarative_base()
 
+
+class Creator(Base):
+    __tablename__ = 'creators'
+    id = Column(String(128), primary_key=True)
+    handle = Column(String(64), nullable=False)
+    display_name = Column(String(128), nullable=False)
+    avatar_url = Column(String, nullable=False, default="")
+
+
 class Message(Base):
     __tablename__ = 'messages'
-    id = Column(Integer, primary_key=True)
-    content = Column(String)
-    like_count = Column(Integer, default=0)
-    alert_count = Column(Integer, default=0)
-    # ... other fields
+    id = Column(String(128), primary_key=True)
+    title = Column(String, nullable=False, default="")
+    content = Column(String, nullable=False, default="")
+    # Key of the body in the blob store (app.services.blobs); content is then empty.
+    content_hash = Column(String(66), nullable=True)
+    creator_id = Column(String(128), ForeignKey('creators.id'), nullable=False, index=True)
+    status = Column(String(16), nullable=False, default="NORMAL")
+    like_count = Column(Integer, nullable=False, default=0)
+    alert_count = Column(Integer, nullable=False, default=0)
+    # 1 while the message is NORMAL but past a like/alert threshold; kept in
+    # step with the counters so the under_review ordering can use an index.
+    review_flag = Column(Integer, nullable=False, default=0)
+    # True once a rejected proposal returned the message to NORMAL; the
+    # thresholds it had crossed then no longer set review_flag.
+    review_dismissed = Column(Boolean, nullable=True)
+    # Lower-cased title, content, creator handle/name and tags joined by \x1f.
+    search_text = Column(String, nullable=False, default="")
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    updated_at = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        # One composite index per feed sort mode, matching its keyset.
+        Index('ix_messages_latest', 'created_at', 'id'),
+        Index('ix_messages_likes', 'like_count', 'created_at', 'id'),
+        Index('ix_messages_alerts', 'alert_count', 'created_at', 'id'),
+        Index('ix_messages_under_review', 'review_flag', 'like_count', 'created_at', 'id'),
+        Index(
+            'ix_messages_search_trgm',
+            'search_text',
+            postgresql_using='gin',
+            postgresql_ops={'search_text': 'gin_trgm_ops'},
+        ).ddl_if(dialect='postgresql'),
+    )
+
+
+class MessageTag(Base):
+    __tablename__ = 'message_tags'
+    message_id = Column(String(128), ForeignKey('messages.id', ondelete='CASCADE'), primary_key=True)
+    position = Column(Integer, primary_key=True)
+    tag = Column(String(64), nullable=False)
+    tag_lower = Column(String(64), nullable=False)
+
+    __table_args__ = (Index('ix_message_tags_lower', 'tag_lower', 'message_id'),)
+
+
+class Comment(Base):
+    __tablename__ = 'comments'
+    id = Column(String(128), primary_key=True)
+    message_id = Column(String(128), nullable=False, index=True)
+    author = Column(String(128), nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+
+
+# Proposals and votes as projected from the vote module's events by app.indexer;
+# ids are the on-chain object ids.  Proposals the backend opens from reaction
+# threshold crossings share the table under ``<message id>:<type>`` ids (see
+# app.services.proposals), which also keeps workers from opening one twice.
+class Proposal(Base):
+    __tablename__ = 'proposals'
+    id = Column(String(128), primary_key=True)
+    message_id = Column(String(128), nullable=False, index=True)
+    proposal_type = Column(String(16), nullable=False)
+    proposer = Column(String(128), nullable=False)
+    status = Column(String(16), nullable=False, default="OPEN")
+    approve_votes = Column(Integer, nullable=False, default=0)
+    reject_votes = Column(Integer, nullable=False, default=0)
+    # Like/alert total that opened a crossing proposal; NULL for chain proposals.
+    trigger_count = Column(Integer, nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    updated_at = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (Index('ix_proposals_status', 'status', 'created_at'),)
+
+
+class Vote(Base):
+    __tablename__ = 'votes'
+    proposal_id = Column(String(128), ForeignKey('proposals.id', ondelete='CASCADE'), primary_key=True)
+    voter = Column(String(128), primary_key=True)
+    approve = Column(Boolean, nullable=False)
+    cast_at = Column(DateTime(timezone=True), nullable=False)
+
+
+class ContentHash(Base):
+    """On-chain hashes of a message and whether its off-chain body matched them."""
+
+    __tablename__ = 'content_hashes'
+    message_id = Column(String(128), primary_key=True)
+    title_hash = Column(String(66), nullable=False)
+    content_hash = Column(String(66), nullable=False)
+    verified = Column(Boolean, nullable=False)
+    checked_at = Column(DateTime(timezone=True), nullable=False)
+
+
+class IndexerCheckpoint(Base):
+    """Last event an indexer stream has applied, committed with the rows it produced."""
+
+    __tablename__ = 'indexer_checkpoints'
+    name = Column(String(64), primary_key=True)
+    tx_digest = Column(String(128), nullable=True)
+    event_seq = Column(String(32), nullable=True)
+    # Chain time of the last applied event, for lag.
+    timestamp_ms = Column(BigInteger, nullable=True)
+    events = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), nullable=False)
+
+
+class ReactionLogCheckpoint(Base):
+    """Last reaction log segment whose increments are committed, written with them."""
+
+    __tablename__ = 'reaction_log_checkpoints'
+    # Resolved path of the buffer's log directory; one row per worker log.
+    log = Column(String(512), primary_key=True)
+    segment = Column(BigInteger, nullable=False)
+    updated_at = Column(DateTime(timezone=True), nullable=False)
+
+
+event.listen(
+    Base.metadata,
+    'before_create',
+    DDL('CREATE EXTENSION IF NOT EXISTS pg_trgm').execute_if(dialect='postgresql'),
+)
+# SQLite has no trigram GIN index; an FTS5 trigram table gives local tests and
+# development databases an indexed substring search instead.
+event.listen(
+    Message.__table__,
+    'after_create',
+    DDL(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts "
+        "USING fts5(message_id UNINDEXED, search_text, tokenize='trigram')"
+    ).execute_if(dialect='sqlite'),
+)
+event.listen(
+    Message.__table__,
+    'before_drop',
+    DDL('DROP TABLE IF EXISTS messages_fts').execute_if(dialect='sqlite'),
+)
@@ -0,0 +1 @@
+"""Database-backed repositories for off-chain data."""
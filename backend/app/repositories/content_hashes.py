@@ -0,0 +1,61 @@
+"""Persistent store behind ``VerifiedHashCache`` (see app.services.content_hash)."""
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, Sequence
+
+from sqlalchemy import Table, delete, insert, select
+from sqlalchemy.orm import Session
+
+from ..models import ContentHash
+from ..services.content_hash import Verification
+from .sql import as_utc, chunks
+
+_content_hashes: Table = ContentHash.__table__
+
+
+class SqlVerificationStore:
+    """Verification results in the ``content_hashes`` table, one row per message."""
+
+    def __init__(self, session_factory: Callable[[], Session]) -> None:
+        self._session_factory = session_factory
+
+    def load(self, message_ids: Sequence[str]) -> Dict[str, Verification]:
+        found: Dict[str, Verification] = {}
+        with self._session_factory() as session:
+            for chunk in chunks(list(message_ids)):
+                rows = session.execute(select(_content_hashes).where(_content_hashes.c.message_id.in_(chunk)))
+                for row in rows.mappings():
+                    found[row["message_id"]] = self._verification(row)
+        return found
+
+    def save(self, verifications: Sequence[Verification]) -> None:
+        rows = [
+            {
+                "message_id": verification.message_id,
+                "title_hash": verification.title_hash,
+                "content_hash": verification.content_hash,
+                "verified": verification.verified,
+                "checked_at": verification.checked_at,
+            }
+            for verification in {verification.message_id: verification for verification in verifications}.values()
+        ]
+        with self._session_factory() as session, session.begin():
+            for chunk in chunks(rows):
+                ids = [row["message_id"] for row in chunk]
+                session.execute(delete(_content_hashes).where(_content_hashes.c.message_id.in_(ids)))
+                session.execute(insert(_content_hashes), chunk)
+
+    def delete(self, message_ids: Sequence[str]) -> None:
+        with self._session_factory() as session, session.begin():
+            for chunk in chunks(list(message_ids)):
+                session.execute(delete(_content_hashes).where(_content_hashes.c.message_id.in_(chunk)))
+
+    @staticmethod
+    def _verification(row: Any) -> Verification:
+        return Verification(
+            message_id=row["message_id"],
+            title_hash=row["title_hash"],
+            content_hash=row["content_hash"],
+            verified=bool(row["verified"]),
+            checked_at=as_utc(row["checked_at"]),
+        )
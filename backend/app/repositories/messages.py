@@ -0,0 +1,592 @@
+"""SQL-backed message repository serving the home feed.
+
+Each feed sort mode maps onto a composite index whose columns are the mode's
+keyset (see ``app.models.Message``), so a page is an index range scan bounded
+by the cursor.  Substring search uses a pg_trgm GIN index on PostgreSQL and an
+FTS5 trigram table on SQLite; both evaluate the same case-insensitive
+substring predicate as the in-memory index.
+
+With a ``BlobStore`` (``BLOB_STORE_DIR``) bodies are written to the blob store
+and rows keep only ``content_hash``; each page's bodies are then read back
+with one ``get_many`` call.
+"""
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from sqlalchemy import Table, bindparam, delete, func, insert, select, tuple_, update
+from sqlalchemy.orm import Session
+
+from ..models import Creator, Message, MessageTag, ReactionLogCheckpoint
+from ..schemas import MessageStatus
+from ..services.search import searchable_fields
+from ..services.store import MessageSeed, from_epoch_us
+from .sql import as_utc, chunks, messages_fts, review_flag, review_flag_expression
+
+if TYPE_CHECKING:  # pragma: no cover
+    from ..services.blobs import BlobStore
+
+SEARCH_SEPARATOR = "\x1f"
+
+_messages: Table = Message.__table__
+_creators: Table = Creator.__table__
+_tags: Table = MessageTag.__table__
+_reaction_logs: Table = ReactionLogCheckpoint.__table__
+
+_SORT_COLUMNS = {
+    "latest": (_messages.c.created_at, _messages.c.id),
+    "likes": (_messages.c.like_count, _messages.c.created_at, _messages.c.id),
+    "alerts": (_messages.c.alert_count, _messages.c.created_at, _messages.c.id),
+    "under_review": (
+        _messages.c.review_flag,
+        _messages.c.like_count,
+        _messages.c.created_at,
+        _messages.c.id,
+    ),
+}
+
+
+def _like_pattern(term: str) -> str:
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def _blob_bodies(blobs: "BlobStore | None", rows: Sequence[Any]) -> Dict[str, str]:
+    """Bodies of blob-backed rows, fetched in one batched lookup."""
+    keys = {row.content_hash for row in rows if row.content_hash}
+    if blobs is None or not keys:
+        return {}
+    return {key: body.decode("utf-8") for key, body in blobs.get_many(keys).items()}
+
+
+def _store_bodies(blobs: "BlobStore | None", seeds: Sequence[MessageSeed]) -> Optional[Dict[str, str]]:
+    """Write the seeds' bodies to ``blobs``; returns message id -> blob key."""
+    if blobs is None:
+        return None
+    return dict(zip((seed.id for seed in seeds), blobs.put_many([seed.content for seed in seeds])))
+
+
+class SqlMessageRepository:
+    """Message storage and feed queries on the SQLAlchemy engine from ``app.db``."""
+
+    def __init__(self, session_factory: Callable[[], Session], blobs: "BlobStore | None" = None) -> None:
+        self._session_factory = session_factory
+        self._blobs = blobs
+
+    # Writes --------------------------------------------------------------------------
+
+    def upsert_many(self, seeds: Iterable[MessageSeed]) -> int:
+        """Insert or replace messages in bulk, one transaction per call."""
+        seeds = list({seed.id: seed for seed in seeds}.values())
+        if not seeds:
+            return 0
+        # Bodies are durable before any row refers to them.
+        body_keys = _store_bodies(self._blobs, seeds)
+        with self._session_factory() as session, session.begin():
+            self._write_seeds(session, seeds, body_keys)
+        return len(seeds)
+
+    def upsert(self, seed: MessageSeed) -> None:
+        self.upsert_many([seed])
+
+    def remove(self, message_id: str) -> None:
+        with self._session_factory() as session, session.begin():
+            self._delete_rows(session, [message_id], sqlite=session.get_bind().dialect.name == "sqlite")
+
+    def apply_reaction_delta(self, message_id: str, *, likes: int = 0, alerts: int = 0) -> Optional[MessageSeed]:
+        with self._session_factory() as session, session.begin():
+            result = session.execute(
+                update(_messages)
+                .where(_messages.c.id == message_id)
+                .values(
+                    like_count=_messages.c.like_count + likes,
+                    alert_count=_messages.c.alert_count + alerts,
+                )
+            )
+            if result.rowcount == 0:
+                return None
+            session.execute(
+                update(_messages).where(_messages.c.id == message_id).values(review_flag=review_flag_expression())
+            )
+        return self.get(message_id)
+
+    def apply_reaction_deltas(
+        self, deltas: Mapping[str, Tuple[int, int]], log_position: Optional[Tuple[str, int]] = None
+    ) -> Dict[str, Tuple[int, int]]:
+        """Apply coalesced ``(likes, alerts)`` increments as one executemany per chunk.
+
+        ``log_position`` is the ``(log, segment)`` of the reaction log the batch
+        was read from; it is committed in the same transaction so a replay after
+        a crash skips increments that already landed.  Returns the committed
+        ``(likes, alerts)`` of every updated message, read in that transaction.
+        """
+        rows = self._delta_rows(deltas)
+        if not rows and log_position is None:
+            return {}
+        with self._session_factory() as session, session.begin():
+            totals = self._write_deltas(session, rows)
+            if log_position is not None:
+                self._save_log_position(session, *log_position)
+        return totals
+
+    def applied_log_segment(self, log: str) -> Optional[int]:
+        """Last reaction log segment of ``log`` whose increments are committed."""
+        with self._session_factory() as session:
+            return session.scalar(select(_reaction_logs.c.segment).where(_reaction_logs.c.log == log))
+
+    def set_status(self, message_id: str, status: MessageStatus) -> Optional[MessageSeed]:
+        with self._session_factory() as session, session.begin():
+            result = session.execute(
+                update(_messages).where(_messages.c.id == message_id).values(status=status.value)
+            )
+            if result.rowcount == 0:
+                return None
+            session.execute(
+                update(_messages).where(_messages.c.id == message_id).values(review_flag=review_flag_expression())
+            )
+        return self.get(message_id)
+
+    def dismiss_review(self, message_id: str) -> Optional[MessageSeed]:
+        """Return a NORMAL or UNDER_REVIEW message to NORMAL for good (see ``review_flag``)."""
+        with self._session_factory() as session, session.begin():
+            result = session.execute(
+                update(_messages)
+                .where(
+                    _messages.c.id == message_id,
+                    _messages.c.status.in_([MessageStatus.NORMAL.value, MessageStatus.UNDER_REVIEW.value]),
+                )
+                .values(status=MessageStatus.NORMAL.value, review_dismissed=True, review_flag=0)
+            )
+            if result.rowcount == 0:
+                return None
+        return self.get(message_id)
+
+    def mark_under_review(self, message_ids: Sequence[str]) -> List[MessageSeed]:
+        """Move the NORMAL messages among ``message_ids`` to UNDER_REVIEW; returns those moved."""
+        moved: List[str] = []
+        with self._session_factory() as session, session.begin():
+            for chunk in chunks(sorted(set(message_ids))):
+                # The status check is part of the UPDATE, so concurrent workers move each message once.
+                moved.extend(
+                    session.scalars(
+                        update(_messages)
+                        .where(_messages.c.id.in_(chunk), _messages.c.status == MessageStatus.NORMAL.value)
+                        .values(status=MessageStatus.UNDER_REVIEW.value, review_flag=1)
+                        .returning(_messages.c.id)
+                    )
+                )
+        return self.get_many(moved) if moved else []
+
+    # Reads ---------------------------------------------------------------------------
+
+    def count(self) -> int:
+        with self._session_factory() as session:
+            return session.scalar(select(func.count()).select_from(_messages)) or 0
+
+    def reaction_totals(self, message_id: str) -> Optional[Tuple[int, int]]:
+        with self._session_factory() as session:
+            row = session.execute(
+                select(_messages.c.like_count, _messages.c.alert_count).where(_messages.c.id == message_id)
+            ).first()
+        return None if row is None else (row.like_count, row.alert_count)
+
+    def get(self, message_id: str) -> Optional[MessageSeed]:
+        with self._session_factory() as session:
+            stmt = select(*self._columns()).select_from(self._joined()).where(_messages.c.id == message_id)
+            seeds = self._load(session, stmt, self._blobs)
+        return seeds[0] if seeds else None
+
+    def get_many(self, message_ids: Sequence[str]) -> List[MessageSeed]:
+        """Messages among ``message_ids``, in no particular order; unknown ids are skipped."""
+        seeds: List[MessageSeed] = []
+        with self._session_factory() as session:
+            for chunk in chunks(list(message_ids)):
+                stmt = select(*self._columns()).select_from(self._joined()).where(_messages.c.id.in_(chunk))
+                seeds.extend(self._load(session, stmt, self._blobs))
+        return seeds
+
+    def page(
+        self,
+        *,
+        search: Optional[str] = None,
+        tags: Optional[Sequence[str]] = None,
+        tag_mode: str = "or",
+        sort: str = "latest",
+        after: Optional[Tuple[Any, ...]] = None,
+        limit: Optional[int] = None,
+    ) -> List[MessageSeed]:
+        """Return one feed page ordered by the keyset of ``sort``, descending."""
+        with self._session_factory() as session:
+            stmt = self._page_statement(
+                sqlite=session.get_bind().dialect.name == "sqlite",
+                search=search,
+                tags=tags,
+                tag_mode=tag_mode,
+                sort=sort,
+                after=after,
+                limit=limit,
+            )
+            return self._load(session, stmt, self._blobs)
+
+    def blob_stats(self) -> Dict[str, int]:
+        return self._blobs.stats() if self._blobs is not None else {}
+
+    def compact_blobs(self, *, min_dead_ratio: float = 0.3) -> Dict[str, int]:
+        """Drop blob-store bodies that only deleted (or removed) messages referenced."""
+        if self._blobs is None:
+            return {}
+
+        def live() -> List[str]:
+            with self._session_factory() as session:
+                return list(
+                    session.scalars(
+                        select(_messages.c.content_hash)
+                        .where(_messages.c.content_hash.is_not(None))
+                        .where(_messages.c.status != MessageStatus.DELETED.value)
+                        .distinct()
+                    )
+                )
+
+        return self._blobs.compact(live, min_dead_ratio=min_dead_ratio)
+
+    # Internals -----------------------------------------------------------------------
+
+    @classmethod
+    def _page_statement(
+        cls,
+        *,
+        sqlite: bool,
+        search: Optional[str],
+        tags: Optional[Sequence[str]],
+        tag_mode: str,
+        sort: str,
+        after: Optional[Tuple[Any, ...]],
+        limit: Optional[int],
+    ):
+        sort_columns = _SORT_COLUMNS[sort]
+        stmt = select(*cls._columns()).select_from(cls._joined())
+        if search:
+            pattern = _like_pattern(search.lower())
+            if sqlite:
+                matched = select(messages_fts.c.message_id).where(
+                    messages_fts.c.search_text.like(pattern, escape="\\")
+                )
+                stmt = stmt.where(_messages.c.id.in_(matched))
+            else:
+                stmt = stmt.where(_messages.c.search_text.like(pattern, escape="\\"))
+
+        if tags:
+            lowered = sorted({tag.lower() for tag in tags})
+            tagged = select(_tags.c.message_id).where(_tags.c.tag_lower.in_(lowered))
+            if tag_mode == "and":
+                tagged = tagged.group_by(_tags.c.message_id).having(
+                    func.count(func.distinct(_tags.c.tag_lower)) == len(lowered)
+                )
+            stmt = stmt.where(_messages.c.id.in_(tagged))
+
+        if after is not None:
+            stmt = stmt.where(tuple_(*sort_columns) < tuple_(*cls._key_values(sort, after)))
+        stmt = stmt.order_by(*(column.desc() for column in sort_columns))
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        return stmt
+
+    @classmethod
+    def _write_seeds(
+        cls, session: Session, seeds: Sequence[MessageSeed], body_keys: Optional[Mapping[str, str]] = None
+    ) -> None:
+        sqlite = session.get_bind().dialect.name == "sqlite"
+        cls._upsert_creators(session, seeds)
+        for chunk in chunks(seeds):
+            ids = [seed.id for seed in chunk]
+            cls._delete_rows(session, ids, sqlite=sqlite)
+            session.execute(insert(_messages), [cls._message_row(seed, body_keys) for seed in chunk])
+            tag_rows = [
+                {"message_id": seed.id, "position": position, "tag": tag, "tag_lower": tag.lower()}
+                for seed in chunk
+                for position, tag in enumerate(seed.tags)
+            ]
+            if tag_rows:
+                session.execute(insert(_tags), tag_rows)
+            if sqlite:
+                session.execute(
+                    insert(messages_fts),
+                    [{"message_id": seed.id, "search_text": cls._search_text(seed)} for seed in chunk],
+                )
+
+    @staticmethod
+    def _delta_rows(deltas: Mapping[str, Tuple[int, int]]) -> List[Dict[str, Any]]:
+        rows = [
+            {"delta_id": message_id, "delta_likes": likes, "delta_alerts": alerts}
+            for message_id, (likes, alerts) in deltas.items()
+        ]
+        # Sorted ids give concurrent flushes the same row lock order.
+        rows.sort(key=lambda row: row["delta_id"])
+        return rows
+
+    @staticmethod
+    def _write_deltas(session: Session, rows: Sequence[Dict[str, Any]]) -> Dict[str, Tuple[int, int]]:
+        totals: Dict[str, Tuple[int, int]] = {}
+        for chunk in chunks(rows):
+            session.execute(
+                update(_messages)
+                .where(_messages.c.id == bindparam("delta_id"))
+                .values(
+                    like_count=_messages.c.like_count + bindparam("delta_likes"),
+                    alert_count=_messages.c.alert_count + bindparam("delta_alerts"),
+                ),
+                chunk,
+            )
+            # The rows stay locked until commit, so these are exactly the counts
+            # this transaction commits; minus the deltas they give the counts before.
+            for row in session.execute(
+                update(_messages)
+                .where(_messages.c.id.in_([row["delta_id"] for row in chunk]))
+                .values(review_flag=review_flag_expression())
+                .returning(_messages.c.id, _messages.c.like_count, _messages.c.alert_count)
+            ):
+                totals[row.id] = (row.like_count, row.alert_count)
+        return totals
+
+    @staticmethod
+    def _save_log_position(session: Session, log: str, segment: int) -> None:
+        values = {"segment": segment, "updated_at": datetime.now(timezone.utc)}
+        result = session.execute(update(_reaction_logs).where(_reaction_logs.c.log == log).values(**values))
+        if result.rowcount == 0:
+            session.execute(insert(_reaction_logs).values(log=log, **values))
+
+    @staticmethod
+    def _columns():
+        return (
+            _messages.c.id,
+            _messages.c.title,
+            _messages.c.content,
+            _messages.c.content_hash,
+            _messages.c.creator_id,
+            _creators.c.handle,
+            _creators.c.display_name,
+            _creators.c.avatar_url,
+            _messages.c.like_count,
+            _messages.c.alert_count,
+            _messages.c.status,
+            _messages.c.review_flag,
+            _messages.c.created_at,
+            _messages.c.updated_at,
+        )
+
+    @staticmethod
+    def _joined():
+        return _messages.join(_creators, _creators.c.id == _messages.c.creator_id)
+
+    @staticmethod
+    def _key_values(sort: str, after: Tuple[Any, ...]) -> Tuple[Any, ...]:
+        # Cursor keys carry created_at as epoch microseconds; the column is a datetime.
+        position = len(_SORT_COLUMNS[sort]) - 2
+        values = list(after)
+        values[position] = from_epoch_us(values[position])
+        return tuple(values)
+
+    @staticmethod
+    def _tag_statement(message_ids: Sequence[str]):
+        return (
+            select(_tags.c.message_id, _tags.c.tag)
+            .where(_tags.c.message_id.in_(message_ids))
+            .order_by(_tags.c.message_id, _tags.c.position)
+        )
+
+    @classmethod
+    def _load(cls, session: Session, stmt, blobs: "BlobStore | None" = None) -> List[MessageSeed]:
+        rows = session.execute(stmt).all()
+        if not rows:
+            return []
+        tags: Dict[str, List[str]] = {row.id: [] for row in rows}
+        for chunk in chunks(list(tags)):
+            for message_id, tag in session.execute(cls._tag_statement(chunk)):
+                tags[message_id].append(tag)
+        return cls._seeds(rows, tags, _blob_bodies(blobs, rows))
+
+    @staticmethod
+    def _seeds(
+        rows: Sequence[Any], tags: Mapping[str, List[str]], bodies: Mapping[str, str] | None = None
+    ) -> List[MessageSeed]:
+        bodies = bodies or {}
+        return [
+            MessageSeed(
+                id=row.id,
+                title=row.title,
+                # A blob-backed body missing from the store was compacted away with its deleted message.
+                content=bodies.get(row.content_hash, "") if row.content_hash else row.content,
+                tags=tuple(tags[row.id]),
+                creator_id=row.creator_id,
+                creator_handle=row.handle,
+                creator_display_name=row.display_name,
+                creator_avatar_url=row.avatar_url,
+                likes=row.like_count,
+                alerts=row.alert_count,
+                status=MessageStatus(row.status),
+                created_at=as_utc(row.created_at),
+                updated_at=as_utc(row.updated_at),
+                displayed_status=MessageStatus.UNDER_REVIEW if row.review_flag else MessageStatus(row.status),
+            )
+            for row in rows
+        ]
+
+    @staticmethod
+    def _search_text(seed: MessageSeed) -> str:
+        return SEARCH_SEPARATOR.join(searchable_fields(seed))
+
+    @classmethod
+    def _message_row(cls, seed: MessageSeed, body_keys: Optional[Mapping[str, str]] = None) -> Dict[str, Any]:
+        body_key = body_keys.get(seed.id) if body_keys else None
+        return {
+            "id": seed.id,
+            "title": seed.title,
+            "content": "" if body_key else seed.content,
+            "content_hash": body_key,
+            "creator_id": seed.creator_id,
+            "status": seed.status.value,
+            "like_count": seed.likes,
+            "alert_count": seed.alerts,
+            "review_flag": review_flag(seed.status, seed.likes, seed.alerts),
+            "search_text": cls._search_text(seed),
+            "created_at": seed.created_at,
+            "updated_at": seed.updated_at,
+        }
+
+    @staticmethod
+    def _upsert_creators(session: Session, seeds: Sequence[MessageSeed]) -> None:
+        rows = {
+            seed.creator_id: {
+                "id": seed.creator_id,
+                "handle": seed.creator_handle,
+                "display_name": seed.creator_display_name,
+                "avatar_url": seed.creator_avatar_url,
+            }
+            for seed in seeds
+        }
+        existing = set()
+        for chunk in chunks(list(rows)):
+            existing.update(session.scalars(select(_creators.c.id).where(_creators.c.id.in_(chunk))))
+        fresh = [row for creator_id, row in rows.items() if creator_id not in existing]
+        # Bind names must differ from column names in an executemany UPDATE.
+        stale = [
+            {f"new_{key}": value for key, value in row.items()}
+            for creator_id, row in rows.items()
+            if creator_id in existing
+        ]
+        if fresh:
+            session.execute(insert(_creators), fresh)
+        if stale:
+            session.execute(
+                update(_creators)
+                .where(_creators.c.id == bindparam("new_id"))
+                .values(
+                    handle=bindparam("new_handle"),
+                    display_name=bindparam("new_display_name"),
+                    avatar_url=bindparam("new_avatar_url"),
+                ),
+                stale,
+            )
+
+    @staticmethod
+    def _delete_rows(session: Session, message_ids: Sequence[str], *, sqlite: bool) -> None:
+        session.execute(delete(_tags).where(_tags.c.message_id.in_(message_ids)))
+        if sqlite:
+            session.execute(delete(messages_fts).where(messages_fts.c.message_id.in_(message_ids)))
+        session.execute(delete(_messages).where(_messages.c.id.in_(message_ids)))
+
+
+class AsyncSqlMessageRepository:
+    """``SqlMessageRepository`` on an ``AsyncSession`` factory, for async handlers.
+
+    Builds the same statements; writes run the sync helpers through
+    ``AsyncSession.run_sync`` so both repositories stay byte-for-byte alike.
+    """
+
+    def __init__(self, session_factory: Callable[[], Any], blobs: "BlobStore | None" = None) -> None:
+        self._session_factory = session_factory
+        self._blobs = blobs
+
+    async def upsert_many(self, seeds: Iterable[MessageSeed]) -> int:
+        seeds = list({seed.id: seed for seed in seeds}.values())
+        if not seeds:
+            return 0
+        body_keys = await asyncio.to_thread(_store_bodies, self._blobs, seeds) if self._blobs is not None else None
+        async with self._session_factory() as session, session.begin():
+            await session.run_sync(SqlMessageRepository._write_seeds, seeds, body_keys)
+        return len(seeds)
+
+    async def apply_reaction_deltas(
+        self, deltas: Mapping[str, Tuple[int, int]], log_position: Optional[Tuple[str, int]] = None
+    ) -> Dict[str, Tuple[int, int]]:
+        """See ``SqlMessageRepository.apply_reaction_deltas``."""
+        rows = SqlMessageRepository._delta_rows(deltas)
+        if not rows and log_position is None:
+            return {}
+        async with self._session_factory() as session, session.begin():
+            totals = await session.run_sync(SqlMessageRepository._write_deltas, rows)
+            if log_position is not None:
+                await session.run_sync(SqlMessageRepository._save_log_position, *log_position)
+        return totals
+
+    async def applied_log_segment(self, log: str) -> Optional[int]:
+        """See ``SqlMessageRepository.applied_log_segment``."""
+        async with self._session_factory() as session:
+            return await session.scalar(select(_reaction_logs.c.segment).where(_reaction_logs.c.log == log))
+
+    async def count(self) -> int:
+        async with self._session_factory() as session:
+            return await session.scalar(select(func.count()).select_from(_messages)) or 0
+
+    async def reaction_totals(self, message_id: str) -> Optional[Tuple[int, int]]:
+        async with self._session_factory() as session:
+            result = await session.execute(
+                select(_messages.c.like_count, _messages.c.alert_count).where(_messages.c.id == message_id)
+            )
+            row = result.first()
+        return None if row is None else (row.like_count, row.alert_count)
+
+    async def get(self, message_id: str) -> Optional[MessageSeed]:
+        stmt = (
+            select(*SqlMessageRepository._columns())
+            .select_from(SqlMessageRepository._joined())
+            .where(_messages.c.id == message_id)
+        )
+        async with self._session_factory() as session:
+            seeds = await self._load(session, stmt)
+        return seeds[0] if seeds else None
+
+    async def page(
+        self,
+        *,
+        search: Optional[str] = None,
+        tags: Optional[Sequence[str]] = None,
+        tag_mode: str = "or",
+        sort: str = "latest",
+        after: Optional[Tuple[Any, ...]] = None,
+        limit: Optional[int] = None,
+    ) -> List[MessageSeed]:
+        async with self._session_factory() as session:
+            stmt = SqlMessageRepository._page_statement(
+                sqlite=session.get_bind().dialect.name == "sqlite",
+                search=search,
+                tags=tags,
+                tag_mode=tag_mode,
+                sort=sort,
+                after=after,
+                limit=limit,
+            )
+            return await self._load(session, stmt)
+
+    async def _load(self, session: Any, stmt) -> List[MessageSeed]:
+        rows = (await session.execute(stmt)).all()
+        if not rows:
+            return []
+        tags: Dict[str, List[str]] = {row.id: [] for row in rows}
+        for chunk in chunks(list(tags)):
+            for message_id, tag in await session.execute(SqlMessageRepository._tag_statement(chunk)):
+                tags[message_id].append(tag)
+        # Bodies are slices of mapped segments; reading them inline does not block on I/O.
+        return SqlMessageRepository._seeds(rows, tags, _blob_bodies(self._blobs, rows))
@@ -0,0 +1,110 @@
+"""Proposal rows the backend opens from reaction threshold crossings, and API votes."""
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+from sqlalchemy import Table, select, update
+from sqlalchemy.orm import Session
+
+from ..models import Proposal, Vote
+from ..schemas import ProposalStatus
+from ..services.counters import ThresholdCrossing
+from ..services.proposals import PROPOSAL_TYPES, crossing_proposal_id
+from .sql import as_utc, chunks
+
+_proposals: Table = Proposal.__table__
+_votes: Table = Vote.__table__
+
+
+class SqlProposalStore:
+    """Crossing proposals in the ``proposals`` table, next to the chain projection."""
+
+    def __init__(self, session_factory: Callable[[], Session]) -> None:
+        self._session_factory = session_factory
+
+    def claim(self, crossings: Sequence[ThresholdCrossing]) -> List[ThresholdCrossing]:
+        """Insert a proposal row per crossing; returns the crossings whose row this call created.
+
+        Rows are keyed by ``crossing_proposal_id``, so when several workers (or a
+        redelivery after a crash) report the same crossing only one claims it.
+        """
+        pending: Dict[str, ThresholdCrossing] = {}
+        for crossing in crossings:
+            pending.setdefault(crossing_proposal_id(crossing.message_id, PROPOSAL_TYPES[crossing.kind]), crossing)
+        if not pending:
+            return []
+        now = datetime.now(timezone.utc)
+        claimed: List[ThresholdCrossing] = []
+        with self._session_factory() as session, session.begin():
+            insert = _conflict_free_insert(session, _proposals, _proposals.c.id)
+            for chunk in chunks(list(pending)):
+                rows = [self._row(row_id, pending[row_id], now) for row_id in chunk]
+                claimed.extend(pending[row_id] for row_id in session.scalars(insert, rows))
+        return claimed
+
+    def load(self) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Every proposal and vote row, for ``ProposalBook.load``."""
+        with self._session_factory() as session:
+            proposals = [dict(row) for row in session.execute(select(_proposals)).mappings()]
+            votes = [dict(row) for row in session.execute(select(_votes)).mappings()]
+        for row in proposals:
+            row["created_at"] = as_utc(row["created_at"])
+        for row in votes:
+            row["cast_at"] = as_utc(row["cast_at"])
+        return proposals, votes
+
+    def record_vote(self, proposal_id: str, voter: str, approve: bool) -> bool:
+        """Store a vote and count it on its proposal row; ``False`` if ``voter`` already voted.
+
+        The tally column is incremented rather than set, so it stays in step
+        with the indexer's projection of the same row; a vote the indexer later
+        sees on chain is recognised by its ``(proposal_id, voter)`` key.
+        """
+        now = datetime.now(timezone.utc)
+        column = _proposals.c.approve_votes if approve else _proposals.c.reject_votes
+        with self._session_factory() as session, session.begin():
+            inserted = session.scalars(
+                _conflict_free_insert(session, _votes, _votes.c.proposal_id, _votes.c.voter),
+                [{"proposal_id": proposal_id, "voter": voter, "approve": approve, "cast_at": now}],
+            ).all()
+            if not inserted:
+                return False
+            session.execute(
+                update(_proposals).where(_proposals.c.id == proposal_id).values({column: column + 1, "updated_at": now})
+            )
+        return True
+
+    def set_status(self, proposal_id: str, status: ProposalStatus) -> None:
+        """Record the status a vote resolved ``proposal_id`` to."""
+        with self._session_factory() as session, session.begin():
+            session.execute(
+                update(_proposals)
+                .where(_proposals.c.id == proposal_id)
+                .values(status=status.value, updated_at=datetime.now(timezone.utc))
+            )
+
+    @staticmethod
+    def _row(row_id: str, crossing: ThresholdCrossing, now: datetime) -> Dict[str, Any]:
+        return {
+            "id": row_id,
+            "message_id": crossing.message_id,
+            "proposal_type": PROPOSAL_TYPES[crossing.kind].value,
+            # Opened by the backend rather than an on-chain proposer.
+            "proposer": "",
+            "status": ProposalStatus.OPEN.value,
+            "approve_votes": 0,
+            "reject_votes": 0,
+            "trigger_count": crossing.total,
+            "created_at": now,
+            "updated_at": now,
+        }
+
+
+def _conflict_free_insert(session: Session, table: Table, *key: Any):
+    """``INSERT ... ON CONFLICT (key) DO NOTHING RETURNING key[0]`` for the session's dialect."""
+    if session.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(table).on_conflict_do_nothing(index_elements=list(key)).returning(key[0])
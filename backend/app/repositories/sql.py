@@ -0,0 +1,58 @@
+"""Helpers shared by the SQL repositories and the indexer's projection."""
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Any, Iterator, Sequence
+
+from sqlalchemy import Table, and_, case, column, table
+
+from ..models import Message
+from ..schemas import MessageStatus
+from ..services.messages import ALERTS_THRESHOLD, LIKES_THRESHOLD
+
+# Rows per statement, keeping IN lists and multi-row VALUES under driver limits.
+CHUNK = 500
+
+_messages: Table = Message.__table__
+
+# FTS5 trigram table created next to ``messages`` on SQLite (see app.models).
+messages_fts = table("messages_fts", column("message_id"), column("search_text"))
+
+
+def review_flag(status: MessageStatus, likes: int, alerts: int, dismissed: bool = False) -> int:
+    """1 while the displayed status is UNDER_REVIEW: set on chain, or NORMAL past a threshold.
+
+    A dismissed review (a rejected proposal) keeps a NORMAL message NORMAL.
+    """
+    if status is MessageStatus.UNDER_REVIEW:
+        return 1
+    if status is not MessageStatus.NORMAL or dismissed:
+        return 0
+    return 1 if likes >= LIKES_THRESHOLD or alerts >= ALERTS_THRESHOLD else 0
+
+
+def review_flag_expression():
+    """``review_flag`` as a SQL expression over the row's own columns."""
+    return case(
+        (_messages.c.status == MessageStatus.UNDER_REVIEW.value, 1),
+        (
+            and_(
+                _messages.c.status == MessageStatus.NORMAL.value,
+                _messages.c.review_dismissed.is_not(True),
+                (_messages.c.like_count >= LIKES_THRESHOLD) | (_messages.c.alert_count >= ALERTS_THRESHOLD),
+            ),
+            1,
+        ),
+        else_=0,
+    )
+
+
+def as_utc(value: datetime) -> datetime:
+    """``value`` with UTC attached where the driver (SQLite) dropped the zone."""
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+def chunks(values: Sequence[Any]) -> Iterator[Sequence[Any]]:
+    """``values`` in slices of at most ``CHUNK``."""
+    for start in range(0, len(values), CHUNK):
+        yield values[start : start + CHUNK]
@@ -38,6 +38,8 @@ class MessageFeedEntry(BaseModel):
     created_at: datetime
     updated_at: datetime
     creator: MessageCreator
+    # Whether title and content match the on-chain hashes; None until checked.
+    content_verified: Optional[bool] = None
     metrics: MessageMetrics
 
 
@@ -49,3 +51,31 @@ class UserProfile(BaseModel):
     id: str
     image_url: str
     description: str
+
+
+class ProposalType(str, Enum):
+    HYPE = "HYPE"
+    SCAM = "SCAM"
+
+
+class ProposalStatus(str, Enum):
+    OPEN = "OPEN"
+    PASSED = "PASSED"
+    REJECTED = "REJECTED"
+    EXECUTED = "EXECUTED"
+
+
+class ProposalSummary(BaseModel):
+    # ``proposals`` row id: ``<message id>:<type>`` from a crossing, else the chain object id.
+    id: str
+    message_id: str
+    proposal_type: ProposalType
+    status: ProposalStatus
+    trigger_count: int
+    created_at: datetime
+    approve_votes: int = 0
+    reject_votes: int = 0
+
+
+class ProposalVote(BaseModel):
+    approve: bool
@@ -1,11 +1,286 @@
-# TODO: Implement security functions, e.g., JWT handling
-from fastapi import Depends, HTTPException
+"""Session and OIDC token verification.
+
+``get_current_user`` verifies the session JWT issued by ``/auth/zk-login``.
+Verified tokens are remembered in a bounded LRU keyed by a hash of the token
+until their ``exp``, so a repeat caller costs one hash and one dict lookup
+instead of a signature check.
+
+``JwksCache`` holds the OIDC providers' signing keys, loaded from a local
+JWKS file (offline development, tests) or fetched from ``OIDC_JWKS_URL`` and
+re-fetched after ``JWKS_CACHE_TTL_SECONDS`` or when a token names an unknown
+``kid``.  ``NonceStore`` remembers zkLogin nonces until the OIDC token they
+came with expires, so a captured login cannot be replayed.
+
+``jose`` and ``httpx`` are imported on first use rather than at startup.
+"""
+from __future__ import annotations
+
+import hashlib
+import heapq
+import json
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
+
 from .config import settings
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/token")
 
-def get_current_user(token: str = Depends(oauth2_scheme)):
-    # Placeholder for user authentication
-    return {"username": "testuser"}
+Claims = Dict[str, Any]
+
+
+class JwksCache:
+    """OIDC signing keys by ``kid``, loaded from a file or URL and refreshed on a TTL."""
+
+    def __init__(
+        self,
+        *,
+        path: Optional[str] = None,
+        url: Optional[str] = None,
+        ttl: float = 3600.0,
+        min_refresh_interval: float = 30.0,
+        fetch: Optional[Callable[[str], Mapping[str, Any]]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if not path and not url:
+            raise ValueError("JwksCache needs a JWKS file path or URL")
+        self.path = path
+        self.url = url
+        self.ttl = ttl
+        self.min_refresh_interval = min_refresh_interval
+        self._fetch = fetch or self._fetch_url
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._keys: Dict[str, Dict[str, Any]] = {}
+        self._loaded_at: Optional[float] = None
+        self.loads = 0
+
+    @staticmethod
+    def _fetch_url(url: str) -> Mapping[str, Any]:
+        import httpx
+
+        response = httpx.get(url, timeout=5.0)
+        response.raise_for_status()
+        return response.json()
+
+    def _load(self) -> None:
+        document = json.loads(Path(self.path).read_text()) if self.path else self._fetch(self.url)
+        self._keys = {key["kid"]: dict(key) for key in document.get("keys", []) if "kid" in key}
+        self._loaded_at = self._clock()
+        self.loads += 1
+
+    def get(self, kid: str) -> Dict[str, Any]:
+        """Return the JWK for ``kid``; raises ``KeyError`` if the provider does not publish it."""
+        with self._lock:
+            now = self._clock()
+            age = None if self._loaded_at is None else now - self._loaded_at
+            # Reload when stale, or when the kid is unknown (key rotation) but not more often than allowed.
+            if age is None or age >= self.ttl or (kid not in self._keys and age >= self.min_refresh_interval):
+                self._load()
+            return self._keys[kid]
+
+
+class VerifiedTokenCache:
+    """Bounded LRU of verified token claims, each valid until its ``exp``."""
+
+    def __init__(self, *, max_entries: int = 100_000, clock: Callable[[], float] = time.time) -> None:
+        self.max_entries = max_entries
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[bytes, Tuple[float, Claims]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(token: str) -> bytes:
+        return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+    def get(self, key: bytes) -> Optional[Claims]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= self._clock():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: bytes, claims: Claims, expires_at: float) -> None:
+        with self._lock:
+            self._entries[key] = (expires_at, claims)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class NonceStore:
+    """Set of used nonces, each forgotten once its expiry passes."""
+
+    def __init__(self, *, max_entries: int = 1_000_000, clock: Callable[[], float] = time.time) -> None:
+        self.max_entries = max_entries
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._expires: Dict[str, float] = {}
+        self._heap: List[Tuple[float, str]] = []
+
+    def use(self, nonce: str, expires_at: float) -> bool:
+        """Record ``nonce``; returns False if it was already used and has not expired."""
+        with self._lock:
+            now = self._clock()
+            while self._heap and (self._heap[0][0] <= now or len(self._expires) > self.max_entries):
+                when, old = heapq.heappop(self._heap)
+                if self._expires.get(old) == when:
+                    del self._expires[old]
+            seen = self._expires.get(nonce)
+            if seen is not None and seen > now:
+                return False
+            self._expires[nonce] = expires_at
+            heapq.heappush(self._heap, (expires_at, nonce))
+            return True
+
+    def is_used(self, nonce: str) -> bool:
+        """Whether ``nonce`` was used and has not expired; ``use`` still decides races."""
+        with self._lock:
+            seen = self._expires.get(nonce)
+            return seen is not None and seen > self._clock()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._expires.clear()
+            self._heap.clear()
+
+    def __len__(self) -> int:
+        return len(self._expires)
+
+
+class SessionVerifier:
+    """Verifies session JWTs signed with ``SECRET_KEY``, caching the results."""
+
+    def __init__(
+        self,
+        secret: str,
+        algorithm: str = "HS256",
+        *,
+        cache: Optional[VerifiedTokenCache] = None,
+    ) -> None:
+        self.secret = secret
+        self.algorithm = algorithm
+        self.cache = cache if cache is not None else VerifiedTokenCache()
+        self.verifications = 0
+
+    def verify(self, token: str) -> Claims:
+        """Return the token's claims; raises ``JWTError`` if it is invalid or expired."""
+        key = VerifiedTokenCache.key(token)
+        claims = self.cache.get(key)
+        if claims is not None:
+            return claims
+        from jose import JWTError, jwt
+
+        claims = jwt.decode(token, self.secret, algorithms=[self.algorithm])
+        self.verifications += 1
+        if "exp" not in claims:
+            raise JWTError("Session token has no exp claim")
+        self.cache.put(key, claims, float(claims["exp"]))
+        return claims
+
+
+_LOCK = threading.Lock()
+_SESSION_VERIFIER: Optional[SessionVerifier] = None
+_JWKS: Optional[JwksCache] = None
+_NONCES: Optional[NonceStore] = None
+
+
+def get_session_verifier() -> SessionVerifier:
+    global _SESSION_VERIFIER
+    verifier = _SESSION_VERIFIER
+    if verifier is not None and verifier.secret == settings.SECRET_KEY and verifier.algorithm == settings.ALGORITHM:
+        return verifier
+    with _LOCK:
+        if not settings.SECRET_KEY:
+            raise RuntimeError("SECRET_KEY is not configured")
+        # Rebuilt (with an empty cache) whenever the key or algorithm changes.
+        _SESSION_VERIFIER = SessionVerifier(
+            settings.SECRET_KEY,
+            settings.ALGORITHM,
+            cache=VerifiedTokenCache(max_entries=settings.SESSION_CACHE_MAX_ENTRIES),
+        )
+        return _SESSION_VERIFIER
+
+
+def get_jwks_cache() -> Optional[JwksCache]:
+    """The OIDC key cache, or ``None`` when neither ``OIDC_JWKS_FILE`` nor ``OIDC_JWKS_URL`` is set."""
+    global _JWKS
+    with _LOCK:
+        if _JWKS is None and (settings.OIDC_JWKS_FILE or settings.OIDC_JWKS_URL):
+            _JWKS = JwksCache(path=settings.OIDC_JWKS_FILE, url=settings.OIDC_JWKS_URL, ttl=settings.JWKS_CACHE_TTL_SECONDS)
+        return _JWKS
+
+
+def use_jwks_cache(cache: Optional[JwksCache]) -> None:
+    global _JWKS
+    with _LOCK:
+        _JWKS = cache
+
+
+def get_nonce_store() -> NonceStore:
+    global _NONCES
+    with _LOCK:
+        if _NONCES is None:
+            _NONCES = NonceStore()
+        return _NONCES
+
+
+def verify_oidc_token(token: str) -> Claims:
+    """Verify an OIDC ID token against the cached provider keys; raises ``JWTError``."""
+    from jose import JWTError, jwt
+
+    jwks = get_jwks_cache()
+    if jwks is None:
+        raise RuntimeError("No OIDC JWKS source is configured")
+    header = jwt.get_unverified_header(token)
+    try:
+        key = jwks.get(header.get("kid", ""))
+    except KeyError as exc:
+        raise JWTError("OIDC token signed with an unknown key") from exc
+    return jwt.decode(
+        token,
+        key,
+        algorithms=[key.get("alg", header.get("alg", "RS256"))],
+        audience=settings.OIDC_AUDIENCE,
+        options={"verify_aud": settings.OIDC_AUDIENCE is not None, "verify_at_hash": False},
+    )
+
+
+def get_current_user(token: str = Depends(oauth2_scheme)) -> Claims:
+    """Claims of the caller's session token, with ``id`` set to their Sui address."""
+    from jose import JWTError
+
+    try:
+        claims = get_session_verifier().verify(token)
+    except JWTError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired session token",
+            headers={"WWW-Authenticate": "Bearer"},
+        ) from exc
+    return {"id": claims.get("sui_address") or claims.get("sub"), **claims}
+
+
+def require_internal_endpoints() -> None:
+    """404 unless ``INTERNAL_ENDPOINTS`` exposes the operational endpoints."""
+    if not settings.INTERNAL_ENDPOINTS:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
@@ -0,0 +1,243 @@
+"""In-process model of the SUI/SWT constant-product pool.
+
+Reserves are held in base units (MIST for SUI, micro-SWT) and swaps use the
+same integer arithmetic an on-chain x*y=k pool does: the fee is taken from
+the input, the output is floored, and the fee stays in the pool.  That keeps
+quotes exact and lets the wallet price a swap locally, including price
+impact, without a round-trip to the node.
+
+The model follows the chain rather than leading it.  ``sync`` installs
+reserves read from the pool object and ``apply_event`` applies a pool event
+that carries post-trade reserves; both take a monotonically increasing
+sequence (e.g. ``(checkpoint, event_seq)``) so replayed or out-of-order
+events are ignored.  ``swap`` mutates the model directly and is meant for
+simulations and tests.
+"""
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from ..config import settings
+
+BPS = 10_000
+SYMBOL_DECIMALS: Mapping[str, int] = {"SUI": 9, "SWT": 6}
+
+
+class PoolError(ValueError):
+    """A swap the pool cannot perform."""
+
+
+class InsufficientLiquidityError(PoolError):
+    pass
+
+
+class SlippageExceededError(PoolError):
+    def __init__(self, amount_out: int, min_amount_out: int) -> None:
+        super().__init__(f"Output {amount_out} is below the minimum {min_amount_out}")
+        self.amount_out = amount_out
+        self.min_amount_out = min_amount_out
+
+
+@dataclass(frozen=True)
+class PoolQuote:
+    pay_symbol: str
+    receive_symbol: str
+    amount_in: int
+    amount_out: int
+    # Fee charged on the input, in pay-token base units.
+    fee_in: int
+    # Output the same input would get with no fee, in receive-token base units.
+    gross_out: int
+    reserve_in: int
+    reserve_out: int
+
+    @property
+    def fee_out(self) -> int:
+        """The fee expressed in the receive token (``gross_out - amount_out``)."""
+        return self.gross_out - self.amount_out
+
+    @property
+    def price_impact_bps(self) -> Decimal:
+        """How far the execution price falls short of the spot price, in bps (fee excluded)."""
+        if self.amount_in == 0:
+            return Decimal(0)
+        spot_out = Decimal(self.amount_in) * self.reserve_out / self.reserve_in
+        return (spot_out - self.gross_out) / spot_out * BPS
+
+
+def min_amount_out(amount_out: int, slippage_bps: int) -> int:
+    """Smallest acceptable output for a quoted ``amount_out`` and a slippage tolerance."""
+    if not 0 <= slippage_bps <= BPS:
+        raise PoolError("slippage_bps must be between 0 and 10000")
+    return amount_out * (BPS - slippage_bps) // BPS
+
+
+def to_units(symbol: str, amount: Decimal) -> int:
+    """Token amount to base units, rounding down."""
+    return int(amount.scaleb(SYMBOL_DECIMALS[symbol]))
+
+
+def from_units(symbol: str, units: int) -> Decimal:
+    return Decimal(units).scaleb(-SYMBOL_DECIMALS[symbol])
+
+
+class ConstantProductPool:
+    """Reserves, fee accrual and x*y=k pricing for one token pair."""
+
+    def __init__(
+        self,
+        symbol_a: str = "SUI",
+        symbol_b: str = "SWT",
+        *,
+        reserve_a: int = 0,
+        reserve_b: int = 0,
+        fee_bps: int = 1,
+    ) -> None:
+        if not 0 <= fee_bps < BPS:
+            raise PoolError("fee_bps must be between 0 and 9999")
+        self.symbols = (symbol_a, symbol_b)
+        self.fee_bps = fee_bps
+        self._reserves: Dict[str, int] = {symbol_a: reserve_a, symbol_b: reserve_b}
+        self._fees: Dict[str, int] = {symbol_a: 0, symbol_b: 0}
+        self._sequence: Optional[Tuple[int, ...]] = None
+        self._lock = threading.Lock()
+        self.swaps = 0
+        self.syncs = 0
+
+    @property
+    def ready(self) -> bool:
+        """Whether the pool holds liquidity on both sides."""
+        return all(reserve > 0 for reserve in self._reserves.values())
+
+    def reserves(self) -> Dict[str, int]:
+        return dict(self._reserves)
+
+    def snapshot(self) -> "ConstantProductPool":
+        """A copy of the current reserves, so several quotes see the same pool."""
+        with self._lock:
+            symbol_a, symbol_b = self.symbols
+            return ConstantProductPool(
+                symbol_a,
+                symbol_b,
+                reserve_a=self._reserves[symbol_a],
+                reserve_b=self._reserves[symbol_b],
+                fee_bps=self.fee_bps,
+            )
+
+    def fees(self) -> Dict[str, int]:
+        return dict(self._fees)
+
+    def _other(self, symbol: str) -> str:
+        if symbol not in self._reserves:
+            raise PoolError(f"{symbol} is not in this pool")
+        return self.symbols[1] if symbol == self.symbols[0] else self.symbols[0]
+
+    def quote(self, pay_symbol: str, amount_in: int) -> PoolQuote:
+        """Price a swap of ``amount_in`` base units without changing the pool."""
+        receive_symbol = self._other(pay_symbol)
+        if amount_in < 0:
+            raise PoolError("amount_in must not be negative")
+        reserve_in = self._reserves[pay_symbol]
+        reserve_out = self._reserves[receive_symbol]
+        if reserve_in <= 0 or reserve_out <= 0:
+            raise InsufficientLiquidityError("Pool has no liquidity")
+        in_after_fee = amount_in * (BPS - self.fee_bps)
+        amount_out = in_after_fee * reserve_out // (reserve_in * BPS + in_after_fee)
+        gross_out = amount_in * reserve_out // (reserve_in + amount_in)
+        fee_in = amount_in * self.fee_bps // BPS
+        return PoolQuote(pay_symbol, receive_symbol, amount_in, amount_out, fee_in, gross_out, reserve_in, reserve_out)
+
+    def quote_amount(self, pay_symbol: str, pay_amount: Decimal) -> Tuple[Decimal, Decimal, Decimal]:
+        """``(receive_amount, fee_amount, spot_price)`` in token units, as the wallet reports them."""
+        quote = self.quote(pay_symbol, to_units(pay_symbol, pay_amount))
+        receive = quote.receive_symbol
+        spot_price = from_units(receive, quote.reserve_out) / from_units(pay_symbol, quote.reserve_in)
+        return from_units(receive, quote.amount_out), from_units(receive, quote.fee_out), spot_price
+
+    def swap(self, pay_symbol: str, amount_in: int, *, min_amount_out: int = 0) -> PoolQuote:
+        """Execute a swap against the model; raises without changes if output < ``min_amount_out``."""
+        with self._lock:
+            quote = self.quote(pay_symbol, amount_in)
+            if quote.amount_out <= 0:
+                raise InsufficientLiquidityError("Input too small for any output")
+            if quote.amount_out < min_amount_out:
+                raise SlippageExceededError(quote.amount_out, min_amount_out)
+            self._reserves[pay_symbol] += amount_in
+            self._reserves[quote.receive_symbol] -= quote.amount_out
+            self._fees[pay_symbol] += quote.fee_in
+            self.swaps += 1
+            return quote
+
+    def sync(self, reserves: Mapping[str, int], sequence: Optional[Tuple[int, ...]] = None) -> bool:
+        """Install on-chain reserves; returns False for a sequence at or before the last one seen."""
+        with self._lock:
+            if sequence is not None and self._sequence is not None and tuple(sequence) <= self._sequence:
+                return False
+            for symbol in self.symbols:
+                self._reserves[symbol] = int(reserves[symbol])
+            if sequence is not None:
+                self._sequence = tuple(sequence)
+            self.syncs += 1
+            return True
+
+    def apply_event(self, event: Mapping[str, Any]) -> bool:
+        """Apply a Sui pool event whose ``parsedJson`` carries ``reserve_sui``/``reserve_swt``.
+
+        The sequence is taken from ``(checkpoint, id.eventSeq)`` when present.
+        Events without reserves are ignored.
+        """
+        fields = event.get("parsedJson") or {}
+        keys = {symbol: f"reserve_{symbol.lower()}" for symbol in self.symbols}
+        if not all(key in fields for key in keys.values()):
+            return False
+        event_id = event.get("id") or {}
+        sequence = None
+        if "checkpoint" in event or "eventSeq" in event_id:
+            sequence = (int(event.get("checkpoint", 0)), int(event_id.get("eventSeq", 0)))
+        return self.sync({symbol: int(fields[key]) for symbol, key in keys.items()}, sequence)
+
+    def status(self) -> Dict[str, Any]:
+        symbol_a, symbol_b = self.symbols
+        reserves = {symbol: from_units(symbol, units) for symbol, units in self._reserves.items()}
+        price = reserves[symbol_b] / reserves[symbol_a] if self.ready else None
+        return {
+            "pair": f"{symbol_a}/{symbol_b}",
+            "ready": self.ready,
+            "fee_bps": self.fee_bps,
+            "reserves": {symbol: format(amount.normalize(), "f") for symbol, amount in reserves.items()},
+            "price": None if price is None else format(price, "f"),
+            "fees_accrued": {
+                symbol: format(from_units(symbol, units).normalize(), "f") for symbol, units in self._fees.items()
+            },
+            "swaps": self.swaps,
+            "syncs": self.syncs,
+            "sequence": list(self._sequence) if self._sequence is not None else None,
+        }
+
+
+_POOL: Optional[ConstantProductPool] = None
+_POOL_LOCK = threading.Lock()
+
+
+def get_swap_pool() -> ConstantProductPool:
+    """Return the SUI/SWT pool model, seeded from settings on first use."""
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = ConstantProductPool(
+                "SUI",
+                "SWT",
+                reserve_a=settings.SWAP_POOL_RESERVE_SUI,
+                reserve_b=settings.SWAP_POOL_RESERVE_SWT,
+                fee_bps=settings.SWAP_POOL_FEE_BPS,
+            )
+        return _POOL
+
+
+def use_swap_pool(pool: Optional[ConstantProductPool]) -> None:
+    global _POOL
+    with _POOL_LOCK:
+        _POOL = pool
@@ -0,0 +1,448 @@
+"""Content-addressed store for off-chain message bodies.
+
+Bodies are keyed by their SHA-256 in the on-chain ``content_hash`` format
+(``0x`` + hex, see ``app.services.content_hash``), so a body shared by many
+messages is stored once.  Bodies up to ``large_bytes`` are packed into
+append-only segment files as ``digest (32 bytes) | length (u32) | body``
+records. Once a segment reaches ``segment_bytes`` it is sealed and a new one
+is started.  Larger bodies get a file of their own under ``large/``.
+
+Reads go through read-only memory maps of the segments, so serving a body is
+a slice of the page cache; ``get_many`` resolves a whole feed page in one
+call.  The index lives in memory and is rebuilt on open by walking the
+record headers; a torn record at the end of the last segment (a crash during
+an append) is truncated away.
+
+``compact(live)`` drops bodies no live message references (deleted messages
+included) by rewriting sealed segments whose dead share is at least
+``min_dead_ratio`` and deleting unreferenced large files.  Bodies written
+while compaction runs are always kept.
+
+The index is per process, so one process owns a directory at a time; a
+second ``BlobStore`` on it raises ``BlobStoreLockedError``.
+"""
+from __future__ import annotations
+
+import asyncio
+import fcntl
+import hashlib
+import logging
+import mmap
+import os
+import struct
+import threading
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from .content_hash import HASH_PREFIX, normalize_hash
+
+logger = logging.getLogger(__name__)
+
+_HEADER = struct.Struct(">32sI")
+_SEGMENT_PREFIX = "seg-"
+_SEGMENT_SUFFIX = ".dat"
+_LARGE_DIR = "large"
+# Segment id used in index entries for bodies kept in their own file.
+_LARGE = -1
+
+Entry = Tuple[int, int, int]  # segment id, body offset, body length
+
+
+class BlobStoreLockedError(RuntimeError):
+    """Another process already has the blob store directory open."""
+
+
+def _digest(body: bytes) -> bytes:
+    return hashlib.sha256(body).digest()
+
+
+def _key(digest: bytes) -> str:
+    return HASH_PREFIX + digest.hex()
+
+
+def _raw(key: str) -> bytes:
+    return bytes.fromhex(normalize_hash(key)[2:])
+
+
+class _Segment:
+    """One segment file and a read-only map of the bytes written so far."""
+
+    def __init__(self, segment_id: int, path: str) -> None:
+        self.id = segment_id
+        self.path = path
+        self.size = os.path.getsize(path)
+        self._map: Optional[mmap.mmap] = None
+
+    def read(self, offset: int, length: int) -> bytes:
+        if self._map is None or offset + length > len(self._map):
+            self._remap()
+        assert self._map is not None
+        return self._map[offset : offset + length]
+
+    def records(self) -> Iterable[Tuple[bytes, int, int]]:
+        """``(digest, offset, length)`` of each complete record, in file order."""
+        if self.size == 0:
+            return
+        self._remap()
+        assert self._map is not None
+        position = 0
+        while position + _HEADER.size <= self.size:
+            digest, length = _HEADER.unpack_from(self._map, position)
+            start = position + _HEADER.size
+            if start + length > self.size:
+                break
+            yield digest, start, length
+            position = start + length
+
+    def close(self) -> None:
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+    def _remap(self) -> None:
+        self.close()
+        if self.size:
+            with open(self.path, "rb") as handle:
+                self._map = mmap.mmap(handle.fileno(), self.size, access=mmap.ACCESS_READ)
+
+
+class BlobStore:
+    """Deduplicating body store on ``directory``; thread-safe."""
+
+    def __init__(
+        self,
+        directory: str,
+        *,
+        segment_bytes: int = 64 * 1024 * 1024,
+        large_bytes: int = 1024 * 1024,
+        fsync: bool = True,
+    ) -> None:
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.large_bytes = large_bytes
+        self.fsync = fsync
+        self._lock = threading.RLock()
+        self._compaction_lock = threading.Lock()
+        self._index: Dict[bytes, Entry] = {}
+        self._segments: Dict[int, _Segment] = {}
+        self._active: Optional[_Segment] = None
+        self._writer = None
+        self._last_id = 0
+        self._recording: Optional[Set[bytes]] = None
+        self.puts = 0
+        self.dedup_hits = 0
+        os.makedirs(os.path.join(directory, _LARGE_DIR), exist_ok=True)
+        self._lock_file = open(os.path.join(directory, "LOCK"), "a")
+        try:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError as exc:
+            self._lock_file.close()
+            raise BlobStoreLockedError(f"Blob store {directory} is open in another process.") from exc
+        self._open()
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, str) and _raw(key) in self._index
+
+    # Writes --------------------------------------------------------------------------
+
+    def put(self, body: bytes | str) -> str:
+        return self.put_many([body])[0]
+
+    def put_many(self, bodies: Sequence[bytes | str]) -> List[str]:
+        """Store ``bodies`` (str is UTF-8 encoded) and return their keys, in order."""
+        encoded = [body.encode("utf-8") if isinstance(body, str) else bytes(body) for body in bodies]
+        digests = [_digest(body) for body in encoded]
+        with self._lock:
+            fresh: Dict[bytes, bytes] = {}
+            for digest, body in zip(digests, encoded):
+                if digest in self._index or digest in fresh:
+                    self.dedup_hits += 1
+                else:
+                    fresh[digest] = body
+                if self._recording is not None:
+                    self._recording.add(digest)
+            self.puts += len(encoded)
+            if fresh:
+                self._append(fresh)
+        return [_key(digest) for digest in digests]
+
+    def compact(self, live: Callable[[], Iterable[str]], *, min_dead_ratio: float = 0.3) -> Dict[str, int]:
+        """Drop bodies whose keys are not in ``live()``.
+
+        ``live`` is called after recording starts, so a body stored (or
+        deduplicated) while the caller computes the live set is kept.
+        """
+        with self._compaction_lock:
+            with self._lock:
+                self._recording = set()
+            try:
+                keep = {_raw(key) for key in live()}
+                with self._lock:
+                    keep |= self._recording
+                    active = self._active.id if self._active is not None else None
+                    sealed = [segment for segment_id, segment in self._segments.items() if segment_id != active]
+                    owned = defaultdict(list)
+                    for digest, entry in self._index.items():
+                        owned[entry[0]].append((digest, entry))
+                victims = [
+                    segment
+                    for segment in sealed
+                    if segment.size
+                    and sum(entry[2] + _HEADER.size for digest, entry in owned[segment.id] if digest not in keep)
+                    >= min_dead_ratio * segment.size
+                ]
+                # Sealed segments never change, so live records are copied without the lock.
+                copied = self._rewrite(
+                    [(digest, entry) for segment in victims for digest, entry in owned[segment.id] if digest in keep]
+                )
+                with self._lock:
+                    keep |= self._recording
+                    return self._swap(victims, owned, keep, copied)
+            finally:
+                with self._lock:
+                    self._recording = None
+
+    def close(self) -> None:
+        # Waits for a running compaction, which may still be swapping segments.
+        with self._compaction_lock, self._lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+            for segment in self._segments.values():
+                segment.close()
+            if not self._lock_file.closed:
+                fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+                self._lock_file.close()
+
+    # Reads ---------------------------------------------------------------------------
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, bytes]:
+        """Bodies for ``keys`` in one pass over the index; unknown keys are left out."""
+        found: Dict[str, bytes] = {}
+        with self._lock:
+            located = []
+            for key in keys:
+                entry = self._index.get(_raw(key))
+                if entry is not None:
+                    located.append((entry, key))
+            # Segment order, then offset order, so each map is read front to back.
+            located.sort()
+            for (segment_id, offset, length), key in located:
+                if segment_id == _LARGE:
+                    found[key] = self._read_large(key)
+                else:
+                    found[key] = self._segments[segment_id].read(offset, length)
+        return found
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            segment_bytes = sum(segment.size for segment in self._segments.values())
+            body_bytes = sum(entry[2] for entry in self._index.values())
+            return {
+                "blobs": len(self._index),
+                "segments": len(self._segments),
+                "segment_bytes": segment_bytes,
+                "body_bytes": body_bytes,
+                "large_blobs": sum(1 for entry in self._index.values() if entry[0] == _LARGE),
+                "puts": self.puts,
+                "dedup_hits": self.dedup_hits,
+            }
+
+    # Internals -----------------------------------------------------------------------
+
+    def _segment_path(self, segment_id: int) -> str:
+        return os.path.join(self.directory, f"{_SEGMENT_PREFIX}{segment_id:08d}{_SEGMENT_SUFFIX}")
+
+    def _large_path(self, key: str) -> str:
+        return os.path.join(self.directory, _LARGE_DIR, normalize_hash(key)[2:])
+
+    def _read_large(self, key: str) -> bytes:
+        with open(self._large_path(key), "rb") as handle:
+            return handle.read()
+
+    def _open(self) -> None:
+        ids = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".tmp"):
+                os.unlink(os.path.join(self.directory, name))
+            elif name.startswith(_SEGMENT_PREFIX) and name.endswith(_SEGMENT_SUFFIX):
+                ids.append(int(name[len(_SEGMENT_PREFIX) : -len(_SEGMENT_SUFFIX)]))
+        for segment_id in sorted(ids):
+            segment = _Segment(segment_id, self._segment_path(segment_id))
+            end = 0
+            for digest, offset, length in segment.records():
+                self._index[digest] = (segment_id, offset, length)
+                end = offset + length
+            if end < segment.size:
+                # A torn append; nothing after it was acknowledged.
+                segment.close()
+                os.truncate(segment.path, end)
+                segment.size = end
+            self._segments[segment_id] = segment
+        for name in os.listdir(os.path.join(self.directory, _LARGE_DIR)):
+            if name.endswith(".tmp"):
+                os.unlink(os.path.join(self.directory, _LARGE_DIR, name))
+                continue
+            size = os.path.getsize(os.path.join(self.directory, _LARGE_DIR, name))
+            self._index[bytes.fromhex(name)] = (_LARGE, 0, size)
+        if ids:
+            self._last_id = max(ids)
+            self._active = self._segments[self._last_id]
+
+    def _reserve_id(self) -> int:
+        with self._lock:
+            self._last_id += 1
+            return self._last_id
+
+    def _roll(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        segment_id = self._reserve_id()
+        open(self._segment_path(segment_id), "xb").close()
+        self._active = self._segments[segment_id] = _Segment(segment_id, self._segment_path(segment_id))
+
+    def _append(self, bodies: Dict[bytes, bytes]) -> None:
+        dirty = False
+        for digest, body in bodies.items():
+            if len(body) > self.large_bytes:
+                self._write_large(digest, body)
+                continue
+            record = _HEADER.size + len(body)
+            if self._active is None or (self._active.size and self._active.size + record > self.segment_bytes):
+                if dirty:
+                    self._flush()
+                    dirty = False
+                self._roll()
+            assert self._active is not None
+            if self._writer is None:
+                self._writer = open(self._active.path, "ab")
+            self._writer.write(_HEADER.pack(digest, len(body)))
+            self._writer.write(body)
+            self._index[digest] = (self._active.id, self._active.size + _HEADER.size, len(body))
+            self._active.size += record
+            dirty = True
+        if dirty:
+            self._flush()
+
+    def _flush(self) -> None:
+        self._writer.flush()
+        if self.fsync:
+            os.fsync(self._writer.fileno())
+
+    def _write_large(self, digest: bytes, body: bytes) -> None:
+        path = self._large_path(_key(digest))
+        with open(path + ".tmp", "wb") as handle:
+            handle.write(body)
+            if self.fsync:
+                handle.flush()
+                os.fsync(handle.fileno())
+        os.replace(path + ".tmp", path)
+        self._index[digest] = (_LARGE, 0, len(body))
+
+    def _rewrite(self, records: List[Tuple[bytes, Entry]]) -> List[Tuple[int, Dict[bytes, Entry]]]:
+        """Copy ``records`` into new sealed segments; returns each new segment's id and index entries."""
+        if not records:
+            return []
+        written: List[Tuple[int, Dict[bytes, Entry]]] = []
+        handle = None
+        entries: Dict[bytes, Entry] = {}
+        size = segment_id = 0
+        for digest, (source, offset, length) in records:
+            if handle is None or (size and size + _HEADER.size + length > self.segment_bytes):
+                if handle is not None:
+                    self._seal(handle, segment_id)
+                    written.append((segment_id, entries))
+                segment_id = self._reserve_id()
+                handle, entries, size = open(self._segment_path(segment_id) + ".tmp", "wb"), {}, 0
+            # Readers may remap a segment concurrently, so reads still take the lock.
+            with self._lock:
+                body = self._segments[source].read(offset, length)
+            handle.write(_HEADER.pack(digest, length))
+            handle.write(body)
+            entries[digest] = (segment_id, size + _HEADER.size, length)
+            size += _HEADER.size + length
+        self._seal(handle, segment_id)
+        written.append((segment_id, entries))
+        return written
+
+    def _seal(self, handle, segment_id: int) -> None:
+        handle.flush()
+        if self.fsync:
+            os.fsync(handle.fileno())
+        handle.close()
+        os.replace(self._segment_path(segment_id) + ".tmp", self._segment_path(segment_id))
+
+    def _swap(
+        self,
+        victims: List[_Segment],
+        owned: Dict[int, List[Tuple[bytes, Entry]]],
+        keep: Set[bytes],
+        copied: List[Tuple[int, Dict[bytes, Entry]]],
+    ) -> Dict[str, int]:
+        moved: Dict[bytes, Entry] = {}
+        for segment_id, entries in copied:
+            self._segments[segment_id] = _Segment(segment_id, self._segment_path(segment_id))
+            moved.update(entries)
+        victim_ids = {segment.id for segment in victims}
+        # Anything recorded since the copy started that still lives in a victim
+        # is appended to the active segment before the victim goes.
+        late = {
+            digest: self._segments[entry[0]].read(entry[1], entry[2])
+            for segment_id in victim_ids
+            for digest, entry in owned[segment_id]
+            if digest in keep and digest not in moved
+        }
+        dropped = 0
+        for segment in victims:
+            for digest, _entry in owned[segment.id]:
+                if digest in moved:
+                    self._index[digest] = moved[digest]
+                elif digest not in late and self._index.get(digest, (None,))[0] == segment.id:
+                    del self._index[digest]
+                    dropped += 1
+        if late:
+            self._append(late)
+        for segment in victims:
+            segment.close()
+            del self._segments[segment.id]
+            os.unlink(segment.path)
+        large = [digest for digest, entry in self._index.items() if entry[0] == _LARGE and digest not in keep]
+        for digest in large:
+            os.unlink(self._large_path(_key(digest)))
+            del self._index[digest]
+        reclaimed = sum(segment.size for segment in victims) - sum(
+            self._segments[segment_id].size for segment_id, _ in copied
+        )
+        return {"segments_rewritten": len(victims), "dropped": dropped + len(large), "reclaimed_bytes": reclaimed}
+
+
+def open_blob_store() -> Optional[BlobStore]:
+    """The blob store configured by ``BLOB_STORE_DIR``, or ``None`` to keep bodies in rows."""
+    from ..config import settings
+
+    if not settings.BLOB_STORE_DIR:
+        return None
+    return BlobStore(
+        settings.BLOB_STORE_DIR,
+        segment_bytes=settings.BLOB_SEGMENT_BYTES,
+        large_bytes=settings.BLOB_LARGE_BYTES,
+    )
+
+
+async def compact_periodically(compact: Callable[[], Dict[str, int]], interval: float) -> None:
+    """Run ``compact`` off the event loop every ``interval`` seconds until cancelled."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            result = await asyncio.to_thread(compact)
+        except Exception:  # pragma: no cover - logged and retried next interval
+            logger.exception("Blob store compaction failed")
+        else:
+            logger.info("Blob store compaction: %s", result)
@@ -0,0 +1,267 @@
+"""Verification of off-chain message bodies against on-chain hashes.
+
+An on-chain ``Message`` keeps only ``title_hash`` and ``content_hash``: the
+SHA-256 of the UTF-8 title and content, as ``scripts/hash_content.sh`` and
+``python -m app.hash_content`` print them.  The feed serves the off-chain
+bodies, so at ingest the bodies are hashed and compared with the chain's
+values.  Hashing runs in batches on a thread pool (hashlib releases the GIL
+for bodies over 2 KiB), never on a feed read.
+
+Each result is a ``Verification`` stored in a ``VerifiedHashCache``.  The
+cache is a dict in front of an optional persistent store
+(``app.repositories.content_hashes``), so other workers and restarts reuse
+the result without hashing again.  Feed entries report it as
+``content_verified``: ``True`` or ``False`` once checked, and ``None`` when
+no on-chain hashes are known.
+"""
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Protocol, Sequence, Tuple
+
+HASH_PREFIX = "0x"
+
+
+def sha256_hex(text: str) -> str:
+    """``0x``-prefixed SHA-256 of ``text``; the on-chain ``title_hash``/``content_hash`` format."""
+    return HASH_PREFIX + hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def normalize_hash(value: Any) -> str:
+    """Canonical ``0x`` + lower-case hex form of a hash.
+
+    Accepts hex strings with or without the prefix, raw bytes, and the
+    byte lists that event ``parsedJson`` uses for ``vector<u8>``.
+    """
+    if isinstance(value, (bytes, bytearray)):
+        return HASH_PREFIX + bytes(value).hex()
+    if isinstance(value, (list, tuple)):
+        return HASH_PREFIX + bytes(value).hex()
+    if isinstance(value, str):
+        digits = value[2:] if value[:2].lower() == HASH_PREFIX else value
+        try:
+            bytes.fromhex(digits)
+        except ValueError as exc:
+            raise ValueError(f"Not a hex hash: {value!r}") from exc
+        return HASH_PREFIX + digits.lower()
+    raise TypeError(f"Unsupported hash value: {type(value).__name__}")
+
+
+def hash_batch(pairs: Sequence[Tuple[str, str]]) -> List[Tuple[str, str]]:
+    """``(title_hash, content_hash)`` for each ``(title, content)``."""
+    return [(sha256_hex(title), sha256_hex(content)) for title, content in pairs]
+
+
+def hash_pairs(
+    pairs: Sequence[Tuple[str, str]],
+    *,
+    executor: Optional[Executor] = None,
+    batch_size: int = 256,
+) -> List[Tuple[str, str]]:
+    """Hash ``pairs`` in batches on ``executor`` (inline without one), preserving order."""
+    batches = [pairs[start : start + batch_size] for start in range(0, len(pairs), batch_size)]
+    if executor is None or len(batches) < 2:
+        results = map(hash_batch, batches)
+    else:
+        results = executor.map(hash_batch, batches)
+    return [digests for batch in results for digests in batch]
+
+
+@dataclass(frozen=True)
+class ContentClaim:
+    """An off-chain body and the hashes its on-chain message carries."""
+
+    message_id: str
+    title: str
+    content: str
+    title_hash: str
+    content_hash: str
+
+
+@dataclass(frozen=True)
+class Verification:
+    message_id: str
+    title_hash: str
+    content_hash: str
+    verified: bool
+    checked_at: datetime
+
+
+class VerificationStore(Protocol):
+    def load(self, message_ids: Sequence[str]) -> Dict[str, Verification]: ...
+
+    def save(self, verifications: Sequence[Verification]) -> None: ...
+
+    def delete(self, message_ids: Sequence[str]) -> None: ...
+
+
+class VerifiedHashCache:
+    """Verification results by message id, read through to ``store`` on a miss.
+
+    Ids the store does not know are remembered as absent for ``absent_ttl``
+    seconds, so feed reads of unverified messages query the store at most
+    that often while still seeing results written by other workers.
+    """
+
+    def __init__(
+        self,
+        store: Optional[VerificationStore] = None,
+        *,
+        max_entries: int = 200_000,
+        absent_ttl: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._store = store
+        self._max_entries = max_entries
+        self._absent_ttl = absent_ttl
+        self._clock = clock
+        self._entries: Dict[str, Verification] = {}
+        self._absent: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, message_id: str) -> Optional[Verification]:
+        return self.get_many([message_id]).get(message_id)
+
+    def get_many(self, message_ids: Iterable[str]) -> Dict[str, Verification]:
+        found: Dict[str, Verification] = {}
+        missing: List[str] = []
+        now = self._clock()
+        with self._lock:
+            for message_id in message_ids:
+                entry = self._entries.get(message_id)
+                if entry is not None:
+                    self.hits += 1
+                    found[message_id] = entry
+                elif self._absent.get(message_id, 0.0) > now:
+                    self.hits += 1
+                else:
+                    self.misses += 1
+                    missing.append(message_id)
+        if missing:
+            loaded = self._store.load(missing) if self._store is not None else {}
+            found.update(loaded)
+            with self._lock:
+                self._remember(loaded.values())
+                expires = now + self._absent_ttl
+                for message_id in missing:
+                    if message_id not in loaded:
+                        self._absent[message_id] = expires
+        return found
+
+    def put_many(self, verifications: Sequence[Verification]) -> None:
+        if self._store is not None and verifications:
+            self._store.save(verifications)
+        with self._lock:
+            self._remember(verifications)
+
+    def discard(self, message_ids: Sequence[str]) -> None:
+        """Drop results for bodies that changed without new hashes."""
+        if self._store is not None and message_ids:
+            self._store.delete(message_ids)
+        with self._lock:
+            for message_id in message_ids:
+                self._entries.pop(message_id, None)
+                self._absent.pop(message_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._absent.clear()
+
+    def _remember(self, verifications: Iterable[Verification]) -> None:
+        for verification in verifications:
+            self._entries[verification.message_id] = verification
+            self._absent.pop(verification.message_id, None)
+        # Dropping the oldest half at once keeps the bound O(1) amortized.
+        for entries in (self._entries, self._absent):
+            if len(entries) > self._max_entries:
+                for message_id in list(entries)[: len(entries) // 2]:
+                    del entries[message_id]
+
+
+class ContentVerifier:
+    """Hashes claims in batches on a thread pool and records the results in ``cache``."""
+
+    def __init__(
+        self,
+        cache: VerifiedHashCache,
+        *,
+        workers: int = 4,
+        batch_size: int = 256,
+        executor: Optional[Executor] = None,
+    ) -> None:
+        self.cache = cache
+        self.batch_size = batch_size
+        self._owns_executor = executor is None
+        self._executor = executor or ThreadPoolExecutor(max_workers=workers, thread_name_prefix="content-hash")
+        self.verified = 0
+        self.mismatched = 0
+
+    def verify_many(self, claims: Sequence[ContentClaim]) -> List[Verification]:
+        digests = hash_pairs(
+            [(claim.title, claim.content) for claim in claims],
+            executor=self._executor,
+            batch_size=self.batch_size,
+        )
+        now = datetime.now(timezone.utc)
+        results = []
+        for claim, (title_digest, content_digest) in zip(claims, digests):
+            title_hash, content_hash = normalize_hash(claim.title_hash), normalize_hash(claim.content_hash)
+            verified = title_digest == title_hash and content_digest == content_hash
+            results.append(Verification(claim.message_id, title_hash, content_hash, verified, now))
+        self.cache.put_many(results)
+        matched = sum(result.verified for result in results)
+        self.verified += matched
+        self.mismatched += len(results) - matched
+        return results
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "verified": self.verified,
+            "mismatched": self.mismatched,
+            "cached": len(self.cache),
+            "cache_hits": self.cache.hits,
+            "cache_misses": self.cache.misses,
+        }
+
+    def shutdown(self) -> None:
+        if self._owns_executor:
+            self._executor.shutdown(wait=False)
+
+
+_VERIFIER: Optional[ContentVerifier] = None
+_VERIFIER_LOCK = threading.Lock()
+
+
+def get_content_verifier() -> ContentVerifier:
+    """Return the process-wide verifier, with an in-memory cache until one is installed."""
+    global _VERIFIER
+    with _VERIFIER_LOCK:
+        if _VERIFIER is None:
+            # Imported here so the hash_content CLI runs without app settings.
+            from ..config import settings
+
+            _VERIFIER = ContentVerifier(
+                VerifiedHashCache(),
+                workers=settings.CONTENT_HASH_WORKERS,
+                batch_size=settings.CONTENT_HASH_BATCH_SIZE,
+            )
+        return _VERIFIER
+
+
+def use_content_verifier(verifier: Optional[ContentVerifier]) -> None:
+    global _VERIFIER
+    with _VERIFIER_LOCK:
+        previous, _VERIFIER = _VERIFIER, verifier
+    if previous is not None and previous is not verifier:
+        previous.shutdown()
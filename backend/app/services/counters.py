@@ -0,0 +1,433 @@
+"""Write-behind like/alert counters for the reactions router.
+
+Clicks on a hot message would otherwise turn into one row UPDATE each and
+contend on that row.  ``ReactionCounterBuffer`` instead coalesces increments in
+per-shard dictionaries and hands them to a sink in batches, either every
+``flush_interval`` seconds or as soon as ``flush_threshold`` increments are
+pending.
+
+Durability comes from a small append-only log.  Every increment is written to
+the current log segment before it is acknowledged; a flush seals the segment,
+and sealed segments are deleted only once the sink has committed their batch.
+The sink commits the ``(log, segment)`` position of the newest sealed segment
+in the same transaction as the counts, so on start-up the remaining segments
+are replayed into the pending counters except for increments the sink already
+holds (a crash between the commit and the delete).
+
+Threshold crossings (``LIKES_THRESHOLD``/``ALERTS_THRESHOLD``) are detected
+at flush time from the counts the sink committed: the sink returns each
+message's totals as of its own transaction, and the totals minus the batch are
+the counts before it.  Running totals kept here only answer the request, since
+with several workers each buffer sees just its own increments; the committed
+counts are shared, so the one flush that takes a message past a threshold
+reports it.  The crossing is logged before the callback runs and marked
+acknowledged when the callback returns, or, with ``auto_ack=False``, when the
+consumer calls ``acknowledge`` after handling it (see
+``app.services.proposals.ProposalPipeline``); crossings still unacknowledged
+after a crash are re-delivered on recovery.  A crash between the commit and
+logging its crossings leaves the committed segments behind; recovery then
+re-reports every threshold their messages are past, and the proposal claim
+drops the ones already opened.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Mapping, Optional, Tuple
+
+from .messages import (
+    ALERTS_THRESHOLD,
+    LIKES_THRESHOLD,
+    applied_log_segment,
+    apply_reaction_deltas,
+    reaction_totals,
+)
+
+logger = logging.getLogger(__name__)
+
+KIND_LIKES = "likes"
+KIND_ALERTS = "alerts"
+THRESHOLDS: Mapping[str, int] = {KIND_LIKES: LIKES_THRESHOLD, KIND_ALERTS: ALERTS_THRESHOLD}
+
+ReactionDeltas = Dict[str, Tuple[int, int]]
+# (resolved log directory, newest log segment folded into the batch)
+LogPosition = Tuple[str, int]
+# Returns the committed (likes, alerts) of every message the batch updated.
+FlushSink = Callable[[ReactionDeltas, Optional[LogPosition]], Mapping[str, Tuple[int, int]]]
+TotalsLoader = Callable[[str], Optional[Tuple[int, int]]]
+AppliedSegmentLoader = Callable[[str], Optional[int]]
+
+
+class UnknownMessageError(KeyError):
+    """Raised when a reaction targets a message that does not exist."""
+
+
+@dataclass(frozen=True)
+class ReactionTotals:
+    likes: int
+    alerts: int
+
+
+@dataclass(frozen=True)
+class ThresholdCrossing:
+    message_id: str
+    kind: str
+    total: int
+
+
+class _Shard:
+    __slots__ = ("lock", "pending", "totals", "generation")
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.pending: Dict[str, List[int]] = {}
+        self.totals: Dict[str, List[int]] = {}
+        # Bumped whenever flushed totals are dropped, so a load that raced a
+        # flush is retried instead of caching pre-flush counts.
+        self.generation = 0
+
+
+class ReactionCounterBuffer:
+    """Sharded, log-backed buffer of like/alert increments."""
+
+    def __init__(
+        self,
+        *,
+        sink: FlushSink = apply_reaction_deltas,
+        load_totals: TotalsLoader = reaction_totals,
+        applied_segment: AppliedSegmentLoader = applied_log_segment,
+        on_crossing: Optional[Callable[[ThresholdCrossing], None]] = None,
+        auto_ack: bool = True,
+        log_dir: Optional[str] = None,
+        shards: int = 16,
+        flush_interval: float = 1.0,
+        flush_threshold: int = 1000,
+    ) -> None:
+        self._sink = sink
+        self._load_totals = load_totals
+        self._applied_segment = applied_segment
+        self._on_crossing = on_crossing
+        self._auto_ack = auto_ack
+        self._shards = [_Shard() for _ in range(max(shards, 1))]
+        self._flush_interval = flush_interval
+        self._flush_threshold = flush_threshold
+
+        self._pending_count = 0
+        self._count_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._unacked: Dict[Tuple[str, str], ThresholdCrossing] = {}
+
+        self._log_dir = Path(log_dir) if log_dir else None
+        self._log_name = str(self._log_dir.resolve()) if self._log_dir is not None else ""
+        self._log_lock = threading.Lock()
+        self._log = None
+        self._segment = 0
+
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        if self._log_dir is not None:
+            self._log_dir.mkdir(parents=True, exist_ok=True)
+            self._recover()
+
+    # Public API ----------------------------------------------------------------------
+
+    def increment(self, message_id: str, *, likes: int = 0, alerts: int = 0) -> ReactionTotals:
+        """Buffer an increment and return the message's running totals."""
+        shard = self._shard(message_id)
+        shard.lock.acquire()
+        try:
+            totals = shard.totals.get(message_id)
+            while totals is None:
+                # Load outside the lock so a cold message does not stall its shard.
+                generation = shard.generation
+                shard.lock.release()
+                try:
+                    loaded = self._load_totals(message_id)
+                finally:
+                    shard.lock.acquire()
+                if loaded is None:
+                    raise UnknownMessageError(message_id)
+                totals = shard.totals.get(message_id)
+                if totals is None and shard.generation == generation:
+                    totals = shard.totals[message_id] = list(loaded)
+
+            totals[0] += likes
+            totals[1] += alerts
+            pending = shard.pending.setdefault(message_id, [0, 0])
+            pending[0] += likes
+            pending[1] += alerts
+            self._append_log([f"I\t{message_id}\t{likes}\t{alerts}"])
+            result = ReactionTotals(likes=totals[0], alerts=totals[1])
+        finally:
+            shard.lock.release()
+
+        with self._count_lock:
+            self._pending_count += 1
+            if self._pending_count >= self._flush_threshold:
+                self._wake.set()
+        return result
+
+    def acknowledge(self, crossing: ThresholdCrossing) -> None:
+        """Mark a delivered crossing as handled so it is not redelivered after a restart."""
+        with self._log_lock:
+            if self._unacked.pop((crossing.message_id, crossing.kind), None) is not None:
+                self._write_log([f"A\t{crossing.message_id}\t{crossing.kind}"])
+
+    def pending(self) -> ReactionDeltas:
+        snapshot: ReactionDeltas = {}
+        for shard in self._shards:
+            with shard.lock:
+                snapshot.update({key: (value[0], value[1]) for key, value in shard.pending.items()})
+        return snapshot
+
+    def flush(self) -> int:
+        """Hand all pending increments to the sink; returns the number of messages flushed."""
+        with self._flush_lock:
+            batch, sealed = self._seal()
+            if not batch:
+                self._delete_segments(sealed)
+                return 0
+            position = (self._log_name, self._segment_number(sealed[-1])) if sealed else None
+            try:
+                committed = self._sink(batch, position)
+            except Exception:
+                self._restore(batch)
+                raise
+            crossings = self._crossings(batch, committed)
+            self._delete_segments(sealed)
+            self._forget_idle_totals()
+        for crossing in crossings:
+            self._deliver(crossing)
+        return len(batch)
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="reaction-counter-flush", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the flusher thread and flush what is left."""
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stopping.set()
+            self._wake.set()
+            thread.join()
+        self.flush()
+        with self._log_lock:
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+
+    # Internals -----------------------------------------------------------------------
+
+    def _shard(self, message_id: str) -> _Shard:
+        return self._shards[hash(message_id) % len(self._shards)]
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            self._wake.wait(self._flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:  # noqa: BLE001 - keep flushing on the next tick
+                logger.exception("Reaction counter flush failed; increments kept for retry")
+
+    def _deliver(self, crossing: ThresholdCrossing) -> None:
+        if self._on_crossing is not None:
+            try:
+                self._on_crossing(crossing)
+            except Exception:  # noqa: BLE001 - redelivered after restart
+                logger.exception("Threshold crossing handler failed for %s", crossing)
+                return
+        if self._auto_ack or self._on_crossing is None:
+            self.acknowledge(crossing)
+
+    def _crossings(
+        self, batch: ReactionDeltas, committed: Mapping[str, Tuple[int, int]]
+    ) -> List[ThresholdCrossing]:
+        """Thresholds the committed batch took its messages past, logged before delivery."""
+        crossings: List[ThresholdCrossing] = []
+        for message_id, deltas in batch.items():
+            after = committed.get(message_id)
+            if after is None:
+                continue
+            for index, kind in enumerate((KIND_LIKES, KIND_ALERTS)):
+                if after[index] - deltas[index] < THRESHOLDS[kind] <= after[index]:
+                    crossings.append(ThresholdCrossing(message_id, kind, after[index]))
+        if crossings:
+            with self._log_lock:
+                for crossing in crossings:
+                    self._unacked[(crossing.message_id, crossing.kind)] = crossing
+                self._write_log([f"C\t{c.message_id}\t{c.kind}\t{c.total}" for c in crossings])
+                if self._log is not None:
+                    os.fsync(self._log.fileno())
+        return crossings
+
+    def _seal(self) -> Tuple[ReactionDeltas, List[Path]]:
+        """Swap out every shard's pending map and start a new log segment atomically."""
+        for shard in self._shards:
+            shard.lock.acquire()
+        try:
+            batch: ReactionDeltas = {}
+            for shard in self._shards:
+                for message_id, (likes, alerts) in shard.pending.items():
+                    batch[message_id] = (likes, alerts)
+                shard.pending = {}
+            with self._count_lock:
+                self._pending_count = 0
+            sealed = self._rotate_log()
+        finally:
+            for shard in reversed(self._shards):
+                shard.lock.release()
+        return batch, sealed
+
+    def _restore(self, batch: ReactionDeltas) -> None:
+        for message_id, (likes, alerts) in batch.items():
+            shard = self._shard(message_id)
+            with shard.lock:
+                pending = shard.pending.setdefault(message_id, [0, 0])
+                pending[0] += likes
+                pending[1] += alerts
+
+    def _forget_idle_totals(self) -> None:
+        for shard in self._shards:
+            with shard.lock:
+                for message_id in [key for key in shard.totals if key not in shard.pending]:
+                    del shard.totals[message_id]
+                shard.generation += 1
+
+    # Log -----------------------------------------------------------------------------
+
+    def _segment_path(self, segment: int) -> Path:
+        assert self._log_dir is not None
+        return self._log_dir / f"reactions-{segment:012d}.log"
+
+    @staticmethod
+    def _segment_number(path: Path) -> int:
+        return int(path.stem.split("-")[1])
+
+    def _segments(self) -> List[Path]:
+        if self._log_dir is None:
+            return []
+        return sorted(self._log_dir.glob("reactions-*.log"))
+
+    def _append_log(self, records: List[str]) -> None:
+        with self._log_lock:
+            self._write_log(records)
+
+    def _write_log(self, records: List[str]) -> None:
+        # Callers hold ``_log_lock``.  Records reach the OS before the reaction is
+        # acknowledged; fsync happens when a segment is sealed.
+        if self._log_dir is None:
+            return
+        if self._log is None:
+            self._log = open(self._segment_path(self._segment), "a", encoding="utf-8")
+        self._log.write("".join(record + "\n" for record in records))
+        self._log.flush()
+
+    def _rotate_log(self) -> List[Path]:
+        """Close the current segment, open the next one, and return the sealed segments."""
+        if self._log_dir is None:
+            return []
+        with self._log_lock:
+            if self._log is not None:
+                self._log.flush()
+                os.fsync(self._log.fileno())
+                self._log.close()
+            sealed = self._segments()
+            self._segment += 1
+            self._log = None
+            # Carry unacknowledged crossings forward so deleting sealed segments keeps them.
+            carried = [f"C\t{c.message_id}\t{c.kind}\t{c.total}" for c in self._unacked.values()]
+            if carried:
+                self._write_log(carried)
+                os.fsync(self._log.fileno())
+        return sealed
+
+    def _delete_segments(self, segments: List[Path]) -> None:
+        for path in segments:
+            path.unlink(missing_ok=True)
+
+    def _recover(self) -> None:
+        segments = self._segments()
+        applied = self._applied_segment(self._log_name) if segments else None
+        committed: Dict[str, None] = {}
+        for path in segments:
+            # Increments of segments the sink already committed are not replayed;
+            # their crossings and acknowledgements still are.
+            increments = applied is None or self._segment_number(path) > applied
+            with open(path, encoding="utf-8") as handle:
+                for line in handle:
+                    fields = line.rstrip("\n").split("\t")
+                    if not increments and fields[0] == "I" and len(fields) == 4:
+                        committed[fields[1]] = None
+                    self._replay(fields, increments=increments)
+        if segments:
+            # Recovered records stay in the old segments until the first successful flush.
+            self._segment = self._segment_number(segments[-1]) + 1
+        # Running totals of recovered messages are the committed counts plus the
+        # replayed increments; messages deleted in the meantime are dropped.
+        for shard in self._shards:
+            for message_id, pending in list(shard.pending.items()):
+                loaded = self._load_totals(message_id)
+                if loaded is None:
+                    del shard.pending[message_id]
+                else:
+                    shard.totals[message_id] = [loaded[0] + pending[0], loaded[1] + pending[1]]
+        # The crossings of a committed batch may not have been logged before the
+        # crash, so report every threshold its messages are past (see module docs).
+        for message_id in committed:
+            loaded = self._load_totals(message_id)
+            for index, kind in enumerate((KIND_LIKES, KIND_ALERTS)):
+                if loaded is not None and loaded[index] >= THRESHOLDS[kind]:
+                    self._unacked.setdefault((message_id, kind), ThresholdCrossing(message_id, kind, loaded[index]))
+        for crossing in list(self._unacked.values()):
+            logger.info("Redelivering threshold crossing %s/%s", crossing.message_id, crossing.kind)
+            self._deliver(crossing)
+
+    def _replay(self, fields: List[str], *, increments: bool = True) -> None:
+        if not fields or not fields[0]:
+            return
+        record = fields[0]
+        try:
+            if record == "I" and len(fields) == 4:
+                if not increments:
+                    return
+                message_id, likes, alerts = fields[1], int(fields[2]), int(fields[3])
+                pending = self._shard(message_id).pending.setdefault(message_id, [0, 0])
+                pending[0] += likes
+                pending[1] += alerts
+                self._pending_count += 1
+            elif record == "C" and len(fields) == 4:
+                self._unacked[(fields[1], fields[2])] = ThresholdCrossing(fields[1], fields[2], int(fields[3]))
+            elif record == "A" and len(fields) == 3:
+                self._unacked.pop((fields[1], fields[2]), None)
+        except ValueError:
+            # A torn final line from a crash mid-write; the increment was never acknowledged.
+            logger.warning("Skipping malformed reaction log record: %r", fields)
+
+
+_BUFFER: Optional[ReactionCounterBuffer] = None
+_BUFFER_LOCK = threading.Lock()
+
+
+def get_reaction_buffer() -> ReactionCounterBuffer:
+    """Return the process-wide buffer, creating an unlogged one on first use."""
+    global _BUFFER
+    with _BUFFER_LOCK:
+        if _BUFFER is None:
+            _BUFFER = ReactionCounterBuffer()
+        return _BUFFER
+
+
+def use_reaction_buffer(buffer: Optional[ReactionCounterBuffer]) -> None:
+    global _BUFFER
+    with _BUFFER_LOCK:
+        _BUFFER = buffer
@@ -0,0 +1,91 @@
+"""Pre-encoded JSON segments for feed entries.
+
+A feed entry is spliced from two cached byte strings:
+
+* a static segment holding everything except ``content_verified`` and
+  ``metrics`` (id, title, content, tags, timestamps, creator), encoded once
+  per message version, and
+* a small metrics segment keyed by the ``(likes, alerts, status)`` it was
+  built from, so counter changes re-encode only that part.
+
+``splice(static, metrics, verified)`` inserts the current verification flag
+between them and is byte-for-byte the output of
+``MessageFeedEntry.model_dump_json()``.
+
+Segments are built outside the lock.  A build records a token for its
+message; ``invalidate`` drops the token, so a build that raced an update is
+returned to its caller but not cached.
+"""
+from __future__ import annotations
+
+from collections import OrderedDict
+from threading import Lock
+from typing import Callable, Hashable, Optional, Tuple
+
+METRICS_PREFIX = b',"metrics":'
+VERIFIED_PREFIX = b',"content_verified":'
+_VERIFIED_VALUES = {None: b"null", True: b"true", False: b"false"}
+
+
+class EncodedEntryCache:
+    """Bounded LRU of pre-encoded static and metrics segments per message."""
+
+    def __init__(self, max_entries: int = 100_000) -> None:
+        self._max_entries = max_entries
+        self._static: "OrderedDict[str, bytes]" = OrderedDict()
+        self._metrics: dict[str, Tuple[Hashable, bytes]] = {}
+        self._building: dict[str, object] = {}
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._static)
+
+    def static(self, message_id: str, build: Callable[[], bytes]) -> bytes:
+        with self._lock:
+            segment = self._static.get(message_id)
+            if segment is not None:
+                self._static.move_to_end(message_id)
+                self.hits += 1
+                return segment
+            self.misses += 1
+            token = self._building[message_id] = object()
+        segment = build()
+        with self._lock:
+            if self._building.get(message_id) is not token:
+                # Invalidated (or rebuilt by a later caller) while this build ran.
+                return segment
+            del self._building[message_id]
+            self._static[message_id] = segment
+            while len(self._static) > self._max_entries:
+                evicted, _ = self._static.popitem(last=False)
+                self._metrics.pop(evicted, None)
+        return segment
+
+    def metrics(self, message_id: str, version: Hashable, build: Callable[[], bytes]) -> bytes:
+        with self._lock:
+            cached: Optional[Tuple[Hashable, bytes]] = self._metrics.get(message_id)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        segment = build()
+        with self._lock:
+            # Keyed by the values it encodes, so a racing store is never stale for its version.
+            self._metrics[message_id] = (version, segment)
+        return segment
+
+    def invalidate(self, message_id: str) -> None:
+        with self._lock:
+            self._static.pop(message_id, None)
+            self._metrics.pop(message_id, None)
+            self._building.pop(message_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._static.clear()
+            self._metrics.clear()
+            self._building.clear()
+
+
+def splice(static: bytes, metrics: bytes, verified: Optional[bool] = None) -> bytes:
+    return static + VERIFIED_PREFIX + _VERIFIED_VALUES[verified] + METRICS_PREFIX + metrics + b"}"
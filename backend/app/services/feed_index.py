@@ -0,0 +1,86 @@
+"""Pre-sorted feed orderings maintained incrementally.
+
+Each sort mode keeps a ``SortedList`` of its keyset tuples (the last element of
+every key is the message id), so a page is a bisect to the cursor followed by
+a reverse walk: O(log N + K) instead of re-sorting the candidate set per hit.
+"""
+from __future__ import annotations
+
+from itertools import islice
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from sortedcontainers import SortedList
+
+if TYPE_CHECKING:  # pragma: no cover - import cycle guard
+    from .messages import MessageSeed
+
+SortKey = Tuple[Any, ...]
+KeyFunction = Callable[["MessageSeed", str], SortKey]
+
+# Below this candidate/total ratio it is cheaper to sort the filtered ids than
+# to walk the full ordering and skip non-matching rows.
+_DIRECT_SORT_RATIO = 0.05
+
+
+class FeedSortIndex:
+    """One descending ordering per sort mode, kept current on every write."""
+
+    def __init__(self, key_fn: KeyFunction, modes: Sequence[str], seeds: Iterable["MessageSeed"] = ()) -> None:
+        self._key_fn = key_fn
+        self._orderings: Dict[str, SortedList] = {mode: SortedList() for mode in modes}
+        self._keys: Dict[str, Dict[str, SortKey]] = {mode: {} for mode in modes}
+        for seed in seeds:
+            self.update(seed)
+
+    def update(self, seed: "MessageSeed") -> None:
+        """Insert ``seed`` or move it to its new position in every ordering."""
+        for mode, ordering in self._orderings.items():
+            keys = self._keys[mode]
+            key = self._key_fn(seed, mode)
+            previous = keys.get(seed.id)
+            if previous == key:
+                continue
+            if previous is not None:
+                ordering.remove(previous)
+            ordering.add(key)
+            keys[seed.id] = key
+
+    add = update
+
+    def remove(self, message_id: str) -> None:
+        for mode, ordering in self._orderings.items():
+            previous = self._keys[mode].pop(message_id, None)
+            if previous is not None:
+                ordering.remove(previous)
+
+    def page(
+        self,
+        sort: str,
+        *,
+        after: Optional[SortKey] = None,
+        limit: Optional[int] = None,
+        candidates: Optional[Set[str]] = None,
+    ) -> List[SortKey]:
+        """Return up to ``limit`` keys ordered descending and strictly below ``after``.
+
+        ``candidates`` restricts the page to a filtered id set (search and tag
+        postings).  Small sets are sorted directly; large ones are intersected
+        while walking the ordering so only ``limit`` matches are materialized.
+        """
+        ordering = self._orderings[sort]
+        if candidates is not None and len(candidates) <= max(limit or 0, len(ordering) * _DIRECT_SORT_RATIO):
+            keys = self._keys[sort]
+            selected = [keys[message_id] for message_id in candidates if message_id in keys]
+            if after is not None:
+                selected = [key for key in selected if key < after]
+            selected.sort(reverse=True)
+            return selected if limit is None else selected[:limit]
+
+        walk: Iterator[SortKey]
+        if after is None:
+            walk = reversed(ordering)
+        else:
+            walk = ordering.irange(maximum=after, inclusive=(True, False), reverse=True)
+        if candidates is not None:
+            walk = (key for key in walk if key[-1] in candidates)
+        return list(walk if limit is None else islice(walk, limit))
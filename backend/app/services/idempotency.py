@@ -0,0 +1,403 @@
+"""Idempotency stores for request handlers that must not run twice.
+
+``run(key, execute)`` executes ``execute`` at most once per key within the
+TTL and hands every later caller the stored result.  A caller arriving while
+the first execution is still in flight waits for it instead of starting a
+second one; if the first execution fails nothing is stored and one of the
+waiters takes over.  Callers that wait longer than ``wait_timeout`` get
+``IdempotencyInProgressError``.
+
+``MemoryIdempotencyStore`` keeps results in a dict with a min-heap of expiry
+times, so expiring or evicting an entry costs O(log N) instead of a scan.
+It only deduplicates within one process.
+
+``SqliteIdempotencyStore`` shares claims and results between worker
+processes through one SQLite file.  A claim is a ``pending`` row with a
+lease and a random owner token.  While ``execute`` runs, a heartbeat thread
+extends the leases the store holds every ``lease / 3`` seconds, so only a
+worker that dies mid-request leaves a row that expires and can be claimed
+again.  Finishing or abandoning a claim only touches the row if it still
+carries the worker's token, so a worker that lost its lease cannot overwrite
+the result of the one that took over.  Results are stored as text via the
+``encode``/``decode`` callables given to ``run``.
+"""
+from __future__ import annotations
+
+import abc
+import heapq
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+V = TypeVar("V")
+
+Encoder = Callable[[Any], str]
+Decoder = Callable[[str], Any]
+
+
+class IdempotencyInProgressError(RuntimeError):
+    """Another request with the same key is still executing."""
+
+    def __init__(self, key: str) -> None:
+        super().__init__(f"Request with idempotency key {key!r} is still in progress")
+        self.key = key
+
+
+class IdempotencyStore(abc.ABC):
+    """Interface shared by the in-memory and SQLite stores."""
+
+    @abc.abstractmethod
+    def run(
+        self,
+        key: str,
+        execute: Callable[[], V],
+        *,
+        encode: Encoder = json.dumps,
+        decode: Decoder = json.loads,
+    ) -> V:
+        """Return the stored result for ``key``, executing ``execute`` if there is none."""
+
+    @abc.abstractmethod
+    def clear(self) -> None:
+        """Forget every stored result."""
+
+    @abc.abstractmethod
+    def stats(self) -> Dict[str, Any]:
+        """Counters for the wallet metrics route."""
+
+
+@dataclass
+class _Flight:
+    done: threading.Event = field(default_factory=threading.Event)
+    succeeded: bool = False
+    value: Any = None
+
+
+class MemoryIdempotencyStore(IdempotencyStore):
+    """Single-process store with heap-ordered expiry and per-key in-flight waiting."""
+
+    def __init__(
+        self,
+        *,
+        ttl: float = 300.0,
+        max_entries: int = 100_000,
+        wait_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.wait_timeout = wait_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._results: Dict[str, Tuple[float, Any]] = {}
+        # (expires_at, key); entries whose key was since re-stored are skipped lazily.
+        self._expiry: List[Tuple[float, str]] = []
+        self._flights: Dict[str, _Flight] = {}
+        self.executed = 0
+        self.replayed = 0
+        self.waited = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    def run(
+        self,
+        key: str,
+        execute: Callable[[], V],
+        *,
+        encode: Encoder = json.dumps,
+        decode: Decoder = json.loads,
+    ) -> V:
+        deadline = self._clock() + self.wait_timeout
+        while True:
+            with self._lock:
+                self._expire(self._clock())
+                stored = self._results.get(key)
+                if stored is not None:
+                    self.replayed += 1
+                    return stored[1]
+                flight = self._flights.get(key)
+                leader = flight is None
+                if leader:
+                    flight = self._flights[key] = _Flight()
+                    self.executed += 1
+                else:
+                    self.waited += 1
+
+            if leader:
+                return self._lead(key, flight, execute)
+            if not flight.done.wait(max(0.0, deadline - self._clock())):
+                raise IdempotencyInProgressError(key)
+            if flight.succeeded:
+                return flight.value
+            # The first execution failed; retry the claim so one waiter runs it again.
+
+    def _lead(self, key: str, flight: _Flight, execute: Callable[[], V]) -> V:
+        try:
+            value = execute()
+        except BaseException:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+            raise
+        with self._lock:
+            self._flights.pop(key, None)
+            expires_at = self._clock() + self.ttl
+            self._results[key] = (expires_at, value)
+            heapq.heappush(self._expiry, (expires_at, key))
+            while len(self._results) > self.max_entries:
+                self._pop_oldest()
+                self.evictions += 1
+        flight.value = value
+        flight.succeeded = True
+        flight.done.set()
+        return value
+
+    def _expire(self, now: float) -> None:
+        while self._expiry and self._expiry[0][0] <= now:
+            self._pop_oldest()
+
+    def _pop_oldest(self) -> None:
+        expires_at, key = heapq.heappop(self._expiry)
+        stored = self._results.get(key)
+        if stored is not None and stored[0] == expires_at:
+            del self._results[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._results.clear()
+            self._expiry.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "backend": "memory",
+                "entries": len(self._results),
+                "in_flight": len(self._flights),
+                "executed": self.executed,
+                "replayed": self.replayed,
+                "waited": self.waited,
+                "evictions": self.evictions,
+            }
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS idempotency_keys (
+    key TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    payload TEXT,
+    owner TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_idempotency_keys_expires_at ON idempotency_keys (expires_at);
+"""
+
+_PENDING = "pending"
+_DONE = "done"
+
+
+class SqliteIdempotencyStore(IdempotencyStore):
+    """Store shared by several worker processes through one SQLite database file."""
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        ttl: float = 300.0,
+        lease: float = 60.0,
+        wait_timeout: float = 30.0,
+        poll_interval: float = 0.02,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.path = path
+        self.ttl = ttl
+        self.lease = lease
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+        self._clock = clock
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        # Keys this store is executing -> owner token, renewed by the heartbeat thread.
+        self._leases: Dict[str, str] = {}
+        self._lease_lock = threading.Lock()
+        self._heartbeat: Optional[threading.Thread] = None
+        self.executed = 0
+        self.replayed = 0
+        self.waited = 0
+        self.lost_leases = 0
+        conn = self._connection()
+        conn.executescript(_SCHEMA)
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(idempotency_keys)")}
+        if "owner" not in columns:
+            # Files created before claims carried an owner token.
+            conn.execute("ALTER TABLE idempotency_keys ADD COLUMN owner TEXT")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Autocommit mode; claims use explicit BEGIN IMMEDIATE transactions.
+            conn = sqlite3.connect(self.path, timeout=self.wait_timeout, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _count(self, name: str) -> None:
+        with self._stats_lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def _claim(self, key: str, owner: str) -> Tuple[str, Optional[str]]:
+        """Return ("claimed", None), ("done", payload) or ("pending", None); claims are made for ``owner``."""
+        conn = self._connection()
+        now = self._clock()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Expired results and abandoned claims; the expires_at index keeps this cheap.
+            conn.execute("DELETE FROM idempotency_keys WHERE expires_at <= ?", (now,))
+            row = conn.execute("SELECT status, payload FROM idempotency_keys WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                conn.execute(
+                    "INSERT INTO idempotency_keys (key, status, expires_at, owner) VALUES (?, ?, ?, ?)",
+                    (key, _PENDING, now + self.lease, owner),
+                )
+                outcome: Tuple[str, Optional[str]] = ("claimed", None)
+            elif row[0] == _DONE:
+                outcome = ("done", row[1])
+            else:
+                outcome = ("pending", None)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return outcome
+
+    def _hold(self, key: str, owner: str) -> None:
+        with self._lease_lock:
+            self._leases[key] = owner
+            if self._heartbeat is None:
+                self._heartbeat = threading.Thread(target=self._renew_leases, name="idempotency-lease", daemon=True)
+                self._heartbeat.start()
+
+    def _release(self, key: str) -> None:
+        with self._lease_lock:
+            self._leases.pop(key, None)
+
+    def _renew_leases(self) -> None:
+        """Extend held leases every ``lease / 3`` seconds; exits once none are held."""
+        while True:
+            time.sleep(self.lease / 3)
+            with self._lease_lock:
+                leases = list(self._leases.items())
+                if not leases:
+                    self._heartbeat = None
+                    return
+            expires_at = self._clock() + self.lease
+            try:
+                self._connection().executemany(
+                    "UPDATE idempotency_keys SET expires_at = ? WHERE key = ? AND owner = ? AND status = ?",
+                    [(expires_at, key, owner, _PENDING) for key, owner in leases],
+                )
+            except sqlite3.Error as exc:
+                logger.warning("could not renew idempotency leases: %s", exc)
+
+    def run(
+        self,
+        key: str,
+        execute: Callable[[], V],
+        *,
+        encode: Encoder = json.dumps,
+        decode: Decoder = json.loads,
+    ) -> V:
+        deadline = time.monotonic() + self.wait_timeout
+        waited = False
+        owner = uuid.uuid4().hex
+        while True:
+            outcome, payload = self._claim(key, owner)
+            if outcome == "done":
+                self._count("replayed")
+                return decode(payload)
+            if outcome == "claimed":
+                self._count("executed")
+                break
+            if not waited:
+                self._count("waited")
+                waited = True
+            if time.monotonic() >= deadline:
+                raise IdempotencyInProgressError(key)
+            time.sleep(self.poll_interval)
+
+        conn = self._connection()
+        self._hold(key, owner)
+        try:
+            value = execute()
+        except BaseException:
+            self._release(key)
+            conn.execute(
+                "DELETE FROM idempotency_keys WHERE key = ? AND owner = ? AND status = ?", (key, owner, _PENDING)
+            )
+            raise
+        self._release(key)
+        stored = conn.execute(
+            "UPDATE idempotency_keys SET status = ?, expires_at = ?, payload = ? WHERE key = ? AND owner = ?",
+            (_DONE, self._clock() + self.ttl, encode(value), key, owner),
+        ).rowcount
+        if not stored:
+            # The lease expired (e.g. the heartbeat could not reach the file) and
+            # another worker claimed the key; its result stands.
+            self._count("lost_leases")
+            logger.warning("idempotency lease for %r was lost before the result was stored", key)
+        return value
+
+    def clear(self) -> None:
+        self._connection().execute("DELETE FROM idempotency_keys")
+
+    def stats(self) -> Dict[str, Any]:
+        (entries,) = self._connection().execute("SELECT COUNT(*) FROM idempotency_keys").fetchone()
+        with self._stats_lock:
+            return {
+                "backend": "sqlite",
+                "entries": entries,
+                "executed": self.executed,
+                "replayed": self.replayed,
+                "waited": self.waited,
+                "lost_leases": self.lost_leases,
+            }
+
+
+def create_idempotency_store() -> IdempotencyStore:
+    """Build the store selected by ``IDEMPOTENCY_BACKEND``."""
+    backend = settings.IDEMPOTENCY_BACKEND
+    if backend == "memory":
+        return MemoryIdempotencyStore(ttl=settings.IDEMPOTENCY_TTL_SECONDS)
+    if backend == "sqlite":
+        return SqliteIdempotencyStore(settings.IDEMPOTENCY_DB_PATH, ttl=settings.IDEMPOTENCY_TTL_SECONDS)
+    raise ValueError(f"Unknown IDEMPOTENCY_BACKEND: {backend!r}")
+
+
+_STORE: Optional[IdempotencyStore] = None
+_STORE_LOCK = threading.Lock()
+
+
+def get_idempotency_store() -> IdempotencyStore:
+    """Return the process-wide store, creating it from settings on first use."""
+    global _STORE
+    with _STORE_LOCK:
+        if _STORE is None:
+            _STORE = create_idempotency_store()
+        return _STORE
+
+
+def use_idempotency_store(store: Optional[IdempotencyStore]) -> None:
+    global _STORE
+    with _STORE_LOCK:
+        _STORE = store
@@ -0,0 +1,318 @@
+"""Server-push fan-out of message metrics and proposal changes.
+
+Clients that poll ``GET /messages`` for like/alert counts and status changes
+recompute a whole feed page for a handful of changed numbers.  ``LiveHub``
+instead pushes compact deltas to subscribers of topics:
+
+* ``feed`` - every message; ``tag:<tag>`` and ``message:<id>`` - a subset;
+* ``proposals`` - every proposal; ``proposal:<id>`` - one proposal.
+
+Publishers (``app.services.messages`` after reactions are applied or a status
+changes, ``ProposalBook`` after votes) call ``publish`` from any thread; it
+only records the latest payload per item, so a burst of likes on one message
+is one entry.  Every ``frame_interval`` (100 ms) the hub task drains those
+entries into one frame ``{"seq": n, "messages": [...], "proposals": [...]}``
+per distinct topic set among the touched subscribers.  The frame is encoded
+once and shared by every client with that set.
+
+Each subscriber has a bounded frame queue.  A client that falls
+``max_frames`` frames behind is evicted rather than buffered without limit;
+it reconnects and reloads the feed.  The WebSocket and SSE transports live
+in ``app.api.live``.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, FrozenSet, Hashable, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+TOPIC_PREFIXES = ("tag:", "message:", "proposal:")
+WILDCARD_TOPICS = ("feed", "proposals")
+
+# (section, item id) -> (topics, payload)
+Pending = Dict[Tuple[str, Hashable], Tuple[Sequence[str], Mapping[str, Any]]]
+
+
+class SubscriptionClosed(Exception):
+    """Raised by ``Subscriber.next_frame`` once the hub has dropped the subscriber."""
+
+    def __init__(self, reason: str) -> None:
+        super().__init__(reason)
+        self.reason = reason
+
+
+def parse_topics(topics: Iterable[str], *, limit: int = 64) -> List[str]:
+    """Validated, de-duplicated topics; raises ``ValueError`` for unknown ones.
+
+    Tags match case-insensitively, as in the feed's tag filter.
+    """
+    parsed: List[str] = []
+    for topic in topics:
+        topic = topic.strip()
+        if topic.startswith("tag:"):
+            topic = topic.lower()
+        if topic in parsed:
+            continue
+        if topic not in WILDCARD_TOPICS:
+            prefix, _, name = topic.partition(":")
+            if f"{prefix}:" not in TOPIC_PREFIXES or not name:
+                raise ValueError(f"unknown topic {topic!r}")
+        parsed.append(topic)
+    if len(parsed) > limit:
+        raise ValueError(f"at most {limit} topics per client")
+    return parsed
+
+
+class Subscriber:
+    """One client's topics and bounded queue of encoded frames."""
+
+    def __init__(self, topics: Iterable[str], max_frames: int) -> None:
+        self.topics: FrozenSet[str] = frozenset(topics)
+        self.max_frames = max_frames
+        self.frames_sent = 0
+        self._frames: Deque[str] = deque()
+        self._waiter: Optional[asyncio.Future] = None
+        self._closed: Optional[str] = None
+
+    @property
+    def closed(self) -> Optional[str]:
+        """Why the hub dropped this subscriber, or ``None`` while it is live."""
+        return self._closed
+
+    def offer(self, frame: str) -> bool:
+        """Queue ``frame``; ``False`` when the queue is full."""
+        if len(self._frames) >= self.max_frames:
+            return False
+        self._frames.append(frame)
+        self._wake()
+        return True
+
+    def close(self, reason: str) -> None:
+        if self._closed is None:
+            self._closed = reason
+            self._wake()
+
+    async def next_frame(self, timeout: Optional[float] = None) -> Optional[str]:
+        """The next frame, or ``None`` after ``timeout`` seconds without one."""
+        while not self._frames:
+            if self._closed is not None:
+                raise SubscriptionClosed(self._closed)
+            self._waiter = asyncio.get_running_loop().create_future()
+            try:
+                if timeout is None:
+                    await self._waiter
+                else:
+                    await asyncio.wait_for(self._waiter, timeout)
+            except asyncio.TimeoutError:
+                return None
+            finally:
+                self._waiter = None
+        self.frames_sent += 1
+        return self._frames.popleft()
+
+    def _wake(self) -> None:
+        # A plain future rather than an asyncio.Event: one wake-up per frame
+        # for every client is the bulk of a fan-out.
+        waiter = self._waiter
+        if waiter is not None and not waiter.done():
+            waiter.set_result(None)
+
+
+class LiveHub:
+    """Topic subscriptions, delta coalescing and frame fan-out on one event loop.
+
+    ``publish`` may be called from any thread; everything else runs on the
+    loop the hub was started on.  Subscribers are grouped by their exact
+    topic set, so a frame walks topics and groups rather than every client.
+    """
+
+    def __init__(self, *, frame_interval: float = 0.1, max_frames: int = 64, max_topics: int = 64) -> None:
+        self.frame_interval = frame_interval
+        self.max_frames = max_frames
+        self.max_topics = max_topics
+        self._lock = threading.Lock()
+        self._pending: Pending = {}
+        self._groups: Dict[FrozenSet[str], Set[Subscriber]] = {}
+        self._topics: Dict[str, Set[FrozenSet[str]]] = {}
+        self._subscribers: Set[Subscriber] = set()
+        self._task: Optional[asyncio.Task] = None
+        self._seq = 0
+        self.published = 0
+        self.frames = 0
+        self.deliveries = 0
+        self.evicted = 0
+        self.last_flush_seconds = 0.0
+
+    @property
+    def listening(self) -> bool:
+        """Whether anyone is subscribed; publishers skip building payloads otherwise."""
+        return bool(self._subscribers)
+
+    def publish(self, section: str, item_id: Hashable, topics: Sequence[str], payload: Mapping[str, Any]) -> None:
+        """Record the latest ``payload`` of an item; it goes out with the next frame."""
+        with self._lock:
+            self._pending[(section, item_id)] = (topics, payload)
+            self.published += 1
+
+    def subscribe(self, topics: Iterable[str]) -> Subscriber:
+        subscriber = Subscriber(parse_topics(topics, limit=self.max_topics), self.max_frames)
+        self._subscribers.add(subscriber)
+        self._attach(subscriber)
+        return subscriber
+
+    def update(self, subscriber: Subscriber, *, add: Iterable[str] = (), remove: Iterable[str] = ()) -> None:
+        """Change a live subscriber's topics."""
+        topics = (subscriber.topics - set(parse_topics(remove, limit=self.max_topics))) | set(
+            parse_topics(add, limit=self.max_topics)
+        )
+        if len(topics) > self.max_topics:
+            raise ValueError(f"at most {self.max_topics} topics per client")
+        if subscriber in self._subscribers and topics != subscriber.topics:
+            self._detach(subscriber)
+            subscriber.topics = frozenset(topics)
+            self._attach(subscriber)
+
+    def unsubscribe(self, subscriber: Subscriber, reason: str = "unsubscribed") -> None:
+        if subscriber not in self._subscribers:
+            return
+        self._subscribers.discard(subscriber)
+        self._detach(subscriber)
+        subscriber.close(reason)
+
+    def flush(self) -> int:
+        """Send everything published since the last frame; returns the number of deliveries."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+        started = time.perf_counter()
+        topics = self._topics
+        by_topic: Dict[str, List[Tuple[str, Hashable]]] = {}
+        for key, (item_topics, _) in pending.items():
+            for topic in item_topics:
+                if topic in topics:
+                    by_topic.setdefault(topic, []).append(key)
+        touched: Dict[FrozenSet[str], List[str]] = {}
+        for topic in by_topic:
+            for group in topics[topic]:
+                touched.setdefault(group, []).append(topic)
+        if not touched:
+            return 0
+
+        self._seq += 1
+        frames: Dict[Tuple[str, ...], str] = {}
+        delivered = 0
+        slow: List[Subscriber] = []
+        for group, subscribed in touched.items():
+            key = tuple(subscribed)
+            frame = frames.get(key)
+            if frame is None:
+                frame = frames[key] = self._encode(pending, by_topic, key)
+            for subscriber in self._groups[group]:
+                if subscriber.offer(frame):
+                    delivered += 1
+                else:
+                    slow.append(subscriber)
+        for subscriber in slow:
+            self.unsubscribe(subscriber, "slow consumer")
+        self.evicted += len(slow)
+        self.frames += len(frames)
+        self.deliveries += delivered
+        self.last_flush_seconds = time.perf_counter() - started
+        return delivered
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop framing and drop every subscriber."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for subscriber in list(self._subscribers):
+            self.unsubscribe(subscriber, "shutdown")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "subscribers": len(self._subscribers),
+            "topics": len(self._topics),
+            "topic_sets": len(self._groups),
+            "published": self.published,
+            "frames": self.frames,
+            "deliveries": self.deliveries,
+            "evicted": self.evicted,
+            "last_flush_ms": self.last_flush_seconds * 1e3,
+        }
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.frame_interval)
+            try:
+                self.flush()
+            except Exception:  # noqa: BLE001 - a bad payload must not stop the stream
+                logger.exception("Live frame fan-out failed")
+
+    def _attach(self, subscriber: Subscriber) -> None:
+        group = subscriber.topics
+        members = self._groups.get(group)
+        if members is None:
+            members = self._groups[group] = set()
+            for topic in group:
+                self._topics.setdefault(topic, set()).add(group)
+        members.add(subscriber)
+
+    def _detach(self, subscriber: Subscriber) -> None:
+        group = subscriber.topics
+        members = self._groups[group]
+        members.discard(subscriber)
+        if not members:
+            del self._groups[group]
+            for topic in group:
+                groups = self._topics[topic]
+                groups.discard(group)
+                if not groups:
+                    del self._topics[topic]
+
+    def _encode(
+        self, pending: Pending, by_topic: Mapping[str, List[Tuple[str, Hashable]]], topics: Sequence[str]
+    ) -> str:
+        if len(topics) == 1:
+            keys: Iterable[Tuple[str, Hashable]] = by_topic[topics[0]]
+        else:
+            # An item on several of the client's topics is sent once.
+            keys = dict.fromkeys(key for topic in topics for key in by_topic[topic])
+        frame: Dict[str, Any] = {"seq": self._seq}
+        for section, item_id in keys:
+            frame.setdefault(section, []).append(pending[(section, item_id)][1])
+        return json.dumps(frame, separators=(",", ":"))
+
+
+_HUB: Optional[LiveHub] = None
+_HUB_LOCK = threading.Lock()
+
+
+def get_live_hub() -> LiveHub:
+    global _HUB
+    if _HUB is None:
+        with _HUB_LOCK:
+            if _HUB is None:
+                _HUB = LiveHub()
+    return _HUB
+
+
+def use_live_hub(hub: Optional[LiveHub]) -> None:
+    """Install ``hub`` for publishers and the live routes; ``None`` resets to a default."""
+    global _HUB
+    with _HUB_LOCK:
+        _HUB = hub
@@ -1,32 +1,38 @@
 from __future__ import annotations
 
+import base64
+import json
 from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Iterable, List, Sequence
+from functools import partial
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Mapping, Sequence, Set, Tuple
+
+import numpy as np
+from starlette.concurrency import run_in_threadpool
 
 from ..schemas import MessageCreator, MessageFeedEntry, MessageMetrics, MessageStatus
+from .content_hash import ContentClaim, Verification, get_content_verifier
+from .feed_cache import EncodedEntryCache, splice
+from .feed_index import FeedSortIndex
+from .live import get_live_hub
+from .search import MessageSearchIndex
+from .store import (
+    REVIEW_NONE,
+    STATUS_CODES,
+    STATUSES,
+    ColumnarMessageStore,
+    MessageSeed,
+    from_epoch_us,
+    to_epoch_us,
+)
+
+if TYPE_CHECKING:  # pragma: no cover - the repository imports this module
+    from ..repositories.messages import AsyncSqlMessageRepository, SqlMessageRepository
 
 LIKES_THRESHOLD = 20
 ALERTS_THRESHOLD = 20
 
 
-@dataclass(frozen=True)
-class MessageSeed:
-    id: str
-    title: str
-    content: str
-    tags: Sequence[str]
-    creator_id: str
-    creator_handle: str
-    creator_display_name: str
-    creator_avatar_url: str
-    likes: int
-    alerts: int
-    status: MessageStatus
-    created_at: datetime
-    updated_at: datetime
-
-
 MESSAGE_SEEDS: Sequence[MessageSeed] = (
     MessageSeed(
         id="msg-001",
@@ -111,6 +117,9 @@ def _status_reason(seed: MessageSeed) -> str | None:
 
 
 def _display_status(seed: MessageSeed) -> MessageStatus:
+    if seed.displayed_status is not None:
+        return seed.displayed_status
+    # Only seeds built by hand get here; stored ones carry the materialized status.
     if seed.status is not MessageStatus.NORMAL:
         return seed.status
     if seed.likes >= LIKES_THRESHOLD or seed.alerts >= ALERTS_THRESHOLD:
@@ -134,7 +143,28 @@ def _alerts_to_threshold(seed: MessageSeed) -> int | None:
     return ALERTS_THRESHOLD - seed.alerts
 
 
-def _build_entry(seed: MessageSeed) -> MessageFeedEntry:
+_NORMAL = STATUS_CODES[MessageStatus.NORMAL]
+_UNDER_REVIEW = STATUS_CODES[MessageStatus.UNDER_REVIEW]
+_NO_THRESHOLD = -1
+# Indexed by the store's REVIEW_* codes.
+_STATUS_REASONS = (None, "likes_threshold", "alerts_threshold")
+_RENDER_BATCH = 256
+
+# likes, alerts, base status, displayed status, reason, likes/alerts to threshold
+MetricsValues = Tuple[int, int, MessageStatus, MessageStatus, str | None, int | None, int | None]
+
+
+def _display_status_codes(review: np.ndarray, status: np.ndarray) -> np.ndarray:
+    """Displayed status from the store's materialized review column."""
+    return np.where(review != REVIEW_NONE, _UNDER_REVIEW, status)
+
+
+def _to_threshold_column(counts: np.ndarray, status: np.ndarray, threshold: int) -> np.ndarray:
+    """Vectorized ``_likes_to_threshold``/``_alerts_to_threshold``; -1 stands for ``None``."""
+    return np.where(status == _NORMAL, np.maximum(threshold - counts, 0), _NO_THRESHOLD)
+
+
+def _build_entry(seed: MessageSeed, verified: bool | None = None) -> MessageFeedEntry:
     status_reason = _status_reason(seed)
     return MessageFeedEntry(
         id=seed.id,
@@ -149,6 +179,7 @@ def _build_entry(seed: MessageSeed) -> MessageFeedEntry:
             display_name=seed.creator_display_name,
             avatar_url=seed.creator_avatar_url,
         ),
+        content_verified=verified,
         metrics=MessageMetrics(
             likes=seed.likes,
             alerts=seed.alerts,
@@ -182,42 +213,542 @@ def _tags_match(seed_tags: Sequence[str], required: Sequence[str], mode: str) ->
     return any(tag in seed_lower for tag in required_lower)
 
 
-def _sort_entries(entries: Iterable[MessageSeed], sort: str) -> List[MessageSeed]:
+_CURSOR_LAYOUTS: Dict[str, Tuple[type, ...]] = {
+    "latest": (int, str),
+    "likes": (int, int, str),
+    "alerts": (int, int, str),
+    "under_review": (int, int, int, str),
+}
+SORT_MODES = tuple(_CURSOR_LAYOUTS)
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded for the requested sort."""
+
+
+@dataclass(frozen=True)
+class MessagePage:
+    message_ids: Sequence[str]
+    next_cursor: str | None
+    # Set when the page was read from a repository rather than the in-process store.
+    seeds: Sequence[MessageSeed] | None = None
+
+    @property
+    def entries(self) -> Iterator[MessageFeedEntry]:
+        if self.seeds is not None:
+            verified = _verified([seed.id for seed in self.seeds])
+            return (_build_entry(seed, verified.get(seed.id)) for seed in self.seeds)
+        return _render(self.message_ids)
+
+    def encoded(self) -> Iterator[bytes]:
+        """Pre-serialized JSON objects for the page, spliced from cached segments."""
+        if self.seeds is not None:
+            return (entry.model_dump_json().encode() for entry in self.entries)
+        return _render_encoded(self.message_ids)
+
+
+def _sort_key(seed: MessageSeed, sort: str) -> Tuple[Any, ...]:
+    """Keyset for ``sort``; feeds are ordered by this tuple, descending."""
+    created = to_epoch_us(seed.created_at)
     if sort == "likes":
-        return sorted(entries, key=lambda seed: (seed.likes, seed.created_at), reverse=True)
+        return (seed.likes, created, seed.id)
     if sort == "alerts":
-        return sorted(entries, key=lambda seed: (seed.alerts, seed.created_at), reverse=True)
+        return (seed.alerts, created, seed.id)
     if sort == "under_review":
-        return sorted(
-            entries,
-            key=lambda seed: (
-                1 if _display_status(seed) is MessageStatus.UNDER_REVIEW else 0,
-                seed.likes,
-                seed.created_at,
-            ),
-            reverse=True,
+        flagged = 1 if _display_status(seed) is MessageStatus.UNDER_REVIEW else 0
+        return (flagged, seed.likes, created, seed.id)
+    return (created, seed.id)
+
+
+def _normalize_sort(sort: str | None) -> str:
+    value = (sort or "latest").lower()
+    return value if value in SORT_MODES else "latest"
+
+
+def encode_cursor(sort: str, key: Sequence[Any]) -> str:
+    raw = json.dumps([sort, *key], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str, sort: str) -> Tuple[Any, ...]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        decoded = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as exc:
+        raise InvalidCursorError("Malformed cursor.") from exc
+    if not isinstance(decoded, list) or not decoded or decoded[0] != sort:
+        raise InvalidCursorError(f"Cursor does not belong to sort mode '{sort}'.")
+    key = tuple(decoded[1:])
+    layout = _CURSOR_LAYOUTS[sort]
+    if len(key) != len(layout) or any(type(part) is not kind for part, kind in zip(key, layout)):
+        raise InvalidCursorError("Malformed cursor.")
+    return key
+
+
+_STORE = ColumnarMessageStore(MESSAGE_SEEDS, review_thresholds=(LIKES_THRESHOLD, ALERTS_THRESHOLD))
+_SEARCH_INDEX = MessageSearchIndex(MESSAGE_SEEDS)
+_SORT_INDEX = FeedSortIndex(_sort_key, SORT_MODES, MESSAGE_SEEDS)
+_ENCODED_CACHE = EncodedEntryCache()
+
+
+_REPOSITORY: "SqlMessageRepository | None" = None
+_ASYNC_REPOSITORY: "AsyncSqlMessageRepository | None" = None
+
+
+def use_repository(repository: "SqlMessageRepository | None") -> None:
+    """Serve and persist messages through ``repository``; ``None`` restores the in-process store."""
+    global _REPOSITORY
+    _REPOSITORY = repository
+
+
+def use_async_repository(repository: "AsyncSqlMessageRepository | None") -> None:
+    """Serve feed pages to async handlers through ``repository`` (see ``page_messages_async``)."""
+    global _ASYNC_REPOSITORY
+    _ASYNC_REPOSITORY = repository
+
+
+def get_message(message_id: str) -> MessageSeed | None:
+    if _REPOSITORY is not None:
+        return _REPOSITORY.get(message_id)
+    return _STORE.get(message_id)
+
+
+def reaction_totals(message_id: str) -> Tuple[int, int] | None:
+    """Current ``(likes, alerts)`` of a message without materializing it."""
+    if _REPOSITORY is not None:
+        return _REPOSITORY.reaction_totals(message_id)
+    row = _STORE.row_of(message_id)
+    return None if row is None else (int(_STORE.likes[row]), int(_STORE.alerts[row]))
+
+
+def _write_message(seed: MessageSeed) -> None:
+    row = _STORE.upsert(seed)
+    _SEARCH_INDEX.update(seed)
+    _SORT_INDEX.update(_STORE.materialize(row))
+    _ENCODED_CACHE.invalidate(seed.id)
+
+
+def upsert_message(seed: MessageSeed) -> None:
+    """Insert or replace a message and refresh its search postings and orderings.
+
+    The body may have changed, so any earlier hash verification is dropped;
+    use ``ingest_messages`` to store bodies together with their on-chain hashes.
+    """
+    if _REPOSITORY is not None:
+        _REPOSITORY.upsert(seed)
+    else:
+        _write_message(seed)
+    get_content_verifier().cache.discard([seed.id])
+
+
+def ingest_messages(
+    seeds: Sequence[MessageSeed],
+    hashes: Mapping[str, Tuple[str, str]] | None = None,
+) -> List[Verification]:
+    """Store off-chain bodies and verify them against on-chain hashes.
+
+    ``hashes`` maps message ids to their on-chain ``(title_hash, content_hash)``.
+    Those bodies are hashed in batches on the verifier's thread pool and the
+    results cached for feed reads; seeds without hashes lose any earlier result.
+    """
+    seeds = list({seed.id: seed for seed in seeds}.values())
+    if _REPOSITORY is not None:
+        _REPOSITORY.upsert_many(seeds)
+    else:
+        for seed in seeds:
+            _write_message(seed)
+    hashes = hashes or {}
+    verifier = get_content_verifier()
+    unhashed = [seed.id for seed in seeds if seed.id not in hashes]
+    if unhashed:
+        verifier.cache.discard(unhashed)
+    claims = [
+        ContentClaim(seed.id, seed.title, seed.content, *hashes[seed.id]) for seed in seeds if seed.id in hashes
+    ]
+    return verifier.verify_many(claims) if claims else []
+
+
+def remove_message(message_id: str) -> None:
+    if _REPOSITORY is not None:
+        _REPOSITORY.remove(message_id)
+    else:
+        _STORE.remove(message_id)
+        _SEARCH_INDEX.remove(message_id)
+        _SORT_INDEX.remove(message_id)
+        _ENCODED_CACHE.invalidate(message_id)
+    get_content_verifier().cache.discard([message_id])
+
+
+def body_store_stats() -> Dict[str, int]:
+    """Blob store counters of the installed repository; empty when bodies are inline."""
+    return _REPOSITORY.blob_stats() if _REPOSITORY is not None else {}
+
+
+def _publish_metrics(seeds: Iterable[MessageSeed]) -> None:
+    """Push the new counts and displayed status of ``seeds`` to live subscribers."""
+    hub = get_live_hub()
+    for seed in seeds:
+        hub.publish(
+            "messages",
+            seed.id,
+            ("feed", f"message:{seed.id}", *(f"tag:{tag.lower()}" for tag in seed.tags)),
+            {
+                "id": seed.id,
+                "likes": seed.likes,
+                "alerts": seed.alerts,
+                "displayed_status": _display_status(seed).value,
+            },
         )
-    return sorted(entries, key=lambda seed: seed.created_at, reverse=True)
 
 
-def list_messages(
+def apply_reaction_delta(message_id: str, *, likes: int = 0, alerts: int = 0) -> MessageSeed | None:
+    """Add like/alert increments to a message and reposition it in the orderings."""
+    if _REPOSITORY is not None:
+        updated = _REPOSITORY.apply_reaction_delta(message_id, likes=likes, alerts=alerts)
+    else:
+        row = _STORE.add_reactions(message_id, likes=likes, alerts=alerts)
+        if row is None:
+            return None
+        updated = _STORE.materialize(row)
+        _SORT_INDEX.update(updated)
+    if updated is not None and get_live_hub().listening:
+        _publish_metrics([updated])
+    return updated
+
+
+def apply_reaction_deltas(
+    deltas: Mapping[str, Tuple[int, int]], log_position: Tuple[str, int] | None = None
+) -> Dict[str, Tuple[int, int]]:
+    """Apply a batch of ``message_id -> (likes, alerts)`` increments; unknown ids are skipped.
+
+    With a repository, ``log_position`` (the reaction log segment the batch
+    covers) is committed together with the counts; see ``applied_log_segment``.
+    Returns the ``(likes, alerts)`` each updated message has after the batch.
+    """
+    if _REPOSITORY is not None:
+        totals = _REPOSITORY.apply_reaction_deltas(deltas, log_position)
+        if deltas and get_live_hub().listening:
+            _publish_metrics(_REPOSITORY.get_many(list(deltas)))
+        return totals
+    totals = {}
+    for message_id, (likes, alerts) in deltas.items():
+        updated = apply_reaction_delta(message_id, likes=likes, alerts=alerts)
+        if updated is not None:
+            totals[message_id] = (updated.likes, updated.alerts)
+    return totals
+
+
+def mark_under_review(message_ids: Sequence[str]) -> List[MessageSeed]:
+    """Move NORMAL messages to UNDER_REVIEW once a proposal is opened for them.
+
+    Mirrors ``message.move``, where crossing a threshold puts the message
+    under review; messages already under review, hyped or spam are left
+    alone.  Returns the messages that moved.
+    """
+    if _REPOSITORY is not None:
+        updated = _REPOSITORY.mark_under_review(message_ids)
+    else:
+        updated = []
+        for message_id in dict.fromkeys(message_ids):
+            row = _STORE.row_of(message_id)
+            if row is None or _STORE.status[row] != _NORMAL:
+                continue
+            _STORE.set_status(message_id, MessageStatus.UNDER_REVIEW)
+            seed = _STORE.materialize(row)
+            _SORT_INDEX.update(seed)
+            updated.append(seed)
+    if updated and get_live_hub().listening:
+        _publish_metrics(updated)
+    return updated
+
+
+def applied_log_segment(log: str) -> int | None:
+    """Last segment of reaction log ``log`` already committed to the repository.
+
+    The in-process store starts from the fixtures on every boot, so nothing
+    logged before a restart has been applied to it.
+    """
+    return _REPOSITORY.applied_log_segment(log) if _REPOSITORY is not None else None
+
+
+def set_message_status(message_id: str, status: MessageStatus) -> MessageSeed | None:
+    if _REPOSITORY is not None:
+        updated = _REPOSITORY.set_status(message_id, status)
+    else:
+        row = _STORE.set_status(message_id, status)
+        if row is None:
+            return None
+        updated = _STORE.materialize(row)
+        _SORT_INDEX.update(updated)
+    if updated is not None and get_live_hub().listening:
+        _publish_metrics([updated])
+    return updated
+
+
+def dismiss_review(message_id: str) -> MessageSeed | None:
+    """Return a message to NORMAL after its proposal was rejected; it stays NORMAL past the thresholds."""
+    if _REPOSITORY is not None:
+        updated = _REPOSITORY.dismiss_review(message_id)
+    else:
+        row = _STORE.dismiss_review(message_id)
+        if row is None:
+            return None
+        updated = _STORE.materialize(row)
+        _SORT_INDEX.update(updated)
+    if updated is not None and get_live_hub().listening:
+        _publish_metrics([updated])
+    return updated
+
+
+def _batch_metrics(rows: np.ndarray) -> List[MetricsValues]:
+    """Vectorized metrics for a batch of store rows, as plain Python values."""
+    likes = _STORE.likes[rows]
+    alerts = _STORE.alerts[rows]
+    status = _STORE.status[rows]
+    review = _STORE.review[rows]
+    columns = zip(
+        likes.tolist(),
+        alerts.tolist(),
+        status.tolist(),
+        _display_status_codes(review, status).tolist(),
+        review.tolist(),
+        _to_threshold_column(likes, status, LIKES_THRESHOLD).tolist(),
+        _to_threshold_column(alerts, status, ALERTS_THRESHOLD).tolist(),
+    )
+    return [
+        (
+            like_count,
+            alert_count,
+            STATUSES[base],
+            STATUSES[displayed],
+            _STATUS_REASONS[reason],
+            None if likes_left == _NO_THRESHOLD else likes_left,
+            None if alerts_left == _NO_THRESHOLD else alerts_left,
+        )
+        for like_count, alert_count, base, displayed, reason, likes_left, alerts_left in columns
+    ]
+
+
+def _verified(message_ids: Sequence[str]) -> Dict[str, bool]:
+    """Cached verification results; a feed read never hashes bodies itself."""
+    found = get_content_verifier().cache.get_many(message_ids)
+    return {message_id: verification.verified for message_id, verification in found.items()}
+
+
+def _row_entry(row: int, values: MetricsValues, verified: bool | None = None) -> MessageFeedEntry:
+    likes, alerts, base, displayed, reason, likes_left, alerts_left = values
+    creator_id, handle, display_name, avatar_url = _STORE.creator_at(row)
+    return MessageFeedEntry(
+        id=_STORE.id_at(row),
+        title=_STORE.title_at(row),
+        content=_STORE.content_at(row),
+        tags=list(_STORE.tags_at(row)),
+        created_at=from_epoch_us(_STORE.created_at[row]),
+        updated_at=from_epoch_us(_STORE.updated_at_us(row)),
+        creator=MessageCreator(
+            id=creator_id,
+            handle=handle,
+            display_name=display_name,
+            avatar_url=avatar_url,
+        ),
+        content_verified=verified,
+        metrics=MessageMetrics(
+            likes=likes,
+            alerts=alerts,
+            base_status=base,
+            displayed_status=displayed,
+            status_reason=reason,
+            likes_to_threshold=likes_left,
+            alerts_to_threshold=alerts_left,
+        ),
+    )
+
+
+def _encode_metrics(values: MetricsValues) -> bytes:
+    likes, alerts, base, displayed, reason, likes_left, alerts_left = values
+    return json.dumps(
+        {
+            "likes": likes,
+            "alerts": alerts,
+            "base_status": base.value,
+            "displayed_status": displayed.value,
+            "status_reason": reason,
+            "likes_to_threshold": likes_left,
+            "alerts_to_threshold": alerts_left,
+        },
+        separators=(",", ":"),
+    ).encode()
+
+
+_STATIC_EXCLUDE = {"content_verified", "metrics"}
+
+
+def _encode_row(row: int, values: MetricsValues, verified: bool | None) -> bytes:
+    message_id = _STORE.id_at(row)
+    static = _ENCODED_CACHE.static(
+        message_id,
+        lambda: _row_entry(row, values).model_dump_json(exclude=_STATIC_EXCLUDE).encode()[:-1],
+    )
+    # likes, alerts and base status fully determine the derived metrics.
+    metrics = _ENCODED_CACHE.metrics(message_id, values[:3], lambda: _encode_metrics(values))
+    return splice(static, metrics, verified)
+
+
+def _live_batches(message_ids: Sequence[str]) -> Iterator[Tuple[List[str], np.ndarray]]:
+    for start in range(0, len(message_ids), _RENDER_BATCH):
+        batch = [message_id for message_id in message_ids[start : start + _RENDER_BATCH] if message_id in _STORE]
+        yield batch, _STORE.rows(batch)
+
+
+def _render(message_ids: Sequence[str]) -> Iterator[MessageFeedEntry]:
+    for batch, rows in _live_batches(message_ids):
+        verified = _verified(batch)
+        for message_id, row, values in zip(batch, rows.tolist(), _batch_metrics(rows)):
+            yield _row_entry(row, values, verified.get(message_id))
+
+
+def _render_encoded(message_ids: Sequence[str]) -> Iterator[bytes]:
+    for batch, rows in _live_batches(message_ids):
+        verified = _verified(batch)
+        for message_id, row, values in zip(batch, rows.tolist(), _batch_metrics(rows)):
+            yield _encode_row(row, values, verified.get(message_id))
+
+
+def _sort_entries(entries: Iterable[MessageSeed], sort: str) -> List[MessageSeed]:
+    sort_value = _normalize_sort(sort)
+    return sorted(entries, key=lambda seed: _sort_key(seed, sort_value), reverse=True)
+
+
+def _select(
     *,
-    search: str | None = None,
-    tags: Sequence[str] | None = None,
-    tag_mode: str = "or",
-    sort: str = "latest",
-) -> List[MessageFeedEntry]:
-    seeds = list(MESSAGE_SEEDS)
+    search: str | None,
+    tags: Sequence[str] | None,
+    tag_mode: str,
+    sort: str,
+    cursor: str | None,
+    limit: int | None,
+) -> Tuple[List[str], str | None]:
+    candidates: Set[str] | None = None
 
     if search:
-        seeds = [seed for seed in seeds if _matches_search(seed, search)]
+        candidates = _SEARCH_INDEX.search(search)
 
     if tags:
         mode = (tag_mode or "or").lower()
         if mode not in {"or", "and"}:
             mode = "or"
-        seeds = [seed for seed in seeds if _tags_match(seed.tags, tags, mode)]
+        tagged = _STORE.ids_with_tags(tags, mode)
+        candidates = tagged if candidates is None else candidates & tagged
+
+    sort_value = _normalize_sort(sort)
+    after = decode_cursor(cursor, sort_value) if cursor is not None else None
+    keys = _SORT_INDEX.page(
+        sort_value,
+        after=after,
+        limit=None if limit is None else limit + 1,
+        candidates=candidates,
+    )
 
-    sort_value = (sort or "latest").lower()
-    seeds = _sort_entries(seeds, sort_value)
-    return [_build_entry(seed) for seed in seeds]
+    next_cursor = None
+    if limit is not None and len(keys) > limit:
+        keys = keys[:limit]
+        next_cursor = encode_cursor(sort_value, keys[-1])
+    return [key[-1] for key in keys], next_cursor
+
+
+def _repository_query(
+    *,
+    search: str | None,
+    tags: Sequence[str] | None,
+    tag_mode: str,
+    sort: str,
+    cursor: str | None,
+    limit: int | None,
+) -> Dict[str, Any]:
+    mode = (tag_mode or "or").lower()
+    sort_value = _normalize_sort(sort)
+    return dict(
+        search=search,
+        tags=tags,
+        tag_mode=mode if mode in {"or", "and"} else "or",
+        sort=sort_value,
+        after=decode_cursor(cursor, sort_value) if cursor is not None else None,
+        limit=None if limit is None else limit + 1,
+    )
+
+
+def _repository_result(seeds: List[MessageSeed], sort: str, limit: int | None) -> MessagePage:
+    next_cursor = None
+    if limit is not None and len(seeds) > limit:
+        seeds = seeds[:limit]
+        next_cursor = encode_cursor(sort, _sort_key(seeds[-1], sort))
+    return MessagePage(message_ids=[seed.id for seed in seeds], next_cursor=next_cursor, seeds=seeds)
+
+
+def _repository_page(
+    *,
+    search: str | None,
+    tags: Sequence[str] | None,
+    tag_mode: str,
+    sort: str,
+    cursor: str | None,
+    limit: int | None,
+) -> MessagePage:
+    assert _REPOSITORY is not None
+    query = _repository_query(search=search, tags=tags, tag_mode=tag_mode, sort=sort, cursor=cursor, limit=limit)
+    return _repository_result(_REPOSITORY.page(**query), query["sort"], limit)
+
+
+def page_messages(
+    *,
+    search: str | None = None,
+    tags: Sequence[str] | None = None,
+    tag_mode: str = "or",
+    sort: str = "latest",
+    cursor: str | None = None,
+    limit: int | None = None,
+) -> MessagePage:
+    """Select one keyset page; entries are rendered lazily as they are consumed."""
+    if _REPOSITORY is not None:
+        return _repository_page(
+            search=search, tags=tags, tag_mode=tag_mode, sort=sort, cursor=cursor, limit=limit
+        )
+    message_ids, next_cursor = _select(
+        search=search, tags=tags, tag_mode=tag_mode, sort=sort, cursor=cursor, limit=limit
+    )
+    return MessagePage(message_ids=message_ids, next_cursor=next_cursor)
+
+
+async def page_messages_async(
+    *,
+    search: str | None = None,
+    tags: Sequence[str] | None = None,
+    tag_mode: str = "or",
+    sort: str = "latest",
+    cursor: str | None = None,
+    limit: int | None = None,
+) -> MessagePage:
+    """``page_messages`` for async handlers.
+
+    Uses the async repository when one is installed; a sync repository runs
+    on the threadpool, and the in-process store is queried inline.
+    """
+    params = dict(search=search, tags=tags, tag_mode=tag_mode, sort=sort, cursor=cursor, limit=limit)
+    if _ASYNC_REPOSITORY is not None:
+        query = _repository_query(**params)
+        return _repository_result(await _ASYNC_REPOSITORY.page(**query), query["sort"], limit)
+    if _REPOSITORY is not None:
+        return await run_in_threadpool(partial(_repository_page, **params))
+    message_ids, next_cursor = _select(**params)
+    return MessagePage(message_ids=message_ids, next_cursor=next_cursor)
+
+
+def list_messages(
+    *,
+    search: str | None = None,
+    tags: Sequence[str] | None = None,
+    tag_mode: str = "or",
+    sort: str = "latest",
+) -> List[MessageFeedEntry]:
+    page = page_messages(search=search, tags=tags, tag_mode=tag_mode, sort=sort)
+    return list(page.entries)
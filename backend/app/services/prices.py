@@ -0,0 +1,287 @@
+"""USD price oracle for the wallet routes.
+
+``PriceOracle`` holds the latest price of each symbol together with when and
+where it was fetched.  Reads never wait for the network: ``prices()`` returns
+the current snapshot, and once that snapshot is older than
+``refresh_interval`` it starts a revalidation in the background and keeps
+serving the stale values until the new ones land.  In the app a refresher
+task on the event loop (``start``/``stop``) keeps prices fresh ahead of
+reads; without it, reads trigger the background refresh themselves.
+
+Sources are tried in order and each symbol takes its price from the first
+source that returns one, so an offline ``FilePriceSource`` can back up a
+live feed.  The built-in placeholder prices only seed the oracle at startup;
+they are never a refresh source, so an outage cannot pass them off as fresh.
+A symbol no source returns keeps its last price and timestamp and reports
+as stale once it is older than ``stale_after``.
+"""
+from __future__ import annotations
+
+import abc
+import asyncio
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from decimal import Decimal
+from pathlib import Path
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence
+
+from ..config import settings
+
+if TYPE_CHECKING:  # pragma: no cover - httpx is imported when a live source first fetches
+    import httpx
+
+logger = logging.getLogger(__name__)
+
+# Placeholder prices used until a live source is configured.
+DEFAULT_PRICES_USD: Mapping[str, Decimal] = MappingProxyType(
+    {
+        "SWT": Decimal("0.001"),
+        "SUI": Decimal("3.66"),
+        "BTC": Decimal("155500"),
+        "ETH": Decimal("4500"),
+    }
+)
+
+
+@dataclass(frozen=True)
+class PricePoint:
+    symbol: str
+    price: Decimal
+    source: str
+    # Wall-clock time of the fetch; ``None`` for seed prices never fetched.
+    fetched_at: Optional[float]
+
+
+class PriceSource(abc.ABC):
+    """A place prices come from; ``fetch`` may return a subset of ``symbols``."""
+
+    name = "source"
+
+    @abc.abstractmethod
+    async def fetch(self, symbols: Sequence[str]) -> Mapping[str, Decimal]:
+        """Current USD prices of those ``symbols`` the source knows."""
+
+
+class StaticPriceSource(PriceSource):
+    name = "static"
+
+    def __init__(self, prices: Mapping[str, Decimal] = DEFAULT_PRICES_USD) -> None:
+        self._prices = dict(prices)
+
+    async def fetch(self, symbols: Sequence[str]) -> Mapping[str, Decimal]:
+        return {symbol: self._prices[symbol] for symbol in symbols if symbol in self._prices}
+
+
+class FilePriceSource(PriceSource):
+    """Prices from a JSON object such as ``{"SUI": "3.66"}``, re-read on every fetch."""
+
+    name = "file"
+
+    def __init__(self, path: str) -> None:
+        self.path = Path(path)
+
+    async def fetch(self, symbols: Sequence[str]) -> Mapping[str, Decimal]:
+        raw = json.loads(await asyncio.to_thread(self.path.read_text))
+        return {symbol: Decimal(str(raw[symbol])) for symbol in symbols if symbol in raw}
+
+
+class CoinGeckoPriceSource(PriceSource):
+    """CoinGecko's ``/simple/price`` endpoint (or anything that answers in its format)."""
+
+    name = "coingecko"
+
+    DEFAULT_IDS: Mapping[str, str] = MappingProxyType({"SUI": "sui", "BTC": "bitcoin", "ETH": "ethereum"})
+
+    def __init__(
+        self,
+        url: str = "https://api.coingecko.com/api/v3/simple/price",
+        *,
+        ids: Mapping[str, str] = DEFAULT_IDS,
+        timeout: float = 5.0,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ) -> None:
+        self.url = url
+        self.ids = dict(ids)
+        self.timeout = timeout
+        self._transport = transport
+
+    async def fetch(self, symbols: Sequence[str]) -> Mapping[str, Decimal]:
+        wanted = {self.ids[symbol]: symbol for symbol in symbols if symbol in self.ids}
+        if not wanted:
+            return {}
+        import httpx
+
+        async with httpx.AsyncClient(timeout=self.timeout, transport=self._transport) as client:
+            response = await client.get(self.url, params={"ids": ",".join(wanted), "vs_currencies": "usd"})
+            response.raise_for_status()
+            body = response.json()
+        return {symbol: Decimal(str(body[coin]["usd"])) for coin, symbol in wanted.items() if coin in body}
+
+
+class PriceOracle:
+    """Latest prices with per-symbol timestamps and stale-while-revalidate reads."""
+
+    def __init__(
+        self,
+        sources: Sequence[PriceSource],
+        *,
+        symbols: Iterable[str] = tuple(DEFAULT_PRICES_USD),
+        seed: Mapping[str, Decimal] = DEFAULT_PRICES_USD,
+        refresh_interval: float = 30.0,
+        stale_after: float = 300.0,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.sources = list(sources)
+        self.symbols = tuple(symbols)
+        self.refresh_interval = refresh_interval
+        self.stale_after = stale_after
+        self._clock = clock
+        # Copy-on-write: a refresh swaps in new dicts, so readers never lock.
+        self._points: Mapping[str, PricePoint] = {
+            symbol: PricePoint(symbol, seed[symbol], "seed", None) for symbol in self.symbols if symbol in seed
+        }
+        self._prices: Mapping[str, Decimal] = MappingProxyType(
+            {symbol: point.price for symbol, point in self._points.items()}
+        )
+        self._refreshed_at: Optional[float] = None
+        self._refresh_lock = threading.Lock()
+        self._refreshing = False
+        self._task: Optional[asyncio.Task] = None
+        self.refreshes = 0
+        self.background_refreshes = 0
+        self.source_failures: Dict[str, int] = {source.name: 0 for source in self.sources}
+        self.last_error: Optional[str] = None
+
+    def prices(self) -> Mapping[str, Decimal]:
+        """Current prices; never blocks, revalidates in the background when old."""
+        refreshed_at = self._refreshed_at
+        if refreshed_at is None or self._clock() - refreshed_at >= self.refresh_interval:
+            self._revalidate_in_background()
+        return self._prices
+
+    def points(self) -> Mapping[str, PricePoint]:
+        return self._points
+
+    async def refresh(self) -> Mapping[str, Decimal]:
+        """Fetch from the sources now and install whatever they returned."""
+        missing: List[str] = list(self.symbols)
+        fetched: Dict[str, PricePoint] = {}
+        for source in self.sources:
+            if not missing:
+                break
+            try:
+                result = await source.fetch(missing)
+            except Exception as exc:  # noqa: BLE001 - one bad source must not stop the others
+                self.source_failures[source.name] = self.source_failures.get(source.name, 0) + 1
+                self.last_error = f"{source.name}: {exc}"
+                logger.warning("Price source %s failed: %s", source.name, exc)
+                continue
+            now = self._clock()
+            for symbol in missing:
+                price = result.get(symbol)
+                if price is not None and price > 0:
+                    fetched[symbol] = PricePoint(symbol, Decimal(price), source.name, now)
+            missing = [symbol for symbol in missing if symbol not in fetched]
+
+        points = {**self._points, **fetched}
+        self._points = points
+        self._prices = MappingProxyType({symbol: point.price for symbol, point in points.items()})
+        self._refreshed_at = self._clock()
+        self.refreshes += 1
+        return self._prices
+
+    def _revalidate_in_background(self) -> None:
+        with self._refresh_lock:
+            if self._refreshing or self._task is not None:
+                return
+            self._refreshing = True
+        self.background_refreshes += 1
+        threading.Thread(target=self._run_refresh, name="price-oracle-refresh", daemon=True).start()
+
+    def _run_refresh(self) -> None:
+        try:
+            asyncio.run(self.refresh())
+        except Exception:  # noqa: BLE001
+            logger.exception("Background price refresh failed")
+        finally:
+            with self._refresh_lock:
+                self._refreshing = False
+
+    def start(self) -> None:
+        """Refresh every ``refresh_interval`` seconds on the running event loop."""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run(), name="price-oracle")
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except Exception:  # noqa: BLE001
+                logger.exception("Price refresh failed")
+            await asyncio.sleep(self.refresh_interval)
+
+    def stats(self) -> Dict[str, Any]:
+        now = self._clock()
+        symbols = {}
+        for symbol, point in self._points.items():
+            age = None if point.fetched_at is None else max(0.0, now - point.fetched_at)
+            symbols[symbol] = {
+                "price": format(point.price, "f"),
+                "source": point.source,
+                "age_seconds": age,
+                "stale": age is None or age >= self.stale_after,
+            }
+        return {
+            "symbols": symbols,
+            "refreshes": self.refreshes,
+            "background_refreshes": self.background_refreshes,
+            "source_failures": dict(self.source_failures),
+            "last_error": self.last_error,
+            "refresher_running": self._task is not None,
+        }
+
+
+def create_price_oracle() -> PriceOracle:
+    """Build the oracle from settings: API feed, then price file, seeded with the built-in prices."""
+    sources: List[PriceSource] = []
+    if settings.PRICE_API_URL:
+        sources.append(CoinGeckoPriceSource(settings.PRICE_API_URL))
+    if settings.PRICE_FILE:
+        sources.append(FilePriceSource(settings.PRICE_FILE))
+    return PriceOracle(
+        sources,
+        refresh_interval=settings.PRICE_REFRESH_INTERVAL_SECONDS,
+        stale_after=settings.PRICE_STALE_AFTER_SECONDS,
+    )
+
+
+_ORACLE: Optional[PriceOracle] = None
+_ORACLE_LOCK = threading.Lock()
+
+
+def get_price_oracle() -> PriceOracle:
+    """Return the process-wide oracle, creating it from settings on first use."""
+    global _ORACLE
+    with _ORACLE_LOCK:
+        if _ORACLE is None:
+            _ORACLE = create_price_oracle()
+        return _ORACLE
+
+
+def use_price_oracle(oracle: Optional[PriceOracle]) -> None:
+    global _ORACLE
+    with _ORACLE_LOCK:
+        _ORACLE = oracle
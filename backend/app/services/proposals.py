@@ -0,0 +1,654 @@
+"""Off-chain hype/scam proposals opened from reaction threshold crossings.
+
+``ReactionCounterBuffer`` reports a ``ThresholdCrossing`` the first time a
+message's likes or alerts reach their threshold.  ``ProposalPipeline`` moves
+those events off the request threads onto an asyncio queue; one worker drains
+the queue in batches and opens the matching proposals in ``ProposalBook``
+(HYPE for likes, SCAM for alerts, as in move/sources/vote.move), moving their
+messages to UNDER_REVIEW.  With a ``SqlProposalStore`` each crossing first
+claims its ``<message id>:<type>`` row in ``proposals``, so a crossing seen by
+several workers, or redelivered after a crash, opens one proposal.  Crossings
+are acknowledged back to the buffer only after their proposals exist.
+
+``ProposalBook`` also indexes the open proposals for manager dashboards, which
+poll every second and would otherwise rescan every proposal (on chain,
+``VotingSystem.active_proposals`` is a plain vector):
+
+* Open proposals are kept sorted by age per type, and by message and type.
+* Every manager is interned to a bit, and each open proposal keeps the bitset
+  of managers who voted on it, so "has X voted" is one bit test rather than a
+  scan of ``voters``.
+* Every open proposal holds a slot, and each manager a bitset of the slots
+  they voted on.  "Not yet voted by X" is the open-slot mask minus X's mask,
+  so building it costs O(open proposals for X) Python steps.
+* Votes update the tallies in place and resolve a proposal once one side
+  reaches ``QUORUM``.  ``apply_events`` folds ``ProposalCreated``,
+  ``VoteCast`` and ``ProposalResolved`` events (as ``app.indexer`` pages
+  them) into the same index.  Replayed votes are ignored.
+
+Proposal ids are the ``proposals`` row ids: ``<message id>:<type>`` for
+proposals opened from crossings, the object id for ones first seen on chain.
+With a database the book is rebuilt from the ``proposals`` and ``votes`` rows
+at startup (``load``), votes cast through the API are written back, and
+``PROPOSAL_FOLLOW_EVENTS`` keeps it current from the vote module's events.
+When a vote through the API resolves a proposal (``cast_vote``), its message
+becomes HYPED or SPAM, or returns to NORMAL when rejected.  Nothing is sent
+on chain: there the vote reaching quorum executes the proposal itself
+(move/sources/vote.move), and the follower folds its ``ProposalResolved``.
+
+Changes to the process-wide book are pushed to live subscribers of the
+``proposals`` and ``proposal:<id>`` topics (``app.services.live``).
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+from dataclasses import dataclass, replace
+from datetime import datetime, timezone
+from heapq import merge
+from itertools import islice
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+from sortedcontainers import SortedList
+
+from ..schemas import MessageStatus, ProposalStatus, ProposalSummary, ProposalType
+from .counters import KIND_ALERTS, KIND_LIKES, ThresholdCrossing
+from .live import get_live_hub
+from .messages import dismiss_review, mark_under_review, set_message_status
+
+if TYPE_CHECKING:  # pragma: no cover - the store imports this module
+    from ..repositories.proposals import SqlProposalStore
+
+logger = logging.getLogger(__name__)
+
+PROPOSAL_TYPES: Dict[str, ProposalType] = {KIND_LIKES: ProposalType.HYPE, KIND_ALERTS: ProposalType.SCAM}
+# Status a message takes when a proposal of each type passes.
+PASSED_STATUSES: Dict[ProposalType, MessageStatus] = {
+    ProposalType.HYPE: MessageStatus.HYPED,
+    ProposalType.SCAM: MessageStatus.SPAM,
+}
+
+# Votes one side needs to resolve a proposal, and the on-chain type and
+# status codes (move/sources/vote.move).
+QUORUM = 4
+CHAIN_TYPES = {0: ProposalType.HYPE, 1: ProposalType.SCAM}
+CHAIN_STATUSES = {
+    0: ProposalStatus.OPEN,
+    1: ProposalStatus.PASSED,
+    2: ProposalStatus.REJECTED,
+    3: ProposalStatus.EXECUTED,
+}
+
+
+def crossing_proposal_id(message_id: str, proposal_type: ProposalType) -> str:
+    """Row id of the proposal opened from a threshold crossing: one per message and type."""
+    return f"{message_id}:{proposal_type.value}"
+
+
+class ProposalError(Exception):
+    """Base class for votes the book refuses."""
+
+
+class UnknownProposalError(ProposalError, KeyError):
+    """Raised when a vote names a proposal that does not exist."""
+
+
+class ProposalClosedError(ProposalError):
+    """Raised when a vote targets a proposal that is no longer open."""
+
+
+class AlreadyVotedError(ProposalError):
+    """Raised when a manager votes twice on one proposal."""
+
+
+class NotAManagerError(ProposalError):
+    """Raised when the voter is not a known manager."""
+
+
+@dataclass(frozen=True)
+class Proposal:
+    id: str
+    message_id: str
+    proposal_type: ProposalType
+    status: ProposalStatus
+    trigger_count: int
+    created_at: datetime
+    approve_votes: int = 0
+    reject_votes: int = 0
+    chain_id: Optional[str] = None
+
+    def summary(self) -> ProposalSummary:
+        return ProposalSummary(
+            id=self.id,
+            message_id=self.message_id,
+            proposal_type=self.proposal_type,
+            status=self.status,
+            trigger_count=self.trigger_count,
+            created_at=self.created_at,
+            approve_votes=self.approve_votes,
+            reject_votes=self.reject_votes,
+        )
+
+
+class ProposalBook:
+    """In-process proposal registry; at most one open proposal per message and type.
+
+    ``on_change`` is called, under the book's lock, with every proposal that
+    is opened, gains a vote or is resolved.
+    """
+
+    def __init__(self, on_change: Optional[Callable[[Proposal], None]] = None) -> None:
+        self._on_change = on_change
+        self._lock = threading.Lock()
+        self._proposals: Dict[str, Proposal] = {}
+        self._open: Dict[Tuple[str, ProposalType], str] = {}
+        self._chain_ids: Dict[str, str] = {}
+        # Open proposals as (created_at, id), per type.
+        self._by_age: Dict[ProposalType, SortedList] = {kind: SortedList() for kind in ProposalType}
+        # Manager address -> bit, and per open proposal the bits of its voters.
+        self._managers: Dict[str, int] = {}
+        self._voters: Dict[str, int] = {}
+        # Open proposal id <-> slot, and per manager bit the slots voted on.
+        self._slots: Dict[str, int] = {}
+        self._slot_ids: List[str] = []
+        self._free_slots: List[int] = []
+        self._open_slots = 0
+        self._type_slots: Dict[ProposalType, int] = {kind: 0 for kind in ProposalType}
+        self._voted: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self._proposals)
+
+    def open_many(self, crossings: Iterable[ThresholdCrossing]) -> List[Proposal]:
+        """Open proposals for ``crossings``; returns only the newly opened ones."""
+        now = datetime.now(timezone.utc)
+        opened: List[Proposal] = []
+        with self._lock:
+            for crossing in crossings:
+                key = (crossing.message_id, PROPOSAL_TYPES[crossing.kind])
+                proposal_id = crossing_proposal_id(*key)
+                # As with the store's claim, a message and type get one crossing proposal ever.
+                if key in self._open or proposal_id in self._proposals:
+                    continue
+                opened.append(self._add(proposal_id, key[0], key[1], crossing.total, now))
+        return opened
+
+    def load(self, proposals: Iterable[Mapping[str, Any]], votes: Iterable[Mapping[str, Any]]) -> int:
+        """Rebuild the book from ``proposals`` and ``votes`` rows (``SqlProposalStore.load``).
+
+        Rows are replayed as their events were: a chain proposal for a message
+        and type with an open crossing proposal is linked to it, and open
+        proposals recount their votes.  Proposals already in the book are
+        skipped, so loading twice is harmless.  Returns how many were added.
+        """
+        added = 0
+        with self._lock:
+            for row in sorted(proposals, key=lambda row: (row["created_at"], row["id"])):
+                added += self._restore(row)
+            for row in sorted(votes, key=lambda row: row["cast_at"]):
+                proposal = self._proposals.get(self._chain_ids.get(row["proposal_id"], row["proposal_id"]))
+                if proposal is None or proposal.status is not ProposalStatus.OPEN:
+                    continue
+                bit = self._manager_bit(row["voter"])
+                if not self._voters[proposal.id] >> bit & 1:
+                    self._record_vote(proposal, bit, bool(row["approve"]))
+        return added
+
+    def add_managers(self, addresses: Iterable[str]) -> None:
+        """Allow ``addresses`` to vote; voters seen in ``VoteCast`` events are added too."""
+        with self._lock:
+            for address in addresses:
+                self._manager_bit(address)
+
+    def is_manager(self, address: str) -> bool:
+        return address in self._managers
+
+    def vote(self, proposal_id: str, voter: str, approve: bool) -> Proposal:
+        """Record ``voter``'s vote and return the proposal with its new tally."""
+        with self._lock:
+            proposal, bit = self._votable(proposal_id, voter)
+            return self._record_vote(proposal, bit, approve)
+
+    def check_vote(self, proposal_id: str, voter: str) -> None:
+        """Raise the error ``vote`` would, without recording anything."""
+        with self._lock:
+            self._votable(proposal_id, voter)
+
+    def apply_events(self, events: Iterable[Mapping[str, Any]]) -> int:
+        """Fold vote-module events into the book; returns how many changed it."""
+        applied = 0
+        with self._lock:
+            for event in events:
+                name = event["type"].split("<", 1)[0].rsplit("::", 1)[-1]
+                handler = _EVENT_HANDLERS.get(name)
+                if handler is not None and handler(self, event["parsedJson"], event):
+                    applied += 1
+        return applied
+
+    def get(self, proposal_id: str) -> Optional[Proposal]:
+        return self._proposals.get(proposal_id)
+
+    def list_open(
+        self,
+        proposal_type: Optional[ProposalType] = None,
+        message_id: Optional[str] = None,
+        *,
+        newest_first: bool = False,
+        limit: Optional[int] = None,
+    ) -> List[Proposal]:
+        """Open proposals, oldest first, optionally of one type and/or message."""
+        with self._lock:
+            kinds = list(ProposalType) if proposal_type is None else [proposal_type]
+            if message_id is not None:
+                ids = [self._open[key] for key in ((message_id, kind) for kind in kinds) if key in self._open]
+                keys: Iterator[Tuple[datetime, str]] = iter(
+                    sorted(
+                        ((self._proposals[proposal_id].created_at, proposal_id) for proposal_id in ids),
+                        reverse=newest_first,
+                    )
+                )
+            else:
+                indexes = [self._by_age[kind] for kind in kinds]
+                ordered = (reversed(index) if newest_first else iter(index) for index in indexes)
+                keys = merge(*ordered, reverse=newest_first)
+            return [self._proposals[proposal_id] for _, proposal_id in islice(keys, limit)]
+
+    def pending_for(
+        self, voter: str, proposal_type: Optional[ProposalType] = None, *, limit: Optional[int] = None
+    ) -> List[Proposal]:
+        """Open proposals ``voter`` has not voted on yet, oldest first."""
+        with self._lock:
+            bit = self._managers.get(voter)
+            if bit is None:
+                raise NotAManagerError(voter)
+            candidates = self._open_slots if proposal_type is None else self._type_slots[proposal_type]
+            pending = [self._proposals[self._slot_ids[slot]] for slot in _bits(candidates & ~self._voted[bit])]
+        pending.sort(key=lambda proposal: (proposal.created_at, proposal.id))
+        return pending if limit is None else pending[:limit]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "proposals": len(self._proposals),
+                "open": len(self._slots),
+                "managers": len(self._managers),
+                "slots": len(self._slot_ids),
+            }
+
+    def clear(self) -> None:
+        """Forget every proposal; registered managers are kept."""
+        with self._lock:
+            self._proposals.clear()
+            self._open.clear()
+            self._chain_ids.clear()
+            for index in self._by_age.values():
+                index.clear()
+            self._voters.clear()
+            self._slots.clear()
+            self._slot_ids.clear()
+            self._free_slots.clear()
+            self._open_slots = 0
+            self._type_slots = {kind: 0 for kind in ProposalType}
+            self._voted = [0] * len(self._voted)
+
+    # Index maintenance; callers hold the lock ------------------------------------
+
+    def _add(
+        self,
+        proposal_id: str,
+        message_id: str,
+        kind: ProposalType,
+        trigger_count: int,
+        created_at: datetime,
+        chain_id: Optional[str] = None,
+    ) -> Proposal:
+        proposal = Proposal(
+            id=proposal_id,
+            message_id=message_id,
+            proposal_type=kind,
+            status=ProposalStatus.OPEN,
+            trigger_count=trigger_count,
+            created_at=created_at,
+            chain_id=chain_id,
+        )
+        self._proposals[proposal.id] = proposal
+        self._open[(message_id, kind)] = proposal.id
+        if chain_id is not None:
+            self._chain_ids[chain_id] = proposal.id
+        self._by_age[kind].add((created_at, proposal.id))
+        self._voters[proposal.id] = 0
+        slot = self._free_slots.pop() if self._free_slots else len(self._slot_ids)
+        if slot == len(self._slot_ids):
+            self._slot_ids.append(proposal.id)
+        else:
+            self._slot_ids[slot] = proposal.id
+        self._slots[proposal.id] = slot
+        self._open_slots |= 1 << slot
+        self._type_slots[kind] |= 1 << slot
+        self._changed(proposal)
+        return proposal
+
+    def _close(self, proposal: Proposal, status: ProposalStatus, **tally: int) -> Proposal:
+        closed = replace(proposal, status=status, **tally)
+        self._proposals[proposal.id] = closed
+        del self._open[(proposal.message_id, proposal.proposal_type)]
+        self._by_age[proposal.proposal_type].remove((proposal.created_at, proposal.id))
+        slot = self._slots.pop(proposal.id)
+        cleared = ~(1 << slot)
+        # Only the managers who voted have this slot set.
+        for bit in _bits(self._voters.pop(proposal.id)):
+            self._voted[bit] &= cleared
+        self._open_slots &= cleared
+        self._type_slots[proposal.proposal_type] &= cleared
+        self._free_slots.append(slot)
+        self._changed(closed)
+        return closed
+
+    def _restore(self, row: Mapping[str, Any]) -> int:
+        proposal_id = row["id"]
+        if proposal_id in self._proposals or proposal_id in self._chain_ids:
+            return 0
+        key = (row["message_id"], ProposalType(row["proposal_type"]))
+        status = ProposalStatus(row["status"])
+        chain_id = None if proposal_id == crossing_proposal_id(*key) else proposal_id
+        held = self._open.get(key)
+        if held is not None:
+            if chain_id is None:
+                # A crossing claimed after the chain proposal opened: open_many skipped it too.
+                return 0
+            # The chain proposal for an open crossing proposal, as in _proposal_created.
+            linked = self._proposals[held] = replace(self._proposals[held], chain_id=chain_id)
+            self._chain_ids[chain_id] = held
+            if status is not ProposalStatus.OPEN:
+                self._close(linked, status, approve_votes=row["approve_votes"], reject_votes=row["reject_votes"])
+            return 0
+        trigger_count = row["trigger_count"] or 0
+        if status is ProposalStatus.OPEN:
+            # Tallies are recounted from the votes rows.
+            self._add(proposal_id, key[0], key[1], trigger_count, row["created_at"], chain_id)
+            return 1
+        self._proposals[proposal_id] = Proposal(
+            id=proposal_id,
+            message_id=key[0],
+            proposal_type=key[1],
+            status=status,
+            trigger_count=trigger_count,
+            created_at=row["created_at"],
+            approve_votes=row["approve_votes"],
+            reject_votes=row["reject_votes"],
+            chain_id=chain_id,
+        )
+        if chain_id is not None:
+            self._chain_ids[chain_id] = proposal_id
+        return 1
+
+    def _votable(self, proposal_id: str, voter: str) -> Tuple[Proposal, int]:
+        proposal = self._proposals.get(proposal_id)
+        if proposal is None:
+            raise UnknownProposalError(proposal_id)
+        bit = self._managers.get(voter)
+        if bit is None:
+            raise NotAManagerError(voter)
+        if proposal.status is not ProposalStatus.OPEN:
+            raise ProposalClosedError(proposal_id)
+        if self._voters[proposal_id] >> bit & 1:
+            raise AlreadyVotedError(proposal_id)
+        return proposal, bit
+
+    def _manager_bit(self, address: str) -> int:
+        bit = self._managers.get(address)
+        if bit is None:
+            bit = self._managers[address] = len(self._voted)
+            self._voted.append(0)
+        return bit
+
+    def _record_vote(self, proposal: Proposal, bit: int, approve: bool) -> Proposal:
+        self._voters[proposal.id] |= 1 << bit
+        self._voted[bit] |= 1 << self._slots[proposal.id]
+        if approve:
+            proposal = replace(proposal, approve_votes=proposal.approve_votes + 1)
+        else:
+            proposal = replace(proposal, reject_votes=proposal.reject_votes + 1)
+        self._proposals[proposal.id] = proposal
+        if proposal.approve_votes >= QUORUM:
+            return self._close(proposal, ProposalStatus.PASSED)
+        if proposal.reject_votes >= QUORUM:
+            return self._close(proposal, ProposalStatus.REJECTED)
+        self._changed(proposal)
+        return proposal
+
+    def _changed(self, proposal: Proposal) -> None:
+        if self._on_change is not None:
+            self._on_change(proposal)
+
+    # Event handlers; each returns whether the book changed --------------------------
+
+    def _proposal_created(self, fields: Mapping[str, Any], event: Mapping[str, Any]) -> bool:
+        chain_id = fields["proposal_id"]
+        if chain_id in self._chain_ids:
+            return False
+        key = (fields["message_id"], CHAIN_TYPES[int(fields["proposal_type"])])
+        proposal_id = self._open.get(key)
+        if proposal_id is not None:
+            # The chain proposal for one this book opened from a threshold crossing.
+            self._proposals[proposal_id] = replace(self._proposals[proposal_id], chain_id=chain_id)
+            self._chain_ids[chain_id] = proposal_id
+            return True
+        millis = event.get("timestampMs")
+        if millis is not None:
+            created_at = datetime.fromtimestamp(int(millis) / 1000, tz=timezone.utc)
+        else:
+            created_at = datetime.now(timezone.utc)
+        self._add(chain_id, key[0], key[1], 0, created_at, chain_id)
+        return True
+
+    def _vote_cast(self, fields: Mapping[str, Any], event: Mapping[str, Any]) -> bool:
+        proposal = self._proposals.get(self._chain_ids.get(fields["proposal_id"], ""))
+        if proposal is None or proposal.status is not ProposalStatus.OPEN:
+            return False
+        bit = self._manager_bit(fields["voter"])
+        if self._voters[proposal.id] >> bit & 1:
+            return False
+        self._record_vote(proposal, bit, bool(fields["vote"]))
+        return True
+
+    def _proposal_resolved(self, fields: Mapping[str, Any], event: Mapping[str, Any]) -> bool:
+        proposal = self._proposals.get(self._chain_ids.get(fields["proposal_id"], ""))
+        if proposal is None:
+            return False
+        status = CHAIN_STATUSES[int(fields["status"])]
+        # The resolution carries final totals, which supersede any counted votes.
+        tally = {"approve_votes": int(fields["approve_votes"]), "reject_votes": int(fields["reject_votes"])}
+        if proposal.status is ProposalStatus.OPEN:
+            if status is ProposalStatus.OPEN:
+                return False
+            self._close(proposal, status, **tally)
+        else:
+            self._proposals[proposal.id] = replace(proposal, status=status, **tally)
+            self._changed(self._proposals[proposal.id])
+        return True
+
+
+_EVENT_HANDLERS: Dict[str, Callable[[ProposalBook, Mapping[str, Any], Mapping[str, Any]], bool]] = {
+    "ProposalCreated": ProposalBook._proposal_created,
+    "VoteCast": ProposalBook._vote_cast,
+    "ProposalResolved": ProposalBook._proposal_resolved,
+}
+
+
+def _bits(mask: int) -> Iterator[int]:
+    """Set bit positions of ``mask``; one ``str.find`` per set bit."""
+    digits = bin(mask)
+    top = len(digits) - 1
+    index = digits.find("1", 2)
+    while index != -1:
+        yield top - index
+        index = digits.find("1", index + 1)
+
+
+class ProposalPipeline:
+    """Asyncio queue and batch worker between the counter buffer and ``ProposalBook``."""
+
+    def __init__(
+        self,
+        book: ProposalBook,
+        *,
+        store: "SqlProposalStore | None" = None,
+        batch_size: int = 256,
+        linger: float = 0.005,
+    ) -> None:
+        self._book = book
+        self._store = store
+        self._batch_size = batch_size
+        self._linger = linger
+        self._queue: asyncio.Queue[ThresholdCrossing] = asyncio.Queue()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._acknowledge: Optional[Callable[[ThresholdCrossing], None]] = None
+        self.batches = 0
+        self.opened = 0
+
+    def publish(self, crossing: ThresholdCrossing) -> None:
+        """Queue a crossing; safe to call from any thread."""
+        loop = self._loop
+        if loop is None or _running_loop() is loop:
+            self._queue.put_nowait(crossing)
+        else:
+            loop.call_soon_threadsafe(self._queue.put_nowait, crossing)
+
+    def start(self, acknowledge: Optional[Callable[[ThresholdCrossing], None]] = None) -> None:
+        """Start the worker on the running loop; ``acknowledge`` is called per handled crossing."""
+        self._loop = asyncio.get_running_loop()
+        self._acknowledge = acknowledge
+        self._worker = self._loop.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Handle everything already queued, then stop the worker."""
+        await self._queue.join()
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        self._loop = None
+
+    async def _run(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            if self._linger:
+                await asyncio.sleep(self._linger)
+            while len(batch) < self._batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                await asyncio.to_thread(self._handle, batch)
+            except Exception:  # noqa: BLE001 - unacknowledged crossings are redelivered
+                logger.exception("Opening proposals failed for %d crossings", len(batch))
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _handle(self, batch: List[ThresholdCrossing]) -> None:
+        claimed = batch if self._store is None else self._store.claim(batch)
+        opened = self._book.open_many(claimed)
+        # Idempotent, so crossings claimed before a crash still move their message.
+        mark_under_review([crossing.message_id for crossing in batch])
+        self.batches += 1
+        self.opened += len(opened)
+        for proposal in opened:
+            logger.info(
+                "Opened %s proposal %s for message %s", proposal.proposal_type.value, proposal.id, proposal.message_id
+            )
+        if self._acknowledge is not None:
+            for crossing in batch:
+                self._acknowledge(crossing)
+
+
+def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+def _publish(proposal: Proposal) -> None:
+    """Push a proposal's status and tally to live subscribers (see app.services.live)."""
+    hub = get_live_hub()
+    if hub.listening:
+        hub.publish(
+            "proposals",
+            proposal.id,
+            ("proposals", f"proposal:{proposal.id}"),
+            {
+                "id": proposal.id,
+                "message_id": proposal.message_id,
+                "proposal_type": proposal.proposal_type.value,
+                "status": proposal.status.value,
+                "approve_votes": proposal.approve_votes,
+                "reject_votes": proposal.reject_votes,
+            },
+        )
+
+
+_BOOK = ProposalBook(on_change=_publish)
+_STORE: "SqlProposalStore | None" = None
+# Serializes API votes so the check, the store write and the book update act as one.
+_VOTE_LOCK = threading.Lock()
+
+
+def get_proposal_book() -> ProposalBook:
+    return _BOOK
+
+
+def use_proposal_store(store: "SqlProposalStore | None") -> None:
+    """Write votes cast through ``cast_vote`` to ``store`` (``None`` keeps them in memory)."""
+    global _STORE
+    _STORE = store
+
+
+def list_open_proposals(
+    proposal_type: Optional[ProposalType] = None,
+    message_id: Optional[str] = None,
+    *,
+    newest_first: bool = False,
+    limit: Optional[int] = None,
+) -> List[ProposalSummary]:
+    return [
+        proposal.summary()
+        for proposal in _BOOK.list_open(proposal_type, message_id, newest_first=newest_first, limit=limit)
+    ]
+
+
+def pending_proposals(
+    voter: str, proposal_type: Optional[ProposalType] = None, *, limit: Optional[int] = None
+) -> List[ProposalSummary]:
+    return [proposal.summary() for proposal in _BOOK.pending_for(voter, proposal_type, limit=limit)]
+
+
+def cast_vote(proposal_id: str, voter: str, approve: bool) -> ProposalSummary:
+    """Vote through the API: stored first, so a failed write leaves the book untouched."""
+    with _VOTE_LOCK:
+        _BOOK.check_vote(proposal_id, voter)
+        if _STORE is not None and not _STORE.record_vote(proposal_id, voter, approve):
+            # Another worker recorded this voter first.
+            raise AlreadyVotedError(proposal_id)
+        proposal = _BOOK.vote(proposal_id, voter, approve)
+        if proposal.status is not ProposalStatus.OPEN:
+            if _STORE is not None:
+                _STORE.set_status(proposal.id, proposal.status)
+            apply_outcome(proposal)
+    return proposal.summary()
+
+
+def apply_outcome(proposal: Proposal) -> None:
+    """Move a resolved proposal's message off review: HYPED or SPAM when it passed.
+
+    A rejected proposal returns the message to NORMAL, unless another proposal
+    for it is still open.
+    """
+    if proposal.status is ProposalStatus.PASSED:
+        set_message_status(proposal.message_id, PASSED_STATUSES[proposal.proposal_type])
+    elif proposal.status is ProposalStatus.REJECTED and not _BOOK.list_open(message_id=proposal.message_id):
+        dismiss_review(proposal.message_id)
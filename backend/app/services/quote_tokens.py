@@ -0,0 +1,112 @@
+"""Stateless, MAC-signed swap quote tokens.
+
+``get_swap_quote`` hands the client a token that encodes the quoted pair,
+amounts and expiry, signed with a server key and bound to the requesting
+user.  ``execute_swap`` verifies the token instead of pricing the swap
+again.  Verification needs only the key, so any worker sharing
+``QUOTE_SIGNING_KEY`` (or ``SECRET_KEY``) accepts tokens issued by any other.
+
+Token layout: ``v1|receive_amount|expires_at|mac``.  ``mac`` is the hex
+keyed BLAKE2b-128 over the user id, the swap (pay symbol, receive symbol,
+normalized pay amount) and the rest of the token, so the swap itself is not
+repeated in the token: executing a different swap with it fails the MAC.
+Keyed BLAKE2b is a MAC in its own right and costs a third of HMAC-SHA256,
+which keeps verification cheaper than re-quoting.
+"""
+from __future__ import annotations
+
+import hashlib
+import hmac
+import logging
+import secrets
+import threading
+import time
+from decimal import Decimal, InvalidOperation
+from typing import Callable, Optional
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+_VERSION = "v1"
+_MAC_SIZE = 16
+_PERSON = b"suiworld.quote"
+
+
+class QuoteTokenError(ValueError):
+    """The token is malformed, tampered with, or issued for another swap or user."""
+
+
+class QuoteTokenExpiredError(QuoteTokenError):
+    pass
+
+
+class QuoteSigner:
+    def __init__(self, key: bytes, *, clock: Callable[[], float] = time.time) -> None:
+        if not key:
+            raise ValueError("Quote signing key must not be empty")
+        # BLAKE2b keys are at most 64 bytes; longer secrets are hashed down first.
+        if len(key) > 64:
+            key = hashlib.blake2b(key).digest()
+        self._mac_base = hashlib.blake2b(key=key, digest_size=_MAC_SIZE, person=_PERSON)
+        self._clock = clock
+
+    def _mac(self, subject: str, pay_symbol: str, receive_symbol: str, pay_amount: Decimal, body: str) -> str:
+        mac = self._mac_base.copy()
+        # str() of the normalized amount is canonical: "1", "1.0" and "1.00" all give "1".
+        mac.update(f"{subject}\0{pay_symbol}\0{receive_symbol}\0{pay_amount.normalize()}\0{body}".encode())
+        return mac.hexdigest()
+
+    def sign(
+        self,
+        subject: str,
+        pay_symbol: str,
+        receive_symbol: str,
+        pay_amount: Decimal,
+        receive_amount: Decimal,
+        expires_at: int,
+    ) -> str:
+        body = f"{_VERSION}|{receive_amount:f}|{expires_at}"
+        return f"{body}|{self._mac(subject, pay_symbol, receive_symbol, pay_amount, body)}"
+
+    def verify(self, token: str, subject: str, pay_symbol: str, receive_symbol: str, pay_amount: Decimal) -> Decimal:
+        """Return the quoted receive amount; raises ``QuoteTokenError`` or ``QuoteTokenExpiredError``."""
+        body, _, mac = token.rpartition("|")
+        if not hmac.compare_digest(mac, self._mac(subject, pay_symbol, receive_symbol, pay_amount, body)):
+            raise QuoteTokenError("Quote token does not match this swap")
+        try:
+            version, receive_amount, expires_at = body.split("|")
+            quoted = Decimal(receive_amount)
+            expired = int(expires_at) <= self._clock()
+        except (ValueError, InvalidOperation) as exc:
+            raise QuoteTokenError("Malformed quote token") from exc
+        if version != _VERSION:
+            raise QuoteTokenError("Unsupported quote token version")
+        if expired:
+            raise QuoteTokenExpiredError("Quote has expired")
+        return quoted
+
+
+_SIGNER: Optional[QuoteSigner] = None
+_SIGNER_LOCK = threading.Lock()
+
+
+def get_quote_signer() -> QuoteSigner:
+    """Return the process-wide signer keyed by ``QUOTE_SIGNING_KEY`` or ``SECRET_KEY``."""
+    global _SIGNER
+    if _SIGNER is not None:
+        return _SIGNER
+    with _SIGNER_LOCK:
+        if _SIGNER is None:
+            key = settings.QUOTE_SIGNING_KEY or settings.SECRET_KEY
+            if not key:
+                logger.warning("No QUOTE_SIGNING_KEY or SECRET_KEY; quote tokens only verify in this process")
+                key = secrets.token_hex(32)
+            _SIGNER = QuoteSigner(key.encode())
+        return _SIGNER
+
+
+def use_quote_signer(signer: Optional[QuoteSigner]) -> None:
+    global _SIGNER
+    with _SIGNER_LOCK:
+        _SIGNER = signer
@@ -0,0 +1,106 @@
+"""Inverted n-gram index backing feed search.
+
+The index keeps a lower-cased copy of every searchable field so a query never
+re-lowers message text, and posting lists keyed by the 1-, 2- and 3-character
+grams of those fields.  Terms of up to three characters are answered straight
+from a posting list; longer terms intersect the postings of their trigrams and
+verify the (small) candidate set with the same substring check the linear scan
+used, so results are identical to ``_matches_search``.
+"""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Dict, Iterable, Set, Tuple
+
+if TYPE_CHECKING:  # pragma: no cover - import cycle guard
+    from .messages import MessageSeed
+
+GRAM_SIZE = 3
+
+
+def _grams(fields: Iterable[str]) -> Set[str]:
+    grams: Set[str] = set()
+    for text in fields:
+        for size in range(1, GRAM_SIZE + 1):
+            grams.update(text[start : start + size] for start in range(len(text) - size + 1))
+    return grams
+
+
+def searchable_fields(seed: "MessageSeed") -> Tuple[str, ...]:
+    return (
+        seed.title.lower(),
+        seed.content.lower(),
+        seed.creator_handle.lower(),
+        seed.creator_display_name.lower(),
+        *(tag.lower() for tag in seed.tags),
+    )
+
+
+class MessageSearchIndex:
+    """Incrementally maintained substring index over message seeds."""
+
+    def __init__(self, seeds: Iterable["MessageSeed"] = ()) -> None:
+        self._fields: Dict[str, Tuple[str, ...]] = {}
+        self._grams: Dict[str, Set[str]] = {}
+        for seed in seeds:
+            self.add(seed)
+
+    def __len__(self) -> int:
+        return len(self._fields)
+
+    def __contains__(self, message_id: object) -> bool:
+        return message_id in self._fields
+
+    def add(self, seed: "MessageSeed") -> None:
+        if seed.id in self._fields:
+            self.remove(seed.id)
+
+        fields = searchable_fields(seed)
+        self._fields[seed.id] = fields
+        postings = self._grams
+        for gram in _grams(fields):
+            posting = postings.get(gram)
+            if posting is None:
+                postings[gram] = {seed.id}
+            else:
+                posting.add(seed.id)
+
+    update = add
+
+    def remove(self, message_id: str) -> None:
+        fields = self._fields.pop(message_id, None)
+        if fields is None:
+            return
+        for gram in _grams(fields):
+            _discard(self._grams, gram, message_id)
+
+    def search(self, term: str) -> Set[str]:
+        """Return ids whose title, content, creator or tags contain ``term``."""
+        lowered = term.lower()
+        if not lowered:
+            return set(self._fields)
+        if len(lowered) <= GRAM_SIZE:
+            return set(self._grams.get(lowered, ()))
+
+        postings = []
+        for start in range(len(lowered) - GRAM_SIZE + 1):
+            posting = self._grams.get(lowered[start : start + GRAM_SIZE])
+            if not posting:
+                return set()
+            postings.append(posting)
+        postings.sort(key=len)
+
+        candidates = postings[0].intersection(*postings[1:])
+        return {
+            message_id
+            for message_id in candidates
+            if any(lowered in field for field in self._fields[message_id])
+        }
+
+
+def _discard(postings: Dict[str, Set[str]], key: str, message_id: str) -> None:
+    posting = postings.get(key)
+    if posting is None:
+        return
+    posting.discard(message_id)
+    if not posting:
+        del postings[key]
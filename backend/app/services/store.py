@@ -0,0 +1,442 @@
+"""Columnar in-process message store.
+
+Rows live in parallel columns instead of one object per message:
+
+* creators are interned once in a creator table and referenced by an int32 id,
+* tags are interned in a tag table and stored as per-row uint64 bitsets; a
+  row whose tags are not already in tag-table order also keeps that order in
+  a sparse side table so rendering is unchanged,
+* likes, alerts and status codes are NumPy arrays that can be updated in place,
+* timestamps are int64 microseconds since the Unix epoch,
+* the review reason (which like/alert threshold puts a NORMAL message under
+  review) is materialized whenever counters or status change, so reads do
+  not re-derive it per row; materialized seeds carry the resulting
+  ``displayed_status``.
+
+``MessageSeed`` stays the record type used to ingest and hand out single
+messages; it is materialized from the columns on demand.
+"""
+from __future__ import annotations
+
+import sys
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from ..schemas import MessageStatus
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+_WORD_BITS = 64
+
+# Codes mirror the status constants in move/sources/message.move.
+STATUSES: Tuple[MessageStatus, ...] = (
+    MessageStatus.NORMAL,
+    MessageStatus.UNDER_REVIEW,
+    MessageStatus.HYPED,
+    MessageStatus.SPAM,
+    MessageStatus.DELETED,
+)
+STATUS_CODES: Dict[MessageStatus, int] = {status: code for code, status in enumerate(STATUSES)}
+_NORMAL = STATUS_CODES[MessageStatus.NORMAL]
+_UNDER_REVIEW = STATUS_CODES[MessageStatus.UNDER_REVIEW]
+
+# Values of the materialized review column.
+REVIEW_NONE = 0
+REVIEW_LIKES = 1
+REVIEW_ALERTS = 2
+
+
+@dataclass(frozen=True)
+class MessageSeed:
+    id: str
+    title: str
+    content: str
+    tags: Sequence[str]
+    creator_id: str
+    creator_handle: str
+    creator_display_name: str
+    creator_avatar_url: str
+    likes: int
+    alerts: int
+    status: MessageStatus
+    created_at: datetime
+    updated_at: datetime
+    # Status shown in the feed, filled in from the materialized review column
+    # by the store and the SQL repository.  Ignored on ingest; ``None`` on
+    # seeds built by hand.
+    displayed_status: Optional[MessageStatus] = None
+
+
+CreatorRecord = Tuple[str, str, str, str]
+
+
+def to_epoch_us(value: datetime) -> int:
+    return (value - _EPOCH) // _MICROSECOND
+
+
+def from_epoch_us(value: int) -> datetime:
+    return _EPOCH + timedelta(microseconds=int(value))
+
+
+class ColumnarMessageStore:
+    """Struct-of-arrays storage for feed messages keyed by message id."""
+
+    def __init__(
+        self,
+        seeds: Iterable[MessageSeed] = (),
+        *,
+        capacity: int = 1024,
+        review_thresholds: Optional[Tuple[int, int]] = None,
+    ) -> None:
+        # (likes, alerts) thresholds; without them the review column stays REVIEW_NONE.
+        self._review_thresholds = review_thresholds
+        self._size = 0
+        self._row_of: Dict[str, int] = {}
+        self._ids: List[str] = []
+        self._titles: List[str] = []
+        self._contents: List[str] = []
+
+        self._creators: List[CreatorRecord] = []
+        self._creator_ids: Dict[CreatorRecord, int] = {}
+        self._tags: List[str] = []
+        self._tag_ids: Dict[str, int] = {}
+        self._tag_ids_by_lower: Dict[str, List[int]] = {}
+        self._tag_order: Dict[int, Tuple[int, ...]] = {}
+
+        capacity = max(capacity, 1)
+        self._creator = np.zeros(capacity, dtype=np.int32)
+        self._tag_bits = np.zeros((capacity, 1), dtype=np.uint64)
+        self._likes = np.zeros(capacity, dtype=np.int64)
+        self._alerts = np.zeros(capacity, dtype=np.int64)
+        self._status = np.zeros(capacity, dtype=np.uint8)
+        self._review = np.zeros(capacity, dtype=np.uint8)
+        # Set once a rejected proposal returned the row to NORMAL (see dismiss_review).
+        self._dismissed = np.zeros(capacity, dtype=bool)
+        self._created_at = np.zeros(capacity, dtype=np.int64)
+        self._updated_at = np.zeros(capacity, dtype=np.int64)
+
+        for seed in seeds:
+            self.upsert(seed)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, message_id: object) -> bool:
+        return message_id in self._row_of
+
+    # Column views over the live rows -------------------------------------------------
+
+    @property
+    def likes(self) -> np.ndarray:
+        return self._likes[: self._size]
+
+    @property
+    def alerts(self) -> np.ndarray:
+        return self._alerts[: self._size]
+
+    @property
+    def status(self) -> np.ndarray:
+        return self._status[: self._size]
+
+    @property
+    def review(self) -> np.ndarray:
+        return self._review[: self._size]
+
+    @property
+    def created_at(self) -> np.ndarray:
+        return self._created_at[: self._size]
+
+    def ids(self) -> Iterable[str]:
+        return iter(self._ids)
+
+    def row_of(self, message_id: str) -> Optional[int]:
+        return self._row_of.get(message_id)
+
+    def rows(self, message_ids: Sequence[str]) -> np.ndarray:
+        row_of = self._row_of
+        return np.fromiter(
+            (row_of[message_id] for message_id in message_ids), dtype=np.int64, count=len(message_ids)
+        )
+
+    def id_at(self, row: int) -> str:
+        return self._ids[row]
+
+    def title_at(self, row: int) -> str:
+        return self._titles[row]
+
+    def content_at(self, row: int) -> str:
+        return self._contents[row]
+
+    def creator_at(self, row: int) -> CreatorRecord:
+        return self._creators[self._creator[row]]
+
+    def tags_at(self, row: int) -> Tuple[str, ...]:
+        order = self._tag_order.get(row)
+        if order is not None:
+            return tuple(self._tags[tag_id] for tag_id in order)
+        tags: List[str] = []
+        for word_index, word in enumerate(self._tag_bits[row].tolist()):
+            base = word_index * _WORD_BITS
+            while word:
+                low = word & -word
+                tags.append(self._tags[base + low.bit_length() - 1])
+                word ^= low
+        return tuple(tags)
+
+    def updated_at_us(self, row: int) -> int:
+        return int(self._updated_at[row])
+
+    # Writes --------------------------------------------------------------------------
+
+    def upsert(self, seed: MessageSeed) -> int:
+        row = self._row_of.get(seed.id)
+        if row is None:
+            row = self._size
+            self._ensure_capacity(row + 1)
+            self._size += 1
+            self._row_of[seed.id] = row
+            self._ids.append(seed.id)
+            self._titles.append(seed.title)
+            self._contents.append(seed.content)
+        else:
+            self._titles[row] = seed.title
+            self._contents[row] = seed.content
+
+        self._creator[row] = self._intern_creator(
+            (seed.creator_id, seed.creator_handle, seed.creator_display_name, seed.creator_avatar_url)
+        )
+        tag_ids = tuple(self._intern_tag(tag) for tag in seed.tags)
+        self._tag_bits[row] = 0
+        for tag_id in tag_ids:
+            word, bit = divmod(tag_id, _WORD_BITS)
+            self._tag_bits[row, word] |= np.uint64(1 << bit)
+        if list(tag_ids) != sorted(set(tag_ids)):
+            self._tag_order[row] = tag_ids
+        else:
+            self._tag_order.pop(row, None)
+        self._likes[row] = seed.likes
+        self._alerts[row] = seed.alerts
+        self._status[row] = STATUS_CODES[seed.status]
+        self._dismissed[row] = False
+        self._created_at[row] = to_epoch_us(seed.created_at)
+        self._updated_at[row] = to_epoch_us(seed.updated_at)
+        self._refresh_review(row)
+        return row
+
+    def remove(self, message_id: str) -> bool:
+        """Drop a row by moving the last row into its slot."""
+        row = self._row_of.pop(message_id, None)
+        if row is None:
+            return False
+        last = self._size - 1
+        if row != last:
+            moved_id = self._ids[last]
+            self._row_of[moved_id] = row
+            self._ids[row] = moved_id
+            self._titles[row] = self._titles[last]
+            self._contents[row] = self._contents[last]
+            for column in self._columns():
+                column[row] = column[last]
+            moved_order = self._tag_order.pop(last, None)
+            if moved_order is None:
+                self._tag_order.pop(row, None)
+            else:
+                self._tag_order[row] = moved_order
+        else:
+            self._tag_order.pop(row, None)
+        self._ids.pop()
+        self._titles.pop()
+        self._contents.pop()
+        self._tag_bits[last] = 0
+        self._size = last
+        return True
+
+    def add_reactions(self, message_id: str, *, likes: int = 0, alerts: int = 0) -> Optional[int]:
+        row = self._row_of.get(message_id)
+        if row is None:
+            return None
+        self._likes[row] += likes
+        self._alerts[row] += alerts
+        self._refresh_review(row)
+        return row
+
+    def set_status(self, message_id: str, status: MessageStatus) -> Optional[int]:
+        row = self._row_of.get(message_id)
+        if row is None:
+            return None
+        self._status[row] = STATUS_CODES[status]
+        self._refresh_review(row)
+        return row
+
+    def dismiss_review(self, message_id: str) -> Optional[int]:
+        """Return a NORMAL or UNDER_REVIEW row to NORMAL for good; the thresholds it crossed no longer put it under review."""
+        row = self._row_of.get(message_id)
+        if row is None or self._status[row] not in (_NORMAL, _UNDER_REVIEW):
+            return None
+        self._status[row] = _NORMAL
+        self._dismissed[row] = True
+        self._refresh_review(row)
+        return row
+
+    # Reads ---------------------------------------------------------------------------
+
+    def get(self, message_id: str) -> Optional[MessageSeed]:
+        row = self._row_of.get(message_id)
+        return None if row is None else self.materialize(row)
+
+    def materialize(self, row: int) -> MessageSeed:
+        creator_id, handle, display_name, avatar_url = self.creator_at(row)
+        return MessageSeed(
+            id=self._ids[row],
+            title=self._titles[row],
+            content=self._contents[row],
+            tags=self.tags_at(row),
+            creator_id=creator_id,
+            creator_handle=handle,
+            creator_display_name=display_name,
+            creator_avatar_url=avatar_url,
+            likes=int(self._likes[row]),
+            alerts=int(self._alerts[row]),
+            status=STATUSES[self._status[row]],
+            created_at=from_epoch_us(self._created_at[row]),
+            updated_at=from_epoch_us(self._updated_at[row]),
+            displayed_status=self._displayed_status(row),
+        )
+
+    def rows_with_tags(self, tags: Sequence[str], mode: str = "or") -> np.ndarray:
+        """Vectorized case-insensitive tag filter over the tag bitsets."""
+        bits = self._tag_bits[: self._size]
+        masks = [self._tag_mask(tag.lower()) for tag in tags]
+        if mode == "and":
+            matched = np.ones(self._size, dtype=bool)
+            for mask in masks:
+                if mask is None:
+                    return np.empty(0, dtype=np.int64)
+                matched &= (bits & mask).any(axis=1)
+        else:
+            present = [mask for mask in masks if mask is not None]
+            if not present:
+                return np.empty(0, dtype=np.int64)
+            matched = (bits & np.bitwise_or.reduce(present)).any(axis=1)
+        return np.flatnonzero(matched)
+
+    def ids_with_tags(self, tags: Sequence[str], mode: str = "or") -> Set[str]:
+        ids = self._ids
+        return {ids[row] for row in self.rows_with_tags(tags, mode).tolist()}
+
+    def memory_usage(self) -> Dict[str, int]:
+        """Approximate bytes held by each part of the store."""
+        arrays = {
+            "creator_column": self._creator,
+            "tag_bitsets": self._tag_bits,
+            "likes": self._likes,
+            "alerts": self._alerts,
+            "status": self._status,
+            "review": self._review,
+            "dismissed": self._dismissed,
+            "created_at": self._created_at,
+            "updated_at": self._updated_at,
+        }
+        usage = {name: int(array.nbytes) for name, array in arrays.items()}
+        usage["text"] = sum(
+            sys.getsizeof(value) for column in (self._ids, self._titles, self._contents) for value in column
+        ) + sum(sys.getsizeof(column) for column in (self._ids, self._titles, self._contents))
+        usage["creator_table"] = sum(
+            sys.getsizeof(record) + sum(sys.getsizeof(part) for part in record) for record in self._creators
+        )
+        usage["tag_table"] = sum(sys.getsizeof(tag) for tag in self._tags) + sum(
+            sys.getsizeof(order) for order in self._tag_order.values()
+        )
+        usage["id_lookup"] = sys.getsizeof(self._row_of)
+        return usage
+
+    # Internals -----------------------------------------------------------------------
+
+    def _columns(self) -> Tuple[np.ndarray, ...]:
+        return (
+            self._creator,
+            self._tag_bits,
+            self._likes,
+            self._alerts,
+            self._status,
+            self._review,
+            self._dismissed,
+            self._created_at,
+            self._updated_at,
+        )
+
+    def _ensure_capacity(self, needed: int) -> None:
+        capacity = len(self._likes)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        self._creator = _grow(self._creator, capacity)
+        self._tag_bits = _grow(self._tag_bits, capacity)
+        self._likes = _grow(self._likes, capacity)
+        self._alerts = _grow(self._alerts, capacity)
+        self._status = _grow(self._status, capacity)
+        self._review = _grow(self._review, capacity)
+        self._dismissed = _grow(self._dismissed, capacity)
+        self._created_at = _grow(self._created_at, capacity)
+        self._updated_at = _grow(self._updated_at, capacity)
+
+    def _displayed_status(self, row: int) -> Optional[MessageStatus]:
+        if self._review_thresholds is None:
+            return None
+        if self._review[row] != REVIEW_NONE:
+            return MessageStatus.UNDER_REVIEW
+        return STATUSES[self._status[row]]
+
+    def _refresh_review(self, row: int) -> None:
+        if self._review_thresholds is None:
+            return
+        likes_threshold, alerts_threshold = self._review_thresholds
+        if self._status[row] != _NORMAL or self._dismissed[row]:
+            self._review[row] = REVIEW_NONE
+        elif self._likes[row] >= likes_threshold:
+            self._review[row] = REVIEW_LIKES
+        elif self._alerts[row] >= alerts_threshold:
+            self._review[row] = REVIEW_ALERTS
+        else:
+            self._review[row] = REVIEW_NONE
+
+    def _intern_creator(self, record: CreatorRecord) -> int:
+        creator_id = self._creator_ids.get(record)
+        if creator_id is None:
+            creator_id = len(self._creators)
+            self._creators.append(record)
+            self._creator_ids[record] = creator_id
+        return creator_id
+
+    def _intern_tag(self, tag: str) -> int:
+        tag_id = self._tag_ids.get(tag)
+        if tag_id is None:
+            tag_id = len(self._tags)
+            self._tags.append(tag)
+            self._tag_ids[tag] = tag_id
+            self._tag_ids_by_lower.setdefault(tag.lower(), []).append(tag_id)
+            words = tag_id // _WORD_BITS + 1
+            if words > self._tag_bits.shape[1]:
+                extra = np.zeros((len(self._tag_bits), words - self._tag_bits.shape[1]), dtype=np.uint64)
+                self._tag_bits = np.hstack([self._tag_bits, extra])
+        return tag_id
+
+    def _tag_mask(self, lowered: str) -> Optional[np.ndarray]:
+        tag_ids = self._tag_ids_by_lower.get(lowered)
+        if not tag_ids:
+            return None
+        mask = np.zeros(self._tag_bits.shape[1], dtype=np.uint64)
+        for tag_id in tag_ids:
+            word, bit = divmod(tag_id, _WORD_BITS)
+            mask[word] |= np.uint64(1 << bit)
+        return mask
+
+
+def _grow(array: np.ndarray, capacity: int) -> np.ndarray:
+    grown = np.zeros((capacity,) + array.shape[1:], dtype=array.dtype)
+    grown[: len(array)] = array
+    return grown
@@ -0,0 +1,194 @@
+"""Address and balance caches in front of the chain adapter.
+
+``SingleFlightCache`` is a bounded LRU with an optional TTL.  Concurrent
+misses for the same key share one upstream call: the first caller loads, the
+rest wait for its result.  Failed loads are not cached, and a key
+invalidated while its load is in flight does not cache that (possibly
+stale) result.
+
+``WalletCache`` pairs a permanent address cache keyed by
+``(user, symbol)`` with a short-lived balance cache keyed by
+``(address, symbol)``, and knows which balances to drop after a swap or
+when the chain reports balance changes.  Sui addresses are hex, so balance
+keys use the lower-cased address whatever case the caller passed.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Generic, Hashable, Iterable, Mapping, Optional, Tuple, TypeVar
+
+V = TypeVar("V")
+
+
+@dataclass
+class _Flight:
+    done: threading.Event = field(default_factory=threading.Event)
+    value: Any = None
+    error: Optional[BaseException] = None
+    invalidated: bool = False
+
+
+class SingleFlightCache(Generic[V]):
+    """Thread-safe LRU/TTL cache with per-key request coalescing."""
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = 10_000,
+        ttl: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._max_entries = max_entries
+        self._ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, Tuple[float, V]]" = OrderedDict()
+        self._flights: Dict[Hashable, _Flight] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_or_load(self, key: Hashable, load: Callable[[], V]) -> V:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > self._clock():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._entries[key]
+            flight = self._flights.get(key)
+            if flight is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                flight = self._flights[key] = _Flight()
+                self.misses += 1
+                leader = True
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = load()
+        except BaseException as exc:
+            flight.error = exc
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+                if flight.error is None and not flight.invalidated:
+                    self._store(key, flight.value)
+            flight.done.set()
+        return flight.value
+
+    def peek(self, key: Hashable) -> Optional[V]:
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry[1] if entry is not None and entry[0] > self._clock() else None
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self.invalidations += 1
+            self._entries.pop(key, None)
+            flight = self._flights.get(key)
+            if flight is not None:
+                flight.invalidated = True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            for flight in self._flights.values():
+                flight.invalidated = True
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                "entries": len(self._entries),
+                "max_entries": self._max_entries,
+                "ttl_seconds": self._ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hit_ratio": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+            }
+
+    def _store(self, key: Hashable, value: V) -> None:
+        expires_at = float("inf") if self._ttl is None else self._clock() + self._ttl
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+
+class WalletCache:
+    """Permanent address entries and short-lived balance entries for wallet routes."""
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = 50_000,
+        balance_ttl: float = 5.0,
+        coin_symbols: Optional[Mapping[str, str]] = None,
+    ) -> None:
+        self.addresses: SingleFlightCache[Optional[str]] = SingleFlightCache(max_entries=max_entries)
+        self.balances: SingleFlightCache[Any] = SingleFlightCache(max_entries=max_entries, ttl=balance_ttl)
+        # Coin type -> wallet symbol, for balance changes reported by the chain.
+        self.coin_symbols: Dict[str, str] = dict(coin_symbols or {})
+
+    def address(self, user_identifier: str, symbol: str, load: Callable[[], Optional[str]]) -> Optional[str]:
+        return self.addresses.get_or_load((user_identifier, symbol), load)
+
+    def balance(self, address: str, symbol: str, load: Callable[[], Any]) -> Any:
+        return self.balances.get_or_load((address.lower(), symbol), load)
+
+    def cached_balance(self, address: str, symbol: str) -> Optional[Any]:
+        """The unexpired cached balance, without counting a lookup or loading."""
+        return self.balances.peek((address.lower(), symbol))
+
+    def invalidate_user_balances(self, user_identifier: str, symbols: Iterable[str]) -> None:
+        """Drop a user's cached balances, e.g. after a swap they executed."""
+        for symbol in symbols:
+            address = self.addresses.peek((user_identifier, symbol))
+            if address:
+                self.invalidate_balance(address, symbol)
+
+    def invalidate_balance(self, address: str, symbol: str) -> None:
+        self.balances.invalidate((address.lower(), symbol))
+
+    def apply_balance_changes(self, changes: Iterable[Mapping[str, Any]]) -> int:
+        """Invalidate balances named in Sui ``balanceChanges`` entries; returns how many matched.
+
+        Entries look like ``{"owner": {"AddressOwner": "0x.."}, "coinType": "0x2::sui::SUI", ...}``.
+        """
+        matched = 0
+        for change in changes:
+            owner = change.get("owner")
+            address = owner.get("AddressOwner") if isinstance(owner, Mapping) else owner
+            symbol = self.coin_symbols.get(str(change.get("coinType")))
+            if address and symbol:
+                self.invalidate_balance(str(address), symbol)
+                matched += 1
+        return matched
+
+    def clear(self) -> None:
+        self.addresses.clear()
+        self.balances.clear()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {"addresses": self.addresses.stats(), "balances": self.balances.stats()}
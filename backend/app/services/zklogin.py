@@ -0,0 +1,287 @@
+"""zkLogin proof verification off the event loop.
+
+``ProofVerifierPool`` runs a verifier function in a process pool so CPU-heavy
+Groth16 checks never block request handling.  At most ``max_pending`` proofs
+may be queued or running; beyond that ``verify`` raises
+``VerifierSaturatedError`` and the login route answers 429.  Identical
+proofs submitted concurrently share one verification.  Results are not
+cached: a proof is bound to its login nonce, which the route refuses once
+spent, so a verified proof is never checked again.
+
+The verifier is chosen with ``ZKLOGIN_PROOF_VERIFIER``, which has no
+default - the app refuses to start until one is configured:
+
+* ``package.module:function``: any picklable ``(ProofJob) -> bool`` callable,
+  e.g. a binding to a Groth16 library with the zkLogin verifying key.
+* ``structure``: ``check_proof_structure`` - the Groth16 points must be on
+  the BN254 curves and the public inputs in the scalar field.  This rejects
+  malformed or corrupted proofs but is not a pairing check.
+* ``none``: proofs are accepted unchecked; for tests and local development.
+
+The last two log a warning when the pool is created.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import importlib
+import json
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+# BN254 base field and scalar field moduli.
+FIELD_MODULUS = 21888242871839275222246405745257275088696311157297823662689037894645226208583
+CURVE_ORDER = 21888242871839275222246405745257275088548364400416034343698204186575808495617
+
+
+class VerifierSaturatedError(RuntimeError):
+    """Too many proofs are already queued for verification."""
+
+
+@dataclass(frozen=True)
+class ProofJob:
+    address: str
+    max_epoch: Optional[int]
+    proof: Mapping[str, Any]
+    public_inputs: Optional[Sequence[str]] = None
+
+    def dedupe_key(self) -> Tuple[str, Optional[int], str]:
+        body = json.dumps([self.proof, self.public_inputs], sort_keys=True, separators=(",", ":"))
+        return self.address, self.max_epoch, hashlib.sha256(body.encode()).hexdigest()
+
+
+ProofVerifier = Callable[[ProofJob], bool]
+
+
+def accept_proof(job: ProofJob) -> bool:
+    return True
+
+
+def _field(value: Any, modulus: int = FIELD_MODULUS) -> int:
+    number = int(value)
+    if not 0 <= number < modulus:
+        raise ValueError("coordinate out of range")
+    return number
+
+
+def _fq2_mul(a: Tuple[int, int], b: Tuple[int, int]) -> Tuple[int, int]:
+    # (a0 + a1*u)(b0 + b1*u) with u^2 = -1
+    q = FIELD_MODULUS
+    return (a[0] * b[0] - a[1] * b[1]) % q, (a[0] * b[1] + a[1] * b[0]) % q
+
+
+# G2 lives on y^2 = x^3 + 3 / (9 + u); 1 / (9 + u) = (9 - u) / 82.
+_INV_82 = pow(82, FIELD_MODULUS - 2, FIELD_MODULUS)
+_G2_B = ((3 * 9 * _INV_82) % FIELD_MODULUS, (-3 * _INV_82) % FIELD_MODULUS)
+
+
+def _g1_on_curve(point: Sequence[Any]) -> bool:
+    x, y, z = (_field(value) for value in point[:3])
+    if z != 1:
+        return False
+    return (y * y - x * x * x - 3) % FIELD_MODULUS == 0
+
+
+def _g2_on_curve(point: Sequence[Sequence[Any]]) -> bool:
+    x = tuple(_field(value) for value in point[0])
+    y = tuple(_field(value) for value in point[1])
+    if tuple(_field(value) for value in point[2]) != (1, 0):
+        return False
+    left = _fq2_mul(y, y)
+    x3 = _fq2_mul(_fq2_mul(x, x), x)
+    return left == ((x3[0] + _G2_B[0]) % FIELD_MODULUS, (x3[1] + _G2_B[1]) % FIELD_MODULUS)
+
+
+def check_proof_structure(job: ProofJob) -> bool:
+    """Accept Sui (``proofPoints.a/b/c``) or snarkjs (``pi_a/pi_b/pi_c``) proofs with valid points."""
+    points = job.proof.get("proofPoints", job.proof)
+    try:
+        a = points.get("a", points.get("pi_a"))
+        b = points.get("b", points.get("pi_b"))
+        c = points.get("c", points.get("pi_c"))
+        if not (_g1_on_curve(a) and _g2_on_curve(b) and _g1_on_curve(c)):
+            return False
+        for value in job.public_inputs or ():
+            _field(value, CURVE_ORDER)
+    except (AttributeError, IndexError, KeyError, TypeError, ValueError):
+        return False
+    return True
+
+
+def load_verifier(name: Optional[str]) -> ProofVerifier:
+    if not name:
+        raise ValueError(
+            "ZKLOGIN_PROOF_VERIFIER is not configured; set it to module:function "
+            "(or to none/structure for tests and local development)"
+        )
+    if name == "none":
+        return accept_proof
+    if name == "structure":
+        return check_proof_structure
+    module_name, _, attribute = name.partition(":")
+    if not attribute:
+        raise ValueError(f"ZKLOGIN_PROOF_VERIFIER must be none, structure or module:function, not {name!r}")
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+def _timed(verifier: ProofVerifier, job: ProofJob) -> Tuple[bool, float, float]:
+    """Runs in the worker: returns the result, when it started and how long it took."""
+    started = time.time()
+    valid = bool(verifier(job))
+    return valid, started, time.time() - started
+
+
+class _Samples:
+    """Recent latency samples in seconds, for mean and percentiles."""
+
+    def __init__(self, size: int = 1024) -> None:
+        self._values: Deque[float] = deque(maxlen=size)
+
+    def add(self, value: float) -> None:
+        self._values.append(value)
+
+    def summary(self) -> Dict[str, Optional[float]]:
+        values: List[float] = sorted(self._values)
+        if not values:
+            return {"count": 0, "mean_ms": None, "p50_ms": None, "p95_ms": None}
+        return {
+            "count": len(values),
+            "mean_ms": sum(values) / len(values) * 1e3,
+            "p50_ms": values[len(values) // 2] * 1e3,
+            "p95_ms": values[min(len(values) - 1, int(len(values) * 0.95))] * 1e3,
+        }
+
+
+class ProofVerifierPool:
+    """Bounded, coalescing proof verification on a process pool."""
+
+    def __init__(
+        self,
+        verifier: ProofVerifier,
+        *,
+        workers: int = 2,
+        max_pending: int = 64,
+        executor: Optional[Executor] = None,
+    ) -> None:
+        if verifier is accept_proof or verifier is check_proof_structure:
+            logger.warning("zkLogin proofs are not cryptographically verified (%s)", verifier.__name__)
+        self.verifier = verifier
+        self.max_pending = max_pending
+        self._executor = executor
+        self._workers = workers
+        self._lock = threading.Lock()
+        self._in_flight: Dict[Tuple[str, Optional[int], str], "asyncio.Future[bool]"] = {}
+        self._pending = 0
+        self.max_depth = 0
+        self.submitted = 0
+        self.coalesced = 0
+        self.rejected = 0
+        self.invalid = 0
+        self._wait = _Samples()
+        self._latency = _Samples()
+
+    def _pool(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                # concurrent.futures.process loads on the first proof, not at startup.
+                from concurrent.futures import ProcessPoolExecutor
+
+                self._executor = ProcessPoolExecutor(max_workers=self._workers)
+            return self._executor
+
+    async def verify(self, job: ProofJob) -> bool:
+        """Whether the proof verifies; raises ``VerifierSaturatedError`` when the queue is full."""
+        if self.verifier is accept_proof:
+            return True
+        key = job.dedupe_key()
+        with self._lock:
+            shared = self._in_flight.get(key)
+            if shared is None:
+                if self._pending >= self.max_pending:
+                    self.rejected += 1
+                    raise VerifierSaturatedError(f"{self._pending} proofs already queued")
+                self._pending += 1
+                self.max_depth = max(self.max_depth, self._pending)
+                self.submitted += 1
+            else:
+                self.coalesced += 1
+        if shared is not None:
+            return await asyncio.shield(shared)
+
+        future = asyncio.get_running_loop().create_future()
+        with self._lock:
+            self._in_flight[key] = future
+        submitted_at = time.time()
+        try:
+            valid, started, elapsed = await asyncio.wrap_future(self._pool().submit(_timed, self.verifier, job))
+        except BaseException as exc:
+            future.set_exception(exc)
+            # Mark retrieved so a failure nobody else awaited is not logged as unhandled.
+            future.exception()
+            raise
+        else:
+            future.set_result(valid)
+            self._wait.add(max(0.0, started - submitted_at))
+            self._latency.add(elapsed)
+            if not valid:
+                with self._lock:
+                    self.invalid += 1
+            return valid
+        finally:
+            with self._lock:
+                self._pending -= 1
+                self._in_flight.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "queue_depth": self._pending,
+                "max_queue_depth": self.max_depth,
+                "max_pending": self.max_pending,
+                "submitted": self.submitted,
+                "coalesced": self.coalesced,
+                "rejected": self.rejected,
+                "invalid": self.invalid,
+                "wait": self._wait.summary(),
+                "verification": self._latency.summary(),
+            }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+_POOL: Optional[ProofVerifierPool] = None
+_POOL_LOCK = threading.Lock()
+
+
+def get_proof_verifier() -> ProofVerifierPool:
+    """Return the process-wide verifier pool configured from settings."""
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = ProofVerifierPool(
+                load_verifier(settings.ZKLOGIN_PROOF_VERIFIER),
+                workers=settings.ZKLOGIN_VERIFIER_WORKERS,
+                max_pending=settings.ZKLOGIN_VERIFIER_MAX_PENDING,
+            )
+        return _POOL
+
+
+def use_proof_verifier(pool: Optional[ProofVerifierPool]) -> None:
+    global _POOL
+    with _POOL_LOCK:
+        previous, _POOL = _POOL, pool
+    if previous is not None and previous is not pool:
+        previous.shutdown()
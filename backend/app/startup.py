@@ -0,0 +1,41 @@
+"""Per-phase startup timing.
+
+``main`` wraps its imports, app construction and each lifespan step in
+``STARTUP.phase(name)``; the breakdown is logged once startup completes and
+served at ``GET /startup`` so slow cold starts can be traced to a phase.
+"""
+from __future__ import annotations
+
+import logging
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator
+
+logger = logging.getLogger(__name__)
+
+
+class StartupTimer:
+    def __init__(self, clock: Callable[[], float] = time.perf_counter) -> None:
+        self._clock = clock
+        self.phases: Dict[str, float] = {}
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        started = self._clock()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + self._clock() - started
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "phases_ms": {name: round(seconds * 1e3, 2) for name, seconds in self.phases.items()},
+            "total_ms": round(sum(self.phases.values()) * 1e3, 2),
+        }
+
+    def log(self, mode: str) -> None:
+        breakdown = ", ".join(f"{name}={seconds * 1e3:.1f}ms" for name, seconds in self.phases.items())
+        logger.info("Startup (%s) took %.1fms: %s", mode, sum(self.phases.values()) * 1e3, breakdown)
+
+
+STARTUP = StartupTimer()
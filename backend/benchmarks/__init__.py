@@ -0,0 +1,4 @@
+"""Offline benchmarks for the SuiWorld backend.
+
+Run from the ``backend`` directory, e.g. ``python -m benchmarks.search_bench``.
+"""
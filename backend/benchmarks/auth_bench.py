@@ -0,0 +1,52 @@
+"""Session verifications per second: full JWT checks versus the verified-token cache.
+
+``cold`` verifies ``--tokens`` distinct session tokens once each (signature,
+claims, cache insert); ``cached`` replays them ``--rounds`` times, which is
+what a repeat caller costs ``get_current_user``.
+
+Usage: ``python -m benchmarks.auth_bench --tokens 5000 --rounds 10``
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+from jose import jwt
+
+from app.security import SessionVerifier, VerifiedTokenCache
+
+SECRET = "bench-secret"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tokens", type=int, default=5000)
+    parser.add_argument("--rounds", type=int, default=10)
+    args = parser.parse_args()
+
+    exp = int(time.time()) + 3600
+    tokens = [
+        jwt.encode({"sub": f"user-{index}", "sui_address": f"0x{index:064x}", "exp": exp}, SECRET, algorithm="HS256")
+        for index in range(args.tokens)
+    ]
+    verifier = SessionVerifier(SECRET, cache=VerifiedTokenCache(max_entries=args.tokens))
+
+    started = time.perf_counter()
+    for token in tokens:
+        verifier.verify(token)
+    cold = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for _ in range(args.rounds):
+        for token in tokens:
+            verifier.verify(token)
+    cached = time.perf_counter() - started
+    cached_count = args.tokens * args.rounds
+
+    print(f"{'case':<10}{'verifications/s':>18}{'us each':>10}")
+    print(f"{'cold':<10}{args.tokens / cold:>18.0f}{cold / args.tokens * 1e6:>10.1f}")
+    print(f"{'cached':<10}{cached_count / cached:>18.0f}{cached / cached_count * 1e6:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Blob store: ingest throughput, dedup savings and per-page body lookups.
+
+A share of the bodies repeat (reposts, templates), the rest are unique;
+pages of ``--page-size`` random messages are then resolved with one
+``get_many`` each, as feed rendering does.
+
+Usage: ``python -m benchmarks.blob_bench --messages 200000 --duplicates 0.3 [--dir /tmp/blobs]``
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import tempfile
+import time
+
+from app.services.blobs import BlobStore
+
+from .corpus import build_corpus
+
+
+def run(args: argparse.Namespace) -> None:
+    rng = random.Random(7)
+    corpus = build_corpus(args.messages, creators=1000)
+    bodies = [seed.content for seed in corpus]
+    originals = len(bodies)
+    for index in range(len(bodies)):
+        if rng.random() < args.duplicates:
+            bodies[index] = bodies[rng.randrange(originals)]
+    with tempfile.TemporaryDirectory(dir=args.dir) as directory:
+        store = BlobStore(directory)
+        started = time.perf_counter()
+        keys = []
+        for start in range(0, len(bodies), args.batch):
+            keys.extend(store.put_many(bodies[start : start + args.batch]))
+        elapsed = time.perf_counter() - started
+        stats = store.stats()
+        raw = sum(len(body.encode()) for body in bodies)
+        print(f"{len(bodies)} bodies in {elapsed:.2f}s ({len(bodies) / elapsed:,.0f}/s, batches of {args.batch})")
+        print(f"  stored {stats['blobs']} blobs, {stats['segment_bytes'] / raw:.0%} of {raw / 1e6:.1f} MB inline")
+
+        pages = [rng.sample(keys, args.page_size) for _ in range(args.pages)]
+        started = time.perf_counter()
+        for page in pages:
+            store.get_many(page)
+        elapsed = time.perf_counter() - started
+        print(f"  page of {args.page_size}: {elapsed / args.pages * 1e6:,.0f}us per get_many")
+        store.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=200_000)
+    parser.add_argument("--duplicates", type=float, default=0.3)
+    parser.add_argument("--batch", type=int, default=500)
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--pages", type=int, default=10_000)
+    parser.add_argument("--dir", default=None)
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
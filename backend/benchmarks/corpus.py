@@ -0,0 +1,45 @@
+"""Synthetic message corpus shared by the benchmarks."""
+from __future__ import annotations
+
+import random
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+from app.schemas import MessageStatus
+from app.services.messages import MessageSeed
+
+VOCABULARY = (
+    "sui", "move", "restaking", "vault", "liquidity", "validator", "governance", "zk",
+    "rollup", "bridge", "oracle", "airdrop", "burner", "wallet", "yield", "staking",
+    "manager", "proposal", "hype", "scam", "telemetry", "flywheel", "rebate", "gas",
+    "epoch", "checkpoint", "object", "coin", "pool", "swap", "slippage", "fee",
+)
+TAGS = ("defi", "zk", "governance", "risk", "infra", "devops", "strategy", "surveillance", "nft", "memes")
+STATUSES = (MessageStatus.NORMAL,) * 17 + (MessageStatus.HYPED, MessageStatus.SPAM, MessageStatus.DELETED)
+
+
+def build_corpus(size: int, *, seed: int = 42, creators: int = 5000) -> List[MessageSeed]:
+    rng = random.Random(seed)
+    epoch = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    corpus: List[MessageSeed] = []
+    for index in range(size):
+        creator = rng.randrange(creators)
+        created_at = epoch + timedelta(seconds=rng.randrange(0, 60 * 60 * 24 * 365))
+        corpus.append(
+            MessageSeed(
+                id=f"msg-{index:07d}",
+                title=" ".join(rng.choices(VOCABULARY, k=4)).capitalize(),
+                content=" ".join(rng.choices(VOCABULARY, k=18)) + f" #{index}",
+                tags=tuple(rng.sample(TAGS, k=rng.randint(1, 3))),
+                creator_id=f"user-{creator}",
+                creator_handle=f"@user{creator}",
+                creator_display_name=f"User {creator}",
+                creator_avatar_url=f"https://cdn.suiworld.xyz/avatars/{creator}.png",
+                likes=rng.randrange(0, 30),
+                alerts=rng.randrange(0, 30),
+                status=rng.choice(STATUSES),
+                created_at=created_at,
+                updated_at=created_at,
+            )
+        )
+    return corpus
@@ -0,0 +1,127 @@
+"""Feed requests/s load test: sync versus async database stack.
+
+Concurrent clients page ``GET /messages`` through the ASGI app, first with
+``SqlMessageRepository`` (each request holds a threadpool worker while it
+waits on the database), then with ``AsyncSqlMessageRepository`` on the async
+engine.  Both use the pool settings from ``app.config``; ``--threadpool``
+caps Starlette's threadpool to show what exhaustion does to the sync stack.
+
+Usage: ``python -m benchmarks.db_load --messages 20000 --clients 200 --requests 20``
+Pass ``--url postgresql://...`` to load PostgreSQL (asyncpg for the async run)
+instead of a temporary SQLite file (aiosqlite).
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+from typing import Any, Dict, List
+
+import anyio.to_thread
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.api import messages as messages_api
+from app.db import async_url, pool_options, pool_stats
+from app.models import Base
+from app.repositories.messages import AsyncSqlMessageRepository, SqlMessageRepository
+from app.services import messages as messages_service
+
+from .corpus import build_corpus
+
+QUERIES: List[Dict[str, Any]] = [
+    {"sort": "latest", "limit": 20},
+    {"sort": "likes", "limit": 20},
+    {"sort": "under_review", "limit": 20},
+    {"search": "wallet", "limit": 20},
+    {"tags": ["defi", "zk"], "tag_mode": "and", "limit": 20},
+]
+
+
+async def _drive(app: FastAPI, clients: int, requests: int, engine: Any, threadpool: int | None) -> tuple:
+    if threadpool:
+        anyio.to_thread.current_default_thread_limiter().total_tokens = threadpool
+    latencies: List[float] = []
+    peak_checked_out = 0
+    transport = httpx.ASGITransport(app=app)
+
+    async def client(index: int) -> None:
+        nonlocal peak_checked_out
+        rng = random.Random(index)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+            for _ in range(requests):
+                started = time.perf_counter()
+                response = await http.get("/messages/", params=rng.choice(QUERIES))
+                latencies.append(time.perf_counter() - started)
+                response.raise_for_status()
+                peak_checked_out = max(peak_checked_out, pool_stats(engine).get("checkedout", 0))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client(index) for index in range(clients)))
+    return time.perf_counter() - started, sorted(latencies), peak_checked_out
+
+
+def _report(label: str, total: int, elapsed: float, latencies: List[float], peak: int) -> None:
+    p50 = statistics.median(latencies) * 1e3
+    p99 = latencies[int(len(latencies) * 0.99) - 1] * 1e3
+    print(f"{label:<8}{total / elapsed:>12,.0f}{p50:>12.1f}{p99:>12.1f}{peak:>14}")
+
+
+def run(args: argparse.Namespace) -> None:
+    tmpdir = tempfile.mkdtemp(prefix="db-load-")
+    url = args.url or f"sqlite:///{os.path.join(tmpdir, 'feed.db')}"
+    engine = create_engine(url, pool_pre_ping=True, **pool_options(url))
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    sync_repository = SqlMessageRepository(sessionmaker(bind=engine, future=True))
+    sync_repository.upsert_many(build_corpus(args.messages, seed=11))
+
+    app = FastAPI()
+    app.include_router(messages_api.router, prefix="/messages")
+    total = args.clients * args.requests
+    print(f"{args.messages} messages, {args.clients} clients x {args.requests} requests ({engine.dialect.name})")
+    print(f"{'stack':<8}{'req/s':>12}{'p50 ms':>12}{'p99 ms':>12}{'peak conns':>14}")
+
+    messages_service.use_repository(sync_repository)
+    try:
+        elapsed, latencies, peak = asyncio.run(_drive(app, args.clients, args.requests, engine, args.threadpool))
+        _report("sync", total, elapsed, latencies, peak)
+
+        async def run_async() -> tuple:
+            target = async_url(url)
+            async_engine = create_async_engine(target, pool_pre_ping=True, **pool_options(target))
+            messages_service.use_async_repository(
+                AsyncSqlMessageRepository(async_sessionmaker(bind=async_engine, expire_on_commit=False))
+            )
+            try:
+                return await _drive(app, args.clients, args.requests, async_engine, args.threadpool)
+            finally:
+                await async_engine.dispose()
+
+        elapsed, latencies, peak = asyncio.run(run_async())
+        _report("async", total, elapsed, latencies, peak)
+    finally:
+        messages_service.use_async_repository(None)
+        messages_service.use_repository(None)
+        engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=20_000)
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=20, help="requests per client")
+    parser.add_argument("--url", default=None)
+    parser.add_argument("--threadpool", type=int, default=None, help="Starlette threadpool size (default 40)")
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
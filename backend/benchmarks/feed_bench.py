@@ -0,0 +1,64 @@
+"""Feed page latency: full re-sort per request versus the pre-sorted index.
+
+Usage: ``python -m benchmarks.feed_bench --sizes 10000,100000,1000000``
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from dataclasses import replace
+from typing import Callable
+
+from app.services.feed_index import FeedSortIndex
+from app.services.messages import SORT_MODES, _sort_entries, _sort_key
+
+from .corpus import TAGS, build_corpus
+
+PAGE_SIZE = 20
+
+
+def _ms(fn: Callable[[], object], repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat * 1e3
+
+
+def run(size: int, repeat: int) -> None:
+    corpus = build_corpus(size)
+    started = time.perf_counter()
+    index = FeedSortIndex(_sort_key, SORT_MODES, corpus)
+    print(f"\n{size} messages (index build {time.perf_counter() - started:.2f}s)")
+    print(f"{'case':<28}{'re-sort ms':>12}{'index ms':>12}")
+
+    tagged = {seed.id for seed in corpus if TAGS[0] in seed.tags}
+    for sort in SORT_MODES:
+        resort = _ms(lambda: _sort_entries(corpus, sort)[:PAGE_SIZE], 1)
+        indexed = _ms(lambda: index.page(sort, limit=PAGE_SIZE), repeat)
+        print(f"{'top-' + str(PAGE_SIZE) + ' ' + sort:<28}{resort:>12.2f}{indexed:>12.4f}")
+
+    resort = _ms(lambda: _sort_entries([s for s in corpus if s.id in tagged], "likes")[:PAGE_SIZE], 1)
+    indexed = _ms(lambda: index.page("likes", limit=PAGE_SIZE, candidates=tagged), repeat)
+    print(f"{'tag filter + likes':<28}{resort:>12.2f}{indexed:>12.4f}")
+
+    rng = random.Random(1)
+    updates = [replace(seed, likes=seed.likes + 1) for seed in rng.sample(corpus, min(size, 1000))]
+    started = time.perf_counter()
+    for seed in updates:
+        index.update(seed)
+    per_update = (time.perf_counter() - started) / len(updates) * 1e6
+    print(f"{'like update (us)':<28}{'':>12}{per_update:>12.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    for size in (int(value) for value in args.sizes.split(",")):
+        run(size, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
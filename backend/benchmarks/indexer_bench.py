@@ -0,0 +1,139 @@
+"""Event indexer throughput: synthetic Move events replayed into SQLite.
+
+Writes a JSON-lines stream shaped like ``suix_queryEvents`` results (messages
+created, then a skewed mix of likes, alerts, updates, comments, proposals
+and votes) and replays it through ``EventIndexer``, reporting events/s.
+
+Usage: ``python -m benchmarks.indexer_bench --events 200000 --page-size 1000 [--url sqlite:///idx.db]``
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+from typing import Any, Dict, List
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.indexer import EventIndexer, JsonlEventSource
+from app.migrations import upgrade
+
+PACKAGE = "0x" + "5e" * 32
+START_MS = 1_700_000_000_000
+
+
+def _address(rng: random.Random) -> str:
+    return "0x" + "%064x" % rng.getrandbits(256)
+
+
+def build_events(count: int, *, seed: int = 3, messages: int | None = None) -> List[Dict[str, Any]]:
+    """``count`` events: one ``MessageCreated`` per message up front, then activity on them."""
+    rng = random.Random(seed)
+    message_count = messages or max(1, count // 20)
+    users = [_address(rng) for _ in range(max(10, message_count // 4))]
+    message_ids = ["0x%064x" % (index + 1) for index in range(message_count)]
+    likes = dict.fromkeys(message_ids, 0)
+    alerts = dict.fromkeys(message_ids, 0)
+    proposals: List[str] = []
+    events: List[Dict[str, Any]] = []
+
+    def emit(module: str, name: str, fields: Dict[str, Any]) -> None:
+        index = len(events)
+        events.append(
+            {
+                "id": {"txDigest": f"tx{index // 4:08d}", "eventSeq": str(index % 4)},
+                "packageId": PACKAGE,
+                "transactionModule": module,
+                "sender": fields.get("author") or fields.get("user") or fields.get("voter") or users[0],
+                "type": f"{PACKAGE}::{module}::{name}",
+                "parsedJson": fields,
+                "timestampMs": str(START_MS + index * 10),
+            }
+        )
+
+    for message_id in message_ids:
+        if len(events) >= count:
+            break
+        emit("message", "MessageCreated", {
+            "message_id": message_id, "author": rng.choice(users), "title_hash": [1, 2, 3], "created_at": "1",
+        })
+    hot = message_ids[: max(1, len(message_ids) // 100)]
+    while len(events) < count:
+        roll = rng.random()
+        message_id = rng.choice(hot) if rng.random() < 0.5 else rng.choice(message_ids)
+        if roll < 0.55:
+            likes[message_id] += 1
+            emit("message", "MessageLiked", {
+                "message_id": message_id, "user": rng.choice(users), "total_likes": str(likes[message_id]),
+            })
+        elif roll < 0.70:
+            alerts[message_id] += 1
+            emit("message", "MessageAlerted", {
+                "message_id": message_id, "user": rng.choice(users), "total_alerts": str(alerts[message_id]),
+            })
+        elif roll < 0.78:
+            emit("message", "CommentCreated", {
+                "comment_id": "0x%064x" % (len(events) + 10**9), "message_id": message_id, "author": rng.choice(users),
+            })
+        elif roll < 0.81:
+            emit("message", "MessageUpdated", {
+                "message_id": message_id, "status": rng.choice([0, 1, 2]), "updated_at": "2",
+            })
+        elif roll < 0.85:
+            proposal_id = "0x%064x" % (len(events) + 2 * 10**9)
+            proposals.append(proposal_id)
+            emit("vote", "ProposalCreated", {
+                "proposal_id": proposal_id, "message_id": message_id, "proposal_type": rng.randint(0, 1),
+                "proposer": rng.choice(users),
+            })
+        elif proposals:
+            emit("vote", "VoteCast", {
+                "proposal_id": rng.choice(proposals), "voter": _address(rng), "vote": rng.random() < 0.6,
+            })
+        else:
+            emit("message", "MessageDeleted", {"message_id": message_id, "deleted_by": users[0]})
+    return events
+
+
+def write_jsonl(events: List[Dict[str, Any]], path: str) -> None:
+    with open(path, "w") as handle:
+        for event in events:
+            handle.write(json.dumps(event, separators=(",", ":")) + "\n")
+
+
+def run(args: argparse.Namespace) -> None:
+    import asyncio
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "events.jsonl")
+        events = build_events(args.events)
+        write_jsonl(events, path)
+        engine = create_engine(args.url or f"sqlite:///{os.path.join(tmp, 'index.db')}", future=True)
+        upgrade(engine)
+        indexer = EventIndexer(
+            JsonlEventSource(path), sessionmaker(bind=engine, future=True), name="bench", page_size=args.page_size
+        )
+        started = time.perf_counter()
+        asyncio.run(indexer.run(until_caught_up=True))
+        elapsed = time.perf_counter() - started
+        stats = indexer.stats()
+        print(f"{stats['events']} events in {elapsed:.2f}s ({engine.dialect.name}, pages of {args.page_size})")
+        print(f"  end-to-end  {stats['events'] / elapsed:>12,.0f} events/s")
+        print(f"  apply only  {stats['events_per_second']:>12,.0f} events/s, last batch {stats['last_batch_ms']:.1f}ms")
+        engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=200_000)
+    parser.add_argument("--page-size", type=int, default=1000)
+    parser.add_argument("--url", default=None)
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+"""Live push load test: 10k clients subscribed to tag, feed and proposal topics.
+
+A publisher emits ``--rate`` metric deltas per second over ``--messages``
+messages (most land on a few hot ones, as in ``reactions_load``).  The hub
+coalesces them into frames every ``--frame-ms`` and fans them out to
+``--clients`` simulated clients.  Each client subscribes to one or two tags;
+a few watch the whole feed or all proposals.  ``--slow`` of the clients never
+read and should be evicted once ``--max-frames`` frames are queued.
+
+Each payload carries its publish time.  A sample of clients parse their frames
+to report delivery latency: the age of the oldest delta in a frame when it
+arrives.
+
+* ``--transport memory`` (default): clients are asyncio tasks reading their
+  ``Subscriber`` directly, which measures the hub on its own.
+* ``--transport ws``: clients are real WebSocket connections over loopback
+  to uvicorn running in a thread.  Each connection takes two file
+  descriptors, so raise ``ulimit -n`` for 10k.
+
+Usage: ``python -m benchmarks.live_load --clients 10000 --rate 2000 --seconds 10 [--transport ws]``
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import threading
+import time
+from typing import Any, Dict, List, Tuple
+
+from app.services.live import LiveHub, SubscriptionClosed, use_live_hub
+
+from .corpus import TAGS, build_corpus
+
+HOT_SHARE = 0.8
+HOT_FRACTION = 0.01
+SAMPLE_EVERY = 50
+
+
+def _topics(rng: random.Random) -> List[str]:
+    draw = rng.random()
+    if draw < 0.02:
+        return ["feed"]
+    if draw < 0.04:
+        return ["proposals"]
+    return [f"tag:{tag}" for tag in rng.sample(TAGS, k=rng.randint(1, 2))]
+
+
+class Results:
+    def __init__(self) -> None:
+        self.frames = 0
+        self.bytes = 0
+        self.latencies: List[float] = []
+
+    def record(self, frame: str, sampled: bool) -> None:
+        self.frames += 1
+        self.bytes += len(frame)
+        if sampled:
+            body = json.loads(frame)
+            stamps = [item["t"] for section in ("messages", "proposals") for item in body.get(section, ())]
+            self.latencies.append(time.perf_counter() - min(stamps))
+
+
+def _publish(hub: LiveHub, args: argparse.Namespace, stop: threading.Event) -> int:
+    """Publish from a thread of its own, as the reaction buffer's flush thread does."""
+    rng = random.Random(3)
+    corpus = build_corpus(args.messages, seed=7)
+    hot = corpus[: max(1, int(len(corpus) * HOT_FRACTION))]
+    topics: Dict[str, Tuple[str, ...]] = {
+        seed.id: ("feed", f"message:{seed.id}", *(f"tag:{tag}" for tag in seed.tags)) for seed in corpus
+    }
+    likes = {seed.id: seed.likes for seed in corpus}
+    tick = 0.01
+    per_tick = max(1, int(args.rate * tick))
+    published = 0
+    while not stop.is_set():
+        now = time.perf_counter()
+        for _ in range(per_tick):
+            seed = rng.choice(hot) if rng.random() < HOT_SHARE else rng.choice(corpus)
+            likes[seed.id] += 1
+            hub.publish(
+                "messages",
+                seed.id,
+                topics[seed.id],
+                {"id": seed.id, "likes": likes[seed.id], "alerts": seed.alerts, "displayed_status": "NORMAL", "t": now},
+            )
+        if rng.random() < 0.05:
+            proposal_id = rng.randrange(100)
+            hub.publish(
+                "proposals",
+                proposal_id,
+                ("proposals", f"proposal:{proposal_id}"),
+                {"id": proposal_id, "status": "OPEN", "approve_votes": rng.randrange(4), "t": now},
+            )
+        published += per_tick
+        time.sleep(max(0.0, tick - (time.perf_counter() - now)))
+    return published
+
+
+async def _memory_client(hub: LiveHub, topics: List[str], results: Results, sampled: bool, slow: bool) -> None:
+    subscriber = hub.subscribe(topics)
+    if slow:
+        return
+    try:
+        while True:
+            results.record(await subscriber.next_frame(), sampled)
+    except SubscriptionClosed:
+        pass
+
+
+async def _run_memory(args: argparse.Namespace, plans: List[Tuple[List[str], bool, bool]], results: Results) -> LiveHub:
+    hub = LiveHub(frame_interval=args.frame_ms / 1000, max_frames=args.max_frames)
+    clients = [
+        asyncio.ensure_future(_memory_client(hub, topics, results, sampled, slow)) for topics, sampled, slow in plans
+    ]
+    await asyncio.sleep(0)
+    await hub.start()
+    stop = threading.Event()
+    publisher = asyncio.ensure_future(asyncio.to_thread(_publish, hub, args, stop))
+    await asyncio.sleep(args.seconds)
+    stop.set()
+    args.published = await publisher
+    await asyncio.sleep(args.frame_ms / 1000 * 2)
+    await hub.stop()
+    await asyncio.gather(*clients)
+    return hub
+
+
+def _serve(hub: LiveHub, port: int, ready: threading.Event) -> Tuple[Any, threading.Thread]:
+    from contextlib import asynccontextmanager
+
+    import uvicorn
+    from fastapi import FastAPI
+
+    from app.api import live
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        await hub.start()
+        ready.set()
+        yield
+        await hub.stop()
+
+    app = FastAPI(lifespan=lifespan)
+    app.include_router(live.router, prefix="/live")
+
+    config = uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", backlog=4096)
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    return server, thread
+
+
+async def _ws_client(url: str, results: Results, sampled: bool, slow: bool, connected: List[int]) -> None:
+    import websockets
+
+    try:
+        # A slow client stops reading once one frame is queued, so TCP backpressure reaches the server.
+        async with websockets.connect(url, max_queue=1 if slow else 16, open_timeout=60) as socket:
+            connected[0] += 1
+            if slow:
+                await socket.wait_closed()
+                return
+            async for frame in socket:
+                results.record(frame, sampled)
+    except (OSError, asyncio.TimeoutError, websockets.WebSocketException):
+        connected[1] += 1
+
+
+async def _run_ws(args: argparse.Namespace, plans: List[Tuple[List[str], bool, bool]], results: Results) -> LiveHub:
+    hub = LiveHub(frame_interval=args.frame_ms / 1000, max_frames=args.max_frames)
+    use_live_hub(hub)
+    ready = threading.Event()
+    server, thread = _serve(hub, args.port, ready)
+    await asyncio.to_thread(ready.wait)
+    connected = [0, 0]
+    started = time.perf_counter()
+    clients = []
+    for index, (topics, sampled, slow) in enumerate(plans):
+        query = "&".join(f"topic={topic}" for topic in topics)
+        url = f"ws://127.0.0.1:{args.port}/live/ws?{query}"
+        clients.append(asyncio.ensure_future(_ws_client(url, results, sampled, slow, connected)))
+        if index % 200 == 199:
+            await asyncio.sleep(0.05)
+    while connected[0] + connected[1] < len(plans) and time.perf_counter() - started < 120:
+        await asyncio.sleep(0.1)
+    print(f"  {connected[0]} connected ({connected[1]} failed) in {time.perf_counter() - started:.1f}s")
+    stop = threading.Event()
+    publisher = asyncio.ensure_future(asyncio.to_thread(_publish, hub, args, stop))
+    await asyncio.sleep(args.seconds)
+    stop.set()
+    args.published = await publisher
+    await asyncio.sleep(1.0)
+    server.should_exit = True
+    await asyncio.to_thread(thread.join, 30)
+    for client in clients:
+        client.cancel()
+    await asyncio.gather(*clients, return_exceptions=True)
+    use_live_hub(None)
+    return hub
+
+
+def run(args: argparse.Namespace) -> None:
+    rng = random.Random(5)
+    slow = set(rng.sample(range(args.clients), args.slow))
+    plans = [(_topics(rng), index % SAMPLE_EVERY == 0, index in slow) for index in range(args.clients)]
+    results = Results()
+    print(
+        f"{args.clients} clients ({args.slow} never read), {args.rate} deltas/s over {args.messages} messages, "
+        f"{args.frame_ms}ms frames, {args.transport} transport"
+    )
+    started = time.perf_counter()
+    runner = _run_ws if args.transport == "ws" else _run_memory
+    hub = asyncio.run(runner(args, plans, results))
+    elapsed = time.perf_counter() - started
+    stats = hub.stats()
+    latencies = sorted(results.latencies)
+    print(f"  published {args.published} deltas, {stats['published']} accepted in {elapsed:.1f}s")
+    print(
+        f"  {stats['deliveries']:,} frame deliveries ({stats['deliveries'] / args.seconds:,.0f}/s), "
+        f"{stats['frames']:,} distinct encodings, {results.frames:,} frames received, "
+        f"{results.bytes / max(results.frames, 1):,.0f} bytes/frame"
+    )
+    if latencies:
+        p50 = statistics.median(latencies) * 1e3
+        p99 = latencies[max(0, int(len(latencies) * 0.99) - 1)] * 1e3
+        print(f"  delivery latency (oldest delta per frame): p50 {p50:.0f}ms, p99 {p99:.0f}ms")
+    print(f"  evicted {stats['evicted']} slow clients, last fan-out {stats['last_flush_ms']:.1f}ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, default=10_000)
+    parser.add_argument("--slow", type=int, default=100)
+    parser.add_argument("--messages", type=int, default=10_000)
+    parser.add_argument("--rate", type=int, default=2000, help="metric deltas published per second")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--frame-ms", type=float, default=100.0)
+    parser.add_argument("--max-frames", type=int, default=64)
+    parser.add_argument("--transport", choices=("memory", "ws"), default="memory")
+    parser.add_argument("--port", type=int, default=8765)
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
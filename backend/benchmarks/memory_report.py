@@ -0,0 +1,59 @@
+"""Memory footprint of a tuple of ``MessageSeed`` objects versus the columnar store.
+
+Usage: ``python -m benchmarks.memory_report --size 200000``
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import time
+import tracemalloc
+from typing import Callable
+
+from app.services.messages import ALERTS_THRESHOLD, LIKES_THRESHOLD, _display_status_codes, _to_threshold_column
+from app.services.store import ColumnarMessageStore
+
+from .corpus import build_corpus
+
+
+def _retained_bytes(build: Callable[[], object]) -> int:
+    """Bytes still allocated once ``build`` returns and its temporaries are freed."""
+    gc.collect()
+    tracemalloc.start()
+    value = build()
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del value
+    return current
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    seed_bytes = _retained_bytes(lambda: tuple(build_corpus(args.size)))
+    store_bytes = _retained_bytes(lambda: ColumnarMessageStore(build_corpus(args.size), capacity=args.size))
+
+    print(f"{args.size} messages")
+    print(f"{'MessageSeed tuple':<28}{seed_bytes / 2**20:>10.1f} MiB")
+    print(f"{'columnar store':<28}{store_bytes / 2**20:>10.1f} MiB")
+
+    store = ColumnarMessageStore(
+        build_corpus(args.size), capacity=args.size, review_thresholds=(LIKES_THRESHOLD, ALERTS_THRESHOLD)
+    )
+    for part, size in sorted(store.memory_usage().items(), key=lambda item: -item[1]):
+        print(f"  {part:<26}{size / 2**20:>10.2f} MiB")
+
+    started = time.perf_counter()
+    for _ in range(args.repeat):
+        _display_status_codes(store.review, store.status)
+        _to_threshold_column(store.likes, store.status, LIKES_THRESHOLD)
+    elapsed = (time.perf_counter() - started) / args.repeat * 1e3
+    print(f"vectorized status + threshold over all rows: {elapsed:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Proposal book: per-manager "not yet voted" views against a full scan.
+
+Opens ``--proposals`` proposals, resolves all but ``--open`` of them with
+votes from ``--managers`` managers, then times the dashboard query for every
+manager with ``ProposalBook.pending_for`` and with a scan of every proposal
+and its voter list (what polling ``VotingSystem.active_proposals`` costs).
+
+Usage: ``python -m benchmarks.proposal_bench --proposals 100000 --open 2000 --managers 20``
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+from app.schemas import ProposalStatus
+from app.services.counters import ThresholdCrossing
+from app.services.proposals import QUORUM, ProposalBook
+
+
+def run(args: argparse.Namespace) -> None:
+    rng = random.Random(11)
+    managers = [f"0x{index:04x}" for index in range(args.managers)]
+    book = ProposalBook()
+    book.add_managers(managers)
+    voters = {}
+    started = time.perf_counter()
+    proposals = book.open_many(
+        ThresholdCrossing(f"msg-{index}", "likes" if index % 3 else "alerts", 20) for index in range(args.proposals)
+    )
+    closing = len(proposals) - args.open
+    for index, proposal in enumerate(proposals):
+        # Resolved proposals take a quorum; open ones a random share of the managers.
+        chosen = rng.sample(managers, QUORUM if index < closing else rng.randrange(QUORUM))
+        for manager in chosen:
+            book.vote(proposal.id, manager, True)
+        voters[proposal.id] = chosen
+    elapsed = time.perf_counter() - started
+    print(f"{args.proposals} proposals, {args.open} open, {sum(map(len, voters.values()))} votes in {elapsed:.2f}s")
+
+    started = time.perf_counter()
+    for _ in range(args.rounds):
+        indexed = [len(book.pending_for(manager)) for manager in managers]
+    elapsed = time.perf_counter() - started
+    print(f"  pending_for: {elapsed / args.rounds / len(managers) * 1e6:,.0f}us per manager")
+
+    history = [book.get(proposal.id) for proposal in proposals]
+    started = time.perf_counter()
+    for _ in range(args.rounds):
+        scanned = [
+            sum(
+                1
+                for proposal in history
+                if proposal.status is ProposalStatus.OPEN and manager not in voters[proposal.id]
+            )
+            for manager in managers
+        ]
+    elapsed = time.perf_counter() - started
+    print(f"  full scan:   {elapsed / args.rounds / len(managers) * 1e6:,.0f}us per manager")
+    assert indexed == scanned
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--proposals", type=int, default=100_000)
+    parser.add_argument("--open", type=int, default=2000)
+    parser.add_argument("--managers", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=5)
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Swap quote throughput: one POST per quote versus the batch endpoint.
+
+Both cases go through the full FastAPI stack (validation, dependency,
+serialization) with ``TestClient``; the batch case sends ``--batch`` quotes
+per request.  Reports requests/s, quotes/s and mean latency per request,
+then compares what ``execute_swap`` spends on the quote: verifying a signed
+quote token versus pricing the swap again.
+
+Usage: ``python -m benchmarks.quote_bench --quotes 2000 --batch 100``
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+import timeit
+from decimal import Decimal
+from typing import Dict, List
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import wallet
+from app.security import get_current_user
+from app.services.amm import ConstantProductPool, use_swap_pool
+
+USER = {"id": "0x" + "ab" * 32}
+
+
+def _requests(count: int, seed: int) -> List[Dict[str, str]]:
+    rng = random.Random(seed)
+    pairs = (("SUI", "SWT"), ("SWT", "SUI"))
+    return [
+        {
+            "pay_symbol": pay,
+            "receive_symbol": receive,
+            "pay_amount": f"{rng.uniform(0.01, 10_000):.6f}",
+        }
+        for pay, receive in (rng.choice(pairs) for _ in range(count))
+    ]
+
+
+def _report(label: str, requests: int, quotes: int, elapsed: float) -> None:
+    print(f"{label:<14}{requests / elapsed:>12.0f}{quotes / elapsed:>12.0f}{elapsed / requests * 1e3:>14.2f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--quotes", type=int, default=2000)
+    parser.add_argument("--batch", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    app = FastAPI()
+    app.include_router(wallet.router, prefix="/api/wallet")
+    app.dependency_overrides[get_current_user] = lambda: USER
+    client = TestClient(app)
+    requests = _requests(args.quotes, args.seed)
+
+    print(f"{args.quotes} quotes, batches of {args.batch}")
+    print(f"{'case':<14}{'requests/s':>12}{'quotes/s':>12}{'ms/request':>14}")
+
+    started = time.perf_counter()
+    for request in requests:
+        client.post("/api/wallet/swap/quote", json=request).raise_for_status()
+    _report("single", len(requests), len(requests), time.perf_counter() - started)
+
+    batches = [requests[index : index + args.batch] for index in range(0, len(requests), args.batch)]
+    started = time.perf_counter()
+    for batch in batches:
+        client.post("/api/wallet/swap/quote/batch", json={"quotes": batch}).raise_for_status()
+    _report("batch", len(batches), len(requests), time.perf_counter() - started)
+
+    quote = client.post("/api/wallet/swap/quote", json=requests[0]).json()
+    exec_req = wallet.SwapExecReq(**requests[0], quote_token=quote["quote_token"])
+    user = wallet._get_user_identifier(USER)
+    amount = Decimal(requests[0]["pay_amount"])
+    number = 20_000
+
+    def best_us(fn) -> float:
+        return min(timeit.repeat(fn, number=number, repeat=5)) / number * 1e6
+
+    requote = best_us(lambda: wallet._compute_quote(exec_req.pay_symbol, exec_req.receive_symbol, amount))
+    verify = best_us(lambda: wallet._verify_quote_token(exec_req, user))
+    use_swap_pool(ConstantProductPool(reserve_a=10**15, reserve_b=366 * 10**13))
+    try:
+        pool_requote = best_us(lambda: wallet._compute_quote(exec_req.pay_symbol, exec_req.receive_symbol, amount))
+    finally:
+        use_swap_pool(None)
+    print()
+    print(
+        f"execute_swap pricing: token verify {verify:.1f} us, re-quote {requote:.1f} us "
+        f"(USD prices) / {pool_requote:.1f} us (pool model)"
+    )
+
+
+if __name__ == "__main__":
+    main()
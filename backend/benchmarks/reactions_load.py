@@ -0,0 +1,165 @@
+"""Reactions/s load test: per-reaction writes versus the write-behind buffer.
+
+Worker threads send a skewed like/alert stream (most clicks land on a few hot
+messages) either straight to ``apply_reaction_delta`` or through
+``ReactionCounterBuffer`` with the proposal pipeline running on its own event
+loop, and report throughput, request latency and how many proposals opened.
+
+Usage: ``python -m benchmarks.reactions_load --messages 10000 --threads 8 --reactions 20000``
+Add ``--database`` to run against a SQLite ``SqlMessageRepository``.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+from typing import Callable, List, Sequence
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models import Base
+from app.repositories.messages import SqlMessageRepository
+from app.services import messages as messages_service
+from app.services.counters import ReactionCounterBuffer
+from app.services.proposals import ProposalBook, ProposalPipeline
+
+from .corpus import build_corpus
+
+HOT_SHARE = 0.8
+HOT_FRACTION = 0.01
+
+
+def _workload(ids: Sequence[str], count: int, seed: int) -> List[tuple]:
+    rng = random.Random(seed)
+    hot = ids[: max(1, int(len(ids) * HOT_FRACTION))]
+    return [
+        (rng.choice(hot) if rng.random() < HOT_SHARE else rng.choice(ids), rng.random() < 0.7)
+        for _ in range(count)
+    ]
+
+
+def _drive(react: Callable[[str, bool], object], workloads: List[List[tuple]]) -> tuple:
+    latencies: List[List[float]] = [[] for _ in workloads]
+
+    def worker(index: int) -> None:
+        record = latencies[index].append
+        for message_id, is_like in workloads[index]:
+            started = time.perf_counter()
+            react(message_id, is_like)
+            record(time.perf_counter() - started)
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(len(workloads))]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    merged = sorted(value for chunk in latencies for value in chunk)
+    return elapsed, merged
+
+
+def _report(label: str, total: int, elapsed: float, latencies: List[float], extra: str = "") -> None:
+    p50 = statistics.median(latencies) * 1e6
+    p99 = latencies[int(len(latencies) * 0.99) - 1] * 1e6
+    print(f"{label:<12}{total / elapsed:>14,.0f}{p50:>12.1f}{p99:>12.1f}  {extra}")
+
+
+def run(args: argparse.Namespace) -> None:
+    corpus = build_corpus(args.messages, seed=7)
+    ids = [seed.id for seed in corpus]
+    tmpdir = tempfile.mkdtemp(prefix="reactions-load-")
+    if args.database:
+        engine = create_engine(f"sqlite:///{os.path.join(tmpdir, 'feed.db')}")
+        Base.metadata.create_all(bind=engine)
+        repository = SqlMessageRepository(sessionmaker(bind=engine, future=True))
+        repository.upsert_many(corpus)
+        messages_service.use_repository(repository)
+    else:
+        for seed in corpus:
+            messages_service.upsert_message(seed)
+
+    workloads = [_workload(ids, args.reactions, seed) for seed in range(args.threads)]
+    total = args.threads * args.reactions
+    backend = "sqlite repository" if args.database else "in-memory store"
+    print(f"{args.messages} messages, {args.threads} threads x {args.reactions} reactions ({backend})")
+    print(f"{'mode':<12}{'reactions/s':>14}{'p50 us':>12}{'p99 us':>12}")
+
+    # The in-memory store is not thread-safe; direct writes take one lock, as a row lock would.
+    lock = threading.Lock()
+
+    def direct(message_id: str, is_like: bool) -> None:
+        with lock:
+            messages_service.apply_reaction_delta(message_id, likes=int(is_like), alerts=int(not is_like))
+
+    direct_workloads = workloads if not args.database else [w[: args.direct_limit] for w in workloads]
+    elapsed, latencies = _drive(direct, direct_workloads)
+    _report("direct", sum(map(len, direct_workloads)), elapsed, latencies)
+
+    loop = asyncio.new_event_loop()
+    loop_thread = threading.Thread(target=loop.run_forever, daemon=True)
+    loop_thread.start()
+    book = ProposalBook()
+    pipeline = ProposalPipeline(book)
+    buffer = ReactionCounterBuffer(
+        on_crossing=pipeline.publish,
+        auto_ack=False,
+        log_dir=os.path.join(tmpdir, "log") if args.log else None,
+        flush_interval=args.flush_interval,
+        flush_threshold=args.flush_threshold,
+    )
+
+    async def start() -> None:
+        pipeline.start(acknowledge=buffer.acknowledge)
+
+    asyncio.run_coroutine_threadsafe(start(), loop).result()
+    flushes = 0
+    original_flush = buffer.flush
+
+    def counted_flush() -> int:
+        nonlocal flushes
+        flushed = original_flush()
+        flushes += bool(flushed)
+        return flushed
+
+    buffer.flush = counted_flush  # type: ignore[method-assign]
+    buffer.start()
+
+    def buffered(message_id: str, is_like: bool) -> None:
+        buffer.increment(message_id, likes=int(is_like), alerts=int(not is_like))
+
+    elapsed, latencies = _drive(buffered, workloads)
+    buffer.stop()
+    asyncio.run_coroutine_threadsafe(pipeline.stop(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    _report(
+        "buffered",
+        total,
+        elapsed,
+        latencies,
+        f"{flushes} flushes, {pipeline.batches} proposal batches, {pipeline.opened} proposals",
+    )
+    messages_service.use_repository(None)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=10_000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--reactions", type=int, default=20_000, help="reactions per thread")
+    parser.add_argument("--database", action="store_true")
+    parser.add_argument("--direct-limit", type=int, default=500, help="per-thread cap for direct SQL writes")
+    parser.add_argument("--log", action="store_true", help="enable the crash-recovery log")
+    parser.add_argument("--flush-interval", type=float, default=0.5)
+    parser.add_argument("--flush-threshold", type=int, default=10_000)
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Feed page latency: in-memory linear scan versus ``SqlMessageRepository``.
+
+Usage: ``python -m benchmarks.repository_bench --sizes 10000,50000,100000 [--url sqlite:///feed.db]``
+
+Without ``--url`` a temporary SQLite file is used (FTS5 trigram search); point
+it at PostgreSQL to exercise the pg_trgm and composite indexes instead.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+from typing import Callable, List
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models import Base
+from app.repositories.messages import SqlMessageRepository
+from app.services.messages import MessageSeed, _matches_search, _sort_entries, _tags_match
+
+from .corpus import build_corpus
+
+PAGE_SIZE = 20
+
+
+def _ms(fn: Callable[[], object], repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat * 1e3
+
+
+def _scan(corpus: List[MessageSeed], *, search=None, tags=None, sort="latest") -> List[MessageSeed]:
+    seeds = corpus
+    if search:
+        seeds = [seed for seed in seeds if _matches_search(seed, search)]
+    if tags:
+        seeds = [seed for seed in seeds if _tags_match(seed.tags, tags, "and")]
+    return _sort_entries(seeds, sort)[:PAGE_SIZE]
+
+
+def run(size: int, url: str | None, repeat: int) -> None:
+    corpus = build_corpus(size)
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(url or f"sqlite:///{os.path.join(tmp, 'feed.db')}", future=True)
+        Base.metadata.drop_all(bind=engine)
+        Base.metadata.create_all(bind=engine)
+        repository = SqlMessageRepository(sessionmaker(bind=engine, future=True))
+        started = time.perf_counter()
+        repository.upsert_many(corpus)
+        print(f"\n{size} messages (bulk load {time.perf_counter() - started:.2f}s, {engine.dialect.name})")
+        print(f"{'case':<26}{'scan ms':>12}{'repository ms':>16}")
+
+        cases = {
+            "latest": {"sort": "latest"},
+            "likes": {"sort": "likes"},
+            "under_review": {"sort": "under_review"},
+            "search '#1234'": {"search": "#1234"},
+            "search 'burner wallet'": {"search": "burner wallet", "sort": "likes"},
+            "tags zk+risk": {"tags": ["zk", "risk"], "sort": "alerts"},
+        }
+        for label, params in cases.items():
+            expected = [seed.id for seed in _scan(corpus, **params)]
+            got = [seed.id for seed in repository.page(limit=PAGE_SIZE, tag_mode="and", **params)]
+            assert got == expected, label
+            scan = _ms(lambda: _scan(corpus, **params), 3)
+            sql = _ms(lambda: repository.page(limit=PAGE_SIZE, tag_mode="and", **params), repeat)
+            print(f"{label:<26}{scan:>12.2f}{sql:>16.2f}")
+        engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="10000,50000,100000")
+    parser.add_argument("--url", default=None)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    for size in (int(value) for value in args.sizes.split(",")):
+        run(size, args.url, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""Compare the linear ``_matches_search`` scan with ``MessageSearchIndex``.
+
+Usage: ``python -m benchmarks.search_bench --size 100000``
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Callable, Sequence
+
+from app.services.messages import _matches_search
+from app.services.search import MessageSearchIndex
+
+from .corpus import build_corpus
+
+QUERIES: Sequence[str] = ("vault", "Burner wallet", "zk", "@user42", "#1234", "slippage fee", "nomatch")
+
+
+def _time(fn: Callable[[], object], repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.size)
+    started = time.perf_counter()
+    index = MessageSearchIndex(corpus)
+    print(f"indexed {args.size} messages in {time.perf_counter() - started:.2f}s")
+    print(f"{'query':<16}{'hits':>9}{'scan ms':>12}{'index ms':>12}{'speedup':>10}")
+
+    for query in QUERIES:
+        hits = index.search(query)
+        assert hits == {seed.id for seed in corpus if _matches_search(seed, query)}
+        scan = _time(lambda: [seed for seed in corpus if _matches_search(seed, query)], 1)
+        indexed = _time(lambda: index.search(query), args.repeat)
+        print(f"{query:<16}{len(hits):>9}{scan * 1e3:>12.2f}{indexed * 1e3:>12.3f}{scan / indexed:>9.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""Wallet summary latency: sequential lookups versus batched reads per chain.
+
+A fake chain adapter sleeps ``--delay`` seconds per address lookup and per
+balance call, batched or not (optionally much longer for one optional chain),
+and is installed in place of ``app.chain``'s functions.
+
+Usage: ``python -m benchmarks.wallet_bench --delay 0.05 --slow-btc 2``
+"""
+from __future__ import annotations
+
+import argparse
+import statistics
+import threading
+import time
+from decimal import Decimal
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+from app import chain as chain_module
+from app.api import wallet
+
+BALANCES: Dict[str, Decimal] = {
+    "SWT": Decimal("1500"),
+    "SUI": Decimal("12.5"),
+    "BTC": Decimal("0.1"),
+    "ETH": Decimal("2"),
+}
+
+
+class FakeChainAdapter:
+    """Delay-injecting stand-in for the ``app.chain`` wallet functions."""
+
+    def __init__(self, delay: float = 0.05) -> None:
+        self.delay = delay
+        self.delays: Dict[str, float] = {}
+        self.failures: Set[str] = set()
+        # Setting ``release`` ends every pending delay early (test teardown).
+        self.release = threading.Event()
+        self.calls = 0
+        self.batches: List[List[str]] = []
+        self.max_in_flight = 0
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    def install(self, setattr_: Callable[[object, str, object], None] = setattr) -> None:
+        setattr_(chain_module, "get_user_address", self.get_user_address)
+        setattr_(chain_module, "get_sui_balance", self.get_sui_balance)
+        setattr_(chain_module, "get_token_balance", self.get_token_balance)
+        setattr_(chain_module, "get_balances", self.get_balances)
+
+    def _wait(self, *symbols: str, timeout: Optional[float] = None) -> None:
+        with self._lock:
+            self.calls += 1
+            self._in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self._in_flight)
+        try:
+            delay = max(self.delays.get(symbol, self.delay) for symbol in symbols)
+            if timeout is not None and delay > timeout:
+                # Like ``app.chain.run``: the call is cancelled at its timeout.
+                self.release.wait(timeout)
+                raise TimeoutError(f"{', '.join(symbols)} balance call timed out")
+            self.release.wait(delay)
+            for symbol in symbols:
+                if symbol in self.failures:
+                    raise RuntimeError(f"{symbol} node unavailable")
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def get_user_address(self, user_identifier: str, symbol: str) -> str:
+        self._wait(symbol)
+        return f"{symbol.lower()}-{user_identifier}"
+
+    def get_sui_balance(self, address: str) -> Decimal:
+        self._wait("SUI")
+        return BALANCES["SUI"]
+
+    def get_token_balance(self, address: str, symbol: str) -> Decimal:
+        self._wait(symbol)
+        return BALANCES[symbol]
+
+    def get_balances(self, queries: Sequence[Tuple[str, str]], timeout: Optional[float] = None) -> List[Decimal]:
+        symbols = [symbol for _, symbol in queries]
+        self.batches.append(symbols)
+        self._wait(*symbols, timeout=timeout)
+        return [BALANCES[symbol] for symbol in symbols]
+
+
+def _sequential(user: str) -> Dict[str, Decimal]:
+    return {
+        symbol: wallet._get_asset_balance(user, user, symbol, optional=symbol in wallet._OPTIONAL_CHAIN_SYMBOLS)
+        for symbol in wallet.ASSET_SYMBOLS
+    }
+
+
+def _concurrent(user: str) -> Dict[str, Decimal]:
+    return wallet._get_asset_balances(user, user, wallet.ASSET_SYMBOLS)
+
+
+def _measure(fn: Callable[[str], object], repeat: int) -> List[float]:
+    samples = []
+    for _ in range(repeat):
+        # Measure cold lookups; the wallet cache would otherwise answer repeats.
+        wallet.get_wallet_cache().clear()
+        started = time.perf_counter()
+        fn("0xuser")
+        samples.append((time.perf_counter() - started) * 1e3)
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--delay", type=float, default=0.05, help="seconds per chain lookup")
+    parser.add_argument("--slow-btc", type=float, default=2.0, help="seconds per BTC lookup in the slow case")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    adapter = FakeChainAdapter(delay=args.delay)
+    adapter.install()
+    print(f"{args.delay * 1e3:.0f} ms per lookup, {len(wallet.ASSET_SYMBOLS)} assets")
+    print(f"{'case':<34}{'p50 ms':>10}{'max ms':>10}")
+    cases = [("sequential", _sequential), ("batched per chain", _concurrent)]
+    for label, fn in cases:
+        samples = _measure(fn, args.repeat)
+        print(f"{label:<34}{statistics.median(samples):>10.1f}{max(samples):>10.1f}")
+
+    adapter.delays["BTC"] = args.slow_btc
+    for label, fn in cases:
+        samples = _measure(fn, max(1, args.repeat // 5))
+        print(f"{label + ' (slow BTC)':<34}{statistics.median(samples):>10.1f}{max(samples):>10.1f}")
+    adapter.release.set()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,19 @@
+import atexit
+import os
+import shutil
 import sys
+import tempfile
 from pathlib import Path
 
 ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
+
+# The app refuses to start without a proof verifier; tests opt into the unchecked one.
+os.environ.setdefault("ZKLOGIN_PROOF_VERIFIER", "none")
+
+# Settings are read at import, before any fixture runs, so the suite's database
+# lives in one temporary directory per run rather than the working directory.
+_DATABASE_DIR = tempfile.mkdtemp(prefix="suiworld-tests-")
+atexit.register(shutil.rmtree, _DATABASE_DIR, ignore_errors=True)
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{Path(_DATABASE_DIR) / 'test.db'}")
@@ -0,0 +1,115 @@
+import os
+from decimal import Decimal
+
+import pytest
+from hypothesis import given, settings as hypothesis_settings
+from hypothesis import strategies as st
+
+os.environ.setdefault("SUPABASE_URL", "http://localhost")
+os.environ.setdefault("SUPABASE_ANON_KEY", "anon")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "service")
+
+from app.services.amm import (
+    ConstantProductPool,
+    InsufficientLiquidityError,
+    SlippageExceededError,
+    min_amount_out,
+)
+
+reserves = st.integers(min_value=10**6, max_value=10**18)
+amounts = st.integers(min_value=1, max_value=10**18)
+fees = st.integers(min_value=0, max_value=100)
+sides = st.sampled_from(["SUI", "SWT"])
+
+
+def _pool(reserve_sui, reserve_swt, fee_bps=30):
+    return ConstantProductPool(reserve_a=reserve_sui, reserve_b=reserve_swt, fee_bps=fee_bps)
+
+
+@given(reserves, reserves, fees, st.lists(st.tuples(sides, amounts), min_size=1, max_size=20))
+def test_swaps_never_decrease_k_or_drain_a_side(reserve_sui, reserve_swt, fee_bps, trades):
+    pool = _pool(reserve_sui, reserve_swt, fee_bps)
+    for pay_symbol, amount_in in trades:
+        before = pool.reserves()
+        try:
+            quote = pool.swap(pay_symbol, amount_in)
+        except InsufficientLiquidityError:
+            assert pool.reserves() == before
+            continue
+        after = pool.reserves()
+        assert after["SUI"] * after["SWT"] >= before["SUI"] * before["SWT"]
+        assert after[quote.receive_symbol] > 0
+        assert after[pay_symbol] == before[pay_symbol] + amount_in
+        assert after[quote.receive_symbol] == before[quote.receive_symbol] - quote.amount_out
+
+
+@given(reserves, reserves, fees, sides, amounts)
+def test_quote_matches_swap_and_fee_only_lowers_output(reserve_sui, reserve_swt, fee_bps, pay_symbol, amount_in):
+    pool = _pool(reserve_sui, reserve_swt, fee_bps)
+    quote = pool.quote(pay_symbol, amount_in)
+    assert 0 <= quote.amount_out <= quote.gross_out < quote.reserve_out
+    assert quote.price_impact_bps >= 0
+    if quote.amount_out > 0:
+        assert pool.swap(pay_symbol, amount_in).amount_out == quote.amount_out
+
+
+@given(reserves, reserves, sides, amounts, amounts)
+def test_larger_trades_get_more_output_at_worse_prices(reserve_sui, reserve_swt, pay_symbol, first, second):
+    small, large = sorted((first, second))
+    pool = _pool(reserve_sui, reserve_swt)
+    small_quote = pool.quote(pay_symbol, small)
+    large_quote = pool.quote(pay_symbol, large)
+    assert large_quote.amount_out >= small_quote.amount_out
+    # Output per unit of input falls with size; +1 allows for flooring the smaller trade.
+    assert large_quote.gross_out * small < (small_quote.gross_out + 1) * large
+
+
+@given(reserves, reserves, fees, sides, amounts)
+def test_round_trip_never_profits(reserve_sui, reserve_swt, fee_bps, pay_symbol, amount_in):
+    pool = _pool(reserve_sui, reserve_swt, fee_bps)
+    try:
+        out = pool.swap(pay_symbol, amount_in).amount_out
+        back = pool.swap(pool.quote(pay_symbol, 0).receive_symbol, out).amount_out
+    except InsufficientLiquidityError:
+        return
+    assert back <= amount_in
+
+
+@hypothesis_settings(max_examples=50)
+@given(reserves, reserves, st.lists(st.tuples(sides, amounts), min_size=1, max_size=10))
+def test_fees_accrue_per_input_token(reserve_sui, reserve_swt, trades):
+    pool = _pool(reserve_sui, reserve_swt, 30)
+    expected = {"SUI": 0, "SWT": 0}
+    for pay_symbol, amount_in in trades:
+        try:
+            quote = pool.swap(pay_symbol, amount_in)
+        except InsufficientLiquidityError:
+            continue
+        expected[pay_symbol] += amount_in * 30 // 10_000
+        assert quote.fee_in == amount_in * 30 // 10_000
+    assert pool.fees() == expected
+
+
+@given(reserves, reserves, sides, amounts, st.integers(min_value=0, max_value=10_000))
+def test_slippage_limit_rejects_without_changes(reserve_sui, reserve_swt, pay_symbol, amount_in, slippage_bps):
+    pool = _pool(reserve_sui, reserve_swt)
+    quote = pool.quote(pay_symbol, amount_in)
+    limit = min_amount_out(quote.amount_out, slippage_bps)
+    assert limit <= quote.amount_out
+    before = pool.reserves()
+    expected_error = SlippageExceededError if quote.amount_out > 0 else InsufficientLiquidityError
+    with pytest.raises(expected_error):
+        pool.swap(pay_symbol, amount_in, min_amount_out=quote.amount_out + 1)
+    assert pool.reserves() == before
+
+
+def test_sync_ignores_stale_events():
+    pool = _pool(0, 0)
+    assert not pool.ready
+    event = {"checkpoint": "10", "id": {"txDigest": "d", "eventSeq": "2"}, "parsedJson": {}}
+    assert pool.apply_event({**event, "parsedJson": {"reserve_sui": "1000000000", "reserve_swt": "3660000"}})
+    assert pool.ready and pool.reserves() == {"SUI": 10**9, "SWT": 3_660_000}
+    stale = {**event, "id": {"txDigest": "d", "eventSeq": "1"}, "parsedJson": {"reserve_sui": "1", "reserve_swt": "1"}}
+    assert not pool.apply_event(stale)
+    assert not pool.apply_event({"parsedJson": {"amount_in": "5"}})
+    assert pool.status()["price"] == "3.66"
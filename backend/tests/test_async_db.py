@@ -0,0 +1,111 @@
+import asyncio
+import os
+
+import pytest
+
+os.environ.setdefault("SUPABASE_URL", "http://localhost")
+os.environ.setdefault("SUPABASE_ANON_KEY", "anon")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "service")
+
+pytest.importorskip("aiosqlite")
+pytest.importorskip("greenlet")
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import db
+from app.api import messages as messages_api
+from app.models import Base
+from app.repositories.messages import AsyncSqlMessageRepository, SqlMessageRepository
+from app.services import messages as messages_service
+
+from benchmarks.corpus import build_corpus
+
+
+def test_async_url_and_pool_options():
+    assert db.async_url("postgresql://user:pw@host/app") == "postgresql+asyncpg://user:pw@host/app"
+    assert db.async_url("postgresql+psycopg2://host/app") == "postgresql+asyncpg://host/app"
+    assert db.async_url("sqlite:///feed.db") == "sqlite+aiosqlite:///feed.db"
+    with pytest.raises(ValueError):
+        db.async_url("mysql://host/app")
+    assert db.pool_options("sqlite://") == {}
+    options = db.pool_options("postgresql://host/app")
+    assert set(options) == {"pool_size", "max_overflow", "pool_timeout", "pool_recycle"}
+
+
+@pytest.fixture
+def repositories(tmp_path):
+    url = f"sqlite:///{tmp_path / 'feed.db'}"
+    engine = create_engine(url, **db.pool_options(url))
+    Base.metadata.create_all(bind=engine)
+    sync_repository = SqlMessageRepository(sessionmaker(bind=engine, future=True))
+    sync_repository.upsert_many([*messages_service.MESSAGE_SEEDS, *build_corpus(120, seed=5, creators=8)])
+    async_engine = create_async_engine(db.async_url(url), **db.pool_options(url))
+    async_repository = AsyncSqlMessageRepository(async_sessionmaker(bind=async_engine, expire_on_commit=False))
+    yield sync_repository, async_repository, async_engine
+    asyncio.run(async_engine.dispose())
+    engine.dispose()
+
+
+def test_async_repository_matches_sync_repository(repositories):
+    sync_repository, async_repository, _ = repositories
+    cases = [
+        {"sort": "likes", "limit": 25},
+        {"search": "wallet", "sort": "latest"},
+        {"tags": ["defi", "zk"], "tag_mode": "and", "sort": "alerts"},
+    ]
+
+    async def run():
+        pages = [await async_repository.page(**params) for params in cases]
+        totals = await async_repository.apply_reaction_deltas({"msg-001": (3, 1)}, ("/var/log/async-reactions", 4))
+        segment = await async_repository.applied_log_segment("/var/log/async-reactions")
+        return pages, await async_repository.count(), await async_repository.get("msg-001"), totals, segment
+
+    before = sync_repository.reaction_totals("msg-001")
+    pages, count, seed, totals, segment = asyncio.run(run())
+    assert pages == [sync_repository.page(**params) for params in cases]
+    assert count == sync_repository.count()
+    assert (seed.likes, seed.alerts) == (before[0] + 3, before[1] + 1)
+    assert totals == {"msg-001": (seed.likes, seed.alerts)}
+    assert seed == sync_repository.get("msg-001")
+    assert segment == sync_repository.applied_log_segment("/var/log/async-reactions") == 4
+
+
+def test_feed_endpoint_pages_through_async_repository(repositories):
+    sync_repository, async_repository, async_engine = repositories
+    app = FastAPI()
+    app.include_router(messages_api.router, prefix="/messages")
+    client = TestClient(app)
+
+    messages_service.use_repository(sync_repository)
+    try:
+        expected = client.get("/messages/", params={"sort": "likes", "limit": 30}).json()
+        messages_service.use_async_repository(async_repository)
+        seen, cursor = [], None
+        while len(seen) < 30:
+            params = {"sort": "likes", "limit": 10, **({"cursor": cursor} if cursor else {})}
+            response = client.get("/messages/", params=params)
+            seen.extend(response.json())
+            cursor = response.headers["X-Next-Cursor"]
+    finally:
+        messages_service.use_async_repository(None)
+        messages_service.use_repository(None)
+    assert seen == expected
+    stats = db.pool_stats(async_engine)
+    assert stats["pool"] == "AsyncAdaptedQueuePool"
+    assert stats["checkedout"] == 0
+
+
+def test_pool_stats_endpoint(monkeypatch):
+    from app.config import settings
+    from app.main import app
+
+    monkeypatch.setattr(settings, "INTERNAL_ENDPOINTS", True)
+    response = TestClient(app).get("/db/pool")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["sync"]["pool"] == type(db.engine.pool).__name__
+    assert "status" in body["sync"]
@@ -0,0 +1,116 @@
+import os
+from dataclasses import replace
+
+import pytest
+from sqlalchemy import create_engine, inspect, select
+from sqlalchemy.orm import sessionmaker
+
+from app.migrations import upgrade
+from app.models import Message
+from app.repositories.messages import SqlMessageRepository
+from app.schemas import MessageStatus
+from app.services.blobs import BlobStore, BlobStoreLockedError
+from app.services.content_hash import sha256_hex
+
+from benchmarks.corpus import build_corpus
+
+
+@pytest.fixture
+def store(tmp_path):
+    blobs = BlobStore(str(tmp_path / "blobs"), segment_bytes=2048, large_bytes=512, fsync=False)
+    yield blobs
+    blobs.close()
+
+
+def _segments(directory):
+    return sorted(name for name in os.listdir(directory) if name.endswith(".dat"))
+
+
+def test_bodies_are_stored_once_and_survive_reopen(store, tmp_path):
+    bodies = [f"body {index % 40} " * (1 + index % 7) for index in range(200)] + ["large " * 200, "large " * 200]
+    keys = store.put_many(bodies)
+    assert keys[0] == sha256_hex(bodies[0])
+    assert len(store) == len(set(bodies))
+    stats = store.stats()
+    assert stats["dedup_hits"] == len(bodies) - len(set(bodies))
+    assert stats["segments"] > 1 and stats["large_blobs"] == 1
+    assert {key: body.decode() for key, body in store.get_many(keys).items()} == dict(zip(keys, bodies))
+
+    store.close()
+    directory = str(tmp_path / "blobs")
+    # A torn append at the tail is cut off on reopen.
+    with open(os.path.join(directory, _segments(directory)[-1]), "ab") as handle:
+        handle.write(b"\x07" * 40)
+    reopened = BlobStore(directory, segment_bytes=2048, large_bytes=512, fsync=False)
+    try:
+        assert len(reopened) == len(set(bodies))
+        assert {key: body.decode() for key, body in reopened.get_many(keys).items()} == dict(zip(keys, bodies))
+        assert reopened.put(bodies[0]) == keys[0]
+        assert reopened.stats()["dedup_hits"] == 1
+        with pytest.raises(BlobStoreLockedError):
+            BlobStore(directory)
+    finally:
+        reopened.close()
+
+
+def test_compaction_keeps_live_and_concurrently_written_bodies(store):
+    bodies = [f"message {index} " * 20 for index in range(120)] + ["large " * 200]
+    keys = store.put_many(bodies)
+    live = set(keys[:30])
+    late = "written while the live set was computed " * 5
+
+    def live_keys():
+        # A dead body deduplicated, and a new one written, during compaction.
+        store.put_many([bodies[100], late])
+        return live
+
+    before = store.stats()["segment_bytes"]
+    result = store.compact(live_keys, min_dead_ratio=0.2)
+    assert result["segments_rewritten"] > 0 and result["dropped"] > 0
+    assert store.stats()["segment_bytes"] < before
+    kept = store.get_many(keys + [sha256_hex(late)])
+    # Dead bodies remain only in the active segment, which is never rewritten.
+    assert live | {keys[100], sha256_hex(late)} <= set(kept)
+    assert keys[-1] not in kept and len(kept) < 40
+    assert all(kept[key].decode() == body for key, body in zip(keys, bodies) if key in kept)
+
+
+def test_repository_serves_blob_backed_bodies(store, tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'feed.db'}")
+    upgrade(engine)
+    sessions = sessionmaker(bind=engine, future=True)
+    seeds = [seed for seed in build_corpus(60, seed=5, creators=4) if seed.status is not MessageStatus.DELETED]
+    # Reposts share a body with their original.
+    seeds += [replace(seed, id=f"{seed.id}-repost") for seed in seeds[:10]]
+    repository = SqlMessageRepository(sessions, store)
+    repository.upsert_many(seeds)
+    assert len(store) == len(seeds) - 10
+    with sessions() as session:
+        assert set(session.scalars(select(Message.content))) == {""}
+
+    lookups = []
+    get_many = store.get_many
+    monkeypatch.setattr(store, "get_many", lambda keys: lookups.append(len(keys)) or get_many(keys))
+    page = repository.page(sort="latest", limit=25)
+    assert len(lookups) == 1
+    expected = {seed.id: seed.content for seed in seeds}
+    assert [seed.content for seed in page] == [expected[seed.id] for seed in page]
+    assert SqlMessageRepository(sessions).get(seeds[0].id).content == ""
+
+    repository.set_status(seeds[20].id, MessageStatus.DELETED)
+    repository.remove(seeds[21].id)
+    repository.set_status(seeds[3].id, MessageStatus.DELETED)  # its repost stays live
+    result = repository.compact_blobs(min_dead_ratio=0)
+    assert result["dropped"] == 2
+    assert repository.get(seeds[20].id).content == ""
+    assert repository.get(f"{seeds[3].id}-repost").content == seeds[3].content
+    engine.dispose()
+
+
+def test_body_key_column_is_added_to_existing_databases(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    upgrade(engine, target=3)
+    assert "content_hash" not in {column["name"] for column in inspect(engine).get_columns("messages")}
+    upgrade(engine)
+    assert "content_hash" in {column["name"] for column in inspect(engine).get_columns("messages")}
+    engine.dispose()
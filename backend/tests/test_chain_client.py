@@ -0,0 +1,151 @@
+import asyncio
+import base64
+import os
+from decimal import Decimal
+
+import httpx
+import pytest
+
+os.environ.setdefault("SUPABASE_URL", "http://localhost")
+os.environ.setdefault("SUPABASE_ANON_KEY", "anon")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "service")
+
+from app import chain
+from app.chain_client import (
+    SUI_COIN_TYPE,
+    ChainRpcError,
+    ChainTransactionError,
+    Ed25519Signer,
+    ProgrammableTransactionBuilder,
+    RpcCall,
+    SuiRpcClient,
+)
+from app.chain_mock import MockChainState, create_mock_rpc_app
+from app.config import settings
+
+PACKAGE = "0xabc"
+OWNERS = [f"0x{index:064x}" for index in range(1, 121)]
+
+
+def _client(state: MockChainState, **kwargs) -> SuiRpcClient:
+    transport = httpx.ASGITransport(app=create_mock_rpc_app(state))
+    return SuiRpcClient("http://mock-rpc/", transport=transport, **kwargs)
+
+
+def test_balance_reads_share_one_batched_request():
+    state = MockChainState()
+    for index, owner in enumerate(OWNERS):
+        state.set_balance(owner, SUI_COIN_TYPE, index * 10)
+
+    async def scenario():
+        async with _client(state, max_batch=50) as client:
+            return await client.get_balances([(owner, SUI_COIN_TYPE) for owner in OWNERS])
+
+    balances = asyncio.run(scenario())
+    assert balances == [index * 10 for index in range(len(OWNERS))]
+    assert state.rpc_calls == len(OWNERS)
+    assert state.http_requests == 3
+
+
+def test_batch_reports_per_call_errors():
+    state = MockChainState()
+
+    async def scenario():
+        async with _client(state) as client:
+            mixed = await client.batch(
+                [RpcCall("suix_getBalance", [OWNERS[0]]), RpcCall("sui_unknown", [])], raise_errors=False
+            )
+            with pytest.raises(ChainRpcError) as excinfo:
+                await client.batch([RpcCall("sui_unknown", [])])
+            return mixed, excinfo.value
+
+    mixed, error = asyncio.run(scenario())
+    assert mixed[0]["totalBalance"] == "0"
+    assert isinstance(mixed[1], ChainRpcError) and mixed[1].code == -32601
+    assert error.code == -32601
+
+
+def test_resolutions_execute_as_one_signed_transaction():
+    state = MockChainState()
+    signer = Ed25519Signer.generate()
+    builder = ProgrammableTransactionBuilder(PACKAGE)
+    builder.resolve_hype("0xp1", "0xm1", "0xtreasury")
+    builder.resolve_scam("0xp2", "0xm2", "0xtreasury", "0xvault", "0xregistry")
+
+    async def scenario():
+        async with _client(state) as client:
+            return await client.execute(builder, signer, gas_budget=1_000)
+
+    digest = asyncio.run(scenario())
+    assert digest
+    assert len(state.transactions) == 1
+    assert [(call["module"], call["function"]) for call in state.transactions[0]] == [
+        ("vote", "execute_proposal"),
+        ("vote", "execute_proposal"),
+        ("message", "slash_message"),
+    ]
+    assert state.transactions[0][2]["arguments"] == ["0xm2", "0xvault", "0xregistry", "0xtreasury", "0xm2"]
+
+
+def test_failed_transaction_raises():
+    state = MockChainState(fail_moves=True)
+    builder = ProgrammableTransactionBuilder(PACKAGE).resolve_hype("0xp", "0xm", "0xt")
+
+    async def scenario():
+        async with _client(state) as client:
+            await client.execute(builder, Ed25519Signer.generate(), gas_budget=1_000)
+
+    with pytest.raises(ChainTransactionError):
+        asyncio.run(scenario())
+
+
+def test_signer_round_trips_keystore_encoding():
+    seed = bytes(range(32))
+    plain = Ed25519Signer.from_base64(base64.b64encode(seed).decode())
+    keystore = Ed25519Signer.from_base64(base64.b64encode(b"\x00" + seed).decode())
+    assert plain.address == keystore.address
+    assert plain.address.startswith("0x") and len(plain.address) == 66
+
+
+def test_sync_wrappers_use_mock_node(monkeypatch):
+    state = MockChainState()
+    owner = OWNERS[0]
+    state.set_balance(owner, SUI_COIN_TYPE, 2_500_000_000)
+    state.set_balance(owner, PACKAGE + chain.SWT_COIN_SUFFIX, 1_234_567)
+    monkeypatch.setattr(settings, "SUI_PACKAGE_ID", PACKAGE)
+    monkeypatch.setattr(settings, "SUI_TREASURY_ID", "0xtreasury")
+    chain.use_client(_client(state), Ed25519Signer.generate())
+    try:
+        assert chain.get_user_address(owner.upper().replace("0X", "0x"), "SUI") == owner
+        with pytest.raises(LookupError):
+            chain.get_user_address("alice", "SUI")
+        with pytest.raises(LookupError):
+            chain.get_user_address(owner, "BTC")
+
+        assert chain.get_sui_balance(owner) == Decimal("2.5")
+        assert chain.get_token_balance(owner, "SWT") == Decimal("1.234567")
+        requests_before = state.http_requests
+        assert chain.get_balances([(owner, "SUI"), (owner, "SWT")]) == [Decimal("2.5"), Decimal("1.234567")]
+        assert state.http_requests == requests_before + 1
+
+        assert chain.resolve_hype_proposal("0xp1", "0xm1")
+        assert len(state.transactions) == 1
+        with pytest.raises(chain.ChainConfigurationError):
+            chain.resolve_scam_proposal("0xp2", "0xm2")
+    finally:
+        chain.use_client(None)
+
+
+def test_timed_out_chain_call_is_cancelled():
+    cancelled = asyncio.Event()
+
+    async def slow():
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    with pytest.raises(TimeoutError):
+        chain.run(slow(), timeout=0.05)
+    assert chain.run(asyncio.wait_for(cancelled.wait(), 1), timeout=2) is True
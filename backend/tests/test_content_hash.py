@@ -0,0 +1,149 @@
+import io
+import json
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import hash_content
+from app.migrations import upgrade
+from app.repositories.content_hashes import SqlVerificationStore
+from app.services import content_hash
+from app.services import messages as messages_service
+from app.services.content_hash import (
+    ContentClaim,
+    ContentVerifier,
+    VerifiedHashCache,
+    hash_pairs,
+    normalize_hash,
+    sha256_hex,
+    use_content_verifier,
+)
+
+from benchmarks.corpus import build_corpus
+
+# scripts/hash_content.sh "Hello World" "This is my first message" (move/tests/message_tests.move)
+HELLO = "0xa591a6d40bf420404a011733cfb7b190d62c65bf0bcda32b57b277d9ad9f146e"
+
+
+@pytest.fixture
+def verifier():
+    installed = ContentVerifier(VerifiedHashCache(), workers=2, batch_size=4)
+    use_content_verifier(installed)
+    yield installed
+    use_content_verifier(None)
+
+
+@pytest.fixture
+def store(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'hashes.db'}")
+    upgrade(engine)
+    yield SqlVerificationStore(sessionmaker(bind=engine, future=True))
+    engine.dispose()
+
+
+def _hashes(seed):
+    return sha256_hex(seed.title), sha256_hex(seed.content)
+
+
+def test_hashes_match_the_on_chain_format():
+    assert sha256_hex("Hello World") == HELLO
+    raw = bytes.fromhex(HELLO[2:])
+    assert normalize_hash(HELLO.upper().replace("0X", "0x")) == HELLO
+    assert normalize_hash(HELLO[2:]) == normalize_hash(raw) == normalize_hash(list(raw)) == HELLO
+    with pytest.raises(ValueError):
+        normalize_hash("0xnothex")
+
+
+def test_pool_hashing_preserves_order():
+    pairs = [(f"title {index}", "body " * index) for index in range(1000)]
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        assert hash_pairs(pairs, executor=executor, batch_size=64) == hash_pairs(pairs)
+
+
+def test_ingest_verifies_once_and_feed_reads_never_hash(verifier, monkeypatch):
+    seeds = build_corpus(20, seed=4, creators=3)
+    tampered = seeds[0]
+    hashes = {seed.id: _hashes(seed) for seed in seeds}
+    hashes[tampered.id] = (hashes[tampered.id][0], sha256_hex("something else"))
+    unhashed = seeds[-1]
+    del hashes[unhashed.id]
+    try:
+        results = messages_service.ingest_messages(seeds, hashes)
+        assert {result.message_id: result.verified for result in results} == {
+            seed.id: seed is not tampered for seed in seeds if seed is not unhashed
+        }
+
+        def no_hashing(pairs):
+            raise AssertionError("feed read hashed a body")
+
+        monkeypatch.setattr(content_hash, "hash_batch", no_hashing)
+        ids = [seed.id for seed in seeds]
+        page = messages_service.MessagePage(message_ids=ids, next_cursor=None)
+        entries = list(page.entries)
+        verified = {entry.id: entry.content_verified for entry in entries}
+        assert verified[tampered.id] is False
+        assert verified[unhashed.id] is None
+        assert verified[seeds[1].id] is True
+        assert list(page.encoded()) == [entry.model_dump_json().encode() for entry in entries]
+
+        # Editing a body without new hashes drops its verification.
+        messages_service.upsert_message(replace(seeds[1], content="edited"))
+        assert next(messages_service.MessagePage([seeds[1].id], None).entries).content_verified is None
+    finally:
+        for seed in seeds:
+            messages_service.remove_message(seed.id)
+    assert verifier.stats()["mismatched"] == 1
+
+
+def test_persisted_results_are_reused_without_hashing(store, monkeypatch):
+    first = ContentVerifier(VerifiedHashCache(store), batch_size=2)
+    claims = [
+        ContentClaim(f"0x{index:02x}", f"title {index}", "body", sha256_hex(f"title {index}"), sha256_hex("body"))
+        for index in range(5)
+    ]
+    first.verify_many(claims)
+    first.shutdown()
+
+    monkeypatch.setattr(content_hash, "hash_batch", None)
+    now = [0.0]
+    restarted = VerifiedHashCache(store, absent_ttl=10, clock=lambda: now[0])
+    found = restarted.get_many([claim.message_id for claim in claims] + ["0xff"])
+    assert sorted(found) == [claim.message_id for claim in claims]
+    assert all(verification.verified for verification in found.values())
+
+    # An unknown id is not looked up again until the absent TTL passes.
+    load = store.load
+    loads = []
+    monkeypatch.setattr(store, "load", lambda ids: loads.append(list(ids)) or {})
+    restarted.get_many(["0xff", "0x00"])
+    now[0] = 11
+    restarted.get_many(["0xff"])
+    assert loads == [["0xff"]]
+
+    restarted.discard(["0x00"])
+    assert load(["0x00", "0x01"]).keys() == {"0x01"}
+
+
+def test_cli_hashes_and_verifies_jsonl(tmp_path, capsys):
+    source = tmp_path / "pairs.jsonl"
+    source.write_text(
+        "\n".join(json.dumps({"id": index, "title": f"제목 {index}", "content": "내용" * index}) for index in range(300))
+    )
+    hashed = tmp_path / "hashed.jsonl"
+    argv = ["--jsonl", str(source), "--out", str(hashed), "--workers", "3", "--batch-size", "16"]
+    assert hash_content.main(argv) == 0
+    records = [json.loads(line) for line in hashed.read_text().splitlines()]
+    assert [record["id"] for record in records] == list(range(300))
+    assert records[7]["content_hash"] == sha256_hex("내용" * 7)
+
+    records[5]["title_hash"] = HELLO
+    sink = io.StringIO()
+    counts = hash_content.hash_jsonl(io.StringIO("\n".join(map(json.dumps, records))), sink, verify=True)
+    assert counts == {"pairs": 300, "mismatched": 1}
+    assert [json.loads(line)["verified"] for line in sink.getvalue().splitlines()].count(False) == 1
+
+    assert hash_content.main(["Hello World", "This is my first message"]) == 0
+    assert f"Title Hash: {HELLO}" in capsys.readouterr().out
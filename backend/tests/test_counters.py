@@ -0,0 +1,276 @@
+import os
+import threading
+
+import pytest
+
+os.environ.setdefault("SUPABASE_URL", "http://localhost")
+os.environ.setdefault("SUPABASE_ANON_KEY", "anon")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "service")
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services import counters
+from app.services import messages as messages_service
+from app.services.counters import ReactionCounterBuffer, ThresholdCrossing
+
+
+class _Recorder:
+    def __init__(self, totals):
+        self.totals = dict(totals)
+        self.flushed = []
+        self.crossings = []
+        self.positions = {}
+
+    def load(self, message_id):
+        return self.totals.get(message_id)
+
+    def applied(self, log):
+        return self.positions.get(log)
+
+    def sink(self, batch, position=None):
+        self.flushed.append(dict(batch))
+        for message_id, (likes, alerts) in batch.items():
+            current = self.totals[message_id]
+            self.totals[message_id] = (current[0] + likes, current[1] + alerts)
+        if position is not None:
+            log, segment = position
+            self.positions[log] = segment
+        return {message_id: self.totals[message_id] for message_id in batch}
+
+
+def _buffer(recorder, **kwargs):
+    kwargs.setdefault("flush_threshold", 10_000)
+    return ReactionCounterBuffer(
+        sink=recorder.sink,
+        load_totals=recorder.load,
+        applied_segment=recorder.applied,
+        on_crossing=recorder.crossings.append,
+        **kwargs,
+    )
+
+
+def test_increments_coalesce_into_one_batch_per_flush():
+    recorder = _Recorder({"a": (0, 0), "b": (5, 5)})
+    buffer = _buffer(recorder)
+
+    for _ in range(7):
+        buffer.increment("a", likes=1)
+    buffer.increment("b", alerts=1)
+    totals = buffer.increment("b", likes=1)
+
+    assert (totals.likes, totals.alerts) == (6, 6)
+    assert recorder.flushed == []
+    assert buffer.flush() == 2
+    assert recorder.flushed == [{"a": (7, 0), "b": (1, 1)}]
+    assert recorder.totals == {"a": (7, 0), "b": (6, 6)}
+    assert buffer.flush() == 0
+
+
+def test_unknown_message_is_rejected():
+    buffer = _buffer(_Recorder({}))
+    with pytest.raises(counters.UnknownMessageError):
+        buffer.increment("missing", likes=1)
+
+
+def test_threshold_crossing_fires_once_under_concurrency():
+    recorder = _Recorder({"hot": (0, 0)})
+    buffer = _buffer(recorder, shards=4)
+
+    def click():
+        for _ in range(50):
+            buffer.increment("hot", likes=1, alerts=1)
+
+    threads = [threading.Thread(target=click) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    buffer.flush()
+
+    assert recorder.totals["hot"] == (400, 400)
+    assert sorted(recorder.crossings, key=lambda c: c.kind) == [
+        ThresholdCrossing("hot", "alerts", 400),
+        ThresholdCrossing("hot", "likes", 400),
+    ]
+
+    # The committed counts are already past the threshold.
+    buffer.increment("hot", likes=1)
+    buffer.flush()
+    assert len(recorder.crossings) == 2
+
+
+def test_crossing_split_across_workers_is_reported_once():
+    # Two workers share the database but not their buffers; neither sees the
+    # other's increments, so only the committed counts show the crossing.
+    recorder = _Recorder({"hot": (0, 0)})
+    lock = threading.Lock()
+
+    def sink(batch, position=None):
+        with lock:
+            return recorder.sink(batch, position)
+
+    crossings = []
+    workers = [
+        ReactionCounterBuffer(sink=sink, load_totals=recorder.load, on_crossing=crossings.append)
+        for _ in range(2)
+    ]
+    for worker in workers:
+        for _ in range(messages_service.LIKES_THRESHOLD - 5):
+            worker.increment("hot", likes=1)
+        assert worker.increment("hot").likes < messages_service.LIKES_THRESHOLD
+
+    flushes = [threading.Thread(target=worker.flush) for worker in workers]
+    for thread in flushes:
+        thread.start()
+    for thread in flushes:
+        thread.join()
+
+    total = 2 * (messages_service.LIKES_THRESHOLD - 5)
+    assert recorder.totals["hot"] == (total, 0)
+    assert [(c.kind, c.total) for c in crossings] == [("likes", total)]
+    for worker in workers:
+        worker.increment("hot", likes=1)
+        worker.flush()
+    assert len(crossings) == 1
+
+
+def test_failed_flush_keeps_increments():
+    recorder = _Recorder({"a": (0, 0)})
+    calls = []
+
+    def flaky(batch, position):
+        calls.append(batch)
+        if len(calls) == 1:
+            raise RuntimeError("database unavailable")
+        return recorder.sink(batch, position)
+
+    buffer = ReactionCounterBuffer(sink=flaky, load_totals=recorder.load)
+    buffer.increment("a", likes=2)
+    with pytest.raises(RuntimeError):
+        buffer.flush()
+    buffer.increment("a", likes=1)
+    buffer.flush()
+
+    assert recorder.totals["a"] == (3, 0)
+
+
+def test_log_replays_unflushed_increments_and_crossings(tmp_path):
+    recorder = _Recorder({"a": (18, 0), "b": (0, 0)})
+    buffer = _buffer(recorder, log_dir=str(tmp_path))
+    buffer.increment("a", likes=1)
+    buffer.flush()
+    buffer.increment("a", likes=1)
+    buffer.increment("b", alerts=3)
+    # Simulated crash: the process dies before the next flush.
+
+    restarted = _Recorder(recorder.totals)
+    restarted.positions = recorder.positions
+    recovered = _buffer(restarted, log_dir=str(tmp_path))
+    assert recovered.pending() == {"a": (1, 0), "b": (0, 3)}
+    # The crossing was acknowledged before the crash, so it is not redelivered.
+    assert restarted.crossings == []
+    assert recovered.increment("b", alerts=1).alerts == 4
+
+    recovered.flush()
+    assert restarted.totals == {"a": (20, 0), "b": (0, 4)}
+    assert restarted.crossings == [ThresholdCrossing("a", "likes", 20)]
+    recovered.increment("a", likes=1)
+    assert recovered.pending() == {"a": (1, 0)}
+
+
+def test_crossings_of_a_committed_but_unlogged_batch_are_redelivered(tmp_path, monkeypatch):
+    recorder = _Recorder({"a": (19, 0), "b": (0, 0)})
+    buffer = _buffer(recorder, log_dir=str(tmp_path))
+    buffer.increment("a", likes=1)
+    buffer.increment("b", likes=1)
+    # Simulated crash after the sink commits and before the crossing is logged.
+    monkeypatch.setattr(buffer, "_crossings", lambda batch, committed: [])
+    monkeypatch.setattr(buffer, "_delete_segments", lambda segments: None)
+    buffer.flush()
+    assert recorder.crossings == []
+
+    restarted = _Recorder(recorder.totals)
+    restarted.positions = recorder.positions
+    recovered = _buffer(restarted, log_dir=str(tmp_path))
+    assert recovered.pending() == {}
+    assert restarted.crossings == [ThresholdCrossing("a", "likes", 20)]
+
+
+def test_replay_skips_segments_the_sink_already_committed(tmp_path, monkeypatch):
+    recorder = _Recorder({"a": (0, 0)})
+    buffer = _buffer(recorder, log_dir=str(tmp_path))
+    buffer.increment("a", likes=2)
+    # Simulated crash after the sink commits and before the sealed segment is deleted.
+    monkeypatch.setattr(buffer, "_delete_segments", lambda segments: None)
+    buffer.flush()
+    buffer.increment("a", likes=1)
+    assert recorder.totals["a"] == (2, 0) and len(list(tmp_path.iterdir())) == 2
+
+    restarted = _Recorder(recorder.totals)
+    restarted.positions = recorder.positions
+    recovered = _buffer(restarted, log_dir=str(tmp_path))
+    assert recovered.pending() == {"a": (1, 0)}
+    recovered.flush()
+    assert restarted.totals["a"] == (3, 0)
+
+
+def test_unacknowledged_crossing_is_redelivered(tmp_path):
+    recorder = _Recorder({"a": (19, 0)})
+
+    def failing(crossing):
+        raise RuntimeError("queue unavailable")
+
+    buffer = ReactionCounterBuffer(
+        sink=recorder.sink, load_totals=recorder.load, on_crossing=failing, log_dir=str(tmp_path)
+    )
+    buffer.increment("a", likes=1)
+    buffer.flush()
+
+    delivered = []
+    ReactionCounterBuffer(
+        sink=recorder.sink, load_totals=recorder.load, on_crossing=delivered.append, log_dir=str(tmp_path)
+    )
+    assert delivered == [ThresholdCrossing("a", "likes", 20)]
+
+    again = []
+    ReactionCounterBuffer(
+        sink=recorder.sink, load_totals=recorder.load, on_crossing=again.append, log_dir=str(tmp_path)
+    )
+    assert again == []
+
+
+def test_size_threshold_triggers_background_flush():
+    recorder = _Recorder({"a": (0, 0)})
+    buffer = _buffer(recorder, flush_interval=60, flush_threshold=5)
+    buffer.start()
+    try:
+        for _ in range(5):
+            buffer.increment("a", likes=1)
+        for _ in range(200):
+            if recorder.flushed:
+                break
+            threading.Event().wait(0.01)
+    finally:
+        buffer.stop()
+    assert recorder.totals["a"] == (5, 0)
+
+
+def test_reaction_routes_buffer_and_flush_into_feed():
+    buffer = ReactionCounterBuffer(flush_threshold=10_000)
+    counters.use_reaction_buffer(buffer)
+    try:
+        client = TestClient(app)
+        response = client.post("/reactions/msg-004/like")
+        assert response.status_code == 200
+        assert response.json() == {"status": "ok", "likes": 13, "alerts": 0}
+        assert client.post("/reactions/msg-004/alert").json()["alerts"] == 1
+        assert client.post("/reactions/msg-missing/like").status_code == 404
+
+        assert messages_service.get_message("msg-004").likes == 12
+        buffer.flush()
+        seed = messages_service.get_message("msg-004")
+        assert (seed.likes, seed.alerts) == (13, 1)
+    finally:
+        messages_service.apply_reaction_delta("msg-004", likes=-1, alerts=-1)
+        counters.use_reaction_buffer(None)
@@ -0,0 +1,72 @@
+from dataclasses import replace
+
+from app.schemas import MessageStatus
+from app.services import messages as messages_service
+from app.services.feed_cache import EncodedEntryCache
+
+from benchmarks.corpus import build_corpus
+
+
+def _encoded_by_id(page):
+    return dict(zip(page.message_ids, page.encoded()))
+
+
+def test_encoded_entries_match_pydantic_serialization() -> None:
+    corpus = build_corpus(300, seed=12)
+    corpus.append(replace(corpus[0], id="msg-unicode", title="Ünïcode “quotes” \\ and \"escapes\"", content="línea\nnueva"))
+    for seed in corpus:
+        messages_service.upsert_message(seed)
+    try:
+        page = messages_service.page_messages()
+        encoded = _encoded_by_id(page)
+        for entry in page.entries:
+            assert encoded[entry.id] == entry.model_dump_json().encode()
+        # Second pass is served from cache and stays identical.
+        assert _encoded_by_id(messages_service.page_messages()) == encoded
+    finally:
+        for seed in corpus:
+            messages_service.remove_message(seed.id)
+
+
+def test_metrics_segment_follows_counters_and_static_segment_follows_updates() -> None:
+    original = messages_service.get_message("msg-001")
+    try:
+        before = _encoded_by_id(messages_service.page_messages())["msg-001"]
+
+        messages_service.apply_reaction_delta("msg-001", likes=1)
+        after_like = _encoded_by_id(messages_service.page_messages())["msg-001"]
+        assert b'"likes":20' in after_like
+        assert b'"displayed_status":"UNDER_REVIEW"' in after_like
+        assert after_like != before
+
+        messages_service.set_message_status("msg-001", MessageStatus.HYPED)
+        assert b'"base_status":"HYPED"' in _encoded_by_id(messages_service.page_messages())["msg-001"]
+
+        messages_service.upsert_message(replace(original, title="Retitled"))
+        assert b'"title":"Retitled"' in _encoded_by_id(messages_service.page_messages())["msg-001"]
+    finally:
+        messages_service.upsert_message(original)
+
+    assert _encoded_by_id(messages_service.page_messages())["msg-001"] == before
+
+
+def test_cache_is_bounded_and_tracks_hits() -> None:
+    cache = EncodedEntryCache(max_entries=2)
+    for message_id in ("a", "b", "a", "c"):
+        cache.static(message_id, lambda: message_id.encode())
+
+    assert len(cache) == 2
+    assert (cache.hits, cache.misses) == (1, 3)
+    assert cache.static("b", lambda: b"rebuilt") == b"rebuilt"
+
+
+def test_invalidate_during_build_is_not_overwritten() -> None:
+    cache = EncodedEntryCache()
+
+    def build_racing_an_update() -> bytes:
+        cache.invalidate("a")
+        return b"stale"
+
+    assert cache.static("a", build_racing_an_update) == b"stale"
+    assert cache.static("a", lambda: b"fresh") == b"fresh"
+    assert cache.static("a", lambda: b"rebuilt") == b"fresh"
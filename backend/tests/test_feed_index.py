@@ -0,0 +1,73 @@
+import random
+from dataclasses import replace
+
+import pytest
+
+from app.schemas import MessageStatus
+from app.services import messages as messages_service
+from app.services.feed_index import FeedSortIndex
+from app.services.messages import SORT_MODES, _sort_entries, _sort_key
+
+from benchmarks.corpus import build_corpus
+
+
+def _ids(keys):
+    return [key[-1] for key in keys]
+
+
+@pytest.mark.parametrize("sort", SORT_MODES)
+def test_index_matches_full_sort_after_random_updates(sort: str) -> None:
+    rng = random.Random(3)
+    corpus = {seed.id: seed for seed in build_corpus(500, seed=5, creators=20)}
+    index = FeedSortIndex(_sort_key, SORT_MODES, corpus.values())
+
+    for _ in range(300):
+        message_id = rng.choice(list(corpus))
+        seed = corpus[message_id]
+        action = rng.random()
+        if action < 0.45:
+            seed = replace(seed, likes=seed.likes + rng.randint(1, 5))
+        elif action < 0.9:
+            seed = replace(seed, alerts=seed.alerts + rng.randint(1, 5))
+        else:
+            seed = replace(seed, status=rng.choice(list(MessageStatus)))
+        corpus[message_id] = seed
+        index.update(seed)
+
+    expected = [seed.id for seed in _sort_entries(corpus.values(), sort)]
+    assert _ids(index.page(sort)) == expected
+
+    first = index.page(sort, limit=25)
+    second = index.page(sort, after=first[-1], limit=25)
+    assert _ids(first + second) == expected[:50]
+
+
+@pytest.mark.parametrize("size", [5, 400])
+def test_index_page_intersects_candidates(size: int) -> None:
+    corpus = build_corpus(1000, seed=9)
+    index = FeedSortIndex(_sort_key, SORT_MODES, corpus)
+    candidates = {seed.id for seed in random.Random(size).sample(corpus, size)}
+
+    expected = [seed.id for seed in _sort_entries(corpus, "likes") if seed.id in candidates]
+    assert _ids(index.page("likes", candidates=candidates)) == expected
+    assert _ids(index.page("likes", limit=3, candidates=candidates)) == expected[:3]
+
+    index.remove(expected[0])
+    assert _ids(index.page("likes", limit=2, candidates=candidates)) == expected[1:3]
+
+
+def test_reaction_delta_moves_message_in_feed() -> None:
+    original = messages_service.get_message("msg-003")
+    try:
+        updated = messages_service.apply_reaction_delta("msg-003", likes=30)
+        assert updated is not None and updated.likes == original.likes + 30
+        ordered = [entry.id for entry in messages_service.list_messages(sort="likes")]
+        assert ordered[0] == "msg-003"
+
+        messages_service.set_message_status("msg-003", MessageStatus.HYPED)
+        review = [entry.id for entry in messages_service.list_messages(sort="under_review")]
+        assert review.index("msg-003") > review.index("msg-002")
+    finally:
+        messages_service.upsert_message(original)
+
+    assert messages_service.apply_reaction_delta("msg-missing", likes=1) is None
@@ -0,0 +1,177 @@
+import os
+import threading
+import time
+
+import pytest
+
+os.environ.setdefault("SUPABASE_URL", "http://localhost")
+os.environ.setdefault("SUPABASE_ANON_KEY", "anon")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "service")
+
+from app.services.idempotency import (
+    IdempotencyInProgressError,
+    MemoryIdempotencyStore,
+    SqliteIdempotencyStore,
+)
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_store(request, tmp_path):
+    def make(**kwargs):
+        if request.param == "memory":
+            return MemoryIdempotencyStore(**kwargs)
+        return SqliteIdempotencyStore(str(tmp_path / "idempotency.sqlite3"), poll_interval=0.005, **kwargs)
+
+    return make
+
+
+def _run_concurrently(store, key, execute, count=8):
+    results, errors = [], []
+
+    def worker():
+        try:
+            results.append(store.run(key, execute))
+        except Exception as exc:  # noqa: BLE001
+            errors.append(exc)
+
+    threads = [threading.Thread(target=worker) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, errors
+
+
+def test_duplicate_requests_execute_once(make_store):
+    store = make_store()
+    calls = []
+
+    def execute():
+        calls.append(1)
+        time.sleep(0.05)
+        return {"digest": "0xabc"}
+
+    results, errors = _run_concurrently(store, "k", execute)
+    assert errors == []
+    assert results == [{"digest": "0xabc"}] * 8
+    assert len(calls) == 1
+    assert store.stats()["executed"] == 1
+
+
+def test_failed_execution_is_retried(make_store):
+    store = make_store()
+
+    def fail():
+        raise RuntimeError("chain down")
+
+    with pytest.raises(RuntimeError):
+        store.run("k", fail)
+    assert store.run("k", lambda: 7) == 7
+    assert store.run("k", lambda: 8) == 7
+
+
+def test_waiters_give_up_after_timeout(make_store):
+    store = make_store(wait_timeout=0.05)
+    release = threading.Event()
+    leader = threading.Thread(target=store.run, args=("k", lambda: release.wait(5)))
+    leader.start()
+    time.sleep(0.02)
+    try:
+        with pytest.raises(IdempotencyInProgressError):
+            store.run("k", lambda: "second")
+    finally:
+        release.set()
+        leader.join()
+
+
+def test_results_expire_after_ttl(make_store):
+    clock = _Clock()
+    store = make_store(ttl=10.0, clock=clock)
+    assert store.run("k", lambda: 1) == 1
+    clock.now += 9
+    assert store.run("k", lambda: 2) == 1
+    clock.now += 2
+    assert store.run("k", lambda: 3) == 3
+
+
+def test_memory_store_evicts_oldest_beyond_capacity():
+    clock = _Clock()
+    store = MemoryIdempotencyStore(ttl=10.0, max_entries=2, clock=clock)
+    for index, key in enumerate("abc"):
+        clock.now += 1
+        store.run(key, lambda index=index: index)
+    assert len(store) == 2
+    assert store.stats()["evictions"] == 1
+    assert store.run("a", lambda: "again") == "again"
+    assert store.run("c", lambda: "again") == 2
+
+
+def test_sqlite_store_is_shared_between_workers(tmp_path):
+    path = str(tmp_path / "shared.sqlite3")
+    first = SqliteIdempotencyStore(path)
+    second = SqliteIdempotencyStore(path)
+    assert first.run("k", lambda: {"n": 1}) == {"n": 1}
+    assert second.run("k", lambda: {"n": 2}) == {"n": 1}
+
+
+def test_sqlite_claim_of_dead_worker_expires(tmp_path):
+    clock = _Clock()
+    path = str(tmp_path / "lease.sqlite3")
+    crashed = SqliteIdempotencyStore(path, lease=5.0, clock=clock)
+    assert crashed._claim("k", "crashed") == ("claimed", None)
+
+    other = SqliteIdempotencyStore(path, lease=5.0, wait_timeout=0.05, clock=clock)
+    with pytest.raises(IdempotencyInProgressError):
+        other.run("k", lambda: "retry")
+    clock.now += 6
+    assert other.run("k", lambda: "retry") == "retry"
+
+
+def test_sqlite_lease_is_renewed_while_executing(tmp_path):
+    path = str(tmp_path / "heartbeat.sqlite3")
+    slow = SqliteIdempotencyStore(path, lease=0.15)
+    other = SqliteIdempotencyStore(path, lease=0.15, wait_timeout=0.05, poll_interval=0.005)
+    started, release = threading.Event(), threading.Event()
+
+    def execute():
+        started.set()
+        release.wait(5)
+        return "slow"
+
+    leader = threading.Thread(target=slow.run, args=("k", execute))
+    leader.start()
+    started.wait(5)
+    try:
+        # Several leases long; the heartbeat keeps the claim alive.
+        time.sleep(0.5)
+        with pytest.raises(IdempotencyInProgressError):
+            other.run("k", lambda: "duplicate")
+    finally:
+        release.set()
+        leader.join()
+    assert other.run("k", lambda: "duplicate") == "slow"
+
+
+def test_sqlite_worker_that_lost_its_lease_keeps_the_new_result(tmp_path):
+    clock = _Clock()
+    path = str(tmp_path / "lost.sqlite3")
+    slow = SqliteIdempotencyStore(path, lease=5.0, clock=clock)
+    other = SqliteIdempotencyStore(path, lease=5.0, clock=clock)
+
+    def execute():
+        # The slow worker's lease lapses and another worker takes the key over.
+        clock.now += 6
+        assert other.run("k", lambda: "second") == "second"
+        return "first"
+
+    assert slow.run("k", execute) == "first"
+    assert other.run("k", lambda: "third") == "second"
+    assert slow.stats()["lost_leases"] == 1
@@ -0,0 +1,217 @@
+import asyncio
+import json
+
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from app.chain import SWT_COIN_SUFFIX
+from app.indexer import (
+    EventIndexer,
+    EventPage,
+    EventSource,
+    JsonlEventSource,
+    Projection,
+    apply_projection,
+    balance_changes,
+    indexer_status,
+)
+from app.migrations import upgrade
+from app.models import Comment, IndexerCheckpoint, Message, Proposal, Vote
+from app.repositories.messages import SqlMessageRepository
+from app.schemas import MessageStatus
+from app.services.wallet_cache import WalletCache
+
+from benchmarks.indexer_bench import PACKAGE, build_events, write_jsonl
+
+AUTHOR = "0x" + "a1" * 32
+MESSAGE = "0x" + "01" * 32
+PROPOSAL = "0x" + "0f" * 32
+
+
+def _event(index, module, name, **fields):
+    return {
+        "id": {"txDigest": f"tx{index}", "eventSeq": "0"},
+        "packageId": PACKAGE,
+        "type": f"{PACKAGE}::{module}::{name}",
+        "parsedJson": fields,
+        "timestampMs": str(1_700_000_000_000 + index * 1000),
+    }
+
+
+STREAM = [
+    _event(0, "message", "MessageCreated", message_id=MESSAGE, author=AUTHOR, title_hash=[1], created_at="3"),
+    *(
+        _event(1 + n, "message", "MessageLiked", message_id=MESSAGE, user=AUTHOR, total_likes=str(n + 1))
+        for n in range(25)
+    ),
+    _event(26, "message", "MessageAlerted", message_id=MESSAGE, user=AUTHOR, total_alerts="2"),
+    _event(27, "message", "CommentCreated", comment_id="0xc1", message_id=MESSAGE, author=AUTHOR),
+    _event(28, "vote", "ProposalCreated", proposal_id=PROPOSAL, message_id=MESSAGE, proposal_type=0, proposer=AUTHOR),
+    _event(29, "vote", "VoteCast", proposal_id=PROPOSAL, voter="0xv1", vote=True),
+    _event(30, "vote", "VoteCast", proposal_id=PROPOSAL, voter="0xv2", vote=False),
+    _event(31, "vote", "VoteCast", proposal_id=PROPOSAL, voter="0xv3", vote=True),
+    _event(32, "vote", "ManagerMisjudgementDetected", manager=AUTHOR, proposal_id=PROPOSAL, misjudgement_count="1"),
+    _event(33, "vote", "ProposalResolved", proposal_id=PROPOSAL, status=1, approve_votes="4", reject_votes="1"),
+    _event(34, "message", "MessageUpdated", message_id=MESSAGE, status=2, updated_at="4"),
+]
+
+
+@pytest.fixture
+def sessions(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'index.db'}")
+    upgrade(engine)
+    yield sessionmaker(bind=engine, future=True)
+    engine.dispose()
+
+
+def _replay(sessions, path, *, page_size, name="replay"):
+    indexer = EventIndexer(JsonlEventSource(str(path)), sessions, name=name, page_size=page_size)
+    asyncio.run(indexer.run(until_caught_up=True))
+    return indexer
+
+
+def _count(sessions, model):
+    with sessions() as session:
+        return session.scalar(select(func.count()).select_from(model))
+
+
+@pytest.mark.parametrize("page_size", [1, 7, 1000])
+def test_replay_projects_events_regardless_of_page_size(sessions, tmp_path, page_size):
+    path = tmp_path / "events.jsonl"
+    write_jsonl(STREAM, str(path))
+    indexer = _replay(sessions, path, page_size=page_size)
+
+    assert indexer.events == len(STREAM)
+    assert indexer.skipped == 1
+    seed = SqlMessageRepository(sessions).get(MESSAGE)
+    assert (seed.likes, seed.alerts, seed.status) == (25, 2, MessageStatus.HYPED)
+    assert seed.creator_id == AUTHOR
+    with sessions() as session:
+        proposal = session.get(Proposal, PROPOSAL)
+        assert (proposal.status, proposal.approve_votes, proposal.reject_votes) == ("PASSED", 4, 1)
+        assert proposal.proposal_type == "HYPE"
+        assert session.get(Comment, "0xc1").message_id == MESSAGE
+        checkpoint = session.get(IndexerCheckpoint, "replay")
+        assert (checkpoint.tx_digest, checkpoint.events) == ("tx34", len(STREAM))
+    assert _count(sessions, Vote) == 3
+
+
+def test_votes_are_tallied_until_resolution(sessions, tmp_path):
+    path = tmp_path / "events.jsonl"
+    write_jsonl(STREAM[:29], str(path))
+    _replay(sessions, path, page_size=100)
+    write_jsonl(STREAM[:32], str(path))
+    _replay(sessions, path, page_size=100)
+    with sessions() as session:
+        proposal = session.get(Proposal, PROPOSAL)
+        assert (proposal.status, proposal.approve_votes, proposal.reject_votes) == ("OPEN", 2, 1)
+
+
+def test_indexer_resumes_from_checkpoint(sessions, tmp_path):
+    events = build_events(3000, seed=9)
+    path = tmp_path / "events.jsonl"
+    write_jsonl(events[:1800], str(path))
+    first = _replay(sessions, path, page_size=250)
+    assert first.events == 1800
+
+    write_jsonl(events, str(path))
+    second = _replay(sessions, path, page_size=250)
+    assert second.events == 1200
+    assert second.cursor == events[-1]["id"]
+
+    # A fresh database fed everything at once ends in the same state.
+    other = tmp_path / "other.db"
+    engine = create_engine(f"sqlite:///{other}")
+    upgrade(engine)
+    reference = sessionmaker(bind=engine, future=True)
+    _replay(reference, path, page_size=1000)
+    for model in (Message, Comment, Proposal, Vote):
+        columns = [column for column in model.__table__.columns if column.name != "updated_at"]
+        with sessions() as left, reference() as right:
+            assert left.execute(select(*columns).order_by(*model.__table__.primary_key)).all() == right.execute(
+                select(*columns).order_by(*model.__table__.primary_key)
+            ).all()
+    engine.dispose()
+
+
+def test_reapplying_a_page_is_idempotent(sessions):
+    with sessions() as session, session.begin():
+        apply_projection(session, Projection.of(STREAM))
+    with sessions() as session, session.begin():
+        apply_projection(session, Projection.of(STREAM))
+    seed = SqlMessageRepository(sessions).get(MESSAGE)
+    assert (seed.likes, seed.alerts) == (25, 2)
+    assert _count(sessions, Vote) == 3
+    with sessions() as session:
+        proposal = session.get(Proposal, PROPOSAL)
+        assert (proposal.approve_votes, proposal.reject_votes) == (4, 1)
+
+
+def test_status_reports_lag(sessions, tmp_path):
+    path = tmp_path / "events.jsonl"
+    write_jsonl(STREAM, str(path))
+    _replay(sessions, path, page_size=10)
+    last = int(STREAM[-1]["timestampMs"]) / 1000
+    [stream] = indexer_status(sessions, clock=lambda: last + 42)
+    assert stream["name"] == "replay"
+    assert stream["cursor"] == {"txDigest": "tx34", "eventSeq": "0"}
+    assert stream["lag_seconds"] == pytest.approx(42)
+    assert json.dumps(stream)
+
+
+class _TailSource(EventSource):
+    """Events already on chain when following starts, then ones emitted after."""
+
+    def __init__(self, history, live):
+        self.events = list(history)
+        self.live = list(live)
+
+    async def latest_cursor(self):
+        return dict(self.events[-1]["id"])
+
+    async def fetch(self, cursor, limit):
+        self.events.extend(self.live)
+        self.live = []
+        ids = [event["id"] for event in self.events]
+        start = ids.index(cursor) + 1 if cursor else 0
+        page = self.events[start : start + limit]
+        return EventPage(page, dict(page[-1]["id"]) if page else cursor, start + limit < len(self.events))
+
+
+def test_event_sources_must_implement_fetch():
+    class Partial(EventSource):
+        pass
+
+    with pytest.raises(TypeError, match="fetch"):
+        Partial()
+    assert asyncio.run(_TailSource([STREAM[0]], []).aclose()) is None
+
+
+def test_follower_invalidates_wallet_balances_from_new_events():
+    alice, bob = "0x" + "a1" * 32, "0x" + "b2" * 32
+    cache = WalletCache(coin_symbols={PACKAGE + SWT_COIN_SUFFIX: "SWT"})
+    cache.balance(alice, "SWT", lambda: 5)
+    cache.balance(bob, "SWT", lambda: 7)
+    source = _TailSource(
+        [_event(0, "token", "TokenMinted", amount="1", recipient=bob, chain_id=None)],
+        [
+            _event(1, "rewards", "RewardDistributed", recipient=alice.upper().replace("0X", "0x"), amount="3"),
+            _event(2, "token", "TokenMinted", amount="9", recipient="0x" + "c3" * 32, chain_id=None),
+        ],
+    )
+    follower = EventIndexer(
+        source,
+        None,
+        name="token",
+        on_page=lambda events: cache.apply_balance_changes(balance_changes(events)),
+        project=False,
+    )
+    asyncio.run(follower.run(until_caught_up=True))
+
+    assert follower.events == 2
+    assert cache.balances.peek((alice, "SWT")) is None
+    # Minted before following started; nothing replays it.
+    assert cache.balances.peek((bob, "SWT")) == 7
+    with pytest.raises(ValueError):
+        EventIndexer(source, None)
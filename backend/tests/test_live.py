@@ -0,0 +1,131 @@
+import asyncio
+import json
+import os
+
+os.environ.setdefault("SUPABASE_URL", "http://localhost")
+os.environ.setdefault("SUPABASE_ANON_KEY", "anon")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "service")
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.live import live_events
+from app.main import app
+from app.services import messages as messages_service
+from app.services.counters import ThresholdCrossing
+from app.services.live import LiveHub, SubscriptionClosed, parse_topics, use_live_hub
+from app.services.proposals import get_proposal_book
+
+
+def _frame(subscriber):
+    return json.loads(asyncio.run(subscriber.next_frame(timeout=0)))
+
+
+def _delta(message_id, likes):
+    return {"id": message_id, "likes": likes, "alerts": 0, "displayed_status": "NORMAL"}
+
+
+def test_topics_are_validated():
+    assert parse_topics(["feed", "tag:DeFi", "tag:defi", " proposal:msg-7:HYPE ", "proposal:0xab"]) == [
+        "feed",
+        "tag:defi",
+        "proposal:msg-7:HYPE",
+        "proposal:0xab",
+    ]
+    for bad in (["likes"], ["tag:"], ["proposal:"], [f"message:{index}" for index in range(3)]):
+        with pytest.raises(ValueError):
+            parse_topics(bad, limit=2)
+
+
+def test_bursts_coalesce_into_one_frame_per_topic_set():
+    hub = LiveHub()
+    defi, other = hub.subscribe(["tag:defi"]), hub.subscribe(["tag:defi"])
+    both, everything = hub.subscribe(["tag:zk", "tag:defi"]), hub.subscribe(["feed"])
+    for likes in range(50):
+        hub.publish("messages", "m1", ("feed", "tag:defi"), _delta("m1", likes))
+    hub.publish("messages", "m2", ("feed", "tag:zk", "tag:defi"), _delta("m2", 1))
+    hub.publish("proposals", 3, ("proposals", "proposal:3"), {"id": 3, "status": "OPEN"})
+    assert hub.flush() == 4
+    # Clients with the same topics share one encoded frame.
+    assert defi._frames[0] is other._frames[0]
+    assert _frame(defi) == {"seq": 1, "messages": [_delta("m1", 49), _delta("m2", 1)]}
+    # m2 is on both of this client's topics and is sent once.
+    assert sorted(entry["id"] for entry in _frame(both)["messages"]) == ["m1", "m2"]
+    assert "proposals" not in _frame(everything)
+    assert hub.stats()["frames"] == 3
+    assert hub.flush() == 0
+
+
+def test_slow_consumers_are_evicted():
+    hub = LiveHub(max_frames=3)
+    slow, fast = hub.subscribe(["feed"]), hub.subscribe(["feed"])
+    for likes in range(5):
+        hub.publish("messages", "m1", ("feed",), _delta("m1", likes))
+        hub.flush()
+        _frame(fast)
+    assert slow.closed == "slow consumer" and fast.closed is None
+    assert hub.stats()["evicted"] == 1 and hub.stats()["subscribers"] == 1
+    # Queued frames are still delivered before the close is reported.
+    assert [_frame(slow)["seq"] for _ in range(3)] == [1, 2, 3]
+    with pytest.raises(SubscriptionClosed):
+        _frame(slow)
+
+
+def test_reactions_status_changes_and_votes_are_published():
+    hub = LiveHub()
+    use_live_hub(hub)
+    book = get_proposal_book()
+    book.add_managers(["0xm1"])
+    try:
+        feed, proposals = hub.subscribe(["tag:restaking"]), hub.subscribe(["proposals"])
+        # msg-001 sits one like below the threshold.
+        messages_service.apply_reaction_delta("msg-001", likes=1)
+        (proposal,) = book.open_many([ThresholdCrossing("msg-001", "likes", 20)])
+        book.vote(proposal.id, "0xm1", True)
+        hub.flush()
+        assert _frame(feed)["messages"] == [
+            {"id": "msg-001", "likes": 20, "alerts": 1, "displayed_status": "UNDER_REVIEW"}
+        ]
+        assert [(p["id"], p["approve_votes"]) for p in _frame(proposals)["proposals"]] == [(proposal.id, 1)]
+    finally:
+        messages_service.apply_reaction_delta("msg-001", likes=-1)
+        book.clear()
+        use_live_hub(None)
+
+
+def test_sse_stream_sends_frames_and_close_reason():
+    async def scenario():
+        hub = LiveHub()
+        use_live_hub(hub)
+        response = await live_events(["message:m1"])
+        chunks = response.body_iterator
+        assert await chunks.__anext__() == "retry: 1000\n\n"
+        hub.publish("messages", "m1", ("message:m1",), _delta("m1", 2))
+        hub.flush()
+        frame = await chunks.__anext__()
+        await hub.stop()
+        closed = await chunks.__anext__()
+        return frame, closed, hub.stats()
+
+    try:
+        frame, closed, stats = asyncio.run(scenario())
+    finally:
+        use_live_hub(None)
+    assert json.loads(frame.removeprefix("data: "))["messages"] == [_delta("m1", 2)]
+    assert closed == 'event: closed\ndata: {"reason": "shutdown"}\n\n'
+    assert stats["subscribers"] == 0
+
+
+def test_websocket_receives_buffered_likes():
+    try:
+        with TestClient(app) as client:
+            with client.websocket_connect("/live/ws?topic=tag:INFRA") as socket:
+                socket.send_text(json.dumps({"subscribe": ["nonsense"]}))
+                assert "unknown topic" in json.loads(socket.receive_text())["error"]
+                assert client.post("/reactions/msg-004/like").status_code == 200
+                # Pushed once the reaction buffer flushes (REACTION_FLUSH_INTERVAL_SECONDS).
+                frame = json.loads(socket.receive_text())
+            assert frame["messages"] == [{"id": "msg-004", "likes": 13, "alerts": 0, "displayed_status": "HYPED"}]
+            assert client.get("/live/stats").json()["subscribers"] == 0
+    finally:
+        messages_service.apply_reaction_delta("msg-004", likes=-1)
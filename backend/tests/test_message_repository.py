@@ -0,0 +1,146 @@
+from dataclasses import replace
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.models import Base, Message
+from app.repositories.messages import SqlMessageRepository
+from app.schemas import MessageStatus
+from app.services import messages as messages_service
+from app.services.messages import SORT_MODES
+
+from benchmarks.corpus import build_corpus
+
+
+@pytest.fixture
+def repository():
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    yield SqlMessageRepository(sessionmaker(bind=engine, future=True))
+    engine.dispose()
+
+
+@pytest.fixture
+def corpus(repository):
+    seeds = build_corpus(250, seed=21, creators=15)
+    seeds.append(replace(seeds[0], id="msg-special", title="50% off_sale", tags=("DeFi",)))
+    repository.upsert_many([*messages_service.MESSAGE_SEEDS, *seeds])
+    for seed in seeds:
+        messages_service.upsert_message(seed)
+    yield seeds
+    for seed in seeds:
+        messages_service.remove_message(seed.id)
+
+
+def _page_ids(**params):
+    return [entry.id for entry in messages_service.list_messages(**params)]
+
+
+@pytest.mark.parametrize(
+    "params",
+    [
+        {"sort": sort} for sort in SORT_MODES
+    ]
+    + [
+        {"search": "vault"},
+        {"search": "ZK ROLL", "sort": "likes"},
+        {"search": "50%"},
+        {"search": "f_s"},
+        {"tags": ["defi", "zk"], "tag_mode": "and"},
+        {"tags": ["RISK", "nft"], "tag_mode": "or", "sort": "alerts"},
+        {"search": "wallet", "tags": ["infra"], "sort": "under_review"},
+    ],
+)
+def test_repository_feed_matches_in_memory_feed(repository, corpus, params) -> None:
+    expected = _page_ids(**params)
+    messages_service.use_repository(repository)
+    try:
+        assert _page_ids(**params) == expected
+    finally:
+        messages_service.use_repository(None)
+
+
+def test_repository_keyset_pages_and_entries(repository, corpus) -> None:
+    expected = [entry.model_dump() for entry in messages_service.list_messages(sort="likes")]
+    messages_service.use_repository(repository)
+    try:
+        seen = []
+        cursor = None
+        while True:
+            page = messages_service.page_messages(sort="likes", limit=40, cursor=cursor)
+            seen.extend(entry.model_dump() for entry in page.entries)
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+        assert seen == expected
+    finally:
+        messages_service.use_repository(None)
+
+
+def test_repository_counters_status_and_removal(repository, corpus) -> None:
+    target = corpus[5]
+    updated = repository.apply_reaction_delta(target.id, likes=100)
+    assert updated.likes == target.likes + 100
+    assert repository.page(sort="likes", limit=1)[0].id == target.id
+
+    repository.set_status(target.id, MessageStatus.HYPED)
+    assert repository.get(target.id).status is MessageStatus.HYPED
+
+    repository.upsert(replace(target, title="Renamed unique-title"))
+    assert [seed.id for seed in repository.page(search="unique-title")] == [target.id]
+
+    repository.remove(target.id)
+    assert repository.get(target.id) is None
+    assert repository.page(search="unique-title") == []
+    assert repository.apply_reaction_delta(target.id, likes=1) is None
+    assert repository.count() == len(messages_service.MESSAGE_SEEDS) + len(corpus) - 1
+
+
+def test_repository_applies_batched_reaction_deltas(repository, corpus) -> None:
+    target = corpus[1]
+    repository.set_status(target.id, MessageStatus.NORMAL)
+    totals = repository.apply_reaction_deltas({target.id: (200, 2), "msg-missing": (1, 1), "msg-001": (1, 0)})
+
+    assert totals == {target.id: (target.likes + 200, target.alerts + 2), "msg-001": (20, 1)}
+    updated = repository.get(target.id)
+    assert (updated.likes, updated.alerts) == (target.likes + 200, target.alerts + 2)
+    assert repository.get("msg-001").likes == 20
+    with repository._session_factory() as session:
+        flag = session.scalar(select(Message.review_flag).where(Message.id == target.id))
+    assert flag == 1
+
+    assert repository.applied_log_segment("/var/log/reactions") is None
+    repository.apply_reaction_deltas({target.id: (1, 0)}, ("/var/log/reactions", 7))
+    repository.apply_reaction_deltas({target.id: (1, 0)}, ("/var/log/reactions", 9))
+    assert repository.applied_log_segment("/var/log/reactions") == 9
+    assert repository.get(target.id).likes == target.likes + 202
+
+
+def test_repository_marks_messages_under_review(repository, corpus) -> None:
+    target, hyped = corpus[2], corpus[3]
+    repository.set_status(target.id, MessageStatus.NORMAL)
+    repository.set_status(hyped.id, MessageStatus.HYPED)
+
+    moved = repository.mark_under_review([target.id, target.id, hyped.id, "msg-missing"])
+    assert [(seed.id, seed.status, seed.displayed_status) for seed in moved] == [
+        (target.id, MessageStatus.UNDER_REVIEW, MessageStatus.UNDER_REVIEW)
+    ]
+    assert repository.mark_under_review([target.id]) == []
+    assert repository.get(hyped.id).displayed_status is MessageStatus.HYPED
+    assert target.id in [seed.id for seed in repository.page(sort="under_review", limit=500)]
+
+
+def test_repository_dismissed_review_stays_normal(repository, corpus) -> None:
+    target, hyped = corpus[2], corpus[3]
+    repository.set_status(target.id, MessageStatus.NORMAL)
+    repository.set_status(hyped.id, MessageStatus.HYPED)
+    repository.mark_under_review([target.id])
+
+    dismissed = repository.dismiss_review(target.id)
+    assert (dismissed.status, dismissed.displayed_status) == (MessageStatus.NORMAL, MessageStatus.NORMAL)
+    repository.apply_reaction_deltas({target.id: (500, 500)})
+    assert repository.get(target.id).displayed_status is MessageStatus.NORMAL
+    assert repository.dismiss_review(hyped.id) is None
+    assert repository.get(hyped.id).status is MessageStatus.HYPED
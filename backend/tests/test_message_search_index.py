@@ -0,0 +1,72 @@
+import random
+from dataclasses import replace
+from datetime import datetime, timezone
+
+import pytest
+
+from app.schemas import MessageStatus
+from app.services import messages as messages_service
+from app.services.messages import MESSAGE_SEEDS, MessageSeed, _matches_search
+from app.services.search import MessageSearchIndex
+
+WORDS = ("sui", "Restake", "vault", "ZK", "gas", "burner", "İstanbul", "flywheel", "a b", "ß")
+
+
+def _random_seed(rng: random.Random, index: int) -> MessageSeed:
+    created = datetime(2024, 9, 1, tzinfo=timezone.utc)
+    return MessageSeed(
+        id=f"msg-{index:05d}",
+        title=" ".join(rng.choices(WORDS, k=3)),
+        content=" ".join(rng.choices(WORDS, k=8)),
+        tags=tuple(rng.sample(("defi", "ZK", "risk", "Infra"), k=rng.randint(0, 3))),
+        creator_id=f"user-{index % 7}",
+        creator_handle=f"@user{index % 7}",
+        creator_display_name=rng.choice(WORDS),
+        creator_avatar_url="https://cdn.suiworld.xyz/avatars/user.png",
+        likes=0,
+        alerts=0,
+        status=MessageStatus.NORMAL,
+        created_at=created,
+        updated_at=created,
+    )
+
+
+@pytest.mark.parametrize(
+    "term",
+    ["v", "zk", "SUI", "vault", "stake fly", "@user3", "İst", "ss", "a b", "nomatch", " "],
+)
+def test_search_matches_linear_scan(term: str) -> None:
+    rng = random.Random(7)
+    seeds = [_random_seed(rng, index) for index in range(300)]
+    index = MessageSearchIndex(seeds)
+
+    expected = {seed.id for seed in seeds if _matches_search(seed, term)}
+    assert index.search(term) == expected
+
+
+def test_index_tracks_updates_and_removals() -> None:
+    seed = MESSAGE_SEEDS[1]
+    index = MessageSearchIndex(MESSAGE_SEEDS)
+    assert index.search("vault") == {seed.id}
+
+    index.update(replace(seed, content="Nothing to see here", tags=("misc",)))
+    assert index.search("vault") == set()
+    assert index.search("misc") == {seed.id}
+
+    index.remove(seed.id)
+    assert seed.id not in index
+    assert index.search("nothing") == set()
+    assert index.search("misc") == set()
+
+
+def test_list_messages_sees_upserted_messages() -> None:
+    seed = replace(MESSAGE_SEEDS[0], id="msg-900", title="Fresh vault audit", tags=("audit",))
+    messages_service.upsert_message(seed)
+    try:
+        results = messages_service.list_messages(search="vault")
+        assert [entry.id for entry in results] == ["msg-900", "msg-002"]
+        assert [entry.id for entry in messages_service.list_messages(tags=["AUDIT"])] == ["msg-900"]
+    finally:
+        messages_service.remove_message(seed.id)
+
+    assert [entry.id for entry in messages_service.list_messages(search="vault")] == ["msg-002"]
@@ -0,0 +1,93 @@
+from dataclasses import replace
+
+import pytest
+
+from app.schemas import MessageStatus
+from app.services import messages as messages_service
+from app.services.messages import MESSAGE_SEEDS, _build_entry, _tags_match
+from app.services.store import REVIEW_ALERTS, REVIEW_LIKES, REVIEW_NONE, ColumnarMessageStore
+
+from benchmarks.corpus import build_corpus
+
+
+def test_store_round_trips_seeds_and_interns_creators() -> None:
+    corpus = build_corpus(300, seed=2, creators=10)
+    store = ColumnarMessageStore(corpus, capacity=8)
+
+    assert len(store) == 300
+    assert [store.get(seed.id) for seed in corpus] == corpus
+    assert len(store._creators) == 10
+
+
+def test_store_remove_moves_last_row_into_gap() -> None:
+    corpus = build_corpus(10, seed=4)
+    store = ColumnarMessageStore(corpus)
+
+    assert store.remove(corpus[2].id)
+    assert not store.remove(corpus[2].id)
+    assert corpus[2].id not in store
+    assert store.get(corpus[-1].id) == corpus[-1]
+    assert len(store) == 9
+
+    store.upsert(replace(corpus[3], likes=99, tags=("fresh",)))
+    assert store.get(corpus[3].id).likes == 99
+    assert store.get(corpus[3].id).tags == ("fresh",)
+
+
+@pytest.mark.parametrize("mode", ["and", "or"])
+def test_tag_bitsets_match_tag_filter(mode: str) -> None:
+    corpus = build_corpus(500, seed=6)
+    corpus += [replace(corpus[0], id="msg-upper", tags=("DeFi", "ZK"))]
+    store = ColumnarMessageStore(corpus)
+
+    required = ["defi", "zk"]
+    expected = {seed.id for seed in corpus if _tags_match(seed.tags, required, mode)}
+    assert store.ids_with_tags(required, mode) == expected
+    assert store.ids_with_tags(["unknown"], mode) == set()
+
+
+def test_tag_bitsets_grow_past_one_word() -> None:
+    seed = MESSAGE_SEEDS[0]
+    seeds = [replace(seed, id=f"msg-{index}", tags=(f"tag-{index}",)) for index in range(130)]
+    store = ColumnarMessageStore(seeds)
+
+    assert store.get("msg-129").tags == ("tag-129",)
+    assert store.ids_with_tags(["TAG-0", "tag-128"]) == {"msg-0", "msg-128"}
+
+
+def test_vectorized_rendering_matches_scalar_entries() -> None:
+    corpus = build_corpus(400, seed=8)
+    for seed in corpus:
+        messages_service.upsert_message(seed)
+    try:
+        rendered = {entry.id: entry for entry in messages_service.list_messages()}
+        for seed in corpus:
+            assert rendered[seed.id] == _build_entry(seed)
+    finally:
+        for seed in corpus:
+            messages_service.remove_message(seed.id)
+
+    assert len(messages_service.list_messages()) == len(MESSAGE_SEEDS)
+
+
+def test_review_column_is_maintained_on_writes() -> None:
+    seed = replace(MESSAGE_SEEDS[0], likes=19, alerts=19, status=MessageStatus.NORMAL)
+    store = ColumnarMessageStore([seed], review_thresholds=(20, 20))
+    assert store.review.tolist() == [REVIEW_NONE]
+
+    store.add_reactions(seed.id, alerts=1)
+    assert store.review.tolist() == [REVIEW_ALERTS]
+    store.add_reactions(seed.id, likes=1)
+    assert store.review.tolist() == [REVIEW_LIKES]
+    store.set_status(seed.id, MessageStatus.HYPED)
+    assert store.review.tolist() == [REVIEW_NONE]
+    store.upsert(replace(seed, likes=40))
+    assert store.review.tolist() == [REVIEW_LIKES]
+    # A rejected proposal dismisses the review; later likes do not bring it back.
+    store.set_status(seed.id, MessageStatus.UNDER_REVIEW)
+    assert store.get(seed.id).displayed_status is MessageStatus.UNDER_REVIEW
+    store.dismiss_review(seed.id)
+    store.add_reactions(seed.id, likes=5)
+    assert store.review.tolist() == [REVIEW_NONE]
+    assert store.get(seed.id).displayed_status is MessageStatus.NORMAL
+    assert store.dismiss_review("missing") is None
@@ -1,3 +1,4 @@
+import json
 import os
 from typing import List
 
@@ -88,3 +89,65 @@ def test_list_messages_search_is_case_insensitive(client: TestClient) -> None:
 
     payload = response.json()
     assert [item["id"] for item in payload] == ["msg-003"]
+
+
+@pytest.mark.parametrize("sort", ["latest", "likes", "alerts", "under_review"])
+def test_list_messages_keyset_pages_cover_full_feed(client: TestClient, sort: str) -> None:
+    full = [item["id"] for item in client.get("/messages", params={"sort": sort}).json()]
+
+    paged: List[str] = []
+    params = {"sort": sort, "limit": 3}
+    while True:
+        response = client.get("/messages", params=params)
+        assert response.status_code == 200
+        paged.extend(item["id"] for item in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+        params = {"sort": sort, "limit": 3, "cursor": cursor}
+
+    assert paged == full
+
+
+def test_list_messages_rejects_cursor_from_other_sort(client: TestClient) -> None:
+    response = client.get("/messages", params={"sort": "latest", "limit": 1})
+    cursor = response.headers["X-Next-Cursor"]
+
+    response = client.get("/messages", params={"sort": "likes", "cursor": cursor})
+    assert response.status_code == 400
+
+    response = client.get("/messages", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+
+def test_list_messages_streams_ndjson(client: TestClient) -> None:
+    response = client.get("/messages", params={"format": "ndjson", "limit": 2})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert response.headers["X-Next-Cursor"]
+
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [item["id"] for item in lines] == ["msg-001", "msg-002"]
+
+
+
+def test_list_messages_without_limit_returns_the_whole_feed(client: TestClient) -> None:
+    from app.api.messages import MAX_PAGE_SIZE
+    from app.services import messages as messages_service
+    from benchmarks.corpus import build_corpus
+
+    seeds = build_corpus(MAX_PAGE_SIZE, seed=5, creators=3)
+    for seed in seeds:
+        messages_service.upsert_message(seed)
+    try:
+        response = client.get("/messages")
+        assert len(response.json()) == len(messages_service.page_messages().message_ids) > MAX_PAGE_SIZE
+        assert "X-Next-Cursor" not in response.headers
+        paged = client.get("/messages", params={"limit": MAX_PAGE_SIZE})
+        assert len(paged.json()) == MAX_PAGE_SIZE
+        assert paged.headers["X-Next-Cursor"]
+    finally:
+        for seed in seeds:
+            messages_service.remove_message(seed.id)
+
+    assert client.get("/messages", params={"limit": MAX_PAGE_SIZE + 1}).status_code == 422
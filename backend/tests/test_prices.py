@@ -0,0 +1,151 @@
+import asyncio
+import json
+import os
+import time
+from decimal import Decimal
+
+import httpx
+
+os.environ.setdefault("SUPABASE_URL", "http://localhost")
+os.environ.setdefault("SUPABASE_ANON_KEY", "anon")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "service")
+
+from app.services.prices import (
+    CoinGeckoPriceSource,
+    FilePriceSource,
+    PriceOracle,
+    PriceSource,
+    StaticPriceSource,
+)
+
+
+class _SlowSource(PriceSource):
+    name = "slow"
+
+    def __init__(self, prices, delay):
+        self.prices = prices
+        self.delay = delay
+        self.fetches = 0
+
+    async def fetch(self, symbols):
+        self.fetches += 1
+        await asyncio.sleep(self.delay)
+        return {symbol: self.prices[symbol] for symbol in symbols if symbol in self.prices}
+
+
+class _BrokenSource(PriceSource):
+    name = "broken"
+
+    async def fetch(self, symbols):
+        raise RuntimeError("feed down")
+
+
+def _wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_reads_serve_stale_prices_while_refreshing():
+    source = _SlowSource({"SUI": Decimal("4.00")}, delay=0.2)
+    oracle = PriceOracle([source], symbols=("SUI",), seed={"SUI": Decimal("3.66")})
+
+    started = time.perf_counter()
+    assert oracle.prices()["SUI"] == Decimal("3.66")
+    assert oracle.prices()["SUI"] == Decimal("3.66")
+    assert time.perf_counter() - started < 0.05
+
+    _wait_for(lambda: oracle.prices()["SUI"] == Decimal("4.00"))
+    assert source.fetches == 1
+    assert oracle.stats()["background_refreshes"] == 1
+
+
+def test_symbols_fall_back_through_sources(tmp_path):
+    price_file = tmp_path / "prices.json"
+    price_file.write_text(json.dumps({"SUI": "3.9", "SWT": 0.002}))
+    oracle = PriceOracle(
+        [_BrokenSource(), FilePriceSource(str(price_file)), StaticPriceSource()],
+        symbols=("SUI", "SWT", "BTC"),
+    )
+
+    prices = asyncio.run(oracle.refresh())
+    assert prices == {"SUI": Decimal("3.9"), "SWT": Decimal("0.002"), "BTC": Decimal("155500")}
+    stats = oracle.stats()
+    assert {symbol: entry["source"] for symbol, entry in stats["symbols"].items()} == {
+        "SUI": "file",
+        "SWT": "file",
+        "BTC": "static",
+    }
+    assert stats["source_failures"] == {"broken": 1, "file": 0, "static": 0}
+    assert stats["last_error"] == "broken: feed down"
+
+
+def test_symbols_missing_from_every_source_go_stale():
+    clock = [1000.0]
+    source = _SlowSource({"SUI": Decimal("4")}, delay=0)
+    oracle = PriceOracle([source], symbols=("SUI", "BTC"), stale_after=60, clock=lambda: clock[0])
+    asyncio.run(oracle.refresh())
+    clock[0] += 30
+    asyncio.run(oracle.refresh())
+    clock[0] += 45
+
+    symbols = oracle.stats()["symbols"]
+    assert symbols["SUI"]["age_seconds"] == 45 and not symbols["SUI"]["stale"]
+    assert symbols["BTC"]["source"] == "seed" and symbols["BTC"]["stale"]
+    assert oracle.prices()["BTC"] == Decimal("155500")
+
+
+def test_failed_live_source_ages_into_stale():
+    clock = [1000.0]
+    source = _SlowSource({"SUI": Decimal("4")}, delay=0)
+    oracle = PriceOracle([source], symbols=("SUI",), stale_after=60, clock=lambda: clock[0])
+    asyncio.run(oracle.refresh())
+
+    source.fetch = _BrokenSource().fetch
+    clock[0] += 30
+    asyncio.run(oracle.refresh())
+    symbols = oracle.stats()["symbols"]
+    assert symbols["SUI"] == {"price": "4", "source": "slow", "age_seconds": 30, "stale": False}
+
+    clock[0] += 30
+    asyncio.run(oracle.refresh())
+    assert oracle.stats()["symbols"]["SUI"]["stale"]
+    assert oracle.stats()["source_failures"] == {"slow": 2}
+    assert oracle.prices()["SUI"] == Decimal("4")
+
+
+def test_settings_oracle_only_seeds_static_prices(monkeypatch):
+    from app.services import prices
+
+    monkeypatch.setattr(prices.settings, "PRICE_API_URL", "http://prices.invalid/simple/price")
+    monkeypatch.setattr(prices.settings, "PRICE_FILE", None)
+    oracle = prices.create_price_oracle()
+    assert [source.name for source in oracle.sources] == ["coingecko"]
+    assert oracle.stats()["symbols"]["SUI"]["source"] == "seed"
+
+
+def test_coingecko_source_maps_coin_ids():
+    def handler(request):
+        assert request.url.params["ids"] == "sui,bitcoin"
+        return httpx.Response(200, json={"sui": {"usd": 3.5}, "bitcoin": {"usd": 100000}})
+
+    source = CoinGeckoPriceSource("http://prices.test/simple/price", transport=httpx.MockTransport(handler))
+    prices = asyncio.run(source.fetch(["SUI", "BTC", "SWT"]))
+    assert prices == {"SUI": Decimal("3.5"), "BTC": Decimal("100000")}
+
+
+def test_background_refresher_runs_on_the_loop():
+    source = _SlowSource({"SUI": Decimal("5")}, delay=0)
+    oracle = PriceOracle([source], symbols=("SUI",), refresh_interval=0.01)
+
+    async def scenario():
+        oracle.start()
+        await asyncio.sleep(0.05)
+        prices = oracle.prices()
+        await oracle.stop()
+        return prices
+
+    assert asyncio.run(scenario())["SUI"] == Decimal("5")
+    assert source.fetches >= 2
+    assert oracle.stats()["background_refreshes"] == 0
@@ -0,0 +1,150 @@
+import random
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import proposals as proposals_api
+from app.schemas import ProposalStatus, ProposalType
+from app.security import get_current_user
+from app.services.counters import ThresholdCrossing
+from app.services.proposals import (
+    QUORUM,
+    AlreadyVotedError,
+    NotAManagerError,
+    ProposalBook,
+    ProposalClosedError,
+    UnknownProposalError,
+    get_proposal_book,
+)
+
+MANAGERS = [f"0x{index:02x}" for index in range(8)]
+
+
+def _event(name, timestamp_ms=None, **fields):
+    event = {"type": f"0xpkg::vote::{name}", "parsedJson": fields}
+    if timestamp_ms is not None:
+        event["timestampMs"] = str(timestamp_ms)
+    return event
+
+
+@pytest.fixture
+def book():
+    book = ProposalBook()
+    book.add_managers(MANAGERS)
+    return book
+
+
+def test_open_index_by_type_message_and_age(book):
+    book.open_many(
+        [
+            ThresholdCrossing("msg-a", "likes", 20),
+            ThresholdCrossing("msg-b", "alerts", 20),
+            ThresholdCrossing("msg-a", "alerts", 20),
+        ]
+    )
+    # A chain proposal opened before the book started sorts as the oldest.
+    book.apply_events([_event("ProposalCreated", 1_000, proposal_id="0xp", message_id="msg-c", proposal_type=0)])
+    # Proposals opened together tie on age and fall back to id order.
+    assert [p.id for p in book.list_open()] == ["0xp", "msg-a:HYPE", "msg-a:SCAM", "msg-b:SCAM"]
+    assert [p.id for p in book.list_open(ProposalType.SCAM)] == ["msg-a:SCAM", "msg-b:SCAM"]
+    assert [p.id for p in book.list_open(newest_first=True, limit=2)] == ["msg-b:SCAM", "msg-a:SCAM"]
+    assert [p.proposal_type for p in book.list_open(message_id="msg-a")] == [ProposalType.HYPE, ProposalType.SCAM]
+    assert [p.id for p in book.list_open(ProposalType.HYPE, "msg-a")] == ["msg-a:HYPE"]
+    assert book.list_open(message_id="msg-z") == []
+
+
+def test_votes_tally_resolve_and_free_pending_slots(book):
+    first, second = book.open_many([ThresholdCrossing("msg-a", "likes", 20), ThresholdCrossing("msg-b", "likes", 20)])
+    assert [p.id for p in book.pending_for(MANAGERS[0])] == [first.id, second.id]
+
+    assert book.vote(first.id, MANAGERS[0], True).approve_votes == 1
+    assert [p.id for p in book.pending_for(MANAGERS[0])] == [second.id]
+    with pytest.raises(AlreadyVotedError):
+        book.vote(first.id, MANAGERS[0], False)
+    with pytest.raises(NotAManagerError):
+        book.vote(first.id, "0xstranger", True)
+    with pytest.raises(NotAManagerError):
+        book.pending_for("0xstranger")
+    with pytest.raises(UnknownProposalError):
+        book.vote("msg-z:HYPE", MANAGERS[0], True)
+
+    book.vote(first.id, MANAGERS[1], False)
+    for manager in MANAGERS[2 : 1 + QUORUM]:
+        resolved = book.vote(first.id, manager, True)
+    assert (resolved.status, resolved.approve_votes, resolved.reject_votes) == (ProposalStatus.PASSED, QUORUM, 1)
+    assert [p.id for p in book.list_open()] == [second.id]
+    with pytest.raises(ProposalClosedError):
+        book.vote(first.id, MANAGERS[-1], True)
+
+    # The freed slot is reused without inheriting the old voters.
+    (third,) = book.open_many([ThresholdCrossing("msg-c", "alerts", 20)])
+    assert book.stats()["slots"] == 2
+    assert [p.id for p in book.pending_for(MANAGERS[0])] == [second.id, third.id]
+    assert [p.id for p in book.pending_for(MANAGERS[0], ProposalType.SCAM)] == [third.id]
+
+
+def test_vote_events_update_tallies_incrementally(book):
+    (local,) = book.open_many([ThresholdCrossing("msg-a", "alerts", 20)])
+    created = _event("ProposalCreated", proposal_id="0xp", message_id="msg-a", proposal_type=1)
+    votes = [_event("VoteCast", proposal_id="0xp", voter=voter, vote=False) for voter in ("0xaa", MANAGERS[0])]
+    assert book.apply_events([created, *votes]) == 3
+    # Replays (the indexer may redeliver a page) and unknown proposals change nothing.
+    assert book.apply_events([created, *votes, _event("VoteCast", proposal_id="0xq", voter="0xaa", vote=True)]) == 0
+    proposal = book.get(local.id)
+    assert (proposal.chain_id, proposal.reject_votes) == ("0xp", 2)
+    assert book.is_manager("0xaa") and [p.id for p in book.pending_for("0xaa")] == []
+    with pytest.raises(AlreadyVotedError):
+        book.vote(local.id, MANAGERS[0], False)
+
+    resolved = _event("ProposalResolved", proposal_id="0xp", status=2, approve_votes=0, reject_votes=4)
+    assert book.apply_events([resolved]) == 1
+    assert (book.get(local.id).status, book.get(local.id).reject_votes) == (ProposalStatus.REJECTED, 4)
+    assert book.list_open() == []
+
+
+def test_pending_views_match_a_full_scan():
+    rng = random.Random(3)
+    book = ProposalBook()
+    book.add_managers(MANAGERS)
+    voted = set()
+    for step in range(3000):
+        if rng.random() < 0.3:
+            book.open_many([ThresholdCrossing(f"msg-{step}", rng.choice(["likes", "alerts"]), 20)])
+            continue
+        open_ids = [p.id for p in book.list_open()]
+        if open_ids:
+            proposal_id, manager = rng.choice(open_ids), rng.choice(MANAGERS)
+            if (proposal_id, manager) not in voted:
+                book.vote(proposal_id, manager, rng.random() < 0.5)
+                voted.add((proposal_id, manager))
+    open_proposals = book.list_open()
+    assert open_proposals and len(book) > len(open_proposals)
+    for manager in MANAGERS:
+        assert book.pending_for(manager) == [p for p in open_proposals if (p.id, manager) not in voted]
+
+
+def test_pending_and_vote_routes():
+    app = FastAPI()
+    app.include_router(proposals_api.router, prefix="/proposals")
+    caller = {"id": MANAGERS[0]}
+    app.dependency_overrides[get_current_user] = lambda: caller
+    book = get_proposal_book()
+    book.add_managers(MANAGERS)
+    try:
+        (proposal,) = book.open_many([ThresholdCrossing("msg-a", "likes", 20)])
+        client = TestClient(app)
+        assert [p["id"] for p in client.get("/proposals/pending").json()] == [proposal.id]
+        response = client.post(f"/proposals/{proposal.id}/vote", json={"approve": True})
+        assert response.status_code == 200 and response.json()["approve_votes"] == 1
+        assert client.get("/proposals/pending").json() == []
+        assert client.post(f"/proposals/{proposal.id}/vote", json={"approve": True}).status_code == 409
+        assert client.post("/proposals/msg-z:HYPE/vote", json={"approve": True}).status_code == 404
+        assert client.get("/proposals/", params={"type": "HYPE"}).json()[0]["approve_votes"] == 1
+        assert client.get("/proposals/", params={"type": "SCAM"}).json() == []
+        caller["id"] = "0xstranger"
+        assert client.get("/proposals/pending").status_code == 403
+        assert client.post(f"/proposals/{proposal.id}/vote", json={"approve": True}).status_code == 403
+    finally:
+        book.clear()
@@ -0,0 +1,275 @@
+import asyncio
+import json
+import os
+import time
+from datetime import datetime, timezone
+
+os.environ.setdefault("SUPABASE_URL", "http://localhost")
+os.environ.setdefault("SUPABASE_ANON_KEY", "anon")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "service")
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app import chain, indexer
+from app.config import settings
+from app.indexer import EventIndexer, JsonlEventSource
+from app.main import app
+from app.models import Base, Proposal, Vote
+from app.repositories.proposals import SqlProposalStore
+from app.schemas import MessageStatus, ProposalStatus, ProposalType
+from app.services import messages as messages_service
+from app.services.counters import ReactionCounterBuffer, ThresholdCrossing
+from app.services.proposals import (
+    QUORUM,
+    ProposalBook,
+    ProposalPipeline,
+    cast_vote,
+    get_proposal_book,
+    use_proposal_store,
+)
+
+MANAGERS = [f"0x{index:02x}" for index in range(8)]
+
+
+def _sqlite_sessions():
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    return engine, sessionmaker(bind=engine, future=True)
+
+
+def test_book_opens_one_proposal_per_message_and_type():
+    book = ProposalBook()
+    opened = book.open_many(
+        [
+            ThresholdCrossing("msg-a", "likes", 20),
+            ThresholdCrossing("msg-a", "likes", 20),
+            ThresholdCrossing("msg-a", "alerts", 20),
+        ]
+    )
+    assert [(p.id, p.proposal_type) for p in opened] == [
+        ("msg-a:HYPE", ProposalType.HYPE),
+        ("msg-a:SCAM", ProposalType.SCAM),
+    ]
+    assert book.open_many([ThresholdCrossing("msg-a", "likes", 21)]) == []
+    assert [p.id for p in book.list_open()] == ["msg-a:HYPE", "msg-a:SCAM"]
+
+
+def test_pipeline_batches_crossings_from_threads_and_acknowledges():
+    async def scenario():
+        book = ProposalBook()
+        pipeline = ProposalPipeline(book, batch_size=64, linger=0.01)
+        totals = {f"msg-{index}": (19, 0) for index in range(100)}
+
+        def sink(batch, position):
+            for message_id, (likes, alerts) in batch.items():
+                totals[message_id] = (totals[message_id][0] + likes, totals[message_id][1] + alerts)
+            return {message_id: totals[message_id] for message_id in batch}
+
+        buffer = ReactionCounterBuffer(
+            sink=sink,
+            load_totals=totals.get,
+            on_crossing=pipeline.publish,
+            auto_ack=False,
+        )
+        pipeline.start(acknowledge=buffer.acknowledge)
+
+        def click_all():
+            for message_id in totals:
+                buffer.increment(message_id, likes=1)
+                buffer.increment(message_id, likes=1)
+            buffer.flush()
+
+        await asyncio.to_thread(click_all)
+        await pipeline.stop()
+        return book, pipeline, buffer
+
+    book, pipeline, buffer = asyncio.run(scenario())
+    assert len(book) == 100
+    assert pipeline.opened == 100
+    assert pipeline.batches < 100
+    assert buffer._unacked == {}
+
+
+def test_store_lets_one_worker_claim_each_crossing():
+    engine, session_factory = _sqlite_sessions()
+    crossing = ThresholdCrossing("msg-a", "likes", 20)
+    try:
+        first, second = SqlProposalStore(session_factory), SqlProposalStore(session_factory)
+        assert first.claim([crossing, crossing]) == [crossing]
+        # Another worker's buffer, or a redelivery, reports the same crossing.
+        assert second.claim([ThresholdCrossing("msg-a", "likes", 21), ThresholdCrossing("msg-a", "alerts", 20)]) == [
+            ThresholdCrossing("msg-a", "alerts", 20)
+        ]
+
+        async def scenario():
+            book = ProposalBook()
+            pipeline = ProposalPipeline(book, store=second, linger=0)
+            pipeline.start()
+            pipeline.publish(crossing)
+            await pipeline.stop()
+            return book
+
+        assert len(asyncio.run(scenario())) == 0
+    finally:
+        engine.dispose()
+
+
+def test_crossing_from_reaction_route_opens_proposal():
+    book = get_proposal_book()
+    try:
+        with TestClient(app) as client:
+            # msg-001 sits one like below the threshold.
+            assert client.post("/reactions/msg-001/like").json()["likes"] == 20
+            deadline = time.monotonic() + 5
+            proposals = []
+            while not proposals and time.monotonic() < deadline:
+                proposals = client.get("/proposals/").json()
+                time.sleep(0.01)
+        assert [(p["message_id"], p["proposal_type"], p["trigger_count"]) for p in proposals] == [
+            ("msg-001", "HYPE", 20)
+        ]
+        # Shutdown flushed the buffered like into the store.
+        entry = messages_service._build_entry(messages_service.get_message("msg-001"))
+        assert entry.metrics.displayed_status.value == "UNDER_REVIEW"
+    finally:
+        messages_service.apply_reaction_delta("msg-001", likes=-1)
+        messages_service.set_message_status("msg-001", MessageStatus.NORMAL)
+        book.clear()
+
+
+def test_book_reloads_proposals_and_votes_from_the_store():
+    engine, session_factory = _sqlite_sessions()
+    store = SqlProposalStore(session_factory)
+    try:
+        store.claim([ThresholdCrossing("msg-a", "likes", 20), ThresholdCrossing("msg-b", "alerts", 20)])
+        chain_created = datetime(2030, 1, 1, tzinfo=timezone.utc)
+        with session_factory() as session, session.begin():
+            # The indexer's projection of the chain proposal for msg-b's SCAM crossing.
+            session.execute(
+                insert(Proposal),
+                [
+                    {
+                        "id": "0xp",
+                        "message_id": "msg-b",
+                        "proposal_type": "SCAM",
+                        "proposer": MANAGERS[0],
+                        "status": "OPEN",
+                        "approve_votes": 1,
+                        "reject_votes": 0,
+                        "created_at": chain_created,
+                        "updated_at": chain_created,
+                    }
+                ],
+            )
+            session.execute(
+                insert(Vote), [{"proposal_id": "0xp", "voter": "0xaa", "approve": True, "cast_at": chain_created}]
+            )
+        book = ProposalBook()
+        book.add_managers(MANAGERS)
+        assert book.load(*store.load()) == 2
+        for manager in MANAGERS[:2]:
+            assert store.record_vote("msg-a:HYPE", manager, True)
+            book.vote("msg-a:HYPE", manager, True)
+        assert store.record_vote("msg-b:SCAM", MANAGERS[0], False)
+        assert not store.record_vote("msg-b:SCAM", MANAGERS[0], True)
+
+        restarted = ProposalBook()
+        restarted.add_managers(MANAGERS)
+        assert restarted.load(*store.load()) == 2
+        assert restarted.load(*store.load()) == 0
+        hype, scam = restarted.get("msg-a:HYPE"), restarted.get("msg-b:SCAM")
+        assert (hype.approve_votes, hype.trigger_count) == (2, 20)
+        assert (scam.chain_id, scam.approve_votes, scam.reject_votes) == ("0xp", 1, 1)
+        assert [p.id for p in restarted.pending_for(MANAGERS[0])] == []
+        assert [p.id for p in restarted.pending_for("0xaa")] == ["msg-a:HYPE"]
+    finally:
+        engine.dispose()
+
+
+def test_resolving_votes_set_message_outcomes_without_chain_calls(monkeypatch):
+    def resolve(batch):
+        raise AssertionError("the chain executes proposals itself when its vote reaches quorum")
+
+    monkeypatch.setattr(chain, "resolve_proposals", resolve)
+    engine, session_factory = _sqlite_sessions()
+    store = SqlProposalStore(session_factory)
+    use_proposal_store(store)
+    book = get_proposal_book()
+    book.add_managers(MANAGERS)
+    try:
+        crossings = [ThresholdCrossing("msg-002", "likes", 20), ThresholdCrossing("msg-003", "alerts", 20)]
+        store.claim(crossings)
+        book.open_many(crossings)
+        messages_service.mark_under_review(["msg-002", "msg-003"])
+        for manager in MANAGERS[:QUORUM]:
+            hype = cast_vote("msg-002:HYPE", manager, True)
+            scam = cast_vote("msg-003:SCAM", manager, False)
+        assert (hype.status, scam.status) == (ProposalStatus.PASSED, ProposalStatus.REJECTED)
+        assert messages_service.get_message("msg-002").status is MessageStatus.HYPED
+        assert messages_service.get_message("msg-003").status is MessageStatus.NORMAL
+        proposals, votes = store.load()
+        assert {row["id"]: (row["status"], row["approve_votes"], row["reject_votes"]) for row in proposals} == {
+            "msg-002:HYPE": ("PASSED", QUORUM, 0),
+            "msg-003:SCAM": ("REJECTED", 0, QUORUM),
+        }
+        assert len(votes) == 2 * QUORUM
+    finally:
+        for message_id in ("msg-002", "msg-003"):
+            messages_service.set_message_status(message_id, MessageStatus.NORMAL)
+        use_proposal_store(None)
+        book.clear()
+        engine.dispose()
+
+
+def test_failed_store_write_leaves_the_book_unchanged(monkeypatch):
+    class FailingStore:
+        def record_vote(self, proposal_id, voter, approve):
+            raise RuntimeError("database unavailable")
+
+    use_proposal_store(FailingStore())
+    book = get_proposal_book()
+    book.add_managers(MANAGERS)
+    try:
+        (proposal,) = book.open_many([ThresholdCrossing("msg-a", "likes", 20)])
+        with pytest.raises(RuntimeError):
+            cast_vote(proposal.id, MANAGERS[0], True)
+        assert book.get(proposal.id).approve_votes == 0
+        assert [p.id for p in book.pending_for(MANAGERS[0])] == [proposal.id]
+    finally:
+        use_proposal_store(None)
+        book.clear()
+
+
+def test_lifespan_follows_vote_events_into_the_book(monkeypatch, tmp_path):
+    path = tmp_path / "vote.jsonl"
+    created = {
+        "id": {"txDigest": "tx1", "eventSeq": "0"},
+        "type": "0xpkg::vote::ProposalCreated",
+        "timestampMs": "1700000000000",
+        "parsedJson": {"proposal_id": "0xfollowed", "message_id": "msg-005", "proposal_type": 1},
+    }
+    path.write_text(json.dumps(created) + "\n")
+    followed = []
+
+    def followers(session_factory, modules, *, on_page=None, project=True):
+        followed.append((modules, project))
+        return [EventIndexer(JsonlEventSource(str(path)), None, name="vote", on_page=on_page, project=False)]
+
+    monkeypatch.setattr(settings, "PROPOSAL_FOLLOW_EVENTS", True)
+    monkeypatch.setattr(indexer, "rpc_indexers", followers)
+    book = get_proposal_book()
+    try:
+        with TestClient(app) as client:
+            deadline = time.monotonic() + 5
+            while book.get("0xfollowed") is None and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert [p["id"] for p in client.get("/proposals/", params={"message_id": "msg-005"}).json()] == [
+                "0xfollowed"
+            ]
+        assert followed == [(("vote",), False)]
+    finally:
+        book.clear()
@@ -0,0 +1,146 @@
+import json
+import os
+import time
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+os.environ.setdefault("SUPABASE_URL", "http://localhost")
+os.environ.setdefault("SUPABASE_ANON_KEY", "anon")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "service")
+
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from jose import jwk, jwt
+
+from app import security
+from app.api import auth
+from app.config import settings
+from app.security import JwksCache, NonceStore, VerifiedTokenCache, get_current_user
+
+ADDRESS = "0x" + "ab" * 32
+
+
+@pytest.fixture(autouse=True)
+def session_settings(monkeypatch):
+    monkeypatch.setattr(settings, "SECRET_KEY", "session-secret")
+    monkeypatch.setattr(settings, "ALGORITHM", "HS256")
+    security.get_nonce_store().clear()
+    yield
+    security.use_jwks_cache(None)
+
+
+def _session_token(exp_offset=600, **claims):
+    payload = {"sub": "user-1", "sui_address": ADDRESS, "exp": int(time.time()) + exp_offset, **claims}
+    return jwt.encode(payload, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+
+    @app.get("/me")
+    def me(user=Depends(get_current_user)):
+        return user
+
+    return TestClient(app)
+
+
+def test_repeat_sessions_skip_signature_checks(client):
+    token = _session_token()
+    verifier = security.get_session_verifier()
+    before = verifier.verifications
+    for _ in range(5):
+        response = client.get("/me", headers={"Authorization": f"Bearer {token}"})
+        assert response.status_code == 200
+        assert response.json()["id"] == ADDRESS
+    assert verifier.verifications == before + 1
+    assert verifier.cache.hits >= 4
+
+
+def test_invalid_sessions_are_rejected(client):
+    expired = _session_token(exp_offset=-5)
+    forged = _session_token()[:-4] + "AAAA"
+    for token in (expired, forged, "not-a-jwt"):
+        response = client.get("/me", headers={"Authorization": f"Bearer {token}"})
+        assert response.status_code == 401
+    assert client.get("/me").status_code == 401
+
+
+def test_cached_claims_expire_with_the_token():
+    now = [1000.0]
+    cache = VerifiedTokenCache(max_entries=2, clock=lambda: now[0])
+    cache.put(b"a", {"sub": "a"}, expires_at=1010)
+    cache.put(b"b", {"sub": "b"}, expires_at=2000)
+    assert cache.get(b"a") == {"sub": "a"}
+    cache.put(b"c", {"sub": "c"}, expires_at=2000)
+    assert cache.get(b"b") is None and len(cache) == 2
+    now[0] = 1010
+    assert cache.get(b"a") is None
+
+
+def test_nonces_are_single_use_until_expiry():
+    now = [1000.0]
+    store = NonceStore(clock=lambda: now[0])
+    assert store.use("n1", expires_at=1060)
+    assert not store.use("n1", expires_at=1060)
+    now[0] = 1061
+    assert store.use("n1", expires_at=1200)
+    assert len(store) == 1
+
+
+@pytest.fixture
+def oidc(tmp_path, monkeypatch):
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    pem = private_key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    )
+    public = jwk.construct(
+        private_key.public_key().public_bytes(serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo),
+        "RS256",
+    ).to_dict()
+    jwks_file = tmp_path / "jwks.json"
+    jwks_file.write_text(json.dumps({"keys": [{**public, "kid": "k1"}]}))
+    monkeypatch.setattr(settings, "OIDC_AUDIENCE", "suiworld")
+    cache = JwksCache(path=str(jwks_file))
+    security.use_jwks_cache(cache)
+
+    def sign(kid="k1", **claims):
+        payload = {"sub": "google-1", "aud": "suiworld", "exp": int(time.time()) + 600, **claims}
+        return jwt.encode(payload, pem, algorithm="RS256", headers={"kid": kid})
+
+    return sign, cache
+
+
+def _login(token, nonce):
+    app = FastAPI()
+    app.include_router(auth.router, prefix="/auth")
+    payload = {
+        "provider": "google",
+        "jwt": token,
+        "nonce": nonce,
+        "suiAddress": ADDRESS,
+        "sessionKey": "session-key",
+        "signature": "signature",
+        "proof": {"proof": {"pi_a": "value"}},
+    }
+    return TestClient(app).post("/auth/zk-login", json=payload)
+
+
+def test_zk_login_verifies_oidc_signature_and_nonce(oidc):
+    sign, cache = oidc
+    response = _login(sign(nonce="n-1"), "n-1")
+    assert response.status_code == 200
+    session = response.json()["session_token"]
+    assert security.get_session_verifier().verify(session)["sui_address"] == ADDRESS
+
+    replay = _login(sign(nonce="n-1"), "n-1")
+    assert replay.status_code == 400
+    assert replay.json()["detail"] == "Nonce has already been used"
+
+    assert _login(sign(nonce="n-2", exp=int(time.time()) - 10), "n-2").status_code == 401
+    assert _login(sign(nonce="n-3", aud="other-app"), "n-3").status_code == 400
+    assert _login(sign(kid="rotated", nonce="n-4"), "n-4").status_code == 400
+    # An unknown kid does not reload the JWKS again within min_refresh_interval.
+    assert cache.loads == 1
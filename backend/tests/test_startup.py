@@ -0,0 +1,154 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+os.environ.setdefault("SUPABASE_URL", "http://localhost")
+os.environ.setdefault("SUPABASE_ANON_KEY", "anon")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "service")
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, inspect
+
+from app import main, migrations
+from app.config import settings
+
+BACKEND = Path(__file__).resolve().parents[1]
+# Importing app.main takes ~0.55s here, most of it FastAPI itself; the budget
+# leaves room for slower CI machines while catching an eager heavy import.
+IMPORT_BUDGET_SECONDS = float(os.environ.get("IMPORT_BUDGET_SECONDS", "1.5"))
+DEFERRED_MODULES = ("sqlalchemy", "jose", "httpx", "concurrent.futures.process")
+
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import app.main
+elapsed = time.perf_counter() - started
+print(json.dumps({"elapsed": elapsed, "loaded": [name for name in %r if name in sys.modules]}))
+"""
+
+
+def _import_app(modules=DEFERRED_MODULES, **overrides) -> dict:
+    env = {**os.environ, "STARTUP_MODE": "lite", "PYTHONWARNINGS": "ignore", **overrides}
+    result = subprocess.run(
+        [sys.executable, "-c", _PROBE % (tuple(modules),)],
+        cwd=BACKEND,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_app_import_defers_heavy_modules_and_stays_within_budget():
+    # Best of three, so one slow run on a busy machine does not fail the budget.
+    probes = [_import_app() for _ in range(3)]
+    assert all(probe["loaded"] == [] for probe in probes)
+    assert min(probe["elapsed"] for probe in probes) < IMPORT_BUDGET_SECONDS
+
+
+def test_unlisted_routers_are_never_imported():
+    routers = [f"app.api.{name}" for name, _ in main.ROUTERS]
+    probe = _import_app(routers, API_ROUTERS="messages, live")
+    assert probe["loaded"] == ["app.api.messages", "app.api.live"]
+    with pytest.raises(ValueError, match="wallets"):
+        main.enabled_routers("messages,wallets")
+
+
+def test_store_libraries_load_only_with_the_routers_that_need_them():
+    # numpy backs the in-process message store and sortedcontainers the proposal
+    # book; app.main leaves both to the lifespan and the feed routers.
+    libraries = ("numpy", "sortedcontainers")
+    assert _import_app(libraries, API_ROUTERS="auth, swap, wallet")["loaded"] == []
+    assert _import_app(libraries, API_ROUTERS="messages")["loaded"] == list(libraries)
+
+
+def test_migrations_upgrade_once_and_report_status(tmp_path, capsys):
+    url = f"sqlite:///{tmp_path / 'app.db'}"
+    engine = create_engine(url)
+    assert [migration.version for migration in migrations.pending(engine)] == [1, 2, 3, 4, 5, 6, 7, 8]
+    assert [migration.version for migration in migrations.upgrade(engine)] == [1, 2, 3, 4, 5, 6, 7, 8]
+    assert migrations.upgrade(engine) == []
+    assert migrations.applied_versions(engine) == [1, 2, 3, 4, 5, 6, 7, 8]
+    assert {"messages", "creators", "schema_migrations"} <= set(inspect(engine).get_table_names())
+    engine.dispose()
+
+    assert migrations.main(["status", "--url", url]) == 0
+    assert "1  applied  initial schema" in capsys.readouterr().out
+
+
+def test_upgrade_stops_at_target(tmp_path):
+    applied = []
+    steps = [
+        migrations.Migration(version, f"step {version}", lambda connection, version=version: applied.append(version))
+        for version in (1, 2, 3)
+    ]
+    engine = create_engine(f"sqlite:///{tmp_path / 'app.db'}")
+    migrations.upgrade(engine, target=2, migrations=steps)
+    assert applied == [1, 2]
+    migrations.upgrade(engine, migrations=steps)
+    assert applied == [1, 2, 3]
+    engine.dispose()
+
+
+@pytest.mark.parametrize("mode, migrates", [("lite", False), ("full", True)])
+def test_lifespan_runs_migrations_only_in_full_mode(monkeypatch, mode, migrates):
+    calls = []
+    monkeypatch.setattr(settings, "STARTUP_MODE", mode)
+    monkeypatch.setattr(settings, "INTERNAL_ENDPOINTS", True)
+    monkeypatch.setattr(migrations, "upgrade", lambda engine: calls.append(engine))
+    with TestClient(main.app) as client:
+        body = client.get("/startup").json()
+    assert bool(calls) is migrates
+    assert body["mode"] == mode
+    assert {"settings", "imports", "app", "routers", "services", "background"} <= set(body["phases_ms"])
+
+
+def test_internal_endpoints_are_hidden_unless_enabled(monkeypatch):
+    client = TestClient(main.app)
+    for path in ("/db/pool", "/blobs", "/indexer", "/startup", "/auth/metrics"):
+        assert client.get(path).status_code == 404
+    paths = client.get("/openapi.json").json()["paths"]
+    assert "/startup" not in paths and "/auth/metrics" not in paths
+    monkeypatch.setattr(settings, "INTERNAL_ENDPOINTS", True)
+    assert client.get("/startup").status_code == 200
+    assert "proof_verifier" in client.get("/auth/metrics").json()
+
+
+def _schema(engine):
+    tables = inspect(engine)
+    return {
+        name: (
+            {(column["name"], str(column["type"]), column["nullable"]) for column in tables.get_columns(name)},
+            {(index["name"], tuple(index["column_names"])) for index in tables.get_indexes(name)},
+        )
+        for name in tables.get_table_names()
+        if name != "schema_migrations" and not name.startswith("messages_fts")
+    }
+
+
+def test_frozen_migrations_build_the_model_schema(tmp_path):
+    from app.models import Base
+
+    migrated = create_engine(f"sqlite:///{tmp_path / 'migrated.db'}")
+    built = create_engine(f"sqlite:///{tmp_path / 'built.db'}")
+    migrations.upgrade(migrated)
+    Base.metadata.create_all(bind=built)
+    assert _schema(migrated) == _schema(built)
+    assert "messages_fts" in inspect(migrated).get_table_names()
+    migrated.dispose()
+    built.dispose()
+
+
+def test_initial_migration_refuses_pre_versioning_messages(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as connection:
+        connection.exec_driver_sql("CREATE TABLE messages (id INTEGER PRIMARY KEY, content VARCHAR)")
+    with pytest.raises(RuntimeError, match="predates versioned migrations"):
+        migrations.upgrade(engine)
+    assert migrations.applied_versions(engine) == []
+    engine.dispose()
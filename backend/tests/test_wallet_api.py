@@ -0,0 +1,398 @@
+import os
+import threading
+import time
+from decimal import Decimal
+
+import pytest
+
+os.environ.setdefault("SUPABASE_URL", "http://localhost")
+os.environ.setdefault("SUPABASE_ANON_KEY", "anon")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "service")
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import wallet
+from app.security import get_current_user
+
+from benchmarks.wallet_bench import FakeChainAdapter
+
+USER = {"id": "0x" + "ab" * 32}
+
+
+@pytest.fixture
+def adapter(monkeypatch):
+    fake = FakeChainAdapter(delay=0.05)
+    fake.install(monkeypatch.setattr)
+    wallet.get_wallet_cache().clear()
+    yield fake
+    wallet.get_wallet_cache().clear()
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(wallet.router, prefix="/api/wallet")
+    app.dependency_overrides[get_current_user] = lambda: USER
+    return TestClient(app)
+
+
+def test_summary_fetches_assets_concurrently(client, adapter):
+    started = time.perf_counter()
+    response = client.get("/api/wallet/summary")
+    elapsed = time.perf_counter() - started
+
+    assert response.status_code == 200
+    amounts = {asset["symbol"]: Decimal(asset["amount"]) for asset in response.json()["assets"]}
+    assert amounts == {"SWT": Decimal("1500"), "SUI": Decimal("12.5"), "BTC": Decimal("0.1"), "ETH": Decimal("2")}
+    # Eight lookups at 50 ms each take 400 ms in sequence; per chain about three round-trips.
+    assert elapsed < 0.3
+    assert adapter.max_in_flight >= 3
+    assert sorted(map(sorted, adapter.batches)) == [["BTC"], ["ETH"], ["SUI", "SWT"]]
+
+
+def test_slow_optional_chain_degrades_to_zero(client, adapter, monkeypatch):
+    adapter.delays["BTC"] = 5.0
+    monkeypatch.setattr(wallet, "OPTIONAL_CHAIN_TIMEOUT_SECONDS", 0.2)
+
+    started = time.perf_counter()
+    response = client.get("/api/wallet/summary")
+    elapsed = time.perf_counter() - started
+
+    assert response.status_code == 200
+    amounts = {asset["symbol"]: Decimal(asset["amount"]) for asset in response.json()["assets"]}
+    assert amounts["BTC"] == Decimal("0")
+    assert amounts["ETH"] == Decimal("2")
+    assert elapsed < 1.0
+    adapter.release.set()
+
+
+def test_slow_required_chain_times_out(client, adapter, monkeypatch):
+    adapter.delays["SUI"] = 5.0
+    monkeypatch.setattr(wallet, "CHAIN_CALL_TIMEOUT_SECONDS", 0.1)
+
+    before = client.get("/api/wallet/metrics").json()["chain_lookups"]
+    response = client.get("/api/wallet/summary")
+    after = client.get("/api/wallet/metrics").json()["chain_lookups"]
+    adapter.release.set()
+
+    assert response.status_code == 503
+    assert response.json()["detail"]["code"] == "WALLET_CHAIN_UNAVAILABLE"
+    # The SUI address lookup ignores the deadline, so its pool thread is given up on.
+    assert after["abandoned"] - before["abandoned"] == 1
+
+
+def test_slow_balance_call_is_cut_off_at_the_deadline(client, adapter, monkeypatch):
+    assert client.get("/api/wallet/summary").status_code == 200
+    adapter.delays["SUI"] = 5.0
+    monkeypatch.setattr(wallet, "CHAIN_CALL_TIMEOUT_SECONDS", 0.1)
+    wallet.get_wallet_cache().balances.clear()
+
+    before = client.get("/api/wallet/metrics").json()["chain_lookups"]
+    started = time.perf_counter()
+    response = client.get("/api/wallet/summary")
+    elapsed = time.perf_counter() - started
+    after = client.get("/api/wallet/metrics").json()["chain_lookups"]
+
+    assert response.status_code == 503
+    assert "Timed out fetching SWT, SUI balance" in response.json()["detail"]["detail"]
+    assert elapsed < 1.0
+    # The batched call timed out by itself; no pool thread was left behind.
+    assert after["timeouts"] - before["timeouts"] == 1
+    assert after["abandoned"] == before["abandoned"]
+
+
+def test_required_chain_error_is_reported(client, adapter):
+    adapter.failures.add("SWT")
+    response = client.get("/api/wallet/summary")
+    assert response.status_code == 503
+    assert "SWT" in response.json()["detail"]["detail"]
+
+
+def test_repeat_summary_is_served_from_cache(client, adapter):
+    assert client.get("/api/wallet/summary").status_code == 200
+    calls = adapter.calls
+    # Counters are process-wide, and concurrent first lookups hit or coalesce by timing.
+    before = client.get("/api/wallet/metrics").json()["cache"]
+    assert client.get("/api/wallet/summary").status_code == 200
+    assert adapter.calls == calls
+
+    after = client.get("/api/wallet/metrics").json()["cache"]
+    assert after["addresses"]["hits"] - before["addresses"]["hits"] == 4
+    assert after["balances"]["hits"] - before["balances"]["hits"] == 4
+
+
+def test_swap_invalidates_traded_balances(client, adapter, monkeypatch):
+    from app import chain as chain_module
+
+    def swap(user, amount, slippage, *, min_receive_amount):
+        return "0xdigest", min_receive_amount
+
+    monkeypatch.setattr(chain_module, "swap_sui_to_swt", swap, raising=False)
+    assert client.get("/api/wallet/summary").status_code == 200
+    response = client.post(
+        "/api/wallet/swap/execute",
+        json={"pay_symbol": "SUI", "receive_symbol": "SWT", "pay_amount": "1"},
+    )
+    assert response.status_code == 200
+
+    calls = adapter.calls
+    assert client.get("/api/wallet/summary").status_code == 200
+    # Only the SUI and SWT balances are re-read, in one call; addresses stay cached.
+    assert adapter.calls == calls + 1
+    assert sorted(adapter.batches[-1]) == ["SUI", "SWT"]
+
+
+def test_concurrent_swaps_with_same_key_execute_once(client, adapter, monkeypatch):
+    from app import chain as chain_module
+    from app.services.idempotency import MemoryIdempotencyStore, use_idempotency_store
+
+    swaps = []
+
+    def swap(user, amount, slippage, *, min_receive_amount):
+        swaps.append(amount)
+        time.sleep(0.1)
+        return f"0xdigest{len(swaps)}", min_receive_amount
+
+    monkeypatch.setattr(chain_module, "swap_sui_to_swt", swap, raising=False)
+    use_idempotency_store(MemoryIdempotencyStore())
+    request = {"pay_symbol": "SUI", "receive_symbol": "SWT", "pay_amount": "1", "idempotency_key": "k1"}
+    responses = []
+    try:
+        threads = [
+            threading.Thread(target=lambda: responses.append(client.post("/api/wallet/swap/execute", json=request)))
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        metrics = client.get("/api/wallet/metrics").json()
+    finally:
+        use_idempotency_store(None)
+
+    assert [response.status_code for response in responses] == [200] * 4
+    assert {response.json()["tx_digest"] for response in responses} == {"0xdigest1"}
+    assert len(swaps) == 1
+    assert metrics["idempotency"]["executed"] == 1
+
+
+def test_quotes_use_oracle_snapshot(client, adapter):
+    from app.services.prices import PriceOracle, StaticPriceSource, use_price_oracle
+
+    prices = {"SWT": Decimal("0.002"), "SUI": Decimal("4")}
+    oracle = PriceOracle([StaticPriceSource(prices)], symbols=tuple(prices), seed=prices)
+    use_price_oracle(oracle)
+    try:
+        quote = client.post(
+            "/api/wallet/swap/quote", json={"pay_symbol": "SUI", "receive_symbol": "SWT", "pay_amount": "1"}
+        ).json()
+        metrics = client.get("/api/wallet/metrics").json()["prices"]
+    finally:
+        use_price_oracle(None)
+
+    assert Decimal(quote["price"]) == Decimal("2000")
+    assert metrics["symbols"]["SUI"]["price"] == "4"
+
+
+def test_batch_quotes_match_single_quotes(client):
+    requests = [
+        {"pay_symbol": pay, "receive_symbol": receive, "pay_amount": amount}
+        for pay, receive in (("SUI", "SWT"), ("SWT", "SUI"))
+        for amount in ("0.000001", "1", "123.456789")
+    ]
+    response = client.post("/api/wallet/swap/quote/batch", json={"quotes": requests})
+    assert response.status_code == 200
+    quotes = response.json()["quotes"]
+    assert len({quote["expires_at"] for quote in quotes}) == 1
+
+    fields = ("receive_amount", "fee_amount", "price", "fee_rate_bps")
+    for request, quote in zip(requests, quotes):
+        single = client.post("/api/wallet/swap/quote", json=request).json()
+        assert {key: quote[key] for key in fields} == {key: single[key] for key in fields}
+
+
+def test_batch_quote_reports_failing_item(client):
+    response = client.post(
+        "/api/wallet/swap/quote/batch",
+        json={
+            "quotes": [
+                {"pay_symbol": "SUI", "receive_symbol": "SWT", "pay_amount": "1"},
+                {"pay_symbol": "SUI", "receive_symbol": "SUI", "pay_amount": "1"},
+            ]
+        },
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"] == {"detail": "quotes[1]: Cannot swap the same asset.", "code": "WALLET_SAME_SYMBOL"}
+    too_many = {"quotes": [{"pay_symbol": "SUI", "receive_symbol": "SWT", "pay_amount": "1"}] * 501}
+    assert client.post("/api/wallet/swap/quote/batch", json=too_many).status_code == 422
+
+
+def test_quote_ladder(client):
+    response = client.post(
+        "/api/wallet/swap/quote/ladder",
+        json={"pay_symbol": "SWT", "receive_symbol": "SUI", "pay_amounts": ["1000", "2000", "5000"]},
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert [step["pay_amount"] for step in body["steps"]] == ["1000", "2000", "5000"]
+    for step in body["steps"]:
+        single = client.post(
+            "/api/wallet/swap/quote",
+            json={"pay_symbol": "SWT", "receive_symbol": "SUI", "pay_amount": step["pay_amount"]},
+        ).json()
+        assert step["receive_amount"] == single["receive_amount"]
+        assert step["fee_amount"] == single["fee_amount"]
+
+
+def test_quotes_use_pool_once_it_has_liquidity(client):
+    from app.api import swap
+    from app.services.amm import ConstantProductPool, use_swap_pool
+
+    pool = ConstantProductPool(reserve_a=1_000 * 10**9, reserve_b=3_660_000 * 10**6, fee_bps=wallet.FEE_BPS)
+    use_swap_pool(pool)
+    try:
+        small = client.post(
+            "/api/wallet/swap/quote", json={"pay_symbol": "SUI", "receive_symbol": "SWT", "pay_amount": "1"}
+        ).json()
+        large = client.post(
+            "/api/wallet/swap/quote", json={"pay_symbol": "SUI", "receive_symbol": "SWT", "pay_amount": "100"}
+        ).json()
+        pool_app = FastAPI()
+        pool_app.include_router(swap.router, prefix="/swap")
+        status = TestClient(pool_app).get("/swap/pool").json()
+    finally:
+        use_swap_pool(None)
+
+    assert Decimal(small["price"]) == Decimal("3660")
+    # 100 SUI moves a 1000 SUI pool: well below 100x the 1 SUI quote.
+    assert Decimal(large["receive_amount"]) < 100 * Decimal(small["receive_amount"]) * Decimal("0.95")
+    assert status["ready"] and status["reserves"] == {"SUI": "1000", "SWT": "3660000"}
+
+
+def test_quote_ladder_prices_every_step_from_one_pool_snapshot(client, monkeypatch):
+    from app.services.amm import ConstantProductPool, use_swap_pool
+
+    reserves = {"reserve_a": 1_000 * 10**9, "reserve_b": 3_660_000 * 10**6, "fee_bps": wallet.FEE_BPS}
+    pool = ConstantProductPool(**reserves)
+    compute_quote = wallet._compute_quote
+
+    def quote_then_trade(*args):
+        # A pool event lands while the ladder is being quoted.
+        quoted = compute_quote(*args)
+        pool.sync({"SUI": 2_000 * 10**9, "SWT": 1_830_000 * 10**6})
+        return quoted
+
+    monkeypatch.setattr(wallet, "_compute_quote", quote_then_trade)
+    use_swap_pool(pool)
+    try:
+        response = client.post(
+            "/api/wallet/swap/quote/ladder",
+            json={"pay_symbol": "SUI", "receive_symbol": "SWT", "pay_amounts": ["1", "10", "100"]},
+        )
+    finally:
+        use_swap_pool(None)
+
+    body = response.json()
+    before = ConstantProductPool(**reserves)
+    assert Decimal(body["price"]) == Decimal("3660")
+    for step in body["steps"]:
+        receive_amount, fee_amount, _ = before.quote_amount("SUI", Decimal(step["pay_amount"]))
+        assert (Decimal(step["receive_amount"]), Decimal(step["fee_amount"])) == (receive_amount, fee_amount)
+
+
+class _SwapRecorder:
+    def __init__(self):
+        self.min_receive_amounts = []
+        self.fill = None
+
+    def __call__(self, user, amount, slippage, *, min_receive_amount):
+        self.min_receive_amounts.append(min_receive_amount)
+        return "0xdigest", min_receive_amount if self.fill is None else self.fill
+
+
+@pytest.fixture
+def swap_recorder(monkeypatch):
+    from app import chain as chain_module
+
+    recorder = _SwapRecorder()
+    monkeypatch.setattr(chain_module, "swap_sui_to_swt", recorder, raising=False)
+    return recorder
+
+
+def test_execute_accepts_quote_token_without_requoting(client, adapter, swap_recorder, monkeypatch):
+    request = {"pay_symbol": "SUI", "receive_symbol": "SWT", "pay_amount": "1", "slippage_bps": 100}
+    quote = client.post("/api/wallet/swap/quote", json=request).json()
+    assert quote["quote_token"]
+
+    def no_requote(*args, **kwargs):
+        raise AssertionError("execute_swap re-quoted")
+
+    monkeypatch.setattr(wallet, "_compute_quote", no_requote)
+    response = client.post("/api/wallet/swap/execute", json={**request, "quote_token": quote["quote_token"]})
+    assert response.status_code == 200
+    assert swap_recorder.min_receive_amounts == [Decimal(quote["receive_amount"]) * Decimal("0.99")]
+
+
+def test_quote_token_rejects_tampering_and_other_users(client, adapter, swap_recorder):
+    request = {"pay_symbol": "SUI", "receive_symbol": "SWT", "pay_amount": "1"}
+    token = client.post("/api/wallet/swap/quote", json=request).json()["quote_token"]
+
+    changed = client.post("/api/wallet/swap/execute", json={**request, "pay_amount": "2", "quote_token": token})
+    assert changed.json()["detail"]["code"] == "WALLET_QUOTE_INVALID"
+    # The same amount written differently still matches.
+    restated = client.post("/api/wallet/swap/execute", json={**request, "pay_amount": "1.00", "quote_token": token})
+    assert restated.status_code == 200
+    forged = token[:-2] + ("AA" if not token.endswith("AA") else "BB")
+    assert client.post("/api/wallet/swap/execute", json={**request, "quote_token": forged}).json()["detail"][
+        "code"
+    ] == "WALLET_QUOTE_INVALID"
+
+    client.app.dependency_overrides[get_current_user] = lambda: {"id": "0x" + "cd" * 32}
+    other = client.post("/api/wallet/swap/execute", json={**request, "quote_token": token})
+    assert other.json()["detail"]["code"] == "WALLET_QUOTE_INVALID"
+
+
+def test_expired_quote_token_is_rejected(client, adapter, swap_recorder, monkeypatch):
+    request = {"pay_symbol": "SUI", "receive_symbol": "SWT", "pay_amount": "1"}
+    monkeypatch.setattr(wallet, "QUOTE_TTL_SECONDS", -1)
+    token = client.post("/api/wallet/swap/quote", json=request).json()["quote_token"]
+    response = client.post("/api/wallet/swap/execute", json={**request, "quote_token": token})
+    assert response.status_code == 400
+    assert response.json()["detail"]["code"] == "WALLET_QUOTE_EXPIRED"
+
+
+def test_fill_below_slippage_limit_is_reported(client, adapter, swap_recorder):
+    swap_recorder.fill = Decimal("3000")
+    response = client.post(
+        "/api/wallet/swap/execute",
+        json={"pay_symbol": "SUI", "receive_symbol": "SWT", "pay_amount": "1", "slippage_bps": 30},
+    )
+    assert response.status_code == 502
+    assert response.json()["detail"]["code"] == "WALLET_SLIPPAGE_EXCEEDED"
+
+
+def test_lifespan_owns_the_chain_pool():
+    app = FastAPI()
+    app.include_router(wallet.router, prefix="/api/wallet")
+    with TestClient(app):
+        pool = wallet.get_chain_pool()
+        assert pool.submit(lambda: 1).result() == 1
+    with pytest.raises(RuntimeError):
+        pool.submit(lambda: 1)
+    assert wallet.get_chain_pool() is not pool
+    wallet.use_chain_pool(None)
+
+
+def test_main_app_mounts_the_wallet_router():
+    from app.main import app as main_app
+
+    client = TestClient(main_app)
+    assert client.get("/api/wallet/metrics").status_code == 401
+    main_app.dependency_overrides[get_current_user] = lambda: USER
+    try:
+        response = client.get("/api/wallet/metrics")
+    finally:
+        main_app.dependency_overrides.pop(get_current_user)
+    assert response.status_code == 200
+    assert set(response.json()) == {"cache", "chain_lookups", "idempotency", "prices"}
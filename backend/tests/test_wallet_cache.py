@@ -0,0 +1,113 @@
+import threading
+
+import pytest
+
+from app.services.wallet_cache import SingleFlightCache, WalletCache
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_concurrent_misses_share_one_load():
+    cache = SingleFlightCache()
+    started = threading.Event()
+    release = threading.Event()
+    loads = []
+
+    def load():
+        loads.append(1)
+        started.set()
+        release.wait(5)
+        return 42
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_load("k", load))) for _ in range(20)]
+    threads[0].start()
+    started.wait(5)
+    for thread in threads[1:]:
+        thread.start()
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert results == [42] * 20
+    assert len(loads) == 1
+    stats = cache.stats()
+    assert stats["misses"] == 1
+    assert stats["hits"] + stats["coalesced"] == 19
+
+
+def test_ttl_expiry_and_lru_eviction():
+    clock = _Clock()
+    cache = SingleFlightCache(max_entries=2, ttl=5.0, clock=clock)
+    cache.get_or_load("a", lambda: 1)
+    cache.get_or_load("b", lambda: 2)
+    cache.get_or_load("a", lambda: 0)
+    cache.get_or_load("c", lambda: 3)
+
+    assert cache.peek("b") is None
+    assert cache.peek("a") == 1
+    assert cache.stats()["evictions"] == 1
+
+    clock.now = 6.0
+    assert cache.get_or_load("a", lambda: 10) == 10
+
+
+def test_failed_loads_are_not_cached():
+    cache = SingleFlightCache()
+
+    def boom():
+        raise RuntimeError("node down")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_load("k", boom)
+    assert cache.get_or_load("k", lambda: 7) == 7
+
+
+def test_invalidation_during_load_discards_result():
+    cache = SingleFlightCache()
+
+    def load():
+        cache.invalidate("k")
+        return "stale"
+
+    assert cache.get_or_load("k", load) == "stale"
+    assert cache.get_or_load("k", lambda: "fresh") == "fresh"
+
+
+def test_wallet_cache_invalidates_from_balance_changes():
+    cache = WalletCache(coin_symbols={"0x2::sui::SUI": "SUI"})
+    cache.address("alice", "SUI", lambda: "0xa11ce")
+    cache.address("alice", "SWT", lambda: "0xa11ce")
+    cache.balance("0xa11ce", "SUI", lambda: 5)
+    cache.balance("0xa11ce", "SWT", lambda: 9)
+
+    matched = cache.apply_balance_changes(
+        [
+            {"owner": {"AddressOwner": "0xA11CE"}, "coinType": "0x2::sui::SUI", "amount": "-10"},
+            {"owner": {"Shared": {}}, "coinType": "0x2::sui::SUI", "amount": "10"},
+        ]
+    )
+    assert matched == 1
+    assert cache.balances.peek(("0xa11ce", "SUI")) is None
+    assert cache.balances.peek(("0xa11ce", "SWT")) == 9
+
+    cache.invalidate_user_balances("alice", ["SWT"])
+    assert cache.balances.peek(("0xa11ce", "SWT")) is None
+    assert cache.addresses.peek(("alice", "SUI")) == "0xa11ce"
+
+
+def test_balance_keys_ignore_address_case():
+    cache = WalletCache(coin_symbols={"0xpkg::token::TOKEN": "SWT"})
+    cache.balance("0xA11CE", "SWT", lambda: 9)
+    assert cache.balance("0xa11ce", "SWT", lambda: 0) == 9
+
+    cache.apply_balance_changes([{"owner": {"AddressOwner": "0xa11ce"}, "coinType": "0xpkg::token::TOKEN"}])
+    assert cache.balance("0xA11CE", "SWT", lambda: 7) == 7
+    cache.invalidate_balance("0xA11ce", "SWT")
+    assert cache.balances.peek(("0xa11ce", "SWT")) is None
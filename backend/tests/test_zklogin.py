@@ -0,0 +1,199 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+os.environ.setdefault("SUPABASE_URL", "http://localhost")
+os.environ.setdefault("SUPABASE_ANON_KEY", "anon")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "service")
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from jose import jwt
+
+from app import security
+from app.api import auth
+from app.config import settings
+from app.services.zklogin import (
+    CURVE_ORDER,
+    FIELD_MODULUS,
+    ProofJob,
+    ProofVerifierPool,
+    VerifierSaturatedError,
+    accept_proof,
+    check_proof_structure,
+    load_verifier,
+    use_proof_verifier,
+)
+
+ADDRESS = "0x" + "ab" * 32
+
+# snarkjs-style proof made of the BN254 generators: on-curve, though not a real proof.
+G1 = ["1", "2", "1"]
+G2 = [
+    [
+        "10857046999023057135944570762232829481370756359578518086990519993285655852781",
+        "11559732032986387107991004021392285783925812861821192530917403151452391805634",
+    ],
+    [
+        "8495653923123431417604973247489272438418190587263600148770280649306958101930",
+        "4082367875863433681332203403145435568316851327593401208105741076214120093531",
+    ],
+    ["1", "0"],
+]
+PROOF = {"pi_a": G1, "pi_b": G2, "pi_c": G1}
+
+
+def _job(proof=PROOF, public_inputs=("1", "2"), max_epoch=10):
+    return ProofJob(ADDRESS, max_epoch, proof, public_inputs)
+
+
+def test_structure_check_accepts_points_on_curve():
+    assert check_proof_structure(_job())
+    assert check_proof_structure(_job({"proofPoints": {"a": G1, "b": G2, "c": G1}}))
+
+
+@pytest.mark.parametrize(
+    "proof, public_inputs",
+    [
+        ({**PROOF, "pi_a": ["1", "3", "1"]}, ("1",)),
+        ({**PROOF, "pi_b": [G2[1], G2[0], G2[2]]}, ("1",)),
+        ({**PROOF, "pi_c": ["1", str(2 + FIELD_MODULUS), "1"]}, ("1",)),
+        ({"pi_a": "value"}, ("1",)),
+        (PROOF, (str(CURVE_ORDER),)),
+        (PROOF, ("input-1",)),
+    ],
+)
+def test_structure_check_rejects_malformed_proofs(proof, public_inputs):
+    assert not check_proof_structure(_job(proof, public_inputs))
+
+
+def test_verifier_must_be_configured():
+    with pytest.raises(ValueError, match="ZKLOGIN_PROOF_VERIFIER"):
+        load_verifier(None)
+    assert load_verifier("none") is accept_proof
+
+
+def test_process_pool_verifies_each_submission():
+    pool = ProofVerifierPool(check_proof_structure, workers=1)
+
+    async def run():
+        first = await pool.verify(_job())
+        again = await pool.verify(_job())
+        other_epoch = await pool.verify(_job(max_epoch=11))
+        bad = await pool.verify(_job(public_inputs=(str(CURVE_ORDER),)))
+        return first, again, other_epoch, bad
+
+    try:
+        assert asyncio.run(run()) == (True, True, True, False)
+    finally:
+        pool.shutdown()
+    stats = pool.stats()
+    assert stats["submitted"] == 4
+    assert stats["invalid"] == 1
+    assert stats["queue_depth"] == 0
+    assert stats["verification"]["count"] == 4
+
+
+def test_saturated_pool_rejects_and_identical_proofs_share_a_slot():
+    release = threading.Event()
+    calls = []
+
+    def slow(job):
+        calls.append(job.max_epoch)
+        release.wait(5)
+        return True
+
+    pool = ProofVerifierPool(slow, max_pending=2, executor=ThreadPoolExecutor(max_workers=1))
+
+    async def run():
+        first = asyncio.ensure_future(pool.verify(_job(max_epoch=1)))
+        duplicate = asyncio.ensure_future(pool.verify(_job(max_epoch=1)))
+        second = asyncio.ensure_future(pool.verify(_job(max_epoch=2)))
+        await asyncio.sleep(0.05)
+        with pytest.raises(VerifierSaturatedError):
+            await pool.verify(_job(max_epoch=3))
+        assert pool.stats()["queue_depth"] == 2
+        release.set()
+        return await asyncio.gather(first, duplicate, second)
+
+    try:
+        assert asyncio.run(run()) == [True, True, True]
+    finally:
+        pool.shutdown()
+    stats = pool.stats()
+    assert sorted(calls) == [1, 2]
+    assert stats["coalesced"] == 1
+    assert stats["rejected"] == 1
+    assert stats["max_queue_depth"] == 2
+    assert stats["wait"]["count"] == 2
+
+
+class _Saturated(ProofVerifierPool):
+    async def verify(self, job):
+        raise VerifierSaturatedError("full")
+
+
+class _Rejecting(ProofVerifierPool):
+    async def verify(self, job):
+        return False
+
+
+@pytest.fixture
+def login(monkeypatch):
+    monkeypatch.setattr(settings, "SECRET_KEY", "session-secret")
+    security.get_nonce_store().clear()
+    app = FastAPI()
+    app.include_router(auth.router, prefix="/auth")
+    client = TestClient(app)
+    token = jwt.encode({"sub": "user-1", "nonce": "n-1"}, "oidc-secret", algorithm="HS256")
+    payload = {
+        "provider": "google",
+        "jwt": token,
+        "nonce": "n-1",
+        "suiAddress": ADDRESS,
+        "sessionKey": "session-key",
+        "signature": "signature",
+        "proof": {"proof": PROOF, "publicInputs": ["1"], "maxEpoch": 10},
+    }
+    yield lambda: client.post("/auth/zk-login", json=payload)
+    use_proof_verifier(None)
+
+
+def test_zk_login_returns_429_when_verifier_is_saturated(login):
+    use_proof_verifier(_Saturated(accept_proof))
+    response = login()
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "1"
+    # The nonce is not spent, so the client can retry.
+    use_proof_verifier(ProofVerifierPool(check_proof_structure, executor=ThreadPoolExecutor(max_workers=1)))
+    assert login().status_code == 200
+
+
+def test_zk_login_rejects_invalid_proof(login):
+    use_proof_verifier(_Rejecting(accept_proof))
+    response = login()
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Invalid zkLogin proof"
+
+
+class _Counting(ProofVerifierPool):
+    def __init__(self):
+        super().__init__(accept_proof)
+        self.calls = 0
+
+    async def verify(self, job):
+        self.calls += 1
+        return True
+
+
+def test_zk_login_refuses_spent_nonce_before_verifying(login):
+    verifier = _Counting()
+    use_proof_verifier(verifier)
+    assert login().status_code == 200
+    response = login()
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Nonce has already been used"
+    assert verifier.calls == 1